@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Painel do Administrador - Atualizações pendentes do robô
+# Mostra, a partir do índice em memória (core.pendentes), o que ainda não foi aplicado no DataJuri.
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+from core.compactacao import compact_pending, format_stats
+from core.pendentes import PendingIndex
+
+# ==============================================================================
+# CONFIGURAÇÃO GERAL E CONSTANTES
+# ==============================================================================
+
+st.set_page_config(page_title="Atualizações Pendentes - DataJuri", layout="wide")
+
+UPDATE_FOLDER = 'atualizacoes_robo' # Mesma pasta usada pelo Assistente Jurídico
+ALERTA_IDADE_MINUTOS = 60
+
+
+@st.cache_resource
+def get_pending_index(folder: str) -> PendingIndex:
+    """Um único índice (e um único observador da pasta) por processo, compartilhado entre as sessões."""
+    index = PendingIndex(folder)
+    index.start_watching()
+    return index
+
+
+def format_idade(minutos: float) -> str:
+    if minutos < 60:
+        return f"{minutos:.0f} min"
+    if minutos < 60 * 24:
+        return f"{minutos / 60:.1f} h"
+    return f"{minutos / (60 * 24):.1f} dias"
+
+
+# ==============================================================================
+# INTERFACE
+# ==============================================================================
+
+index = get_pending_index(UPDATE_FOLDER)
+stats = index.stats()
+
+st.title("🤖 Atualizações Pendentes do Robô")
+st.caption(f"Índice atualizado em {stats['atualizado_em']:%d/%m/%Y %H:%M:%S} "
+           f"(observador: {stats['modo']}; último registro: nº {stats['ultimo_seq']}; processado pelo robô até o nº {stats['offset']}).")
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Pastas com pendências", stats['pastas'])
+col2.metric("Registros pendentes", stats['registros'])
+col3.metric("Tarefas pendentes", stats['tarefas'])
+idade = (datetime.now() - stats['mais_antigo']).total_seconds() / 60 if stats['mais_antigo'] else 0
+col4.metric("Espera mais longa", format_idade(idade) if stats['mais_antigo'] else "-")
+
+if st.button("🔄 Atualizar"):
+    st.rerun()
+
+with st.expander("🗜️ Compactar pendências"):
+    st.write("Junta os registros pendentes de cada pasta em um único conjunto mínimo de tarefas.")
+    if st.button("Compactar agora"):
+        st.session_state.resultado_compactacao = format_stats(compact_pending(index.journal))
+        index.refresh()
+        st.rerun()
+    if st.session_state.get("resultado_compactacao"):
+        st.success(st.session_state.resultado_compactacao)
+
+st.divider()
+
+st.header("Pendências por Pasta")
+summary = index.summary()
+if not summary:
+    st.info("Nenhuma atualização pendente. ✅")
+else:
+    summary_df = pd.DataFrame(summary)
+    summary_df['idade'] = summary_df['idade_min'].map(format_idade)
+    summary_df['mais_antigo'] = summary_df['mais_antigo'].map(lambda ts: ts.strftime('%d/%m/%Y %H:%M'))
+    atrasadas = int((summary_df['idade_min'] >= ALERTA_IDADE_MINUTOS).sum())
+    if atrasadas:
+        st.warning(f"{atrasadas} pasta(s) com atualizações esperando há mais de {ALERTA_IDADE_MINUTOS} minutos.")
+    st.dataframe(summary_df[['pasta', 'registros', 'tarefas', 'mais_antigo', 'idade']], use_container_width=True, hide_index=True)
+
+st.header("Consultar Pasta")
+pasta = st.text_input("Número da pasta:", key="pasta_consulta").strip()
+if pasta:
+    records = index.for_pasta(pasta)
+    if not records:
+        st.info(f"Nenhuma atualização pendente para a pasta {pasta}.")
+    for record in records:
+        st.subheader(f"Registro nº {record['seq']} - {record['ts']:%d/%m/%Y %H:%M:%S}")
+        linhas = []
+        for task in record['tasks']:
+            acao = task.get('acao', 'alterar')
+            anterior = record.get('anterior', {}).get(str(task.get('id')), {})
+            campos = {k: v for k, v in task.items() if k not in ('id', 'acao', 'origem')}
+            if acao == 'excluir' or not campos:
+                linhas.append({'pedido': str(task.get('id')), 'ação': acao, 'campo': '', 'de': '', 'para': ''})
+            for campo, valor in campos.items():
+                linhas.append({'pedido': str(task.get('id')) if acao != 'incluir' else '(novo)', 'ação': acao, 'campo': campo,
+                               'de': '' if acao == 'incluir' else str(anterior.get(campo, '?')), 'para': str(valor)})
+        st.dataframe(pd.DataFrame(linhas), use_container_width=True, hide_index=True)
@@ -4,10 +4,12 @@
 
 import streamlit as st
 from datetime import date, timedelta, datetime
-import holidays
-import re
+from collections import OrderedDict
+import hashlib
 import pandas as pd
 
+from core.tabela_colada import format_table_report, parse_datajuri_table
+
 # ========= INÍCIO: Constantes e Configurações =========
 # Centralizando opções e configurações para fácil manutenção
 CLIENTE_OPTIONS = ["Reclamante", "Reclamado", "Outro (Terceiro, MPT, etc.)"]
@@ -34,6 +36,10 @@ MAPA_DECISAO_RECURSO = {
 }
 IMAGE_PATH = "image_545e9d.png" # Certifique-se que este arquivo está na mesma pasta
 
+# Limites dos caches de tabelas processadas (por sessão e compartilhado entre sessões)
+PARSE_CACHE_SESSION_MAX = 16
+PARSE_CACHE_SHARED_MAX = 256
+
 # ========= FIM: Constantes e Configurações =========
 
 
@@ -41,7 +47,8 @@ IMAGE_PATH = "image_545e9d.png" # Certifique-se que este arquivo está na mesma
 
 @st.cache_data
 def get_holidays(year):
-    """Cacheia feriados para evitar recálculos."""
+    """Cacheia feriados para evitar recálculos (a biblioteca só é importada no primeiro cálculo de prazo)."""
+    import holidays
     return holidays.country_holidays('BR', years=year)
 
 def add_business_days(from_date, num_days):
@@ -65,114 +72,35 @@ def add_business_days(from_date, num_days):
         days_added += 1
     return current_date
 
-def _find_header_and_map_columns(lines: list[str]) -> tuple[dict, int, list]:
-    """Localiza a linha do cabeçalho e mapeia dinamicamente os índices das colunas."""
-    HEADER_KEYWORDS = ['objetos', 'situação', 'resultado 1ª instância', 'resultado 2ª instância', 'resultado instância superior']
-    header_map = {}
-    header_row_index = -1
-
-    for i, line in enumerate(lines):
-        line_lower = line.lower()
-        if sum(kw in line_lower for kw in HEADER_KEYWORDS) >= 3:
-            header_row_index = i
-            parts = re.split(r'\t|\s{2,}', line)
-            header_parts = [p.strip().lower() for p in parts if p.strip()]
-            
-            for kw in HEADER_KEYWORDS:
-                try:
-                    found_col = next(col for col in header_parts if kw in col)
-                    header_map[kw] = header_parts.index(found_col)
-                except StopIteration:
-                    return None, -1, [f"Coluna essencial '{kw}' não encontrada no cabeçalho: '{line}'"]
-            return header_map, header_row_index, []
-    
-    return None, -1, ["Não foi possível localizar uma linha de cabeçalho válida. Verifique se colunas como 'Objetos', 'Situação' e 'Resultado...' estão presentes."]
-
-def _parse_data_rows(lines: list[str], header_map: dict, start_index: int) -> tuple[list[dict], list[str]]:
-    """Processa as linhas de dados com base no mapa de colunas dinâmico."""
-    parsed_data = []
-    warnings = []
-    
-    num_expected_parts = len(header_map)
-    for i in range(start_index, len(lines)):
-        line = lines[i].strip()
-        if not line or line.lower().startswith(("visualizar", "editar", "ação", "gerenciar")):
-            continue
-
-        parts = re.split(r'\t|\s{2,}', line)
-        parts = [p.strip() for p in parts if p.strip()]
-        
-        if len(parts) < num_expected_parts:
-            warnings.append(f"Linha {i+1} parece incompleta (tem {len(parts)} partes, esperado ~{num_expected_parts}): '{line[:70]}...'")
-            continue
-
-        row_data = {}
-        try:
-            for key, col_index in header_map.items():
-                # Renomeia chaves para serem mais amigáveis ao Python/Pandas
-                clean_key = key.replace(' ', '_').replace('ª', 'a').capitalize()
-                row_data[clean_key] = parts[col_index] if col_index < len(parts) else 'N/A'
-            parsed_data.append(row_data)
-        except IndexError:
-            warnings.append(f"Falha ao acessar coluna na linha {i+1}. Verifique o alinhamento: '{line[:70]}...'")
-
-    return parsed_data, warnings
-
-def _format_report_text(data: list[dict], tipo_decisao: str, warnings: list[str]) -> str:
-    """Formata os dados processados em um texto de relatório legível."""
-    report_lines = []
-    if warnings:
-        report_lines.append("[AVISOS DURANTE PROCESSAMENTO]:")
-        report_lines.extend([f"- {w}" for w in warnings])
-        report_lines.append("-" * 20)
-
-    try:
-        data.sort(key=lambda x: x.get('Objetos', ''))
-    except TypeError:
-        st.warning("Não foi possível ordenar os pedidos (dados mistos).")
-
-    for index, item in enumerate(data, start=1):
-        report_lines.append(f"{index}) {item.get('Objetos', 'N/A')}")
-        
-        if situacao := item.get('Situação', 'N/A').strip():
-             report_lines.append(f" - Situação: {situacao}")
-
-        res1 = item.get('Resultado_1a_instância', 'N/A')
-        res2 = item.get('Resultado_2a_instância', 'N/A')
-        resSup = item.get('Resultado_instância_superior', 'N/A')
-
-        tipo_decisao_lower = tipo_decisao.lower() if tipo_decisao else ""
-        show_res2 = "acórdão" in tipo_decisao_lower or "monocrática" in tipo_decisao_lower or "denegatório" in tipo_decisao_lower
-        show_resSup = "tst" in tipo_decisao_lower or "denegatório" in tipo_decisao_lower
-
-        def is_relevant(res_value):
-            return res_value and res_value.lower().strip() not in ["aguardando julgamento", "n/a", "", "não houve recurso"]
-
-        if is_relevant(res1): report_lines.append(f" - Resultado 1ª Instância: {res1}")
-        if show_res2 and is_relevant(res2): report_lines.append(f" - Resultado 2ª Instância: {res2}")
-        if show_resSup and is_relevant(resSup): report_lines.append(f" - Resultado Instância Superior: {resSup}")
-        
-        report_lines.append("")
-
-    return "\n".join(report_lines)
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+@st.cache_data(max_entries=PARSE_CACHE_SHARED_MAX, show_spinner=False)
+def _parse_datajuri_table_shared(text_hash: str, _text: str):
+    """Cache compartilhado entre sessões, indexado apenas pelo hash do texto colado."""
+    return parse_datajuri_table(_text)
+
+def get_parsed_table(text: str):
+    """Busca a tabela processada no cache da sessão (LRU limitado) e, se ausente, no cache compartilhado."""
+    cache = st.session_state.setdefault("parse_cache", OrderedDict())
+    key = _text_hash(text)
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    result = _parse_datajuri_table_shared(key, text)
+    cache[key] = result
+    while len(cache) > PARSE_CACHE_SESSION_MAX:
+        cache.popitem(last=False)
+    return result
 
 def process_datajuri_table(text: str, tipo_decisao: str) -> tuple[pd.DataFrame, str, str]:
     """Função principal que orquestra o pipeline de processamento da tabela."""
-    lines = [l.strip() for l in text.strip().splitlines() if l.strip()]
-    if not lines:
-        return None, None, "Erro: O texto da tabela está vazio."
-
-    header_map, header_row_index, errors = _find_header_and_map_columns(lines)
-    if errors:
-        return None, None, "\n".join(errors)
-
-    data_rows, warnings = _parse_data_rows(lines, header_map, header_row_index + 1)
-    if not data_rows:
-        return None, None, "Erro: Nenhum dado de pedido válido foi extraído. Verifique o conteúdo após o cabeçalho."
-
-    df = pd.DataFrame(data_rows)
-    report_text = _format_report_text(data_rows, tipo_decisao, warnings)
+    df, data_rows, warnings, error = get_parsed_table(text)
+    if error:
+        return None, None, error
 
+    # Apenas a formatação depende do tipo de decisão; o parse vem do cache.
+    report_text = format_table_report(data_rows, tipo_decisao, warnings, avisar=st.warning)
     return df, report_text, None
 
 def format_prazos(prazos_list):
@@ -4,15 +4,22 @@
 # Correção: Ajustada a data de validade dos tetos recursais e o campo padrão de cliente.
 
 import streamlit as st
-import pandas as pd
-import requests
-import base64
-import json
-import os
-import logging
-from datetime import datetime, date, timedelta
-import holidays
-import re
+import contextlib
+import time
+import uuid
+from datetime import date
+
+from core.custas import calcular_custas, calcular_deposito_recursal, deposito_aplicavel, motivo_isencao
+from core.prazos import preload_holidays, suggest_prazo
+from core.logs import configure_logging, set_log_context
+from core.perfil import PerfilSessao
+from core.prefetch import Prefetcher
+from core.recentes import CasosRecentes
+from core.tetos import TetosError, get_tabela_tetos
+from app_comum import (definir_contexto_log, get_entity_data, get_prefetch_executor, get_valid_token, guardar_caso_atual,
+                        medir_etapa, mostrar_casos_recentes, mostrar_fila, mostrar_perfil, perfil_habilitado, prefetch_pasta)
+# pandas, requests e a geração de documentos (core.geracao) são importados no primeiro uso:
+# a tela inicial, antes da busca da pasta, não precisa deles.
 
 # ==============================================================================
 # CONFIGURAÇÃO GERAL E CONSTANTES
@@ -23,30 +30,14 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+inicio_pagina, inicio_cpu_pagina = time.perf_counter(), time.thread_time()
 
 # --- Constantes de Configuração e Valores Legais ---
-TOKEN_FILE = 'token.json'
 LOG_FILE = 'assistente.log'
-UPDATE_FOLDER = 'atualizacoes_robo' # Pasta para salvar os arquivos JSON
-TOKEN_EXPIRATION_MINUTES = 50
-
-# DATA DE VALIDADE DOS VALORES ABAIXO
-VALIDADE_VALORES_TETO = date(2025, 7, 31) # CORRIGIDO
-
-# ATENÇÃO: Valores base conforme Ato SEGJUD.GP Nº 366/2024, vigentes a partir de 01/08/2024.
-TETO_RECURSO_ORDINARIO = 13133.46
-TETO_RECURSO_REVISTA = 26266.92
-
-# O dicionário agora calcula os valores dos agravos dinamicamente.
-TETOS_DEPOSITO_RECURSAL = {
-    "Recurso Ordinário (RO)": TETO_RECURSO_ORDINARIO,
-    "Recurso de Revista (RR)": TETO_RECURSO_REVISTA,
-    "Recurso de Embargos (E-RR/E-ED)": TETO_RECURSO_REVISTA,
-    "Agravo de Instrumento em Recurso Ordinário (AIRO)": TETO_RECURSO_ORDINARIO / 2,
-    "Agravo de Instrumento em Recurso de Revista (AIRR)": TETO_RECURSO_REVISTA / 2,
-    "Outro": TETO_RECURSO_REVISTA # Usa o teto máximo como padrão
-}
-
+UPDATE_FOLDER = 'atualizacoes_robo' # Pasta do diário de atualizações do robô
+D_MENOS = -2 # Data D- (controle interno): dias úteis antes do prazo fatal, na seção de prazos e na fila de trabalho
+MODELO_EMAIL = 'email_cliente_retorno.txt' # Corpo do e-mail ao cliente (modelos/): pede retorno em 48 horas sobre o recurso
+# Tetos do depósito recursal: dados/tetos_deposito_recursal.json (uma vigência por ato do TST, ver core/tetos.py)
 
 CLIENTE_OPTIONS = ["Reclamante", "Reclamado", "Outro (Terceiro, MPT, etc.)"]
 DECISAO_OPTIONS = [
@@ -72,15 +63,27 @@ MAPA_DECISAO_RECURSO = {
     "Despacho Denegatório de Recurso": 4, "Decisão de Embargos de Declaração": 1,
     "Decisão Interlocutória": 0, "Outro": 0
 }
+RECURSO_POR_DECISAO = {decisao: RECURSO_OPTIONS[indice] for decisao, indice in MAPA_DECISAO_RECURSO.items()}
+OPCOES_FORMULARIO = { # Valores aceitos nos campos preenchidos pela lista da fila de trabalho
+    "cliente_role": CLIENTE_OPTIONS, "tipo_decisao": DECISAO_OPTIONS, "resultado_sentenca": RESULTADO_OPTIONS,
+    "ed_status": ED_OPTIONS, "recurso_selecionado": RECURSO_OPTIONS, "isencao_deposito": ISENCAO_OPTIONS, "isencao_custas": ISENCAO_OPTIONS,
+}
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', filename=LOG_FILE, filemode='a')
+configure_logging(LOG_FILE) # Uma linha JSON por registro, gravada em segundo plano, com rotação e compressão (ver core/logs.py)
 
 # ==============================================================================
 # VERIFICAÇÃO DE VALIDADE E INICIALIZAÇÃO
 # ==============================================================================
 
-# Exibe um aviso se a data de validade dos valores de teto já passou.
-if datetime.now().date() > VALIDADE_VALORES_TETO:
+preload_holidays() # Calendário de feriados carregado em segundo plano enquanto a tela inicial é exibida
+
+# Exibe um aviso se a vigência mais recente da tabela de tetos já terminou.
+try:
+    tabela_tetos = get_tabela_tetos()
+except TetosError as e:
+    st.error(f"Não foi possível carregar a tabela de tetos do depósito recursal: {e}")
+    st.stop()
+if tabela_tetos.expirada():
     st.error(
         "**ALERTA DE ATUALIZAÇÃO:** Os valores de teto para depósito recursal podem estar desatualizados. "
         "Por favor, contate **Tarcisio Picon** para atualizar o sistema com a nova portaria do TST."
@@ -90,145 +93,11 @@ if datetime.now().date() > VALIDADE_VALORES_TETO:
 # FUNÇÕES AUXILIARES E DE API
 # ==============================================================================
 
-@st.cache_resource
-def get_new_token():
-    st.info("➡️ Solicitando um novo token de acesso à API...")
-    logging.info("Requesting new access token.")
-    try:
-        client_id = st.secrets["DATAJURI_CLIENT_ID"]
-        client_secret = st.secrets["DATAJURI_SECRET_ID"]
-        user_email = st.secrets["DATAJURI_USERNAME"]
-        user_password = st.secrets["DATAJURI_PASSWORD"]
-        api_base_url = st.secrets["DATAJURI_BASE_URL"]
-    except KeyError as e:
-        st.error(f"⚠️ ATENÇÃO: A credencial '{e.args[0]}' não foi encontrada. Configure os 'Secrets' no Streamlit Cloud.")
-        return None
-
-    try:
-        auth_string = f"{client_id}:{client_secret}"
-        auth_base64 = base64.b64encode(auth_string.encode('utf-8')).decode('utf-8')
-        token_url = f"{api_base_url}/oauth/token"
-        headers = {'Authorization': f'Basic {auth_base64}', 'Content-Type': 'application/x-www-form-urlencoded'}
-        payload = {'grant_type': 'password', 'username': user_email, 'password': user_password}
-        response = requests.post(token_url, headers=headers, data=payload)
-        response.raise_for_status()
-        token_data = response.json()
-        access_token = token_data.get('access_token')
-        if not access_token:
-            st.error("❌ Erro: 'access_token' não encontrado na resposta da API.")
-            return None
-        token_info = {'access_token': access_token, 'timestamp': datetime.now().isoformat()}
-        with open(TOKEN_FILE, 'w') as f:
-            json.dump(token_info, f)
-        st.success("✅ Novo token obtido e salvo com sucesso!")
-        return access_token
-    except Exception as e:
-        st.error(f"❌ Erro na autenticação: {e}")
-        logging.error(f"Authentication error: {e}")
-        return None
-
-@st.cache_resource
-def get_valid_token():
-    if os.path.exists(TOKEN_FILE):
-        try:
-            with open(TOKEN_FILE, 'r') as f:
-                token_info = json.load(f)
-            token_timestamp = datetime.fromisoformat(token_info['timestamp'])
-            if datetime.now() < token_timestamp + timedelta(minutes=TOKEN_EXPIRATION_MINUTES):
-                st.sidebar.success("Token de acesso válido. ✅")
-                return token_info['access_token']
-            else:
-                st.sidebar.warning("Token existente expirou. ⚠️")
-        except Exception:
-            st.sidebar.error("Arquivo de token inválido. ⚠️")
-    return get_new_token()
-
-def get_entity_data(api_base_url, api_headers, module_name, fields, criteria_list):
-    with st.spinner(f"Buscando dados do módulo '{module_name}'..."):
-        try:
-            params = [('campos', ",".join(fields)), ('pageSize', 1000)]
-            params.extend([('criterio', item) for item in criteria_list])
-            entity_url = f"{api_base_url}/v1/entidades/{module_name}"
-            logging.info(f"REQUEST: GET {entity_url} with PARAMS: {params}")
-            response = requests.get(entity_url, headers=api_headers, params=params)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            st.error(f"❌ Erro na busca ({module_name}): {e}")
-            logging.error(f"API Search Error ({module_name}): {e}")
-            return None
-
-@st.cache_data
-def get_holidays(_year):
-    return holidays.country_holidays('BR', years=_year)
-
-def add_business_days(from_date, num_days):
-    if not isinstance(from_date, date): return None
-    br_holidays = get_holidays(from_date.year)
-    if num_days != 0:
-        end_year = (from_date + timedelta(days=num_days * 2)).year
-        if end_year != from_date.year:
-             br_holidays.update(get_holidays(end_year))
-    current_date, days_added = from_date, 0
-    increment = 1 if num_days >= 0 else -1
-    while days_added < abs(num_days):
-        current_date += timedelta(days=increment)
-        if current_date.weekday() < 5 and current_date not in br_holidays:
-            days_added += 1
-    return current_date
-
-def format_report_from_df(df: pd.DataFrame, tipo_decisao: str):
-    """Formata a seção de pedidos do relatório a partir de um DataFrame, incluindo resultados."""
-    if df.empty: return "Nenhum pedido encontrado."
-    report_lines = []
-    df_sorted = df.sort_values(by='nomeObjeto').reset_index(drop=True) if 'nomeObjeto' in df.columns else df.reset_index(drop=True)
-
-    for index, row in df_sorted.iterrows():
-        report_lines.append(f"{index + 1}) {row.get('nomeObjeto', 'N/A')}")
-        if situacao := row.get('situacao', '').strip():
-            report_lines.append(f" - Situação: {situacao}")
-
-        res1 = row.get('resultado_1_instanci', 'N/A')
-        res2 = row.get('resultado_2_instanci', 'N/A')
-        resSup = row.get('resultado_instancia_', 'N/A')
-
-        tipo_decisao_lower = tipo_decisao.lower() if tipo_decisao else ""
-        show_res2 = "acórdão" in tipo_decisao_lower or "monocrática" in tipo_decisao_lower or "denegatório" in tipo_decisao_lower
-        show_resSup = "tst" in tipo_decisao_lower or "denegatório" in tipo_decisao_lower
-
-        def is_relevant(res_value):
-            return res_value and isinstance(res_value, str) and res_value.lower().strip() not in ["aguardando julgamento", "n/a", "", "não houve recurso"]
-
-        if is_relevant(res1): report_lines.append(f" - Resultado 1ª Instância: {res1}")
-        if show_res2 and is_relevant(res2): report_lines.append(f" - Resultado 2ª Instância: {res2}")
-        if show_resSup and is_relevant(resSup): report_lines.append(f" - Resultado Instância Superior: {resSup}")
-        report_lines.append("")
-    return "\n".join(report_lines)
-
-def format_prazos(prazos_list):
-    if not prazos_list: return "Nenhum prazo informado."
-    lines = []
-    for i, p in enumerate(prazos_list, start=1):
-        lines.append(f"{i}) {p.get('descricao','N/A')}")
-        data_d_str = p['data_d'].strftime('%d/%m/%Y') if isinstance(p.get('data_d'), date) else 'Inválido'
-        lines.append(f"   - Data D-: {data_d_str}")
-        data_fatal_str = p['data_fatal'].strftime('%d/%m/%Y') if isinstance(p.get('data_fatal'), date) else 'Inválido'
-        lines.append(f"   - Data Fatal: {data_fatal_str}")
-        if obs := p.get('obs','').strip():
-            lines.append(f"   - Observações: {obs}")
-        lines.append("")
-    return "\n".join(lines)
-
-def generate_final_text(sections):
-    final_lines = []
-    visible_idx = 1
-    for title, content in sections:
-        if content and str(content).strip():
-            final_lines.append(f"{visible_idx}. {title}:")
-            final_lines.append(str(content).strip())
-            final_lines.append("")
-            visible_idx += 1
-    return "\n".join(final_lines)
+def marcar_etapa(nome):
+    """Começo de um trecho do formulário no painel de desempenho: vai até o próximo trecho ou o fim da execução."""
+    perfil = st.session_state.get("perfil")
+    if perfil is not None:
+        perfil.marco(nome)
 
 # ==============================================================================
 # INICIALIZAÇÃO DO APP E ESTADO DA SESSÃO
@@ -236,12 +105,24 @@ def generate_final_text(sections):
 
 if "access_token" not in st.session_state: st.session_state.access_token = None
 if "processo_data" not in st.session_state: st.session_state.processo_data = None
-if "pedidos_df" not in st.session_state: st.session_state.pedidos_df = None
-if "edited_pedidos_df" not in st.session_state: st.session_state.edited_pedidos_df = None
+if "pedidos" not in st.session_state: st.session_state.pedidos = None # PedidosEdicao: base compartilhada + alterações da sessão
+if "pedidos_gerados" not in st.session_state: st.session_state.pedidos_gerados = None # Alterações congeladas ao gerar os relatórios
 if "prazos" not in st.session_state: st.session_state.prazos = []
 if "report_generated" not in st.session_state: st.session_state.report_generated = False
+if "prefetch" not in st.session_state: st.session_state.prefetch = Prefetcher(get_prefetch_executor()) # Busca antecipada da pasta digitada
+if "recentes" not in st.session_state: st.session_state.recentes = CasosRecentes() # Últimos casos abertos, retomados sem consultar a API
+if "fila" not in st.session_state: st.session_state.fila = None # Fila de trabalho do dia (core/fila.py)
+if "fila_erro" not in st.session_state: st.session_state.fila_erro = None
+if "sessao_log" not in st.session_state: st.session_state.sessao_log = uuid.uuid4().hex[:8] # Identifica a sessão nos registros do log
+definir_contexto_log()
+if perfil_habilitado():
+    if "perfil" not in st.session_state: st.session_state.perfil = PerfilSessao() # Etapas de cada execução (core/perfil.py)
+    st.session_state.perfil.start("página", inicio_pagina, inicio_cpu_pagina)
+else:
+    st.session_state.pop("perfil", None)
 
-st.session_state.access_token = get_valid_token()
+with medir_etapa("token"):
+    st.session_state.access_token = get_valid_token()
 api_base_url = st.secrets.get("DATAJURI_BASE_URL", "") if 'DATAJURI_BASE_URL' in st.secrets else ""
 
 if st.session_state.access_token:
@@ -257,17 +138,30 @@ else:
 st.title("🔎 Assistente Jurídico - Análise de Decisões")
 st.markdown("Busque pelo número da pasta do processo para carregar os dados e iniciar a análise.")
 
-numero_processo = st.text_input("Número da Pasta do Processo:", key="numero_processo_input")
+numero_processo = st.text_input("Número da Pasta do Processo:", key="numero_processo_input", on_change=prefetch_pasta)
 
 if st.button("Buscar Processo", type="primary"):
+    # O caso aberto vai para os recentes; a pasta buscada, se estava entre eles, é recarregada do DataJuri.
+    if st.session_state.processo_data and str(st.session_state.processo_data.get('pasta', '')) != numero_processo:
+        guardar_caso_atual()
+    st.session_state.recentes.pop(numero_processo)
     st.session_state.report_generated = False
+    st.session_state.pedidos_gerados = None
     st.session_state.prazos = []
     if not numero_processo:
         st.warning("Por favor, insira o número da pasta do processo.")
         st.session_state.processo_data = None # Limpa dados antigos
     else:
+        set_log_context(pasta=numero_processo)
+        # Resultado da busca iniciada em segundo plano ao digitar a pasta (None: busca agora, como antes).
+        with st.spinner("Buscando dados do processo...") if st.session_state.prefetch.pending(numero_processo) else contextlib.nullcontext(), \
+                medir_etapa("busca antecipada"):
+            antecipado = st.session_state.prefetch.take(numero_processo)
         processo_fields = ["pasta", "cliente.nome", "adverso.nome", "posicaoCliente", "assunto", "status", "faseAtual.vara", "faseAtual.forum"]
-        processo_raw_data = get_entity_data(api_base_url, api_headers, "Processo", processo_fields, [f"pasta | igual a | {numero_processo}"])
+        if antecipado is not None:
+            processo_raw_data = {'rows': [antecipado['processo']] if antecipado['processo'] else []}
+        else:
+            processo_raw_data = get_entity_data(api_base_url, api_headers, "Processo", processo_fields, [f"pasta | igual a | {numero_processo}"])
         if processo_raw_data and processo_raw_data.get('rows'):
             st.session_state.processo_data = processo_raw_data['rows'][0]
             st.success(f"Processo **{st.session_state.processo_data['pasta']}** encontrado!")
@@ -276,17 +170,24 @@ if st.button("Buscar Processo", type="primary"):
             st.session_state.processo_data = None
         
         if st.session_state.processo_data:
+            from core.estado_pedidos import PedidosEdicao, get_base
             pedidos_fields = ["id", "nomeObjeto", "situacao", "resultado_1_instanci", "resultado_2_instanci", "resultado_instancia_"]
-            pedidos_raw_data = get_entity_data(api_base_url, api_headers, "PedidoProcesso", pedidos_fields, [f"processo.pasta | igual a | {numero_processo}"])
-            if pedidos_raw_data and pedidos_raw_data.get('rows'):
-                df = pd.DataFrame(pedidos_raw_data['rows'])
-                st.session_state.pedidos_df = df
-                st.session_state.edited_pedidos_df = df.copy()
-                st.info(f"Encontrados **{len(df)}** pedidos/objetos para este processo.")
+            if antecipado is not None:
+                pedidos_raw_data = {'rows': antecipado['pedidos']}
+            else:
+                pedidos_raw_data = get_entity_data(api_base_url, api_headers, "PedidoProcesso", pedidos_fields, [f"processo.pasta | igual a | {numero_processo}"])
+            rows = (pedidos_raw_data or {}).get('rows') or []
+            # Uma única tabela por pasta no processo, compartilhada com as outras sessões que a abrirem.
+            with medir_etapa("tabela de pedidos"):
+                st.session_state.pedidos = PedidosEdicao(get_base(str(st.session_state.processo_data.get('pasta', numero_processo)), rows))
+            if rows:
+                st.info(f"Encontrados **{len(rows)}** pedidos/objetos para este processo.")
             else:
                 st.warning("Nenhum pedido/objeto encontrado para este processo.")
-                st.session_state.pedidos_df = pd.DataFrame()
-                st.session_state.edited_pedidos_df = pd.DataFrame()
+
+with medir_etapa("barra lateral"):
+    mostrar_fila(RECURSO_POR_DECISAO, OPCOES_FORMULARIO, D_MENOS)
+    mostrar_casos_recentes()
 
 # --- Renderiza o formulário de análise se um processo foi carregado ---
 if st.session_state.get("processo_data"):
@@ -298,6 +199,7 @@ if st.session_state.get("processo_data"):
     col3.metric("Adverso", st.session_state.processo_data.get('adverso.nome', 'N/A'))
     col4.metric("Status", st.session_state.processo_data.get('status', 'N/A'))
     
+    marcar_etapa("contexto")
     st.header("1. Contexto e Análise da Decisão")
     # CORREÇÃO: Lógica para definir "Reclamado" como padrão.
     posicao_cliente_api = st.session_state.processo_data.get('posicaoCliente', '').lower()
@@ -308,21 +210,25 @@ if st.session_state.get("processo_data"):
     with col_contexto2: cliente_role = st.selectbox("Cliente é:", options=CLIENTE_OPTIONS, index=cliente_index, key="cliente_role")
     with col_contexto3: tipo_decisao = st.selectbox("Tipo de Decisão Analisada:", options=DECISAO_OPTIONS, index=None, key="tipo_decisao")
     resultado_sentenca = st.selectbox("Resultado Geral para o Cliente:", options=RESULTADO_OPTIONS, index=None, key="resultado_sentenca")
-    obs_sentenca = st.text_area("Observações sobre a Decisão (para o email):", help="Detalhe aqui nuances, especialmente se 'Parcialmente Favorável'.")
+    obs_sentenca = st.text_area("Observações sobre a Decisão (para o email):", help="Detalhe aqui nuances, especialmente se 'Parcialmente Favorável'.", key="obs_sentenca")
 
+    marcar_etapa("pedidos")
     st.header("2. Atualização dos Pedidos")
-    if st.session_state.edited_pedidos_df is not None and not st.session_state.edited_pedidos_df.empty:
+    pedidos = st.session_state.pedidos
+    if pedidos is not None and not pedidos.base.df.empty:
         st.info("Ajuste a 'situação' de cada pedido conforme a decisão. Isso será usado nos relatórios.")
-        edited_df = st.data_editor(st.session_state.edited_pedidos_df, use_container_width=True, key="data_editor_pedidos")
+        # O editor recebe a base compartilhada (ou, ao retomar um caso recente, a tabela já alterada); a sessão guarda só as células alteradas.
+        st.data_editor(pedidos.entrada, use_container_width=True, key=pedidos.editor_key, disabled=["id"])
+        pedidos.aplicar_editor(st.session_state[pedidos.editor_key])
     else:
         st.warning("Nenhum pedido foi carregado para este processo.")
-        edited_df = pd.DataFrame()
 
+    marcar_etapa("recurso")
     st.header("3. Próximos Passos (ED / Recurso)")
     ed_status = st.radio("Avaliação sobre Embargos de Declaração (ED):", options=ED_OPTIONS, index=None, key="ed_status", horizontal=True)
     justificativa_ed = ""
     if ed_status == "Cabe ED":
-        justificativa_ed = st.text_area("Justificativa para ED (obrigatório):", height=100)
+        justificativa_ed = st.text_area("Justificativa para ED (obrigatório):", height=100, key="justificativa_ed")
 
     recurso_selecionado, recurso_outro_especificar, recurso_justificativa = None, "", ""
     if ed_status == "Não cabe ED":
@@ -332,16 +238,17 @@ if st.session_state.get("processo_data"):
             recurso_selecionado = st.selectbox("Recurso a ser considerado:", options=RECURSO_OPTIONS, index=suggested_recurso_index, key="recurso_sel")
             if recurso_selecionado == "Outro":
                 recurso_outro_especificar = st.text_input("Especifique qual outro recurso:", key="recurso_outro_txt")
-            recurso_justificativa = st.text_area("Justificativa para a escolha do Recurso:", height=100)
+            recurso_justificativa = st.text_area("Justificativa para a escolha do Recurso:", height=100, key="recurso_justificativa")
 
+    marcar_etapa("custas e depósito")
     st.header("4. Custas e Depósito Recursal")
     with st.container(border=True):
         col_calc1, col_calc2 = st.columns(2)
         with col_calc1:
-            valor_condenacao = st.number_input("Valor da Condenação (R$):", min_value=0.0, step=100.0, format="%.2f")
-            deposito_recolhido = st.number_input("Valor de Depósito já Recolhido (R$):", min_value=0.0, step=100.0, format="%.2f")
+            valor_condenacao = st.number_input("Valor da Condenação (R$):", min_value=0.0, step=100.0, format="%.2f", key="valor_condenacao")
+            deposito_recolhido = st.number_input("Valor de Depósito já Recolhido (R$):", min_value=0.0, step=100.0, format="%.2f", key="deposito_recolhido")
         with col_calc2:
-            percentual_custas = st.number_input("Percentual de Custas na Decisão (%):", min_value=0.0, max_value=100.0, value=2.0, step=0.5, format="%.1f")
+            percentual_custas = st.number_input("Percentual de Custas na Decisão (%):", min_value=0.0, max_value=100.0, value=2.0, step=0.5, format="%.1f", key="percentual_custas")
         
         st.subheader("Depósito Recursal")
         isencao_deposito = st.selectbox("Isenção de Depósito Recursal:", options=ISENCAO_OPTIONS, key="isencao_deposito")
@@ -349,22 +256,18 @@ if st.session_state.get("processo_data"):
         if isencao_deposito == "Outro motivo":
             outro_motivo_deposito = st.text_input("Especifique o outro motivo da isenção do depósito:", key="outro_motivo_deposito_input")
         
-        pagamento_metade_deposito = st.checkbox("Redução de 50% no Depósito (MEI, EPP, etc.)", help="Marque se aplicável para o depósito recursal.")
+        pagamento_metade_deposito = st.checkbox("Redução de 50% no Depósito (MEI, EPP, etc.)", help="Marque se aplicável para o depósito recursal.", key="pagamento_metade_deposito")
 
-        deposito_a_recolher = 0.0
-        is_entidade_beneficente = (isencao_deposito == "Entidade Beneficente")
-        
-        if isencao_deposito == "Não se aplica" or is_entidade_beneficente:
-            if recurso_selecionado and recurso_selecionado != "Não Interpor Recurso":
-                teto_recurso = TETOS_DEPOSITO_RECURSAL.get(recurso_selecionado, max(TETOS_DEPOSITO_RECURSAL.values()))
-                valor_base_deposito = min(teto_recurso, valor_condenacao) if valor_condenacao > 0 else teto_recurso
-                deposito_a_recolher = valor_base_deposito - deposito_recolhido
-                if is_entidade_beneficente or pagamento_metade_deposito:
-                    deposito_a_recolher /= 2
-                deposito_a_recolher = max(0, deposito_a_recolher)
+        deposito_a_recolher = calcular_deposito_recursal(recurso_selecionado, valor_condenacao, deposito_recolhido, isencao_deposito, pagamento_metade_deposito, data_ciencia)
+        if isencao_deposito == "Não se aplica" or isencao_deposito == "Entidade Beneficente":
+            if deposito_aplicavel(isencao_deposito, recurso_selecionado):
                 st.metric("Valor do Depósito a Recolher:", f"R$ {deposito_a_recolher:,.2f}")
+                data_teto = data_ciencia or date.today()
+                if tabela_tetos.vigencia(data_teto) is None:
+                    st.warning(f"Não há teto vigente em {data_teto.strftime('%d/%m/%Y')}. Foi usado o de "
+                               f"{tabela_tetos.vigencia_referencia(data_teto).ato}; confira o valor antes de recolher.")
         else:
-            motivo_deposito_display = isencao_deposito if isencao_deposito != 'Outro motivo' else outro_motivo_deposito
+            motivo_deposito_display = motivo_isencao(isencao_deposito, outro_motivo_deposito)
             st.info(f"Depósito isento. Motivo: {motivo_deposito_display}")
 
         st.subheader("Custas Processuais")
@@ -373,37 +276,18 @@ if st.session_state.get("processo_data"):
         if isencao_custas == "Outro motivo":
             outro_motivo_custas = st.text_input("Especifique o outro motivo da isenção das custas:", key="outro_motivo_custas_input")
 
-        custas_a_recolher = 0.0
+        custas_a_recolher = calcular_custas(valor_condenacao, percentual_custas, isencao_custas)
         if isencao_custas == "Não se aplica":
-            custas_a_recolher = valor_condenacao * (percentual_custas / 100)
             st.metric("Valor das Custas a Recolher:", f"R$ {custas_a_recolher:,.2f}")
         else:
-            motivo_custas_display = isencao_custas if isencao_custas != 'Outro motivo' else outro_motivo_custas
+            motivo_custas_display = motivo_isencao(isencao_custas, outro_motivo_custas)
             st.info(f"Custas isentas. Motivo: {motivo_custas_display}")
 
+    marcar_etapa("prazos")
     st.header("5. Prazos")
     with st.container(border=True):
-        suggested_prazo = None
-        if data_ciencia:
-            data_base = data_ciencia
-            prazo_dias = 8
-            if ed_status == "Cabe ED":
-                prazo_fatal = add_business_days(data_base, 5)
-                if prazo_fatal:
-                    suggested_prazo = {"descricao": "Prazo para Oposição de Embargos de Declaração", "data_fatal": prazo_fatal, "data_d": add_business_days(prazo_fatal, -2), "obs": ""}
-            elif ed_status == "Não cabe ED" and recurso_selecionado:
-                if "Extraordinário" in recurso_selecionado: prazo_dias = 15
-                prazo_fatal = add_business_days(data_base, prazo_dias)
-                if prazo_fatal:
-                    if recurso_selecionado == "Não Interpor Recurso":
-                        descricao = "Verificar interposição de recurso pela parte contrária"
-                        data_d = prazo_fatal
-                    else:
-                        recurso_final = recurso_selecionado if recurso_selecionado != "Outro" else recurso_outro_especificar
-                        descricao = f"Prazo para Interposição de {recurso_final}"
-                        data_d = add_business_days(prazo_fatal, -2)
-                    suggested_prazo = {"descricao": descricao, "data_fatal": prazo_fatal, "data_d": data_d, "obs": ""}
-        
+        suggested_prazo = suggest_prazo(data_ciencia, ed_status, recurso_selecionado, recurso_outro_especificar, d_menos=D_MENOS)
+
         if suggested_prazo:
             st.info(f"**Sugestão de Prazo:** {suggested_prazo['descricao']} (Fatal: {suggested_prazo['data_fatal'].strftime('%d/%m/%Y')})")
             if st.button("Adicionar Prazo Sugerido"):
@@ -441,166 +325,61 @@ if st.session_state.get("processo_data"):
                     del st.session_state.prazos[index]
                 st.rerun()
 
+    marcar_etapa("documentos")
     st.header("6. Geração de Documentos")
-    obs_finais = st.text_area("Observações Gerais Internas (opcional):", height=100)
+    obs_finais = st.text_area("Observações Gerais Internas (opcional):", height=100, key="obs_finais")
     st.divider()
 
     if st.button("✔️ Gerar Relatórios e Arquivo de Atualização", type="primary", use_container_width=True):
         st.session_state.report_generated = True
-        st.session_state.edited_pedidos_df = edited_df
+        st.session_state.pedidos_gerados = pedidos.congelar() if pedidos is not None else None
         st.rerun()
 
     if st.session_state.report_generated:
+        from core.geracao import GenerationCache, build_snapshot, generate_documents, generate_email, save_update, snapshot_key
+        if "generation_cache" not in st.session_state: st.session_state.generation_cache = GenerationCache()
+        # Mesma geração do AppNaara (core/geracao.py); só o corpo do e-mail usa o modelo próprio deste app.
+        # As tabelas original e editada são montadas aqui, sob demanda, a partir da base e das alterações congeladas.
+        gerados = st.session_state.pedidos_gerados
+        with medir_etapa("snapshot"):
+            snapshot = build_snapshot(
+                st.session_state.processo_data, gerados.base.df if gerados else None, gerados.view() if gerados else None, st.session_state.prazos,
+                cliente_role=cliente_role, tipo_decisao=tipo_decisao, data_ciencia=data_ciencia, resultado_sentenca=resultado_sentenca,
+                obs_sentenca=obs_sentenca, ed_status=ed_status, justificativa_ed=justificativa_ed, recurso_selecionado=recurso_selecionado,
+                recurso_outro_especificar=recurso_outro_especificar, recurso_justificativa=recurso_justificativa,
+                isencao_deposito=isencao_deposito, outro_motivo_deposito=outro_motivo_deposito, isencao_custas=isencao_custas,
+                outro_motivo_custas=outro_motivo_custas, deposito_a_recolher=deposito_a_recolher, custas_a_recolher=custas_a_recolher,
+                obs_finais=obs_finais,
+            )
+            snapshot_hash = snapshot_key(snapshot)
+        documents = st.session_state.generation_cache.get_or_compute(snapshot_hash, generate_documents, snapshot)
+
         st.subheader("🤖 Arquivo de Atualização para o Robô")
-        changes = st.session_state.pedidos_df.compare(st.session_state.edited_pedidos_df)
-        if changes.empty:
-            st.info("Nenhuma alteração nos pedidos detectada. Nenhum arquivo de atualização gerado.")
+        if not documents['update_tasks']:
+            st.info("Nenhuma alteração nos pedidos detectada. Nenhuma atualização registrada.")
         else:
-            update_tasks = []
-            changed_cols = changes.columns.get_level_values(0).unique()
-            for idx in changes.index:
-                task = {'id': int(st.session_state.edited_pedidos_df.loc[idx, 'id'])}
-                for col_name in changed_cols:
-                    if not pd.isna(changes.loc[idx, (col_name, 'self')]):
-                        task[col_name] = st.session_state.edited_pedidos_df.loc[idx, col_name]
-                if len(task) > 1:
-                    update_tasks.append(task)
-            
-            if update_tasks:
-                os.makedirs(UPDATE_FOLDER, exist_ok=True)
-                pasta_sanitizada = re.sub(r'[\\/*?:"<>|]',"", st.session_state.processo_data.get('pasta', 'unknown'))
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                file_name = f"update_{pasta_sanitizada}_{timestamp}.json"
-                file_path = os.path.join(UPDATE_FOLDER, file_name)
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(update_tasks, f, indent=2, ensure_ascii=False)
-                st.success(f"Arquivo de atualização '{file_name}' salvo na pasta '{UPDATE_FOLDER}' no servidor para processamento pelo administrador.")
-            else:
-                 st.info("Nenhuma alteração nos pedidos detectada. Nenhum arquivo de atualização gerado.")
+            # As reexecuções da página não registram a mesma atualização novamente.
+            update_key = documents['update_key']
+            saved_updates = st.session_state.setdefault("saved_updates", {})
+            if update_key not in saved_updates:
+                saved_updates[update_key] = save_update(UPDATE_FOLDER, st.session_state.processo_data.get('pasta', 'unknown'),
+                                                        documents['update_tasks'], documents['update_previous'])
+            st.success(f"Atualização nº {saved_updates[update_key]} registrada no diário da pasta '{UPDATE_FOLDER}' no servidor para processamento pelo administrador.")
 
         st.subheader("📄 Relatório Interno Gerado")
-        sections_data = []
-        contexto_str = (f"- Processo: {st.session_state.processo_data.get('pasta', 'N/A')}\n"
-                        f"- Cliente: {st.session_state.processo_data.get('cliente.nome', 'N/A')} ({cliente_role})\n"
-                        f"- Adverso: {st.session_state.processo_data.get('adverso.nome', 'N/A')}\n"
-                        f"- Tipo de Decisão Analisada: {tipo_decisao}\n"
-                        f"- Data da Ciência: {data_ciencia.strftime('%d/%m/%Y') if data_ciencia else 'N/A'}")
-        sections_data.append(("Contexto do Processo", contexto_str))
-        
-        resultado_str = (f"- Avaliação para o Cliente: {resultado_sentenca}\n"
-                         f"- Observações: {obs_sentenca.strip() or 'Nenhuma'}")
-        sections_data.append(("Resultado Geral da Decisão", resultado_str))
-        
-        pedidos_report_text = format_report_from_df(st.session_state.edited_pedidos_df, tipo_decisao)
-        sections_data.append(("Tabela de Pedidos Processada", pedidos_report_text))
-        
-        ed_str = (f"- Avaliação: {ed_status}\n"
-                  f"- Justificativa: {justificativa_ed.strip() or 'N/A'}")
-        sections_data.append(("Embargos de Declaração (ED)", ed_str))
-
-        if ed_status == "Não cabe ED":
-            recurso_final = recurso_selecionado if recurso_selecionado != "Outro" else recurso_outro_especificar.strip()
-            recurso_str = (f"- Decisão/Recomendação: {recurso_final}\n"
-                           f"- Justificativa: {recurso_justificativa.strip()}")
-            sections_data.append(("Recurso", recurso_str))
-            
-            motivo_deposito = isencao_deposito if isencao_deposito != 'Outro motivo' else outro_motivo_deposito
-            motivo_custas = isencao_custas if isencao_custas != 'Outro motivo' else outro_motivo_custas
-            custas_deposito_str = (f"- Depósito a Recolher: R$ {deposito_a_recolher:,.2f} (Isenção: {motivo_deposito})\n"
-                                   f"- Custas a Recolher: R$ {custas_a_recolher:,.2f} (Isenção: {motivo_custas})")
-            sections_data.append(("Custas e Depósito Recursal", custas_deposito_str))
-
-        sections_data.append(("Prazos Adicionados", format_prazos(st.session_state.prazos)))
-        sections_data.append(("Observações Finais Internas", obs_finais.strip() or "Nenhuma"))
-        
-        final_text = generate_final_text(sections_data)
-        st.text_area("Copie o texto abaixo para seu workflow:", final_text, height=300)
+        st.text_area("Copie o texto abaixo para seu workflow:", documents['final_text'], height=300)
 
         st.subheader("📧 Email para o Cliente")
-        advogado_responsavel = st.text_input("Advogado(a) Responsável pela Comunicação:")
+        marcar_etapa("e-mail")
+        advogado_responsavel = st.text_input("Advogado(a) Responsável pela Comunicação:", key="advogado_responsavel")
 
         if advogado_responsavel:
-            mapa_assunto = {"Sentença (Vara do Trabalho)": "SENTENÇA", "Decisão de Embargos de Declaração": "SENTENÇA ED", "Acórdão (TRT)": "ACÓRDÃO TRT"}
-            tipo_decisao_assunto = mapa_assunto.get(tipo_decisao, tipo_decisao.upper())
-            email_subject = f"TRABALHISTA: {tipo_decisao_assunto} - {st.session_state.processo_data.get('adverso.nome', '')} X {st.session_state.processo_data.get('cliente.nome', '')}"
-            local_processo = st.session_state.processo_data.get('faseAtual.vara') or st.session_state.processo_data.get('faseAtual.forum') or "Local não informado"
-
-            pedidos_por_situacao = {}
-            if not st.session_state.edited_pedidos_df.empty:
-                pedidos_por_situacao = st.session_state.edited_pedidos_df.groupby('situacao')['nomeObjeto'].apply(list).to_dict()
-
-            categorias_padrao = {
-                'Procedentes': 'Procedência',
-                'Parcialmente Procedentes': 'Parcialmente procedente',
-                'Improcedentes': 'Improcedência'
-            }
-            
-            resumo_pedidos_email = ""
-            for nome_cat, chave_cat in categorias_padrao.items():
-                pedidos = pedidos_por_situacao.get(chave_cat)
-                if pedidos:
-                    resumo_pedidos_email += f"{nome_cat}:\n" + "\n".join([f"- {p}" for p in pedidos]) + "\n\n"
-
-            outras_ocorrencias = []
-            for situacao, pedidos in pedidos_por_situacao.items():
-                if situacao not in categorias_padrao.values():
-                    for pedido in pedidos:
-                        outras_ocorrencias.append(f"- {pedido} ({situacao})")
-            
-            if outras_ocorrencias:
-                resumo_pedidos_email += "Outras Ocorrências:\n" + "\n".join(outras_ocorrencias) + "\n"
-
-            motivo_deposito_final = isencao_deposito if isencao_deposito != 'Outro motivo' else outro_motivo_deposito
-            motivo_custas_final = isencao_custas if isencao_custas != 'Outro motivo' else outro_motivo_custas
-
-            info_deposito_str = ""
-            if motivo_deposito_final != "Não se aplica":
-                info_deposito_str = f"Quanto ao depósito recursal, foi deferida a isenção (motivo: {motivo_deposito_final})."
-            elif deposito_a_recolher > 0:
-                info_deposito_str = f"Para a interposição do recurso, será necessário o recolhimento de R$ {deposito_a_recolher:,.2f} a título de depósito recursal."
-            else:
-                 info_deposito_str = "Não há valor a ser recolhido a título de depósito recursal."
-
-            info_custas_str = ""
-            if motivo_custas_final != "Não se aplica":
-                info_custas_str = f"Quanto às custas processuais, foi deferida a isenção (motivo: {motivo_custas_final})."
-            elif custas_a_recolher > 0:
-                info_custas_str = f"Será necessário, também, o pagamento de R$ {custas_a_recolher:,.2f} de custas processuais."
-            else:
-                info_custas_str = "Não há valor a ser recolhido a título de custas processuais."
-            
-            info_custas = f"{info_deposito_str} {info_custas_str}"
-
-            recomendacao_final = ""
-            if ed_status == "Não cabe ED" and recurso_selecionado != "Não Interpor Recurso":
-                recurso_final_nome = recurso_selecionado if recurso_selecionado != "Outro" else recurso_outro_especificar
-                recomendacao_final = f"Recomendamos a interposição de {recurso_final_nome} para {recurso_justificativa.lower() if recurso_justificativa else 'reverter a decisão desfavorável.'}"
-            elif obs_sentenca:
-                 recomendacao_final = obs_sentenca
-            
-            email_body = f"""Prezados, bom dia!
-
-Local: {local_processo}
-Processo nº. {st.session_state.processo_data.get('pasta', 'N/A')}
-Cliente: {st.session_state.processo_data.get('cliente.nome', 'N/A')}
-Adverso: {st.session_state.processo_data.get('adverso.nome', 'N/A')}
-
-Pelo presente, informamos que a {tipo_decisao.lower() if tipo_decisao else 'decisão'} referente ao processo acima foi publicada.
-
-Segue abaixo um resumo dos pedidos, com informações atualizadas sobre cada um deles:
-
-{resumo_pedidos_email.strip()}
-
-{recomendacao_final}
-{info_custas}
-
-Diante do exposto, para que possamos elaborar o recurso, solicitamos retorno quanto ao interesse em 48 horas.
-Qualquer esclarecimento, favor entrar em contato com o escritório.
-
-Atenciosamente,
-
-{advogado_responsavel}
-"""
+            email_subject, email_body = st.session_state.generation_cache.get_or_compute(
+                snapshot_key(snapshot, advogado_responsavel, MODELO_EMAIL), generate_email, snapshot, advogado_responsavel, MODELO_EMAIL)
             st.text_input("Assunto do Email:", value=email_subject)
             st.text_area("Corpo do Email:", value=email_body, height=400)
             st.success("Rascunho do email gerado com sucesso!")
+
+if "perfil" in st.session_state:
+    st.session_state.perfil.finish()
+    mostrar_perfil()
@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+"""Funções do Streamlit compartilhadas pelos apps de análise (AppNaara e Appgama).
+
+Cada app monta o próprio formulário; o que é igual nos dois fica aqui: o acesso ao DataJuri (token e
+consultas compartilhados), a fila de trabalho, a busca antecipada da pasta, os casos recentes da
+sessão, o painel de desempenho e o contexto do log. Nada aqui é executado na importação, só ao chamar
+as funções (depois do st.set_page_config de cada app).
+"""
+
+import base64
+import contextlib
+import functools
+import logging
+import os
+import time
+
+import streamlit as st
+
+from core.armazenamento import ENTITY_CACHE_TTL, entity_cache_key, get_or_compute, get_shared_token, open_store
+from core.logs import log_context, set_log_context
+from core.perfil import PERFIL_CPROFILE_EXECUCOES
+from core.prazos import D_MENOS_PADRAO
+from core.prefetch import fetch_case
+from core.recentes import capture_case, restore_case
+
+STORE_URL = 'sqlite:///datajuri_compartilhado.db' # Token e consultas compartilhados entre workers (ou DATAJURI_STORE, ver core/armazenamento.py)
+TOKEN_EXPIRATION_MINUTES = 50
+PREFETCH_WORKERS = 4 # Threads (por processo) que buscam em segundo plano a pasta digitada
+FILA_ANTECIPAR = 3 # Casos da fila de trabalho buscados à frente do atual
+PRODUTIVIDADE_DIR = 'produtividade' # Registro diário dos casos da fila de trabalho (python -m core.fila produtividade/)
+PERFIL_DIR = 'perfis' # Arquivos .prof gravados pelo painel de desempenho (?perfil=1, liberado por PERFIL_PAINEL)
+
+
+# ==============================================================================
+# PAINEL DE DESEMPENHO E CONTEXTO DO LOG
+# ==============================================================================
+
+def perfil_habilitado():
+    """Painel de desempenho: liberado pelo administrador (PERFIL_PAINEL) e aberto na sessão com ?perfil=1."""
+    liberado = st.secrets.get("PERFIL_PAINEL") if 'PERFIL_PAINEL' in st.secrets else os.environ.get("PERFIL_PAINEL")
+    return str(liberado).lower() in ("1", "true", "sim") and st.query_params.get("perfil") == "1"
+
+
+def definir_contexto_log():
+    """Sessão e pasta aberta nos registros do log desta execução (ver core/logs.py)."""
+    set_log_context(sessao=st.session_state.get("sessao_log"), pasta=(st.session_state.get("processo_data") or {}).get('pasta'), etapa=None)
+
+
+@contextlib.contextmanager
+def medir_etapa(nome):
+    """Etapa nomeada da execução: identifica os registros do log e é medida quando o painel de desempenho está aberto (ver core/perfil.py)."""
+    perfil = st.session_state.get("perfil")
+    with log_context(etapa=nome), (perfil.etapa(nome) if perfil is not None else contextlib.nullcontext()):
+        yield
+
+
+def etapa_callback(nome):
+    """Decorador dos callbacks dos widgets: rodam antes do script e entram no painel como etapa da execução seguinte."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            definir_contexto_log()
+            with medir_etapa(nome):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def mostrar_perfil():
+    """Painel de desempenho na barra lateral: etapas da última execução em cascata, percentis e o cProfile."""
+    perfil = st.session_state.get("perfil")
+    if perfil is None or not perfil.execucoes:
+        return
+    import altair as alt
+    import pandas as pd
+    execucao = perfil.execucoes[-1]
+    with st.sidebar.expander("⏱️ Desempenho", expanded=True):
+        st.caption(f"Última execução ({execucao['escopo']}): {execucao['total_ms']:.0f} ms, CPU {execucao['cpu_ms']:.0f} ms"
+                   + (" · interrompida" if execucao['interrompida'] else "") + ". O próprio painel não entra na medida.")
+        etapas = pd.DataFrame([{"etapa": f"[{execucao['escopo']}]", "nivel": 0, "inicio_ms": 0.0, "ms": execucao['total_ms'],
+                                "cpu_ms": execucao['cpu_ms']}] + execucao['etapas'])
+        etapas["fim_ms"] = etapas["inicio_ms"] + etapas["ms"]
+        etapas["rotulo"] = [f"{i:02d} {'· ' * nivel}{nome}" for i, (nivel, nome) in enumerate(zip(etapas["nivel"], etapas["etapa"]))]
+        st.altair_chart(alt.Chart(etapas).mark_bar().encode(
+            x=alt.X("inicio_ms:Q", title="ms desde o início da execução"), x2="fim_ms:Q",
+            y=alt.Y("rotulo:N", sort=None, title=None), color=alt.Color("nivel:O", legend=None),
+            tooltip=["etapa", alt.Tooltip("ms:Q", format=".1f"), alt.Tooltip("cpu_ms:Q", format=".1f", title="CPU ms")],
+        ), use_container_width=True)
+        st.caption(f"Percentis das últimas {len(perfil.execucoes)} execuções da sessão:")
+        st.dataframe(pd.DataFrame(perfil.percentiles()).round(1), hide_index=True, use_container_width=True)
+        perfil.cprofile = st.toggle("cProfile nas próximas execuções", value=perfil.cprofile, key="perfil_cprofile",
+                                    help=f"Guarda o cProfile das últimas {PERFIL_CPROFILE_EXECUCOES} execuções. Deixa a página mais lenta.")
+        if perfil.perfis:
+            if st.button(f"Salvar perfil ({len(perfil.perfis)} execuções)", key="perfil_salvar", use_container_width=True):
+                os.makedirs(PERFIL_DIR, exist_ok=True)
+                caminho = os.path.join(PERFIL_DIR, f"perfil_{time.strftime('%Y%m%d_%H%M%S')}.prof")
+                perfil.dump(caminho)
+                logging.info(f"Profile saved: {caminho}")
+                with open(caminho, "rb") as f:
+                    st.download_button("Baixar .prof", f.read(), file_name=os.path.basename(caminho), use_container_width=True)
+                st.caption(f"Gravado em `{caminho}` (python -m pstats {caminho}).")
+            if st.checkbox("Funções mais custosas", key="perfil_funcoes"):
+                st.code(perfil.top_functions(15))
+
+
+# ==============================================================================
+# TOKEN E CONSULTAS AO DATAJURI
+# ==============================================================================
+
+@st.cache_resource
+def get_store():
+    """Armazenamento do token e das consultas, compartilhado por todos os workers (ver core/armazenamento.py)."""
+    url = st.secrets.get("DATAJURI_STORE") if 'DATAJURI_STORE' in st.secrets else os.environ.get("DATAJURI_STORE")
+    return open_store(url or STORE_URL)
+
+
+def get_new_token():
+    import requests
+    st.info("➡️ Solicitando um novo token de acesso à API...")
+    logging.info("Requesting new access token.")
+    try:
+        client_id = st.secrets["DATAJURI_CLIENT_ID"]
+        client_secret = st.secrets["DATAJURI_SECRET_ID"]
+        user_email = st.secrets["DATAJURI_USERNAME"]
+        user_password = st.secrets["DATAJURI_PASSWORD"]
+        api_base_url = st.secrets["DATAJURI_BASE_URL"]
+    except KeyError as e:
+        st.error(f"⚠️ ATENÇÃO: A credencial '{e.args[0]}' não foi encontrada. Configure os 'Secrets' no Streamlit Cloud.")
+        return None
+
+    try:
+        auth_string = f"{client_id}:{client_secret}"
+        auth_base64 = base64.b64encode(auth_string.encode('utf-8')).decode('utf-8')
+        token_url = f"{api_base_url}/oauth/token"
+        headers = {'Authorization': f'Basic {auth_base64}', 'Content-Type': 'application/x-www-form-urlencoded'}
+        payload = {'grant_type': 'password', 'username': user_email, 'password': user_password}
+        response = requests.post(token_url, headers=headers, data=payload)
+        response.raise_for_status()
+        token_data = response.json()
+        access_token = token_data.get('access_token')
+        if not access_token:
+            st.error("❌ Erro: 'access_token' não encontrado na resposta da API.")
+            return None
+        st.success("✅ Novo token obtido e salvo com sucesso!")
+        return access_token
+    except Exception as e:
+        st.error(f"❌ Erro na autenticação: {e}")
+        logging.error(f"Authentication error: {e}")
+        return None
+
+
+def get_valid_token():
+    """Token compartilhado entre os workers: quando ele expira, só um deles pede um novo à API."""
+    if 'DATAJURI_BASE_URL' not in st.secrets or 'DATAJURI_USERNAME' not in st.secrets:
+        return get_new_token() # Exibe qual credencial está faltando
+    renovado = []
+    def renovar():
+        renovado.append(True)
+        return get_new_token()
+    try:
+        token = get_shared_token(get_store(), st.secrets["DATAJURI_BASE_URL"], st.secrets["DATAJURI_USERNAME"], renovar,
+                                 validade=TOKEN_EXPIRATION_MINUTES * 60)
+    except Exception as e:
+        logging.error(f"Shared store error (token): {e}")
+        st.sidebar.warning("Armazenamento compartilhado indisponível. ⚠️")
+        return None if renovado else get_new_token()
+    if token and not renovado:
+        st.sidebar.success("Token de acesso válido. ✅")
+    return token
+
+
+def fetch_entity_data(api_base_url, api_headers, module_name, fields, criteria_list):
+    import requests
+    with st.spinner(f"Buscando dados do módulo '{module_name}'..."):
+        try:
+            params = [('campos', ",".join(fields)), ('pageSize', 1000)]
+            params.extend([('criterio', item) for item in criteria_list])
+            entity_url = f"{api_base_url}/v1/entidades/{module_name}"
+            logging.info(f"REQUEST: GET {entity_url} with PARAMS: {params}")
+            response = requests.get(entity_url, headers=api_headers, params=params)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            st.error(f"❌ Erro na busca ({module_name}): {e}")
+            logging.error(f"API Search Error ({module_name}): {e}")
+            return None
+
+
+def get_entity_data(api_base_url, api_headers, module_name, fields, criteria_list):
+    """Consulta compartilhada entre os workers: a mesma busca feita há pouco por outra sessão vem do armazenamento."""
+    def buscar():
+        return fetch_entity_data(api_base_url, api_headers, module_name, fields, criteria_list)
+    try:
+        store = get_store()
+        chave = entity_cache_key(store, api_base_url, module_name, fields, criteria_list)
+        with medir_etapa(f"API ({module_name})"):
+            return get_or_compute(store, chave, buscar, ENTITY_CACHE_TTL)
+    except Exception as e:
+        logging.error(f"Shared store error ({module_name}): {e}")
+        return buscar()
+
+
+# ==============================================================================
+# BUSCA ANTECIPADA DA PASTA
+# ==============================================================================
+
+@st.cache_resource
+def get_prefetch_executor():
+    """Threads compartilhadas pelas sessões para a busca antecipada das pastas (ver core/prefetch.py)."""
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+
+@etapa_callback("início da busca antecipada")
+def prefetch_pasta():
+    """on_change da pasta: começa a buscar o processo e os pedidos antes do clique em "Buscar Processo"."""
+    pasta = st.session_state.numero_processo_input
+    if not pasta or not st.session_state.access_token or 'DATAJURI_BASE_URL' not in st.secrets:
+        st.session_state.prefetch.cancel()
+        return
+    st.session_state.prefetch.start(pasta, functools.partial(fetch_case, st.secrets["DATAJURI_BASE_URL"], st.session_state.access_token,
+                                                             pasta, store=get_store()))
+
+
+# ==============================================================================
+# CASOS RECENTES DA SESSÃO
+# ==============================================================================
+
+def guardar_caso_atual():
+    """Guarda o caso aberto entre os recentes da sessão (ver core/recentes.py) antes de sair dele."""
+    if st.session_state.get("processo_data"):
+        pasta = str(st.session_state.processo_data.get('pasta', ''))
+        st.session_state.recentes.put(pasta, capture_case(st.session_state))
+
+
+@etapa_callback("retomar caso recente")
+def retomar_caso(pasta):
+    """on_click da lista de casos recentes: guarda o caso aberto e devolve `pasta` à tela, sem consultar a API."""
+    caso = st.session_state.recentes.pop(pasta)
+    if caso is None:
+        return
+    guardar_caso_atual()
+    restore_case(st.session_state, caso)
+    st.session_state.numero_processo_input = pasta
+    st.session_state.prefetch.cancel()
+
+
+def mostrar_casos_recentes():
+    """Casos recentes na barra lateral: um clique retoma a pasta com o formulário, os pedidos e os prazos."""
+    recentes = st.session_state.recentes
+    if not len(recentes):
+        return
+    with st.sidebar:
+        st.subheader("Casos Recentes")
+        for caso in recentes.entries():
+            resumo = [f"{caso['prazos']} prazo(s)"] + (["pedidos alterados"] if caso['alterado'] else [])
+            st.button(f"📁 {caso['pasta']} · {caso['processo'].get('cliente.nome', 'N/A')}", key=f"recente_{caso['pasta']}",
+                      on_click=retomar_caso, args=(caso['pasta'],), use_container_width=True,
+                      help=f"Retomar a pasta como foi deixada ({', '.join(resumo)}), sem nova consulta ao DataJuri.")
+        stats = recentes.stats()
+        st.caption(f"{stats['casos']} caso(s) em memória · {stats['bytes'] / 1024:,.0f} KB"
+                   + (f" · {stats['descartados']} descartado(s)" if stats['descartados'] else ""))
+
+
+# ==============================================================================
+# FILA DE TRABALHO
+# ==============================================================================
+
+def carregar_fila(itens, origem, recursos, d_menos):
+    """Substitui a fila de trabalho da sessão e começa a buscar os primeiros casos (ver core/fila.py e mostrar_fila)."""
+    from core.fila import FilaTrabalho, prepare_case
+    if st.session_state.fila is not None:
+        st.session_state.fila.cancel()
+    if not itens:
+        st.session_state.fila, st.session_state.fila_erro = None, "A lista não tem nenhuma pasta."
+        return
+    buscar = functools.partial(prepare_case, st.secrets["DATAJURI_BASE_URL"], st.session_state.access_token,
+                               store=get_store(), recursos=recursos, d_menos=d_menos)
+    st.session_state.fila = FilaTrabalho(itens, get_prefetch_executor(), buscar, antecipar=FILA_ANTECIPAR, origem=origem)
+    st.session_state.fila_erro = None
+    logging.info(f"Worklist loaded ({origem}): {len(itens)} pastas")
+
+
+def carregar_fila_arquivo(recursos, d_menos):
+    """on_click: fila a partir do arquivo enviado (CSV, TXT ou JSON)."""
+    from core.fila import read_worklist
+    arquivo = st.session_state.get("fila_arquivo")
+    if arquivo is None:
+        st.session_state.fila_erro = "Envie o arquivo com as pastas do dia."
+        return
+    try:
+        carregar_fila(read_worklist(arquivo.getvalue(), arquivo.name), arquivo.name, recursos, d_menos)
+    except ValueError as e:
+        st.session_state.fila_erro = f"Arquivo inválido: {e}"
+
+
+def carregar_fila_datajuri(recursos, d_menos):
+    """on_click: fila a partir de uma consulta ao DataJuri (ex.: as publicações do dia)."""
+    from core.datajuri import DataJuriClient
+    from core.fila import worklist_from_datajuri
+    criterios = [c.strip() for c in st.session_state.fila_criterios.splitlines() if c.strip()]
+    try:
+        client = DataJuriClient(st.secrets["DATAJURI_BASE_URL"], access_token=st.session_state.access_token, store=get_store())
+        itens = worklist_from_datajuri(client, st.session_state.fila_modulo, criterios, st.session_state.fila_campo_pasta,
+                                       st.session_state.fila_campo_data or None)
+    except Exception as e:
+        logging.error(f"Worklist query error: {e}")
+        st.session_state.fila_erro = f"Erro na consulta da fila: {e}"
+        return
+    carregar_fila(itens, f"DataJuri: {st.session_state.fila_modulo}", recursos, d_menos)
+
+
+@etapa_callback("próximo caso da fila")
+def proximo_caso(recursos, opcoes, d_menos, concluido=True):
+    """on_click da fila: registra o caso atual, guarda-o entre os recentes e abre o seguinte, já buscado."""
+    from core.fila import open_case, prepare_case, register_case
+    fila = st.session_state.fila
+    evento = fila.leave(st.session_state.get("analista", ""), concluido)
+    if evento:
+        register_case(PRODUTIVIDADE_DIR, evento)
+    item, dados = fila.advance()
+    if item is None: # fim da fila: o último caso continua na tela
+        return
+    if dados is None: # busca antecipada falhou, foi cancelada ou expirou: busca agora
+        inicio = time.perf_counter()
+        try:
+            dados = prepare_case(st.secrets["DATAJURI_BASE_URL"], st.session_state.access_token, item,
+                                 store=get_store(), recursos=recursos, d_menos=d_menos)
+        except Exception as e:
+            logging.error(f"Worklist fetch error ({item['pasta']}): {e}")
+            st.session_state.fila_erro = f"Erro ao buscar a pasta {item['pasta']}: {e}"
+            fila.retreat() # o caso não foi aberto: o próximo clique tenta de novo
+            return
+        fila.opened(dados, time.perf_counter() - inicio)
+    guardar_caso_atual()
+    st.session_state.recentes.pop(item['pasta'])
+    open_case(st.session_state, item, dados, opcoes)
+    st.session_state.fila_erro = None if dados['processo'] else f"Nenhum processo encontrado com a pasta {item['pasta']}."
+
+
+def mostrar_fila(recursos, opcoes, d_menos=D_MENOS_PADRAO):
+    """Fila de trabalho na barra lateral: carregar a lista do dia e passar ao próximo caso.
+
+    `recursos` (recurso sugerido por tipo de decisão) e `opcoes` (valores aceitos nos campos do formulário) são os
+    do app; `d_menos` é o deslocamento da data D- nos prazos sugeridos (ver core.prazos.suggest_prazo).
+    """
+    fila = st.session_state.fila
+    carregar = {"recursos": recursos, "d_menos": d_menos} # argumentos dos callbacks
+    proximo = {**carregar, "opcoes": opcoes}
+    with st.sidebar:
+        st.subheader("Fila de Trabalho")
+        st.text_input("Analista:", key="analista", help="Identifica os casos no registro de produtividade da equipe.")
+        if st.session_state.fila_erro:
+            st.error(st.session_state.fila_erro)
+        if fila is not None:
+            stats = fila.stats()
+            st.progress(min(stats['posicao'], stats['total']) / stats['total'],
+                        text=f"Caso {min(stats['posicao'], stats['total'])} de {stats['total']} · {fila.origem}")
+            if fila.atual is not None and fila.prazos:
+                linhas = [f"**{rotulo}:** fatal {p['data_fatal'].strftime('%d/%m/%Y')} (D-: {p['data_d'].strftime('%d/%m/%Y')})"
+                          for rotulo, p in (("Se couber ED", fila.prazos['ed']), ("Recurso", fila.prazos['recurso'])) if p]
+                if linhas:
+                    st.caption("Prazos sugeridos pela data da ciência:  \n" + "  \n".join(linhas))
+            if fila.terminada:
+                st.success("Fila concluída. ✅")
+            else:
+                rotulo = "Abrir o primeiro caso ▶" if fila.atual is None else "Próximo caso ▶"
+                col_prox, col_pular = st.columns([0.65, 0.35])
+                col_prox.button(rotulo, type="primary", on_click=proximo_caso, kwargs=proximo, use_container_width=True,
+                                help="Já buscado em segundo plano." if not fila.pending() else "Busca em andamento.")
+                if fila.atual is not None:
+                    col_pular.button("Pular", on_click=proximo_caso, kwargs={**proximo, "concluido": False},
+                                     use_container_width=True)
+            if stats['concluidos'] or stats['pulados']:
+                st.caption(f"{stats['concluidos']} concluído(s), {stats['pulados']} pulado(s)"
+                           + (f" · {stats['casos_hora']:.1f} casos/h" if stats['casos_hora'] else "")
+                           + f" · espera média {stats['espera_media_ms']:.0f} ms · {stats['antecipados']:.0%} prontos ao abrir")
+        with st.expander("Carregar a lista do dia", expanded=fila is None):
+            st.file_uploader("Arquivo com as pastas (CSV, TXT ou JSON):", type=["csv", "txt", "json"], key="fila_arquivo",
+                             help="Uma pasta por linha ou CSV com a coluna 'pasta' e, opcionalmente, 'data_ciencia' e outros campos do formulário.")
+            st.button("Carregar arquivo", on_click=carregar_fila_arquivo, kwargs=carregar, use_container_width=True)
+            st.divider()
+            st.text_input("Módulo:", value="Processo", key="fila_modulo")
+            st.text_area("Critérios (um por linha):", key="fila_criterios", placeholder="status | igual a | Ativo")
+            st.text_input("Campo da pasta:", value="pasta", key="fila_campo_pasta")
+            st.text_input("Campo da data da ciência (opcional):", key="fila_campo_data")
+            st.button("Consultar DataJuri", on_click=carregar_fila_datajuri, kwargs=carregar, use_container_width=True)
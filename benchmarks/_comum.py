@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Código comum aos benchmarks: a raiz do repositório no sys.path, a medição e as entradas sintéticas.
+
+Importar este módulo (os benchmarks rodam como `python benchmarks/bench_x.py`, com a pasta benchmarks/
+no sys.path) coloca a raiz do repositório no sys.path, de modo que `core` possa ser importado em seguida.
+Os geradores recebem uma semente (42 por padrão) e produzem sempre as mesmas entradas.
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+SITUACOES = ["Procedência", "Improcedência", "Parcialmente procedente", "Acordo", "Extinto sem resolução"]
+OBJETOS = ["Horas extras", "Adicional de insalubridade", "Adicional noturno", "Intervalo intrajornada",
+           "Danos morais", "Diferenças salariais", "Multa do art. 477 da CLT", "Honorários advocatícios",
+           "Justiça gratuita", "Equiparação salarial", "Vale-transporte", "FGTS e multa de 40%"]
+RESULTADOS_1 = ["Procedente", "Improcedente", "Parcialmente procedente", "Aguardando julgamento"]
+RESULTADOS_2 = ["Mantida", "Reformada", "Parcialmente reformada", "Aguardando julgamento", "Não houve recurso"]
+RESULTADOS_SUP = ["N/A", "Mantida", "Reformada", "Aguardando julgamento"]
+
+RECURSOS = [None, "Recurso Ordinário (RO)", "Recurso de Revista (RR)", "Recurso de Embargos (E-RR/E-ED)",
+            "Agravo de Instrumento em Recurso de Revista (AIRR)", "Agravo de Petição (AP)",
+            "Recurso Extraordinário (RE)", "Não Interpor Recurso", "Outro"]
+ISENCOES = ["Não se aplica", "Não se aplica", "Entidade Beneficente", "Justiça Gratuita"]
+
+
+def best_time(func, repeticoes: int) -> float:
+    """Menor tempo (s) de `repeticoes` chamadas de func(): o menos afetado pelo ruído da máquina."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def make_pedidos(n: int, seed: int = 42, incompletos: bool = False) -> pd.DataFrame:
+    """Pedidos como os do DataJuri (colunas de PedidoProcesso), com nomes de tamanhos variados.
+
+    Com `incompletos`, a situação pode vir vazia e os resultados vazios ou None, como em pastas mal preenchidas.
+    """
+    rng = random.Random(seed)
+    vazios = ["", None] if incompletos else []
+    situacoes = SITUACOES + [""] if incompletos else SITUACOES
+    return pd.DataFrame({
+        'id': range(1, n + 1),
+        'nomeObjeto': [f"{rng.choice(OBJETOS)} ({i + 1})" for i in range(n)],
+        'situacao': [rng.choice(situacoes) for _ in range(n)],
+        'resultado_1_instanci': [rng.choice(RESULTADOS_1 + vazios) for _ in range(n)],
+        'resultado_2_instanci': [rng.choice(RESULTADOS_2 + vazios) for _ in range(n)],
+        'resultado_instancia_': [rng.choice(RESULTADOS_SUP + vazios) for _ in range(n)],
+    })
+
+
+def make_editados(pedidos: pd.DataFrame, fracao: float = 0.1, seed: int = 42) -> pd.DataFrame:
+    """Cópia com a situação trocada em `fracao` dos pedidos, como na edição da tabela no app."""
+    rng = random.Random(seed)
+    editado = pedidos.copy()
+    for idx in rng.sample(range(len(pedidos)), max(1, int(len(pedidos) * fracao))):
+        editado.loc[idx, 'situacao'] = rng.choice([s for s in SITUACOES if s != pedidos.loc[idx, 'situacao']])
+    return editado
+
+
+def make_cases(n: int, seed: int = 42) -> pd.DataFrame:
+    """Carteira de casos com os campos do cálculo de custas e depósito (ver core.custas.COLUNAS_CALCULO)."""
+    rng = random.Random(seed)
+    inicio = date(2024, 8, 1)
+    return pd.DataFrame({
+        'pasta': [str(100000 + i) for i in range(n)],
+        'cliente': [f"Cliente {rng.randrange(200)}" for _ in range(n)],
+        'recurso_selecionado': [rng.choice(RECURSOS) for _ in range(n)],
+        'data_ciencia': [inicio + timedelta(days=rng.randrange(360)) if rng.random() > 0.02 else None for _ in range(n)],
+        'valor_condenacao': [round(rng.uniform(0, 80000), 2) if rng.random() > 0.1 else 0.0 for _ in range(n)],
+        'deposito_recolhido': [round(rng.uniform(0, 15000), 2) if rng.random() < 0.3 else 0.0 for _ in range(n)],
+        'percentual_custas': [2.0] * n,
+        'isencao_deposito': [rng.choice(ISENCOES) for _ in range(n)],
+        'pagamento_metade_deposito': [rng.random() < 0.1 for _ in range(n)],
+        'isencao_custas': [rng.choice(ISENCOES) for _ in range(n)],
+    })
+
+
+def compare_update_tasks(pedidos_df: pd.DataFrame, edited_pedidos_df: pd.DataFrame) -> list[dict]:
+    """Implementação anterior do diff dos pedidos, baseada em DataFrame.compare (referência de tempo)."""
+    changes = pedidos_df.compare(edited_pedidos_df)
+    update_tasks = []
+    if changes.empty:
+        return update_tasks
+    changed_cols = changes.columns.get_level_values(0).unique()
+    for idx in changes.index:
+        task = {'id': int(edited_pedidos_df.loc[idx, 'id'])}
+        for col_name in changed_cols:
+            if not pd.isna(changes.loc[idx, (col_name, 'self')]):
+                task[col_name] = edited_pedidos_df.loc[idx, col_name]
+        if len(task) > 1:
+            update_tasks.append(task)
+    return update_tasks
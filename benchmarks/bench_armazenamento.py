@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Benchmark do armazenamento compartilhado: chamadas à API feitas por N processos ao mesmo tempo.
+
+Simula N workers que começam juntos (sem token) e buscam a mesma pasta, contra o DataJuri local
+(core.datajuri_local, com latência para que as requisições se sobreponham). Em seguida, o token é
+trocado no servidor (como se tivesse expirado) e cada worker grava uma alteração: a primeira tentativa
+recebe 401 e o token precisa ser renovado. Conta as requisições que chegaram à API:
+
+    sem armazenamento   cada processo obtém o próprio token e faz as próprias consultas
+    sqlite              core.armazenamento.SQLiteStore (padrão)
+    redis               core.armazenamento.RedisStore contra core.redis_local (requer o pacote `redis`)
+
+Com o armazenamento, deve haver exatamente um pedido de token por renovação e uma consulta por busca.
+
+Uso: python benchmarks/bench_armazenamento.py [--processos 8] [--latencia-ms 100]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import _comum  # noqa: F401  (põe a raiz do repositório no sys.path)
+
+from core.armazenamento import ArmazenamentoError, open_store  # noqa: E402
+from core.datajuri import DataJuriClient  # noqa: E402
+from core.datajuri_local import LocalDataJuri  # noqa: E402
+from core.redis_local import LocalRedis  # noqa: E402
+
+TIMEOUT = 120  # segundos de espera em cada sincronização com os workers
+
+
+def worker(url_api, url_store, barreira, fase, indice):
+    store = open_store(url_store) if url_store else None
+    client = DataJuriClient(url_api, "bench", "bench", "bench", "bench", store=store)
+    barreira.wait(TIMEOUT)
+    client.fetch_processo("123")
+    client.fetch_pedidos("123")
+    barreira.wait(TIMEOUT)  # o processo principal troca o token no servidor
+    fase.wait(TIMEOUT)
+    client.update_entity("PedidoProcesso", 1, {"situacao": f"Alterado {indice}"})
+    if store is not None:
+        store.close()
+
+
+def medir(api: LocalDataJuri, url_store: str | None, processos: int) -> dict:
+    contexto = multiprocessing.get_context("spawn")
+    barreira = contexto.Barrier(processos + 1)
+    fase = contexto.Barrier(processos + 1)
+    filhos = [contexto.Process(target=worker, args=(api.url, url_store, barreira, fase, i)) for i in range(processos)]
+    for filho in filhos:
+        filho.start()
+    api.requisicoes.clear()
+    try:
+        barreira.wait(TIMEOUT)
+        inicio = time.perf_counter()
+        barreira.wait(TIMEOUT)
+        busca = time.perf_counter() - inicio
+        inicial = dict(api.requisicoes)
+        api.requisicoes.clear()
+        api.token = f"token-renovado-{time.monotonic_ns()}"
+        fase.wait(TIMEOUT)
+    except threading.BrokenBarrierError:
+        for filho in filhos:
+            filho.terminate()
+        sys.exit(f"ERRO: um worker falhou ({url_store or 'sem armazenamento'}).")
+    for filho in filhos:
+        filho.join(TIMEOUT)
+        if filho.exitcode != 0:
+            sys.exit(f"ERRO: worker terminou com código {filho.exitcode}")
+    return {"token_inicial": inicial.get("POST", 0), "consultas": inicial.get("GET", 0),
+            "token_renovado": api.requisicoes.get("POST", 0), "busca_s": busca}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processos", type=int, default=8)
+    parser.add_argument("--latencia-ms", type=float, default=100, help="Latência de cada requisição à API local.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta, LocalDataJuri(latencia=args.latencia_ms / 1000) as api, LocalRedis() as redis:
+        backends = [("sem armazenamento", None), ("sqlite", f"sqlite:///{os.path.join(pasta, 'compartilhado.db')}")]
+        try:
+            open_store(redis.url).close()
+            backends.append(("redis (local)", redis.url))
+        except ArmazenamentoError as e:
+            print(f"Backend Redis ignorado: {e}")
+        resultados = {nome: medir(api, url, args.processos) for nome, url in backends}
+
+    print(f"{args.processos} processos buscando a mesma pasta; latência da API {args.latencia_ms:.0f} ms")
+    print(f"{'Backend':<20}{'Tokens (início)':>16}{'Consultas':>11}{'Tokens (401)':>14}{'Busca (s)':>11}")
+    for nome, r in resultados.items():
+        print(f"{nome:<20}{r['token_inicial']:>16}{r['consultas']:>11}{r['token_renovado']:>14}{r['busca_s']:>11.2f}")
+    for nome, r in resultados.items():
+        if nome != "sem armazenamento" and (r["token_inicial"], r["consultas"], r["token_renovado"]) != (1, 2, 1):
+            sys.exit(f"ERRO: com '{nome}' a API deveria receber 1 pedido de token, 2 consultas e 1 renovação.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""Teste de carga do app: N sessões simultâneas em um servidor do Streamlit, com o fluxo completo do analista.
+
+Sobe o DataJuri local (core.datajuri_local) com uma base sintética (core.dados_sinteticos) e o app com
+`streamlit run`, cada um no seu processo, e abre as sessões pelo mesmo WebSocket que o navegador usa
+(/_stcore/stream): cada sessão manda o estado dos widgets (BackMsg.rerun_script) e lê a página de volta
+(ForwardMsg), como o frontend. As interações com widgets de um fragmento (st.fragment) reexecutam só o
+fragmento, também como no navegador. Cada sessão repete o fluxo em pastas sorteadas da base: digita e busca
+a pasta, preenche o contexto, edita alguns pedidos, adiciona o prazo sugerido, gera os relatórios e o
+e-mail, com um tempo de "pensar" entre as interações.
+
+A carga sobe em níveis (--sessoes 1,2,4,8,16): as sessões de um nível continuam abertas no seguinte. Em
+cada nível, depois de --aquecimento segundos, mede por --duracao segundos a latência de cada reexecução
+(do envio do estado até o fim do script), a vazão, a CPU do processo do servidor e a memória (RSS) por
+sessão, lidas do /proc (Linux). O ponto de saturação é o primeiro nível em que o p95 passa de --limite-ms
+ou em que a vazão cresce menos de 10% em relação ao nível anterior.
+
+Uso: python benchmarks/bench_carga.py [--app AppNaara.py] [--sessoes 1,2,4,8,16] [--duracao 30] [--pensar-ms 500]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import date, timedelta
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from _comum import RAIZ
+
+from core.dados_sinteticos import PASTA_INICIAL, generate_case, write_dataset  # noqa: E402
+
+SITUACOES = ["Procedência", "Improcedência", "Parcialmente procedente", "Acordo"]
+TIPOS_DECISAO = ["Sentença (Vara do Trabalho)", "Acórdão (TRT)"]
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def esperar(url: str, processo: subprocess.Popen, timeout: float = 60):
+    """Espera o servidor responder em `url` (qualquer status HTTP)."""
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            sys.exit(f"ERRO: o processo {processo.args[2:4]} terminou (código {processo.returncode}).")
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except urllib.error.HTTPError:
+            return
+        except OSError:
+            time.sleep(0.2)
+    sys.exit(f"ERRO: {url} não respondeu em {timeout:.0f} s.")
+
+
+def cpu_rss(pid: int) -> tuple[float, float]:
+    """CPU acumulada (s, usuário + sistema) e RSS atual (MB) do processo, do /proc."""
+    with open(f"/proc/{pid}/stat") as f:
+        campos = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(campos[11]) + int(campos[12])) / os.sysconf("SC_CLK_TCK")
+    with open(f"/proc/{pid}/status") as f:
+        rss = next(int(linha.split()[1]) for linha in f if linha.startswith("VmRSS:")) / 1024
+    return cpu, rss
+
+
+def percentil(valores: list, q: float) -> float:
+    return valores[min(len(valores) - 1, int(len(valores) * q))] if valores else float("nan")
+
+
+class SessaoWeb:
+    """Uma sessão do app pelo WebSocket do Streamlit: os elementos na tela e o estado dos widgets, como no navegador."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.ws = None
+        self.elementos = {}  # delta_path -> (tipo, proto, fragment_id)
+        self.estados = {}  # id do widget -> WidgetState (valores informados, reenviados a cada execução)
+        self.pagina = ""
+
+    async def abrir(self) -> float:
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None, ping_interval=None)
+        return await self.executar()
+
+    async def fechar(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def executar(self, gatilho: WidgetState = None, fragmento: str = "") -> float:
+        """Manda o estado dos widgets e lê a página até o fim do script. Retorna a latência (s)."""
+        msg = BackMsg()
+        cliente = msg.rerun_script
+        cliente.query_string, cliente.page_script_hash, cliente.fragment_id = "", self.pagina, fragmento
+        na_tela = {getattr(proto, "id", "") for _, proto, _ in self.elementos.values()}
+        cliente.widget_states.widgets.extend(e for wid, e in self.estados.items() if wid in na_tela)
+        if gatilho is not None:
+            cliente.widget_states.widgets.append(gatilho)
+        inicio = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        tocados, erros, escopo = set(), [], fragmento
+        while True:
+            resposta = ForwardMsg()
+            resposta.ParseFromString(await self.ws.recv())
+            tipo = resposta.WhichOneof("type")
+            if tipo == "new_session":  # início de uma execução: um st.rerun() no fragmento reexecuta a página inteira
+                self.pagina = resposta.new_session.page_script_hash
+                tocados, escopo = set(), "".join(resposta.new_session.fragment_ids_this_run[:1])
+            elif tipo == "delta" and resposta.delta.WhichOneof("type") == "new_element":
+                elemento = resposta.delta.new_element
+                tipo_elemento = elemento.WhichOneof("type")
+                caminho = tuple(resposta.metadata.delta_path)
+                self.elementos[caminho] = (tipo_elemento, getattr(elemento, tipo_elemento), resposta.delta.fragment_id)
+                tocados.add(caminho)
+                if tipo_elemento == "exception":
+                    erros.append(elemento.exception.message)
+            elif tipo == "script_finished" and resposta.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        latencia = time.perf_counter() - inicio
+        # O que não foi redesenhado some da tela (no fragmento, só o que é dele); os ids dos fragmentos mudam
+        # junto com a posição deles na página.
+        for caminho in [c for c, (_, _, frag) in self.elementos.items() if c not in tocados and (not escopo or frag == escopo)]:
+            del self.elementos[caminho]
+        if erros:
+            raise RuntimeError(f"Exceção no app: {erros[0]}")
+        return latencia
+
+    def widget(self, chave: str = None, rotulo: str = None) -> tuple[str, object, str]:
+        """(tipo, proto, fragment_id) do widget pela chave (key=) ou pelo início do rótulo."""
+        for tipo, proto, fragmento in self.elementos.values():
+            wid = getattr(proto, "id", "")
+            if wid and ((chave and wid.endswith("-" + chave)) or (rotulo and getattr(proto, "label", "").startswith(rotulo))):
+                return tipo, proto, fragmento
+        raise LookupError(f"Widget não está na tela: {chave or rotulo}")
+
+    async def definir(self, chave: str, valor) -> float:
+        """Altera o valor de um widget, como o usuário (o fragmento do widget é reexecutado sozinho)."""
+        tipo, proto, fragmento = self.widget(chave=chave)
+        estado = WidgetState(id=proto.id)
+        if tipo == "date_input":
+            estado.string_array_value.data[:] = [valor.isoformat()]
+        elif tipo == "dataframe":  # st.data_editor: {"edited_rows": ..., "added_rows": ..., "deleted_rows": ...}
+            estado.string_value = json.dumps(valor)
+        elif tipo in ("checkbox", "toggle"):
+            estado.bool_value = valor
+        elif tipo == "number_input":
+            estado.double_value = valor
+        else:  # text_input, text_area, selectbox, radio
+            estado.string_value = valor
+        self.estados[proto.id] = estado
+        return await self.executar(fragmento=fragmento)
+
+    async def clicar(self, rotulo: str) -> float:
+        _, proto, fragmento = self.widget(rotulo=rotulo)
+        return await self.executar(WidgetState(id=proto.id, trigger_value=True), fragmento)
+
+
+async def analista(n: int, url: str, casos: int, seed: int, pensar: float, parar: asyncio.Event, medicoes: list):
+    """Sessão `n`: repete o fluxo do analista em pastas sorteadas até `parar`."""
+    rng = random.Random(f"{seed}:sessao:{n}")
+    sessao = SessaoWeb(url)
+
+    async def passo(nome, acao):
+        await asyncio.sleep(pensar * rng.uniform(0.5, 1.5))
+        medicoes.append((time.monotonic(), n, nome, await acao))
+
+    try:
+        medicoes.append((time.monotonic(), n, "abrir a página", await sessao.abrir()))
+        while not parar.is_set():
+            i = rng.randrange(casos)
+            pasta, pedidos = str(PASTA_INICIAL + i), generate_case(seed, i, casos)[1]
+            await passo("digitar a pasta", sessao.definir("numero_processo_input", pasta))
+            await passo("buscar o processo", sessao.clicar("Buscar Processo"))
+            await passo("data da ciência", sessao.definir("data_ciencia", date(2025, 3, 3) + timedelta(days=rng.randrange(30))))
+            await passo("tipo de decisão", sessao.definir("tipo_decisao", rng.choice(TIPOS_DECISAO)))
+            await passo("resultado", sessao.definir("resultado_sentenca", "Desfavorável"))
+            editados = rng.sample(range(len(pedidos)), rng.randint(1, min(3, len(pedidos))))
+            # A chave do editor de pedidos muda com o processo (data_editor_pedidos_<digest>).
+            editor = next(p.id for t, p, _ in sessao.elementos.values() if t == "dataframe" and "-data_editor_pedidos" in p.id)
+            await passo("editar pedidos", sessao.definir(editor.rsplit("-", 1)[1], {
+                "edited_rows": {str(pos): {"situacao": rng.choice(SITUACOES)} for pos in editados},
+                "added_rows": [], "deleted_rows": []}))
+            await passo("ED", sessao.definir("ed_status", "Não cabe ED"))
+            await passo("adicionar o prazo sugerido", sessao.clicar("Adicionar Prazo Sugerido"))
+            await passo("gerar relatórios", sessao.clicar("✔️ Gerar"))
+            await passo("e-mail", sessao.definir("advogado_responsavel", rng.choice(["Dra. Ana", "Dr. Paulo"])))
+    except Exception as e:  # a sessão para; o erro aparece no resumo do nível
+        medicoes.append((time.monotonic(), n, f"ERRO: {type(e).__name__}: {e}", None))
+    finally:
+        await sessao.fechar()
+
+
+async def carga(args, url: str, pid: int) -> list[dict]:
+    parar, medicoes, tarefas, niveis = asyncio.Event(), [], [], []
+    # Aquecimento: uma sessão importa o app e passa pelo fluxo uma vez; a memória depois dela é a base.
+    aquecimento = asyncio.Event()
+    tarefa = asyncio.create_task(analista(-1, url, args.casos, args.seed, 0, aquecimento, medicoes))
+    while not any(m[2] == "e-mail" or m[3] is None for m in medicoes):
+        await asyncio.sleep(0.1)
+    aquecimento.set()
+    await tarefa
+    if any(m[3] is None for m in medicoes):
+        sys.exit(next(m[2] for m in medicoes if m[3] is None))
+    _, rss_base = cpu_rss(pid)
+
+    for sessoes in args.sessoes:
+        while len(tarefas) < sessoes:
+            tarefas.append(asyncio.create_task(analista(len(tarefas), url, args.casos, args.seed, args.pensar_ms / 1000,
+                                                        parar, medicoes)))
+        await asyncio.sleep(args.aquecimento)
+        cpu0, _ = cpu_rss(pid)
+        cpu_teste0, inicio = time.process_time(), time.monotonic()
+        await asyncio.sleep(args.duracao)
+        cpu1, rss = cpu_rss(pid)
+        fim = time.monotonic()
+        janela = [m for m in medicoes if inicio <= m[0] < fim and m[1] >= 0]
+        latencias = sorted(m[3] for m in janela if m[3] is not None)
+        passos = {}
+        for m in janela:
+            if m[3] is not None:
+                passos.setdefault(m[2], []).append(m[3])
+        niveis.append({
+            "sessoes": sessoes, "reexecucoes": len(latencias), "vazao": len(latencias) / (fim - inicio),
+            "p50": percentil(latencias, 0.5), "p95": percentil(latencias, 0.95), "p99": percentil(latencias, 0.99),
+            "cpu": (cpu1 - cpu0) / (fim - inicio), "cpu_teste": (time.process_time() - cpu_teste0) / (fim - inicio),
+            "rss": rss, "rss_sessao": (rss - rss_base) / sessoes,
+            "passos": {nome: percentil(sorted(v), 0.95) for nome, v in passos.items()},
+            "erros": sorted({m[2] for m in medicoes if m[3] is None}),
+        })
+    parar.set()
+    await asyncio.gather(*tarefas)
+    return niveis
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="AppNaara.py")
+    parser.add_argument("--sessoes", default="1,2,4,8,16", help="Níveis de carga (sessões simultâneas), em ordem crescente.")
+    parser.add_argument("--duracao", type=float, default=30, help="Segundos medidos em cada nível.")
+    parser.add_argument("--aquecimento", type=float, default=5, help="Segundos antes de medir cada nível.")
+    parser.add_argument("--pensar-ms", type=float, default=500, help="Tempo médio do analista entre as interações.")
+    parser.add_argument("--casos", type=int, default=2000, help="Processos na base sintética.")
+    parser.add_argument("--latencia-ms", type=float, default=50, help="Latência de cada requisição ao DataJuri local.")
+    parser.add_argument("--limite-ms", type=float, default=1000, help="p95 máximo aceitável de uma reexecução.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    args.sessoes = sorted(int(n) for n in args.sessoes.split(","))
+
+    with tempfile.TemporaryDirectory() as pasta:
+        write_dataset(os.path.join(pasta, "base"), args.casos, args.seed, tabelas=False)
+        porta_api, porta_app = porta_livre(), porta_livre()
+        os.makedirs(os.path.join(pasta, ".streamlit"))
+        with open(os.path.join(pasta, ".streamlit", "secrets.toml"), "w", encoding="utf-8") as f:
+            f.write("".join(f'{chave} = "carga"\n' for chave in ("DATAJURI_CLIENT_ID", "DATAJURI_SECRET_ID",
+                                                                   "DATAJURI_USERNAME", "DATAJURI_PASSWORD")))
+            f.write(f'DATAJURI_BASE_URL = "http://127.0.0.1:{porta_api}"\n')
+        ambiente = {**os.environ, "PYTHONPATH": RAIZ}
+        api = subprocess.Popen([sys.executable, "-m", "core.datajuri_local", "--porta", str(porta_api),
+                                "--dados", os.path.join(pasta, "base"), "--latencia", str(args.latencia_ms / 1000)],
+                               cwd=pasta, env=ambiente, stdout=subprocess.DEVNULL)
+        app = subprocess.Popen([sys.executable, "-m", "streamlit", "run", os.path.join(RAIZ, args.app),
+                                "--server.headless", "true", "--server.port", str(porta_app),
+                                "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+                               cwd=pasta, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            esperar(f"http://127.0.0.1:{porta_api}/", api)
+            esperar(f"http://127.0.0.1:{porta_app}/_stcore/health", app)
+            niveis = asyncio.run(carga(args, f"ws://127.0.0.1:{porta_app}/_stcore/stream", app.pid))
+        finally:
+            for processo in (app, api):
+                processo.terminate()
+                processo.wait()
+
+    print(f"{args.app}: fluxo completo em pastas de uma base de {args.casos} processos, {args.pensar_ms:.0f} ms "
+          f"entre interações, latência da API {args.latencia_ms:.0f} ms, {args.duracao:.0f} s por nível")
+    print(f"{'Sessões':>8}{'reexec/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'CPU serv.':>11}{'CPU teste':>11}"
+          f"{'RSS MB':>9}{'MB/sessão':>11}")
+    saturacao = None
+    for i, nivel in enumerate(niveis):
+        print(f"{nivel['sessoes']:>8}{nivel['vazao']:>10.1f}{nivel['p50'] * 1000:>9.0f}{nivel['p95'] * 1000:>9.0f}"
+              f"{nivel['p99'] * 1000:>9.0f}{nivel['cpu']:>11.0%}{nivel['cpu_teste']:>11.0%}{nivel['rss']:>9.0f}"
+              f"{nivel['rss_sessao']:>11.1f}")
+        anterior = niveis[i - 1] if i else None
+        if saturacao is None and (nivel["p95"] * 1000 > args.limite_ms or nivel["erros"]
+                                  or (anterior and nivel["vazao"] < anterior["vazao"] * 1.1)):
+            saturacao = (nivel, anterior)
+    for erro in niveis[-1]["erros"] if niveis else []:
+        print(erro)
+    if saturacao is None:
+        print(f"Sem saturação até {args.sessoes[-1]} sessões (p95 abaixo de {args.limite_ms:.0f} ms e vazão crescendo).")
+        return
+    nivel, anterior = saturacao
+    motivo = ("erros nas sessões" if nivel["erros"] else f"p95 acima de {args.limite_ms:.0f} ms"
+              if nivel["p95"] * 1000 > args.limite_ms else "a vazão parou de crescer")
+    print(f"Saturação com {nivel['sessoes']} sessões ({motivo}); "
+          f"{'suporta ' + str(anterior['sessoes']) + ' sessões' if anterior else 'nem uma sessão fica dentro do limite'}.")
+    print(f"Passos mais lentos com {nivel['sessoes']} sessões (p95):")
+    for nome, p95 in sorted(nivel["passos"].items(), key=lambda p: -p[1])[:5]:
+        print(f"  {nome:<28}{p95 * 1000:>8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
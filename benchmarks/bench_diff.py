@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Benchmark do diff de pedidos: diff_pedidos (por id, vetorizado) vs. DataFrame.compare + .loc.
+
+Uso: python benchmarks/bench_diff.py [--pedidos 10000] [--alterados 0.1] [--repeticoes 5]
+"""
+
+import argparse
+import sys
+
+from _comum import best_time, compare_update_tasks, make_editados, make_pedidos
+
+from core.diff_pedidos import diff_pedidos  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pedidos", type=int, default=10000)
+    parser.add_argument("--alterados", type=float, default=0.1, help="Fração de pedidos alterados.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    original = make_pedidos(args.pedidos)
+    edited = make_editados(original, args.alterados)
+    esperado = compare_update_tasks(original, edited)
+    obtido = diff_pedidos(original, edited).to_tasks()
+    if esperado != obtido:
+        sys.exit("ERRO: tarefas divergentes da implementação com DataFrame.compare.")
+
+    t_ref = best_time(lambda: compare_update_tasks(original, edited), args.repeticoes)
+    t_new = best_time(lambda: diff_pedidos(original, edited).to_tasks(), args.repeticoes)
+    print(f"{args.pedidos} pedidos, {len(obtido)} alterados")
+    print(f"DataFrame.compare + .loc: {t_ref * 1000:8.1f} ms")
+    print(f"diff_pedidos (por id):    {t_new * 1000:8.1f} ms  ({t_ref / t_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
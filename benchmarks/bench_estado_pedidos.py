@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Benchmark da memória do estado dos pedidos: DataFrames por sessão vs. base compartilhada + alterações.
+
+Simula N sessões abrindo a mesma pasta e editando algumas células. Antes, cada sessão guardava a
+tabela original, uma cópia para edição e a tabela devolvida pelo editor; agora guarda só as
+alterações, sobre uma base única por processo (core.estado_pedidos). Mede a memória retida com
+tracemalloc mais o pool do pyarrow (onde o pandas guarda as colunas de texto) e confere que a
+tabela editada montada sob demanda é a mesma.
+
+Uso: python benchmarks/bench_estado_pedidos.py [--sessoes 50] [--pedidos 2000] [--edicoes 5]
+"""
+
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+
+import pandas as pd
+
+from _comum import SITUACOES, make_pedidos
+
+from core.estado_pedidos import PedidosEdicao, get_base  # noqa: E402
+
+def editor_state(n: int, edicoes: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    return {"edited_rows": {pos: {'situacao': rng.choice(SITUACOES)} for pos in rng.sample(range(n), edicoes)},
+            "added_rows": [], "deleted_rows": []}
+
+
+def sessao_anterior(rows: list[dict], estado: dict) -> dict:
+    """Estado de uma sessão no modelo anterior: original, cópia editável e saída do editor."""
+    pedidos_df = pd.DataFrame(rows)
+    edited_pedidos_df = pedidos_df.copy()
+    saida_editor = edited_pedidos_df.copy()
+    for pos, campos in estado["edited_rows"].items():
+        for col, valor in campos.items():
+            saida_editor.iat[pos, saida_editor.columns.get_loc(col)] = valor
+    return {'pedidos_df': pedidos_df, 'edited_pedidos_df': edited_pedidos_df, 'saida_editor': saida_editor}
+
+
+def sessao_atual(rows: list[dict], estado: dict) -> dict:
+    pedidos = PedidosEdicao(get_base("123", rows))
+    pedidos.aplicar_editor(estado)
+    return {'pedidos': pedidos}
+
+
+def memoria_arrow() -> int:
+    try:
+        import pyarrow
+    except ImportError:
+        return 0
+    return pyarrow.total_allocated_bytes()
+
+
+def memoria_retida(criar_sessoes) -> tuple[int, list]:
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0] + memoria_arrow()
+    sessoes = criar_sessoes()
+    gc.collect()
+    depois = tracemalloc.get_traced_memory()[0] + memoria_arrow()
+    tracemalloc.stop()
+    return depois - antes, sessoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessoes", type=int, default=50)
+    parser.add_argument("--pedidos", type=int, default=2000)
+    parser.add_argument("--edicoes", type=int, default=5, help="Células editadas por sessão.")
+    args = parser.parse_args(argv)
+
+    # Cada sessão recebe sua própria resposta da API (listas novas), como no app.
+    respostas = [make_pedidos(args.pedidos).to_dict('records') for _ in range(args.sessoes)]
+    estados = [editor_state(args.pedidos, args.edicoes, seed) for seed in range(args.sessoes)]
+
+    bytes_antes, anteriores = memoria_retida(lambda: [sessao_anterior(r, e) for r, e in zip(respostas, estados)])
+    bytes_depois, atuais = memoria_retida(lambda: [sessao_atual(r, e) for r, e in zip(respostas, estados)])
+
+    for anterior, atual in zip(anteriores, atuais):
+        if not anterior['saida_editor'].equals(atual['pedidos'].view()):
+            sys.exit("ERRO: tabela editada montada sob demanda diferente da saída do editor.")
+
+    print(f"{args.sessoes} sessões, {args.pedidos} pedidos, {args.edicoes} células editadas por sessão")
+    print(f"DataFrames por sessão:              {bytes_antes / 2**20:8.1f} MiB")
+    print(f"Base compartilhada + alterações:    {bytes_depois / 2**20:8.1f} MiB  ({bytes_antes / max(bytes_depois, 1):.0f}x menos)")
+
+
+if __name__ == "__main__":
+    main()
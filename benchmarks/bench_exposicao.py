@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Benchmark da exposição da carteira: calcular_custas_depositos_df (vetorizado) vs. laço caso a caso.
+
+Uso: python benchmarks/bench_exposicao.py [--casos 100000] [--repeticoes 3]
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from _comum import best_time, make_cases
+
+from core.custas import calcular_custas, calcular_custas_depositos_df, calcular_deposito_recursal  # noqa: E402
+from core.exposicao import aggregate_exposicao, calcular_exposicao  # noqa: E402
+from core.prazos import add_business_days  # noqa: E402
+
+def scalar_loop(casos: pd.DataFrame) -> pd.DataFrame:
+    """Implementação caso a caso com as funções do formulário (referência de tempo e de resultado)."""
+    deposito, custas = [], []
+    for caso in casos.to_dict('records'):
+        caso = {k: None if pd.isna(v) else v for k, v in caso.items()}  # NaN -> None, como no formulário
+        deposito.append(calcular_deposito_recursal(caso['recurso_selecionado'], caso['valor_condenacao'], caso['deposito_recolhido'],
+                                                   caso['isencao_deposito'], caso['pagamento_metade_deposito'], caso['data_ciencia']))
+        custas.append(calcular_custas(caso['valor_condenacao'], caso['percentual_custas'], caso['isencao_custas']))
+    return pd.DataFrame({'deposito_a_recolher': deposito, 'custas_a_recolher': custas}, index=casos.index)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--casos", type=int, default=100000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    casos = make_cases(args.casos)
+    esperado = scalar_loop(casos)
+    obtido = calcular_custas_depositos_df(casos)
+    for coluna in esperado.columns:
+        if not np.allclose(esperado[coluna], obtido[coluna]):
+            sys.exit(f"ERRO: '{coluna}' divergente do cálculo caso a caso.")
+
+    resultado = calcular_exposicao(casos)
+    amostra = resultado[resultado['data_ciencia'].notna()].sample(min(2000, len(resultado)), random_state=0)
+    for caso in amostra.itertuples():
+        dias = 15 if "Extraordinário" in str(caso.recurso_selecionado) else 8
+        if add_business_days(caso.data_ciencia, dias).strftime('%Y-%m') != caso.mes_desembolso:
+            sys.exit(f"ERRO: mês do desembolso divergente na pasta {caso.pasta}.")
+
+    t_ref = best_time(lambda: scalar_loop(casos), args.repeticoes)
+    t_new = best_time(lambda: calcular_custas_depositos_df(casos), args.repeticoes)
+    t_total = best_time(lambda: aggregate_exposicao(calcular_exposicao(casos)), args.repeticoes)
+    print(f"{args.casos} casos")
+    print(f"Caso a caso (formulário):        {t_ref * 1000:8.1f} ms")
+    print(f"calcular_custas_depositos_df:    {t_new * 1000:8.1f} ms  ({t_ref / t_new:.0f}x)")
+    print(f"Exposição completa + agregação:  {t_total * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
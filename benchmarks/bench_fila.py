@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Benchmark da fila de trabalho: espera em "Próximo caso" e vazão com e sem a busca antecipada.
+
+Usa core.fila.FilaTrabalho contra o DataJuri local (core.datajuri_local) com latência por requisição.
+O analista simulado passa por N pastas, gastando um tempo fixo em cada uma. Sem antecipação (K=0), cada
+"Próximo caso" busca o processo, os pedidos e calcula os prazos na hora; com K casos antecipados, a busca
+roda enquanto o caso anterior é analisado. Mostra a espera ao abrir cada caso, os casos por hora e a
+fração de casos prontos ao abrir, a mesma medida registrada pelo app (python -m core.fila).
+
+Uso: python benchmarks/bench_fila.py [--pastas 20] [--latencia-ms 250] [--analise-ms 600] [--antecipar 3]
+"""
+
+import argparse
+import functools
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import _comum  # noqa: F401  (põe a raiz do repositório no sys.path)
+
+from core.datajuri_local import LocalDataJuri, dados_demo  # noqa: E402
+from core.fila import FILA_ANTECIPAR, FilaTrabalho, prepare_case, read_worklist  # noqa: E402
+
+
+def dados(pastas: int) -> dict:
+    """Pastas 1000, 1001, ... com os pedidos da base de demonstração."""
+    base = dados_demo()
+    processo, modelo = base["Processo"][0], base["PedidoProcesso"]
+    base["Processo"], base["PedidoProcesso"] = [], []
+    for i in range(pastas):
+        pasta = str(1000 + i)
+        base["Processo"].append({**processo, "id": 1 + i, "pasta": pasta})
+        base["PedidoProcesso"].extend({**p, "id": 1 + i * len(modelo) + j, "processo.pasta": pasta} for j, p in enumerate(modelo))
+    return base
+
+
+def percorrer(fila: FilaTrabalho, buscar, analise: float) -> dict:
+    """Passa por toda a fila como o app: advance(), busca na hora se preciso, análise, leave()."""
+    esperas = []
+    inicio = time.perf_counter()
+    while True:
+        t = time.perf_counter()
+        item, resultado = fila.advance()
+        if item is None:
+            break
+        if resultado is None:
+            resultado = buscar(item, None)
+            fila.opened(resultado, time.perf_counter() - t)
+        esperas.append(time.perf_counter() - t)
+        assert resultado["processo"] and resultado["prazos"]["ed"], item["pasta"]
+        time.sleep(analise)
+        fila.leave("bench")
+    total = time.perf_counter() - inicio
+    stats = fila.stats()
+    return {"esperas": esperas, "total": total, "casos_hora": len(esperas) * 3600 / total, "prontos": stats["antecipados"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pastas", type=int, default=20)
+    parser.add_argument("--latencia-ms", type=float, default=250, help="Latência de cada requisição ao DataJuri local.")
+    parser.add_argument("--analise-ms", type=float, default=600, help="Tempo do analista em cada caso.")
+    parser.add_argument("--antecipar", type=int, default=FILA_ANTECIPAR, help="Casos buscados à frente do atual.")
+    args = parser.parse_args(argv)
+
+    inicio = date(2025, 3, 10)
+    lista = "pasta;data_ciencia\n" + "".join(f"{1000 + i};{(inicio + timedelta(days=i % 5)).strftime('%d/%m/%Y')}\n"
+                                             for i in range(args.pastas))
+    itens = read_worklist(lista.encode("utf-8"), "publicacoes.csv")
+    resultados = {}
+    with LocalDataJuri(dados(args.pastas), latencia=args.latencia_ms / 1000) as api, ThreadPoolExecutor(4) as executor:
+        buscar = functools.partial(prepare_case, api.url, api.token)
+        for antecipar in (0, args.antecipar):
+            antes = api.requisicoes["GET"]
+            resultados[antecipar] = percorrer(FilaTrabalho(itens, executor, buscar, antecipar=antecipar), buscar, args.analise_ms / 1000)
+            resultados[antecipar]["gets"] = api.requisicoes["GET"] - antes
+
+    print(f"{args.pastas} casos, latência da API {args.latencia_ms:.0f} ms por requisição, {args.analise_ms:.0f} ms de análise por caso")
+    print(f"{'Antecipados':<14}{'espera p50 ms':>14}{'p95 ms':>9}{'máx ms':>9}{'casos/h':>10}{'prontos':>9}{'GETs':>6}")
+    for antecipar, r in resultados.items():
+        esperas = sorted(r["esperas"])
+        p95 = esperas[min(len(esperas) - 1, int(len(esperas) * 0.95))]
+        print(f"{antecipar:<14}{statistics.median(esperas) * 1000:>14.0f}{p95 * 1000:>9.0f}{esperas[-1] * 1000:>9.0f}"
+              f"{r['casos_hora']:>10.0f}{r['prontos']:>9.0%}{r['gets']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Benchmark do custo de CPU por interação no AppNaara: página inteira vs. seção (fragmento).
+
+Roda o app com o AppTest contra o DataJuri local (core.datajuri_local), repete interações típicas de
+cada seção e compara o tempo de CPU da execução completa da página (o custo de toda interação antes
+dos fragmentos) com o da seção em que a interação acontece (o custo de reexecutar só o fragmento).
+Os tempos vêm das medições do próprio app (st.session_state.cpu_execucoes).
+
+Uso: python benchmarks/bench_fragmentos.py [--repeticoes 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+from datetime import date
+
+from _comum import RAIZ
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from core.datajuri_local import LocalDataJuri  # noqa: E402
+
+
+def ultimo(at: AppTest, escopo: str) -> float:
+    return next(e["cpu_ms"] for e in reversed(at.session_state["cpu_execucoes"]) if e["escopo"] == escopo)
+
+
+def preparar(url: str) -> AppTest:
+    at = AppTest.from_file(os.path.join(RAIZ, "AppNaara.py"), default_timeout=60)
+    at.secrets.update({"DATAJURI_CLIENT_ID": "bench", "DATAJURI_SECRET_ID": "bench", "DATAJURI_USERNAME": "bench",
+                       "DATAJURI_PASSWORD": "bench", "DATAJURI_BASE_URL": url})
+    at.run()
+    at.text_input(key="numero_processo_input").set_value("123").run()
+    at.button[0].click().run()
+    at.date_input(key="data_ciencia").set_value(date(2025, 3, 10)).run()
+    at.selectbox(key="tipo_decisao").set_value("Sentença (Vara do Trabalho)").run()
+    at.selectbox(key="resultado_sentenca").set_value("Desfavorável").run()
+    at.radio(key="ed_status").set_value("Não cabe ED").run()
+    return at
+
+
+def interacoes(at: AppTest, i: int):
+    """Uma interação de cada seção: (seção, função que a executa)."""
+    def adicionar_e_remover_prazo():
+        next(b for b in at.button if b.label == "Adicionar Prazo Sugerido").click().run()
+        at.button(key="del_0").click().run()
+
+    return [
+        ("contexto", lambda: at.text_area(key="obs_sentenca").set_value(f"Observação {i}").run()),
+        ("pedidos", lambda: at.run()),  # edição da tabela: só a própria seção é reexecutada
+        ("recurso e custas", lambda: at.number_input(key="valor_condenacao").set_value(1000.0 + i).run()),
+        ("prazos", adicionar_e_remover_prazo),
+        ("documentos", lambda: at.text_area(key="obs_finais").set_value(f"Nota {i}").run()),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with LocalDataJuri() as api, tempfile.TemporaryDirectory() as pasta:
+        os.chdir(pasta)  # armazenamento compartilhado, log e diário de atualizações ficam na pasta temporária
+        at = preparar(api.url)
+        medicoes = {}
+        for i in range(args.repeticoes):
+            for secao, interagir in interacoes(at, i):
+                interagir()
+                if at.exception:
+                    sys.exit(f"ERRO na seção '{secao}': {at.exception[0].value}")
+                medicoes.setdefault(secao, []).append((ultimo(at, "página"), ultimo(at, secao)))
+
+    print(f"CPU do servidor por interação (mediana de {args.repeticoes}, ms)")
+    print(f"{'Seção':<18}{'Página inteira':>16}{'Só a seção':>12}{'Redução':>10}")
+    for secao, valores in medicoes.items():
+        pagina = statistics.median(v[0] for v in valores)
+        fragmento = statistics.median(v[1] for v in valores)
+        print(f"{secao:<18}{pagina:>16.1f}{fragmento:>12.1f}{1 - fragmento / pagina:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Perfil da inicialização a frio de um app: tempo de importação e da primeira renderização.
+
+Cada medição roda em um processo Python novo (com -X importtime), que importa o Streamlit e executa
+a primeira renderização do app com o AppTest, contra o DataJuri local (core.datajuri_local) e numa
+pasta temporária (sem token salvo). Mostra as importações mais caras feitas pelo app e encerra com
+código 1 se a mediana da primeira renderização passar do orçamento.
+
+Uso: python benchmarks/bench_inicializacao.py [--app AppNaara.py] [--repeticoes 3] [--orcamento-ms 1000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from _comum import RAIZ
+
+from core.datajuri_local import LocalDataJuri  # noqa: E402
+
+MARCADOR = "@@primeira-renderizacao"
+MODULOS_PESADOS = ("pandas", "numpy", "requests", "holidays", "pyarrow")
+
+# Executado no processo novo: argv = [app, url do DataJuri local].
+FILHO = f"""
+import json, sys, time
+inicio = time.perf_counter()
+import streamlit
+from streamlit.testing.v1 import AppTest
+importacao_streamlit = time.perf_counter() - inicio
+print({MARCADOR!r}, file=sys.stderr, flush=True)
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+at.secrets.update({{"DATAJURI_CLIENT_ID": "bench", "DATAJURI_SECRET_ID": "bench", "DATAJURI_USERNAME": "bench",
+                    "DATAJURI_PASSWORD": "bench", "DATAJURI_BASE_URL": sys.argv[2]}})
+inicio = time.perf_counter()
+at.run()
+renderizacao = time.perf_counter() - inicio
+print({MARCADOR!r}, file=sys.stderr, flush=True)
+print(json.dumps({{"streamlit_ms": importacao_streamlit * 1000, "renderizacao_ms": renderizacao * 1000,
+                   "excecao": [e.value for e in at.exception],
+                   "carregados": [m for m in {MODULOS_PESADOS!r} if m in sys.modules]}}))
+"""
+
+
+def parse_importtime(stderr: str) -> dict[str, float]:
+    """Tempo acumulado (ms) por pacote das importações de primeiro nível feitas durante a primeira renderização."""
+    partes = stderr.split(MARCADOR)
+    tempos = {}
+    for linha in (partes[1] if len(partes) > 2 else "").splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha[len("import time:"):].split("|")
+        if nome[1:].startswith(" "):  # submódulo importado por outro módulo: já conta no acumulado do pai
+            continue
+        pacote = nome.strip().split(".")[0]  # ex.: holidays.countries.* (carregados sob demanda) contam em holidays
+        tempos[pacote] = tempos.get(pacote, 0.0) + int(acumulado) / 1000
+    return tempos
+
+
+def medir(app: str, url: str) -> dict:
+    with tempfile.TemporaryDirectory() as pasta:
+        env = dict(os.environ, PYTHONPATH=RAIZ)
+        inicio = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", FILHO, app, url],
+                              cwd=pasta, env=env, capture_output=True, text=True, timeout=300)
+        total = time.perf_counter() - inicio
+    if proc.returncode != 0 or not proc.stdout.strip():
+        sys.exit(f"ERRO ao iniciar '{app}':\n{proc.stderr[-3000:]}")
+    resultado = json.loads(proc.stdout.strip().splitlines()[-1])
+    resultado["processo_ms"] = total * 1000
+    resultado["importacoes"] = parse_importtime(proc.stderr)
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="AppNaara.py")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--orcamento-ms", type=float, default=1000, help="Limite para a primeira renderização (mediana).")
+    parser.add_argument("--top", type=int, default=10, help="Quantas importações mais caras mostrar.")
+    args = parser.parse_args(argv)
+
+    app = os.path.join(RAIZ, args.app)
+    with LocalDataJuri() as api:
+        medicoes = [medir(app, api.url) for _ in range(args.repeticoes)]
+    if medicoes[-1]["excecao"]:
+        sys.exit(f"ERRO na primeira renderização: {medicoes[-1]['excecao'][0]}")
+
+    renderizacao = statistics.median(m["renderizacao_ms"] for m in medicoes)
+    print(f"{args.app} - inicialização a frio (mediana de {args.repeticoes} processos)")
+    print(f"Processo completo (python + streamlit + app): {statistics.median(m['processo_ms'] for m in medicoes):8.0f} ms")
+    print(f"Importação do Streamlit:                      {statistics.median(m['streamlit_ms'] for m in medicoes):8.0f} ms")
+    print(f"Primeira renderização do app:                 {renderizacao:8.0f} ms")
+    print(f"Módulos pesados carregados na primeira tela:  {', '.join(medicoes[-1]['carregados']) or 'nenhum'}")
+    print("Importações mais caras durante a renderização (ms, acumulado por pacote):")
+    for nome, ms in sorted(medicoes[-1]["importacoes"].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {nome:<40}{ms:8.1f}")
+
+    if renderizacao > args.orcamento_ms:
+        print(f"ACIMA DO ORÇAMENTO: {renderizacao:.0f} ms > {args.orcamento_ms:.0f} ms")
+        return 1
+    print(f"Dentro do orçamento de {args.orcamento_ms:.0f} ms.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""Benchmark do log: custo de logging.info na thread da sessão, antes (arquivo em texto) e com core.logs.
+
+Antes, os apps usavam logging.basicConfig(filename=...): cada registro era formatado e gravado no arquivo
+na própria thread da sessão, sob a trava do handler compartilhada por todas as sessões. Com core.logs, a
+thread da sessão só coloca o registro na fila; o JSON é montado e gravado por uma thread em segundo plano.
+O benchmark mede o tempo de cada chamada em T threads simultâneas (as sessões) nos dois modos, com o disco
+local e com um disco lento simulado (--disco-lento-us por gravação, como um volume de rede).
+
+Depois confere a rotação com vários workers: P processos gravam no mesmo arquivo com um limite de tamanho
+pequeno; todos os registros devem ser lidos de volta (read_log, inclusive dos segmentos .gz), sem perdas
+nem linhas quebradas.
+
+Uso: python benchmarks/bench_logs.py [--registros 20000] [--threads 8] [--processos 4] [--disco-lento-us 300]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import _comum  # noqa: F401  (põe a raiz do repositório no sys.path)
+
+from core.logs import configure_logging, log_context, log_segments, read_log, shutdown_logging  # noqa: E402
+
+
+def chamadas(logger: logging.Logger, registros: int, threads: int) -> list[float]:
+    """Tempo (s) de cada logger.info, em `threads` threads simultâneas."""
+    tempos, trava = [], threading.Lock()
+
+    def sessao(n):
+        locais = []
+        with log_context(sessao=f"s{n}", pasta=str(1000 + n), etapa="bench"):
+            for i in range(registros // threads):
+                inicio = time.perf_counter()
+                logger.info(f"REQUEST: GET /v1/entidades/Processo with PARAMS: [('criterio', 'pasta | igual a | {1000 + n}')] #{i}")
+                locais.append(time.perf_counter() - inicio)
+        with trava:
+            tempos.extend(locais)
+
+    grupo = [threading.Thread(target=sessao, args=(n,)) for n in range(threads)]
+    for t in grupo:
+        t.start()
+    for t in grupo:
+        t.join()
+    return sorted(tempos)
+
+
+def comparar(pasta: str, registros: int, threads: int, atraso: float) -> dict:
+    """Tempos das chamadas nos dois modos; `atraso` (s) é somado a cada gravação no disco."""
+    class TextoLento(logging.FileHandler):
+        def flush(self):
+            super().flush()
+            time.sleep(atraso)
+
+    antigo = logging.getLogger(f"bench.texto.{atraso}")
+    antigo.propagate = False
+    handler = (TextoLento if atraso else logging.FileHandler)(os.path.join(pasta, f"texto{atraso}.log"), mode="a")
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    antigo.addHandler(handler)
+    antigo.setLevel(logging.INFO)
+    tempos = {"texto": chamadas(antigo, registros, threads)}
+    handler.close()
+
+    arquivo = os.path.join(pasta, f"json{atraso}.log")
+    handler = configure_logging(arquivo)
+    if atraso:
+        emit = handler.emit
+        handler.emit = lambda record: (emit(record), time.sleep(atraso))
+    inicio = time.perf_counter()
+    tempos["json"] = chamadas(logging.getLogger("bench.json"), registros, threads)
+    tempos["na_fila"] = time.perf_counter() - inicio
+    shutdown_logging()  # espera a thread gravar o que ficou na fila
+    tempos["gravado"] = time.perf_counter() - inicio
+    tempos["lidos"] = sum(1 for _ in read_log(arquivo))
+    return tempos
+
+
+def worker(arquivo: str, n: int, registros: int, max_bytes: int):
+    configure_logging(arquivo, max_bytes=max_bytes, segmentos=1000)
+    with log_context(sessao=f"p{n}"):
+        for i in range(registros):
+            logging.info(f"registro {i}", extra={"i": i})
+    shutdown_logging()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--registros", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--processos", type=int, default=4)
+    parser.add_argument("--disco-lento-us", type=float, default=300, help="Atraso simulado por gravação no disco lento.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        cenarios = {"disco local": comparar(pasta, args.registros, args.threads, 0),
+                    f"disco lento (+{args.disco_lento_us:.0f} µs)": comparar(pasta, args.registros // 10, args.threads,
+                                                                             args.disco_lento_us / 1e6)}
+
+        # Rotação com vários workers no mesmo arquivo.
+        arquivo = os.path.join(pasta, "workers.log")
+        por_processo = args.registros // args.processos
+        processos = [multiprocessing.Process(target=worker, args=(arquivo, n, por_processo, 64 * 1024))
+                     for n in range(args.processos)]
+        for p in processos:
+            p.start()
+        for p in processos:
+            p.join()
+        lidos = [(e["sessao"], e["i"]) for e in read_log(arquivo)]
+        segmentos = log_segments(arquivo)
+        comprimidos = sum(nome.endswith(".gz") for nome in segmentos)
+
+    print(f"logging.info em {args.threads} threads (sessões) simultâneas, tempo na thread de quem registra")
+    print(f"{'':<56}{'registros':>10}{'p50 µs':>9}{'p99 µs':>9}{'máx µs':>10}")
+    perdidos = False
+    for cenario, tempos in cenarios.items():
+        for chave, modo in (("texto", "texto, gravado na thread (antes)"), ("json", "JSON, em fila (core.logs)")):
+            valores = tempos[chave]
+            print(f"{cenario + ': ' + modo:<56}{len(valores):>10}{valores[len(valores) // 2] * 1e6:>9.1f}"
+                  f"{valores[int(len(valores) * 0.99)] * 1e6:>9.1f}{valores[-1] * 1e6:>10.0f}")
+        print(f"{'':<4}core.logs: na fila em {tempos['na_fila'] * 1000:.0f} ms, gravados em segundo plano em "
+              f"{tempos['gravado'] * 1000:.0f} ms ({tempos['lidos']}/{len(tempos['json'])} lidos de volta)")
+        perdidos |= tempos["lidos"] != len(tempos["json"])
+    esperados = args.processos * por_processo
+    print(f"{args.processos} workers no mesmo arquivo (rotação a cada 64 KB): {len(lidos)}/{esperados} registros lidos, "
+          f"{len(set(lidos))} distintos, {len(segmentos)} segmentos ({comprimidos} .gz)")
+    if perdidos or len(set(lidos)) != esperados or len(lidos) != esperados:
+        sys.exit("ERRO: registros perdidos ou duplicados.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Benchmark do painel de desempenho: custo de medir as etapas de cada execução, com e sem o cProfile.
+
+Roda o app com o AppTest contra o DataJuri local (core.datajuri_local), com a pasta carregada e os
+relatórios gerados, e reexecuta a página N vezes em três modos: painel fechado (como em produção),
+painel aberto (?perfil=1, só as etapas) e painel aberto com o cProfile. Mostra o tempo mediano de cada
+execução e as etapas mais lentas medidas pelo painel, e confere que o .prof gravado pode ser lido.
+
+Uso: python benchmarks/bench_perfil.py [--app AppNaara.py] [--execucoes 20]
+"""
+
+import argparse
+import datetime
+import os
+import pstats
+import statistics
+import sys
+import tempfile
+import time
+
+from _comum import RAIZ
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from core.datajuri_local import LocalDataJuri, dados_demo  # noqa: E402
+
+
+def novo_app(app: str, url: str, perfil: bool) -> AppTest:
+    """App com a pasta 123 carregada, o formulário preenchido e os relatórios gerados."""
+    at = AppTest.from_file(os.path.join(RAIZ, app), default_timeout=60)
+    at.secrets.update({"DATAJURI_CLIENT_ID": "bench", "DATAJURI_SECRET_ID": "bench", "DATAJURI_USERNAME": "bench",
+                       "DATAJURI_PASSWORD": "bench", "DATAJURI_BASE_URL": url, "PERFIL_PAINEL": "1"})
+    if perfil:
+        at.query_params["perfil"] = "1"
+    at.run()
+    at.text_input(key="numero_processo_input").set_value("123").run()
+    next(b for b in at.button if b.label == "Buscar Processo").click().run()
+    at.date_input(key="data_ciencia").set_value(datetime.date(2025, 3, 10)).run()
+    at.selectbox(key="tipo_decisao").set_value("Sentença (Vara do Trabalho)").run()
+    at.selectbox(key="resultado_sentenca").set_value("Desfavorável").run()
+    next(b for b in at.button if "Gerar" in b.label).click().run()
+    at.text_input(key="advogado_responsavel").set_value("Dra. Ana").run()
+    if at.exception:
+        sys.exit(f"ERRO: {at.exception[0].value}")
+    return at
+
+
+def medir(at: AppTest, execucoes: int) -> list[float]:
+    tempos = []
+    for _ in range(execucoes):
+        inicio = time.perf_counter()
+        at.run()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="AppNaara.py")
+    parser.add_argument("--execucoes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with LocalDataJuri(dados_demo()) as api, tempfile.TemporaryDirectory() as pasta:
+        os.chdir(pasta)
+        medir(novo_app(args.app, api.url, False), 3)  # aquecimento: importações e cache das consultas
+        tempos = {"Painel fechado": medir(novo_app(args.app, api.url, False), args.execucoes)}
+        at = novo_app(args.app, api.url, True)
+        tempos["Painel aberto (etapas)"] = medir(at, args.execucoes)
+        at.toggle(key="perfil_cprofile").set_value(True).run()
+        tempos["Painel aberto + cProfile"] = medir(at, args.execucoes)
+        perfil = at.session_state["perfil"]
+        at.button(key="perfil_salvar").click().run()
+        arquivos = os.listdir("perfis") if os.path.isdir("perfis") else []
+        funcoes = len(pstats.Stats(os.path.join("perfis", arquivos[0])).stats) if arquivos else 0
+
+    base = statistics.median(tempos["Painel fechado"])
+    print(f"{args.app}: {args.execucoes} reexecuções da página com os relatórios gerados")
+    print(f"{'':<28}{'mediana ms':>11}{'máx ms':>9}{'custo':>8}")
+    for modo, valores in tempos.items():
+        mediana = statistics.median(valores)
+        print(f"{modo:<28}{mediana * 1000:>11.1f}{max(valores) * 1000:>9.1f}{(mediana / base - 1):>+8.0%}")
+    print("Etapas mais lentas (p50 no painel):")
+    for linha in sorted(perfil.percentiles(), key=lambda r: -r["p50 ms"])[:6]:
+        print(f"  {linha['etapa']:<26}{linha['p50 ms']:>8.1f} ms  (p95 {linha['p95 ms']:.1f}, CPU {linha['CPU média ms']:.1f})")
+    if not funcoes:
+        sys.exit("ERRO: o perfil do cProfile não foi gravado.")
+    print(f"Perfil gravado: {arquivos[0]} ({len(perfil.perfis)} execuções, {funcoes} funções)")
+
+
+if __name__ == "__main__":
+    main()
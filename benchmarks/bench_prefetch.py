@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Benchmark da busca antecipada da pasta: tempo do clique em "Buscar Processo" com e sem prefetch.
+
+Roda o app com o AppTest contra o DataJuri local (core.datajuri_local) com latência por requisição.
+Sem prefetch, a pasta é digitada e o botão clicado na mesma interação (a busca começa no clique). Com
+prefetch, a pasta é digitada (on_change inicia a busca em segundo plano), o analista leva um tempo
+para clicar e só então o botão é clicado. Também confere que a busca de uma pasta trocada antes do
+clique é descartada: o app carrega a pasta que está na tela.
+
+Uso: python benchmarks/bench_prefetch.py [--app AppNaara.py] [--latencia-ms 300] [--pausa-ms 800] [--repeticoes 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from _comum import RAIZ
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from core.datajuri_local import LocalDataJuri, dados_demo  # noqa: E402
+
+
+def dados(pastas: int) -> dict:
+    """Base de demonstração com `pastas` cópias do processo 123 (pastas 1000, 1001, ...).
+
+    Cada medição usa uma pasta diferente, para que nenhuma resposta venha do cache compartilhado das consultas.
+    """
+    base = dados_demo()
+    processo, pedidos = base["Processo"][0], list(base["PedidoProcesso"])
+    for i in range(pastas):
+        pasta = str(1000 + i)
+        base["Processo"].append({**processo, "id": 2 + i, "pasta": pasta})
+        base["PedidoProcesso"].extend({**p, "id": 100 + 10 * i + j, "processo.pasta": pasta} for j, p in enumerate(pedidos))
+    return base
+
+
+def novo_app(app: str, url: str) -> AppTest:
+    at = AppTest.from_file(os.path.join(RAIZ, app), default_timeout=60)
+    at.secrets.update({"DATAJURI_CLIENT_ID": "bench", "DATAJURI_SECRET_ID": "bench", "DATAJURI_USERNAME": "bench",
+                       "DATAJURI_PASSWORD": "bench", "DATAJURI_BASE_URL": url})
+    at.run()
+    return at
+
+
+def buscar(at: AppTest, pasta: str, prefetch: bool, pausa: float) -> float:
+    """Tempo (s) da execução disparada pelo clique em "Buscar Processo"."""
+    campo = at.text_input(key="numero_processo_input").set_value(pasta)
+    if prefetch:
+        at.run()  # on_change: a busca começa em segundo plano
+        time.sleep(pausa)  # o analista confere o número e clica
+    else:
+        campo.set_value(pasta)
+    botao = next(b for b in at.button if b.label == "Buscar Processo")
+    botao.click()
+    inicio = time.perf_counter()
+    at.run()
+    total = time.perf_counter() - inicio
+    if at.exception:
+        sys.exit(f"ERRO: {at.exception[0].value}")
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="AppNaara.py")
+    parser.add_argument("--latencia-ms", type=float, default=300, help="Latência de cada requisição ao DataJuri local.")
+    parser.add_argument("--pausa-ms", type=float, default=800, help="Tempo entre digitar a pasta e clicar no botão.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    pastas = iter(str(1000 + i) for i in range(2 * args.repeticoes + 3))
+    with LocalDataJuri(dados(2 * args.repeticoes + 3), latencia=args.latencia_ms / 1000) as api, \
+            tempfile.TemporaryDirectory() as pasta:
+        os.chdir(pasta)  # armazenamento compartilhado (token e consultas) em um diretório temporário
+        buscar(novo_app(args.app, api.url), next(pastas), False, 0)  # aquecimento: importações do formulário
+        tempos = {}
+        for prefetch in (False, True):
+            tempos[prefetch] = [buscar(novo_app(args.app, api.url), next(pastas), prefetch, args.pausa_ms / 1000)
+                                for _ in range(args.repeticoes)]
+
+        # Pasta trocada antes do clique: a busca da primeira é cancelada e não chega à tela.
+        antiga, nova = next(pastas), next(pastas)
+        at = novo_app(args.app, api.url)
+        at.text_input(key="numero_processo_input").set_value(antiga).run()
+        at.text_input(key="numero_processo_input").set_value(nova).run()
+        time.sleep(args.latencia_ms * 3 / 1000)
+        next(b for b in at.button if b.label == "Buscar Processo").click().run()
+        carregada = (at.session_state["processo_data"] or {}).get("pasta")
+
+    sem, com = statistics.median(tempos[False]), statistics.median(tempos[True])
+    print(f"{args.app}: clique em 'Buscar Processo' (mediana de {args.repeticoes}, latência da API {args.latencia_ms:.0f} ms)")
+    print(f"Sem prefetch (busca no clique):        {sem * 1000:8.0f} ms")
+    print(f"Com prefetch ({args.pausa_ms:.0f} ms até o clique):   {com * 1000:8.0f} ms  ({sem / com:.1f}x mais rápido)")
+    if carregada != nova:
+        sys.exit(f"ERRO: após trocar a pasta de {antiga} para {nova}, o app carregou {carregada!r}.")
+    print(f"Troca de pasta antes do clique ({antiga} -> {nova}): resultado antigo descartado, pasta {nova} carregada.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Benchmark dos casos recentes: voltar a uma pasta pela barra lateral em vez de buscá-la de novo.
+
+Roda o app com o AppTest contra o DataJuri local (core.datajuri_local) com latência por requisição. O
+analista abre N pastas em sequência, preenchendo parte do formulário em cada uma, e depois volta a cada
+uma delas: primeiro buscando de novo (como antes, com o formulário vazio e duas consultas à API) e
+depois pela lista de casos recentes (sem consultas, com o formulário como foi deixado). Mostra o
+tempo de cada volta, as requisições feitas e a memória estimada da lista, e confere os limites do LRU.
+
+Uso: python benchmarks/bench_recentes.py [--app AppNaara.py] [--pastas 6] [--latencia-ms 200] [--pedidos 200]
+"""
+
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from _comum import RAIZ
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from core.armazenamento import invalidate_entities, open_store  # noqa: E402
+from core.datajuri_local import LocalDataJuri, dados_demo  # noqa: E402
+from core.recentes import RECENTES_MAX_CASOS, CasosRecentes, capture_case  # noqa: E402
+
+
+def dados(pastas: int, pedidos: int) -> dict:
+    """Pastas 1000, 1001, ... com `pedidos` pedidos cada."""
+    base = dados_demo()
+    processo, modelo = base["Processo"][0], base["PedidoProcesso"]
+    base["Processo"], base["PedidoProcesso"] = [], []
+    for i in range(pastas):
+        pasta = str(1000 + i)
+        base["Processo"].append({**processo, "id": 1 + i, "pasta": pasta, "cliente.nome": f"Cliente {i}"})
+        base["PedidoProcesso"].extend({**modelo[j % len(modelo)], "id": 1 + i * pedidos + j, "processo.pasta": pasta,
+                                       "nomeObjeto": f"Pedido {j}"} for j in range(pedidos))
+    return base
+
+
+def novo_app(app: str, url: str) -> AppTest:
+    at = AppTest.from_file(os.path.join(RAIZ, app), default_timeout=60)
+    at.secrets.update({"DATAJURI_CLIENT_ID": "bench", "DATAJURI_SECRET_ID": "bench", "DATAJURI_USERNAME": "bench",
+                       "DATAJURI_PASSWORD": "bench", "DATAJURI_BASE_URL": url})
+    at.run()
+    return at
+
+
+def executar(at: AppTest, acao) -> float:
+    acao()
+    inicio = time.perf_counter()
+    at.run()
+    if at.exception:
+        sys.exit(f"ERRO: {at.exception[0].value}")
+    return time.perf_counter() - inicio
+
+
+def buscar(at: AppTest, pasta: str) -> float:
+    at.text_input(key="numero_processo_input").set_value(pasta).run()
+    return executar(at, lambda: next(b for b in at.button if b.label == "Buscar Processo").click())
+
+
+def retomar(at: AppTest, pasta: str) -> float:
+    return executar(at, lambda: next(b for b in at.sidebar.button if b.label.startswith(f"📁 {pasta} ")).click())
+
+
+def preencher(at: AppTest, i: int):
+    at.date_input(key="data_ciencia").set_value(datetime.date(2025, 3, 10) + datetime.timedelta(days=i)).run()
+    at.selectbox(key="tipo_decisao").set_value("Sentença (Vara do Trabalho)").run()
+    pedidos = at.session_state["pedidos"]
+    at.session_state[pedidos.editor_key] = {"edited_rows": {0: {"situacao": "Acordo"}}, "added_rows": [], "deleted_rows": []}
+    at.run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="AppNaara.py")
+    parser.add_argument("--pastas", type=int, default=6)
+    parser.add_argument("--latencia-ms", type=float, default=200, help="Latência de cada requisição ao DataJuri local.")
+    parser.add_argument("--pedidos", type=int, default=200, help="Pedidos por pasta.")
+    args = parser.parse_args(argv)
+    pastas = [str(1000 + i) for i in range(args.pastas)]
+
+    with LocalDataJuri(dados(args.pastas, args.pedidos), latencia=args.latencia_ms / 1000) as api, \
+            tempfile.TemporaryDirectory() as pasta_temp:
+        os.chdir(pasta_temp)
+        at = novo_app(args.app, api.url)
+        for i, pasta in enumerate(pastas):
+            buscar(at, pasta)
+            preencher(at, i)
+        buscar(at, pastas[0])  # a última pasta vai para os recentes
+
+        # Volta buscando de novo, em outra sessão. O cache compartilhado das consultas é invalidado antes, como
+        # depois de alguns minutos: ele só vale por ENTITY_CACHE_TTL segundos.
+        store = open_store()
+        for modulo in ("Processo", "PedidoProcesso"):
+            invalidate_entities(store, api.url, modulo)
+        store.close()
+        at_busca = novo_app(args.app, api.url)
+        get_antes = api.requisicoes["GET"]
+        tempos_busca = [buscar(at_busca, pasta) for pasta in pastas[1:]]
+        get_busca = api.requisicoes["GET"] - get_antes
+
+        get_antes = api.requisicoes["GET"]
+        tempos_retomada, preservados, casos = [], 0, []
+        for i, pasta in enumerate(pastas[1:], start=1):
+            tempos_retomada.append(retomar(at, pasta))
+            preservados += (at.session_state["data_ciencia"] == datetime.date(2025, 3, 10) + datetime.timedelta(days=i)
+                            and at.session_state["pedidos"].tem_alteracoes)
+            casos.append(capture_case(at.session_state))
+        get_retomada = api.requisicoes["GET"] - get_antes
+        stats = at.session_state["recentes"].stats()
+
+    n = len(pastas) - 1
+    print(f"{args.app}: {n} voltas a pastas já abertas ({args.pedidos} pedidos cada, latência da API {args.latencia_ms:.0f} ms)")
+    print(f"{'':<32}{'mediana ms':>11}{'máx ms':>9}{'GETs':>6}")
+    print(f"{'Buscar de novo':<32}{statistics.median(tempos_busca) * 1000:>11.0f}{max(tempos_busca) * 1000:>9.0f}{get_busca:>6}")
+    print(f"{'Casos recentes (barra lateral)':<32}{statistics.median(tempos_retomada) * 1000:>11.0f}"
+          f"{max(tempos_retomada) * 1000:>9.0f}{get_retomada:>6}")
+    print(f"Formulário e pedidos preservados: {preservados}/{n}; lista: {stats['casos']} casos, "
+          f"{stats['bytes'] / 1024:,.0f} KB estimados, {stats['descartados']} descartados")
+
+    # Limites do LRU: número de casos e memória (cada caso com a sua tabela de pedidos).
+    recentes = CasosRecentes()
+    for i in range(RECENTES_MAX_CASOS + 3):
+        recentes.put(str(i), casos[i % len(casos)])
+    contagem_ok = len(recentes) == RECENTES_MAX_CASOS and "0" not in recentes and recentes.descartados == 3
+    por_caso = statistics.mean(e["bytes"] for e in recentes.entries())
+    recentes = CasosRecentes(max_bytes=int(por_caso * 2.5))
+    for i, caso in enumerate(casos):
+        recentes.put(str(i), caso)
+    memoria_ok = len(recentes) == 2 and recentes.nbytes <= recentes.max_bytes
+    print(f"LRU: {RECENTES_MAX_CASOS} casos no máximo ({'ok' if contagem_ok else 'FALHOU'}); com a memória limitada a "
+          f"~2,5 casos ({recentes.max_bytes / 1024:,.0f} KB), ficaram {len(recentes)} ({'ok' if memoria_ok else 'FALHOU'})")
+    if get_retomada or preservados != n or not (contagem_ok and memoria_ok):
+        sys.exit("ERRO: a retomada consultou a API, perdeu o estado do caso ou o LRU não respeitou os limites.")
+
+
+if __name__ == "__main__":
+    main()
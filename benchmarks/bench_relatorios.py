@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Benchmark de format_report_from_df: versão vetorizada vs. implementação original com iterrows.
+
+Uso: python benchmarks/bench_relatorios.py [--pedidos 5000] [--repeticoes 5]
+"""
+
+import argparse
+import sys
+
+import pandas as pd
+
+from _comum import best_time, make_pedidos
+
+from core.relatorios import format_report_from_df  # noqa: E402
+
+TIPOS_DECISAO = ["Sentença (Vara do Trabalho)", "Acórdão (TRT)", "Acórdão (TST - Turma)", "Despacho Denegatório de Recurso"]
+
+
+def format_report_from_df_iterrows(df: pd.DataFrame, tipo_decisao: str):
+    """Implementação original (linha a linha), mantida como referência de saída e de tempo."""
+    if df.empty: return "Nenhum pedido encontrado."
+    report_lines = []
+    df_sorted = df.sort_values(by='nomeObjeto').reset_index(drop=True) if 'nomeObjeto' in df.columns else df.reset_index(drop=True)
+
+    for index, row in df_sorted.iterrows():
+        report_lines.append(f"{index + 1}) {row.get('nomeObjeto', 'N/A')}")
+        if situacao := row.get('situacao', '').strip():
+            report_lines.append(f" - Situação: {situacao}")
+
+        res1 = row.get('resultado_1_instanci', 'N/A')
+        res2 = row.get('resultado_2_instanci', 'N/A')
+        resSup = row.get('resultado_instancia_', 'N/A')
+
+        tipo_decisao_lower = tipo_decisao.lower() if tipo_decisao else ""
+        show_res2 = "acórdão" in tipo_decisao_lower or "monocrática" in tipo_decisao_lower or "denegatório" in tipo_decisao_lower
+        show_resSup = "tst" in tipo_decisao_lower or "denegatório" in tipo_decisao_lower
+
+        def is_relevant(res_value):
+            return res_value and isinstance(res_value, str) and res_value.lower().strip() not in ["aguardando julgamento", "n/a", "", "não houve recurso"]
+
+        if is_relevant(res1): report_lines.append(f" - Resultado 1ª Instância: {res1}")
+        if show_res2 and is_relevant(res2): report_lines.append(f" - Resultado 2ª Instância: {res2}")
+        if show_resSup and is_relevant(resSup): report_lines.append(f" - Resultado Instância Superior: {resSup}")
+        report_lines.append("")
+    return "\n".join(report_lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pedidos", type=int, default=5000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    df = make_pedidos(args.pedidos, incompletos=True)
+    for tipo in TIPOS_DECISAO:
+        esperado = format_report_from_df_iterrows(df, tipo)
+        obtido = format_report_from_df(df, tipo)
+        if esperado != obtido:
+            sys.exit(f"ERRO: saída divergente da implementação original para '{tipo}'.")
+
+        t_ref = best_time(lambda: format_report_from_df_iterrows(df, tipo), args.repeticoes)
+        t_vet = best_time(lambda: format_report_from_df(df, tipo), args.repeticoes)
+        print(f"{tipo:<35} iterrows: {t_ref * 1000:8.1f} ms | vetorizado: {t_vet * 1000:7.1f} ms | {t_ref / t_vet:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""Teste de ponta a ponta do robô (core.robo) contra o DataJuri local: combinação, novas tentativas, falhas e idempotência.
+
+Carrega uma base sintética (core.dados_sinteticos) no DataJuri local (core.datajuri_local), com uma taxa
+de falhas temporárias (503) e latência por requisição, e grava no diário (core.journal) o que o app
+gravaria ao gerar os relatórios várias vezes: edições repetidas dos mesmos pedidos, inclusões, exclusões
+e algumas alterações de pedidos inexistentes (404, que vão para a fila de falhas). O robô é interrompido
+uma vez depois de aplicar um lote e antes de confirmar o offset, e reprocessa o lote ao voltar.
+
+No fim, compara a base da API com o resultado esperado (os registros aplicados um a um, em ordem):
+nenhuma alteração perdida, nenhuma inclusão em dobro, e a fila de falhas com exatamente as alterações
+inválidas, uma vez cada (também as do lote reprocessado). Mostra as tarefas, operações e requisições
+(a economia da combinação e o custo das novas tentativas) e encerra com código 1 se algo divergir.
+
+Uso: python benchmarks/bench_robo.py [--casos 200] [--registros 600] [--taxa-falhas 0.2] [--latencia-ms 2] [--concorrencia 4]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import _comum  # noqa: F401  (põe a raiz do repositório no sys.path)
+
+from core.dados_sinteticos import generate_cases  # noqa: E402
+from core.datajuri import DataJuriClient  # noqa: E402
+from core.datajuri_local import LocalDataJuri  # noqa: E402
+from core.journal import UpdateJournal  # noqa: E402
+from core.robo import CAMPO_PASTA, MODULO_PEDIDOS, RoboAtualizacoes  # noqa: E402
+
+SITUACOES = ["Procedência", "Improcedência", "Parcialmente procedente", "Acordo", "Aguardando julgamento"]
+ID_INEXISTENTE = 10 ** 9
+
+
+class Interrompido(Exception):
+    pass
+
+
+class JournalInterrompido(UpdateJournal):
+    """Diário cujo commit() falha uma vez, depois de `apos` lotes: o robô "cai" entre aplicar e confirmar."""
+
+    def __init__(self, folder, apos: int):
+        super().__init__(folder)
+        self.apos = apos
+
+    def commit(self, consumer, seq):
+        self.apos -= 1
+        if self.apos == 0:
+            raise Interrompido(f"queda simulada antes de confirmar o seq {seq}")
+        super().commit(consumer, seq)
+
+
+def gravar_registros(journal: UpdateJournal, pedidos: dict, registros: int, pastas: int, seed: int) -> tuple[dict, list]:
+    """Grava `registros` gerações no diário e aplica cada uma ao estado esperado.
+
+    `pedidos`: pasta -> {id: pedido}. Retorna (inclusões esperadas por pasta, ids inexistentes alterados).
+    """
+    rng = random.Random(seed)
+    escolhidas = rng.sample(sorted(pedidos), min(pastas, len(pedidos)))  # poucas pastas: as edições se repetem
+    incluidos, invalidos = {}, []
+    for r in range(registros):
+        pasta = rng.choice(escolhidas)
+        atuais = pedidos[pasta]
+        tasks, anterior = [], {}
+        for pedido_id in rng.sample(sorted(atuais), min(len(atuais), rng.randint(1, 3))):
+            nova = rng.choice(SITUACOES)
+            if nova != atuais[pedido_id]["situacao"]:
+                anterior[pedido_id] = {"situacao": atuais[pedido_id]["situacao"]}
+                tasks.append({"id": pedido_id, "situacao": nova})
+                atuais[pedido_id]["situacao"] = nova
+        if rng.random() < 0.1:
+            nome = f"Pedido incluído {r}"
+            tasks.append({"acao": "incluir", "nomeObjeto": nome, "situacao": rng.choice(SITUACOES)})
+            incluidos.setdefault(pasta, []).append((nome, tasks[-1]["situacao"]))
+        if rng.random() < 0.05 and len(atuais) > 1:
+            pedido_id = rng.choice(sorted(atuais))
+            tasks.append({"id": pedido_id, "acao": "excluir"})
+            del atuais[pedido_id]
+        if rng.random() < 0.03:
+            invalidos.append(ID_INEXISTENTE + r)
+            tasks.append({"id": invalidos[-1], "situacao": "Acordo"})
+        if tasks:
+            journal.append(pasta, tasks, anterior)
+    return incluidos, invalidos
+
+
+def ler_falhas(dead_letter: str) -> list[dict]:
+    if not os.path.exists(dead_letter):
+        return []
+    with open(dead_letter, encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def conferir(api: LocalDataJuri, pedidos: dict, incluidos: dict, invalidos: list, falhas: list) -> list[str]:
+    """Diferenças entre a base da API e o estado esperado.
+
+    Uma operação que esgotou as tentativas (503 na fila de falhas) pode ter sido aplicada depois, no lote
+    reprocessado: os pedidos e as inclusões dela ficam fora da comparação.
+    """
+    erros = []
+    esgotadas = list({f["idempotency_key"]: f for f in falhas if f["status_code"] != 404}.values())
+    ignorados = {f["id"] for f in esgotadas if f["id"] is not None}
+    incluidos = {pasta: list(lista) for pasta, lista in incluidos.items()}
+    incertas = {}  # pasta -> inclusões que podem ou não estar na API
+    for f in esgotadas:
+        chave = (f["campos"].get("nomeObjeto"), f["campos"].get("situacao"))
+        if f["acao"] == "incluir" and chave in incluidos.get(f["pasta"], []):
+            incluidos[f["pasta"]].remove(chave)
+            incertas.setdefault(f["pasta"], []).append(chave)
+    tabela = api.entidades[MODULO_PEDIDOS]
+    por_pasta = {}
+    for pedido in tabela.values():
+        por_pasta.setdefault(pedido[CAMPO_PASTA], []).append(pedido)
+    for pasta, esperados in pedidos.items():
+        na_api = {p["id"]: p for p in por_pasta.get(pasta, []) if p["id"] in esperados or p["id"] in ignorados}
+        if (set(na_api) ^ set(esperados)) - ignorados:
+            erros.append(f"Pasta {pasta}: pedidos {sorted((set(esperados) ^ set(na_api)) - ignorados)} divergem (exclusões).")
+        for pedido_id, esperado in esperados.items():
+            if pedido_id in na_api and pedido_id not in ignorados and na_api[pedido_id]["situacao"] != esperado["situacao"]:
+                erros.append(f"Pedido {pedido_id}: situação '{na_api[pedido_id]['situacao']}', esperada '{esperado['situacao']}'.")
+        novos = Counter((p["nomeObjeto"], p["situacao"]) for p in por_pasta.get(pasta, [])
+                        if p["nomeObjeto"].startswith("Pedido incluído"))
+        novos.subtract(incertas.get(pasta, []))
+        novos = +novos  # só as contagens positivas
+        if novos != Counter(incluidos.get(pasta, [])):
+            erros.append(f"Pasta {pasta}: inclusões {dict(novos)}, esperadas {dict(Counter(incluidos.get(pasta, [])))}.")
+    invalidas = {f["id"] for f in falhas if f["status_code"] == 404}
+    if invalidas - set(invalidos) or set(invalidos) - invalidas - ignorados:
+        erros.append(f"Fila de falhas: ids {sorted(invalidas)} com 404, esperados {sorted(invalidos)}.")
+    return erros
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--casos", type=int, default=200, help="Processos na base sintética.")
+    parser.add_argument("--registros", type=int, default=600, help="Gerações de documentos gravadas no diário.")
+    parser.add_argument("--pastas", type=int, default=40, help="Pastas editadas (menos pastas, mais edições repetidas).")
+    parser.add_argument("--taxa-falhas", type=float, default=0.2, help="Fração das requisições que respondem 503.")
+    parser.add_argument("--latencia-ms", type=float, default=2)
+    parser.add_argument("--concorrencia", type=int, default=4)
+    parser.add_argument("--lote", type=int, default=100)
+    parser.add_argument("--tentativas", type=int, default=10, help="Tentativas por operação antes da fila de falhas.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    logging.disable(logging.ERROR)  # as falhas esperadas (404, 503) não poluem a saída
+
+    processos, linhas = [], []
+    for processo, pedidos_caso in generate_cases(args.casos, args.seed):
+        processos.append(processo)
+        linhas.extend(pedidos_caso)
+    pedidos = {}
+    for pedido in linhas:
+        pedidos.setdefault(pedido[CAMPO_PASTA], {})[pedido["id"]] = {"situacao": pedido["situacao"]}
+
+    with tempfile.TemporaryDirectory() as pasta, \
+            LocalDataJuri({"Processo": processos, MODULO_PEDIDOS: linhas}, taxa_falhas=args.taxa_falhas,
+                          latencia=args.latencia_ms / 1000, seed=args.seed) as api:
+        journal = JournalInterrompido(pasta, apos=2)
+        incluidos, invalidos = gravar_registros(journal, pedidos, args.registros, args.pastas, args.seed)
+        journal.commit("robo", 0)  # o robô é o consumidor do diário desde o início
+        tarefas = sum(len(r["tasks"]) for r in journal.read())
+        client = DataJuriClient(api.url, access_token=api.token)
+        resumos = []
+
+        def robo(diario):
+            return RoboAtualizacoes(diario, client, args.concorrencia, max_tentativas=args.tentativas, espera_inicial=0.005,
+                                    espera_maxima=0.05)
+
+        inicio = time.perf_counter()
+        try:
+            robo(journal).executar(args.lote, on_lote=resumos.append)
+            sys.exit("ERRO: a queda simulada não aconteceu (aumente --registros ou reduza --lote).")
+        except Interrompido as e:
+            interrupcao = str(e)
+        reprocessados = args.lote  # o lote não confirmado volta inteiro
+        robo(UpdateJournal(pasta)).executar(args.lote, on_lote=resumos.append)
+        segundos = time.perf_counter() - inicio
+        escritas = sum(api.requisicoes[m] for m in ("PUT", "POST", "DELETE"))
+        falhas = ler_falhas(os.path.join(pasta, "dead_letter.jsonl"))
+        erros = conferir(api, pedidos, incluidos, invalidos, falhas)
+        pendentes = len(UpdateJournal(pasta).pending("robo"))
+        injetadas = api.requisicoes["503"]
+
+    operacoes = sum(r["operacoes"] for r in resumos)
+    repetidas = len(falhas) - len({f["idempotency_key"] for f in falhas})
+    esgotadas = len({f["idempotency_key"] for f in falhas if f["status_code"] != 404})
+    print(f"Robô contra o DataJuri local: {args.registros} gerações em {args.pastas} pastas, {args.taxa_falhas:.0%} "
+          f"de falhas temporárias, {args.latencia_ms:.0f} ms por requisição, concorrência {args.concorrencia}")
+    print(f"  tarefas no diário: {tarefas} | operações após a combinação, nos lotes confirmados: {operacoes}")
+    print(f"  requisições de escrita: {escritas} (respondidas com 503: {injetadas}) | "
+          f"aplicadas: {sum(r['aplicadas'] for r in resumos)} | {segundos:.2f} s")
+    print(f"  fila de falhas: {len(invalidos)} pedido(s) inexistente(s) (404), {esgotadas} operação(ões) com as "
+          f"{args.tentativas} tentativas esgotadas, {repetidas} repetida(s)")
+    print(f"  {interrupcao}; os {reprocessados} registros do lote foram reprocessados com as mesmas chaves de "
+          f"idempotência | pendentes no fim: {pendentes}")
+    if pendentes:
+        erros.append(f"{pendentes} registro(s) ainda pendentes.")
+    if repetidas:
+        erros.append(f"{repetidas} entrada(s) repetida(s) na fila de falhas.")
+    for erro in erros[:20]:
+        print(f"  {erro}")
+    if erros:
+        sys.exit(f"ERRO: {len(erros)} divergência(s) entre a API e o resultado esperado.")
+    print("  OK: a base da API confere com os registros aplicados em ordem (sem perdas nem inclusões em dobro).")
+
+
+if __name__ == "__main__":
+    main()
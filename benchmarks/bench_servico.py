@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Teste de carga do serviço HTTP da análise (core.servico): vazão e latência por rota.
+
+Inicia o serviço em um processo separado (python -m core.servico), apontado para o DataJuri local
+(core.datajuri_local), e dispara requisições de N conexões keep-alive simultâneas (cliente asyncio) em
+cada rota. Mostra requisições por segundo e as latências p50/p95/p99, e encerra com código 1 se alguma
+resposta não for 200.
+
+Uso: python benchmarks/bench_servico.py [--conexoes 16] [--requisicoes 400] [--processos 0] [--latencia-ms 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+from _comum import RAIZ
+
+from core.datajuri_local import LocalDataJuri, dados_demo  # noqa: E402
+
+CASO = {
+    "pasta": "123", "data_ciencia": "2025-03-10", "tipo_decisao": "Sentença (Vara do Trabalho)",
+    "resultado_sentenca": "Desfavorável", "ed_status": "Não cabe ED", "recurso_selecionado": "Recurso Ordinário (RO)",
+    "valor_condenacao": 50000.0, "percentual_custas": 2.0, "advogado_responsavel": "Dra. Ana",
+}
+
+
+def corpos() -> dict:
+    """Corpo de cada rota testada."""
+    dados = dados_demo()
+    processo = dados["Processo"][0]
+    pedidos = [{k: v for k, v in p.items() if k != "processo.pasta"} for p in dados["PedidoProcesso"]]
+    editados = [dict(p) for p in pedidos]
+    editados[0]["situacao"] = "Acordo"
+    return {
+        "/v1/analyze (busca no DataJuri)": ("/v1/analyze", CASO),
+        "/v1/analyze (dados enviados)": ("/v1/analyze", {**CASO, "processo": processo, "pedidos": pedidos, "pedidos_editados": editados}),
+        "/v1/compute-deadlines": ("/v1/compute-deadlines", CASO),
+        "/v1/compute-custas": ("/v1/compute-custas", CASO),
+        "/v1/compute-custas (100 casos)": ("/v1/compute-custas", {"casos": [CASO] * 100}),
+        "/v1/render-email": ("/v1/render-email", {**CASO, "processo": processo, "pedidos": pedidos}),
+        "/v1/diff-updates": ("/v1/diff-updates", {"original": pedidos, "editado": editados}),
+    }
+
+
+async def conexao(host, port, caminho, corpo: bytes, quantidade: int, latencias: list, status: list):
+    reader, writer = await asyncio.open_connection(host, port)
+    requisicao = (f"POST {caminho} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(corpo)}\r\n\r\n").encode("latin-1") + corpo
+    try:
+        for _ in range(quantidade):
+            inicio = time.perf_counter()
+            writer.write(requisicao)
+            await writer.drain()
+            linha = await reader.readline()
+            tamanho = 0
+            while (cabecalho := await reader.readline()) not in (b"\r\n", b""):
+                nome, _, valor = cabecalho.decode("latin-1").partition(":")
+                if nome.lower() == "content-length":
+                    tamanho = int(valor)
+            await reader.readexactly(tamanho)
+            latencias.append(time.perf_counter() - inicio)
+            status.append(int(linha.split()[1]))
+    finally:
+        writer.close()
+
+
+async def carga(host, port, caminho, corpo, conexoes, requisicoes) -> dict:
+    latencias, status = [], []
+    dados = json.dumps(corpo).encode("utf-8")
+    por_conexao = [requisicoes // conexoes + (i < requisicoes % conexoes) for i in range(conexoes)]
+    inicio = time.perf_counter()
+    await asyncio.gather(*(conexao(host, port, caminho, dados, n, latencias, status) for n in por_conexao if n))
+    total = time.perf_counter() - inicio
+    quantis = statistics.quantiles(latencias, n=100)
+    return {"rps": len(latencias) / total, "p50": quantis[49] * 1000, "p95": quantis[94] * 1000, "p99": quantis[98] * 1000,
+            "erros": sum(s != 200 for s in status)}
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conexoes", type=int, default=16)
+    parser.add_argument("--requisicoes", type=int, default=400, help="Requisições por rota.")
+    parser.add_argument("--processos", type=int, default=0, help="Pool de processos do serviço (0: threads).")
+    parser.add_argument("--latencia-ms", type=float, default=20, help="Latência de cada requisição ao DataJuri local.")
+    args = parser.parse_args(argv)
+
+    host, port = "127.0.0.1", porta_livre()
+    with LocalDataJuri(latencia=args.latencia_ms / 1000) as api:
+        env = dict(os.environ, PYTHONPATH=RAIZ, DATAJURI_CLIENT_ID="bench", DATAJURI_SECRET_ID="bench",
+                   DATAJURI_USERNAME="bench", DATAJURI_PASSWORD="bench", DATAJURI_BASE_URL=api.url)
+        env.pop("DATAJURI_STORE", None)
+        servico = subprocess.Popen([sys.executable, "-m", "core.servico", "--porta", str(port), "--processos", str(args.processos)],
+                                   cwd=RAIZ, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            for _ in range(100):
+                try:
+                    requests.get(f"http://{host}:{port}/v1/health", timeout=1)
+                    break
+                except requests.ConnectionError:
+                    time.sleep(0.1)
+            else:
+                sys.exit("ERRO: o serviço não iniciou.")
+            resultados = {}
+            for nome, (caminho, corpo) in corpos().items():
+                asyncio.run(carga(host, port, caminho, corpo, args.conexoes, args.conexoes))  # aquecimento
+                resultados[nome] = asyncio.run(carga(host, port, caminho, corpo, args.conexoes, args.requisicoes))
+        finally:
+            servico.terminate()
+            servico.wait(10)
+
+    print(f"{args.conexoes} conexões, {args.requisicoes} requisições por rota, "
+          f"{'%d processos' % args.processos if args.processos else 'threads'} para os cálculos; "
+          f"latência do DataJuri local {args.latencia_ms:.0f} ms")
+    print(f"{'Rota':<36}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'erros':>7}")
+    for nome, r in resultados.items():
+        print(f"{nome:<36}{r['rps']:>9.0f}{r['p50']:>9.1f}{r['p95']:>9.1f}{r['p99']:>9.1f}{r['erros']:>7}")
+    return 1 if any(r["erros"] for r in resultados.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
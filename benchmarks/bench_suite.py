@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Suíte de micro-benchmarks do núcleo: prazos, parsers da tabela colada, relatórios, diff dos pedidos e e-mail.
+
+Cada caso chama uma função de core/ com entradas sintéticas reproduzíveis (random.Random(--seed)): datas
+de ciência, tabelas de pedidos como DataFrame (_comum.make_pedidos) e como texto colado do DataJuri (core.dados_sinteticos),
+prazos, seções do relatório e dados do processo. O tempo por chamada é medido com timeit: --repeticoes
+medições, cada uma com o número de chamadas que leva ao menos 0,2 s; guarda-se a mediana e o mínimo.
+
+`run --salvar base.json` grava o resultado como linha de base em JSON (com as versões do Python e do
+pandas e os parâmetros das entradas). `compare base.json novo.json` mostra a variação do tempo mínimo de
+cada caso (o menos afetado por ruído da máquina; a mediana oscila dezenas de por cento entre duas
+execuções do mesmo código) e termina com erro se algum ficou mais lento do que --limite por cento.
+
+Uso: python benchmarks/bench_suite.py run [--salvar base.json] [--filtro prazos] [--pedidos 50] [--seed 42]
+     python benchmarks/bench_suite.py compare base.json novo.json [--limite 25]
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from _comum import compare_update_tasks, make_editados, make_pedidos
+
+from core.dados_sinteticos import pasted_table  # noqa: E402
+from core.email_cliente import build_email_context, compose_client_email  # noqa: E402
+from core.geracao import compute_update_tasks  # noqa: E402
+from core.prazos import add_business_days, get_holidays, suggest_prazo  # noqa: E402
+from core.relatorios import format_prazos, format_report_from_df, generate_final_text  # noqa: E402
+from core.tabela_colada import format_table_report, parse_and_format_report_v2, parse_datajuri_table  # noqa: E402
+
+TIPO_DECISAO = "Acórdão (TST - Turma)"  # mostra as três instâncias nos relatórios
+
+
+def casos(seed: int, n: int) -> dict:
+    """Casos da suíte: nome -> função sem argumentos. As entradas são geradas aqui, fora da medição."""
+    rng = random.Random(seed)
+    df = make_pedidos(n, seed)
+    editado = make_editados(df, seed=seed)
+    linhas = df.to_dict("records")
+    texto_appbeta, texto_v2 = pasted_table(linhas), pasted_table(linhas, objetos_no_cabecalho=False)
+    _, linhas_appbeta, avisos_appbeta, _ = parse_datajuri_table(texto_appbeta)
+    datas = [date(2024, 1, 1) + timedelta(days=rng.randrange(3 * 365)) for _ in range(100)]
+    ciencia = date(2024, 12, 20)
+    prazos = [suggest_prazo(ciencia, "Cabe ED"), suggest_prazo(ciencia, "Não cabe ED", "Recurso Ordinário (RO)"),
+              {"descricao": "Manifestação sobre cálculos", "data_fatal": date(2025, 2, 3), "data_d": date(2025, 1, 29),
+               "obs": "Conferir com o perito."}]
+    secoes = [("Dados do processo", "Pasta: 123\nCliente: Empresa X Ltda.\nAdverso: Fulano de Tal"),
+              ("Decisão", f"{TIPO_DECISAO} - Desfavorável"), ("Pedidos", format_report_from_df(df, TIPO_DECISAO)),
+              ("Embargos de declaração", "Não cabe ED."), ("Recurso", "Recurso de Revista (RR)\nJustificativa: divergência."),
+              ("Custas e depósito", "Depósito recursal: R$ 26.266,92\nCustas: R$ 1.000,00"),
+              ("Prazos", format_prazos(prazos)), ("Observações", "")]
+    processo = {"pasta": "123", "cliente.nome": "Empresa X Ltda.", "adverso.nome": "Fulano de Tal",
+                "faseAtual.vara": "1ª Vara do Trabalho de São Paulo"}
+    for ano in range(2024, 2028):
+        get_holidays(ano)  # add_business_days é medido com o calendário em cache, como no app
+    def email():
+        contexto = build_email_context(processo, TIPO_DECISAO, df, "Dra. Ana", ed_status="Não cabe ED",
+                                       recurso_selecionado="Recurso de Revista (RR)", recurso_justificativa="Divergência.",
+                                       deposito_a_recolher=26266.92, custas_a_recolher=1000.0, prazos=prazos)
+        return compose_client_email(contexto)
+
+    return {
+        "prazos.add_business_days +5 (virada do ano)": lambda: add_business_days(ciencia, 5),
+        "prazos.add_business_days -3 (virada do ano)": lambda: add_business_days(date(2025, 1, 3), -3),
+        "prazos.add_business_days +250 (dois anos)": lambda: add_business_days(date(2024, 6, 3), 250),
+        "prazos.add_business_days +8 (100 datas)": lambda: [add_business_days(d, 8) for d in datas],
+        "prazos.get_holidays (sem cache)": lambda: get_holidays.__wrapped__(2025),
+        "prazos.get_holidays (em cache)": lambda: get_holidays(2025),
+        f"tabela_colada.parse_datajuri_table ({n} pedidos)": lambda: parse_datajuri_table(texto_appbeta),
+        f"tabela_colada.format_table_report ({n} pedidos)": lambda: format_table_report(linhas_appbeta, TIPO_DECISAO, avisos_appbeta),
+        f"tabela_colada.parse_and_format_report_v2 ({n} pedidos)": lambda: parse_and_format_report_v2(texto_v2, TIPO_DECISAO),
+        f"relatorios.format_report_from_df ({n} pedidos)": lambda: format_report_from_df(df, TIPO_DECISAO),
+        "relatorios.format_prazos (3 prazos)": lambda: format_prazos(prazos),
+        "relatorios.generate_final_text (8 seções)": lambda: generate_final_text(secoes),
+        f"geracao.compute_update_tasks ({n} pedidos, 10% alterados)": lambda: compute_update_tasks(df, editado),
+        f"DataFrame.compare ({n} pedidos, 10% alterados, referência)": lambda: compare_update_tasks(df, editado),
+        f"email_cliente.build_email_context + compose_client_email ({n} pedidos)": email,
+    }
+
+
+def medir(funcao, repeticoes: int) -> dict:
+    """Tempo por chamada (µs): mediana e mínimo de `repeticoes` medições de ao menos 0,2 s cada."""
+    timer = timeit.Timer(funcao)
+    chamadas, _ = timer.autorange()
+    tempos = [t / chamadas * 1e6 for t in timer.repeat(repeat=repeticoes, number=chamadas)]
+    return {"mediana_us": statistics.median(tempos), "min_us": min(tempos), "chamadas": chamadas}
+
+
+def _tempo(us: float) -> str:
+    return f"{us / 1000:.2f} ms" if us >= 1000 else f"{us:.2f} µs"
+
+
+def run(args):
+    selecionados = {nome: f for nome, f in casos(args.seed, args.pedidos).items() if not args.filtro or args.filtro in nome}
+    if not selecionados:
+        sys.exit(f"ERRO: nenhum caso contém '{args.filtro}'.")
+    resultado = {
+        "meta": {"quando": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                 "pandas": pd.__version__, "plataforma": platform.platform(), "seed": args.seed,
+                 "pedidos": args.pedidos, "repeticoes": args.repeticoes},
+        "casos": {},
+    }
+    largura = max(map(len, selecionados))
+    print(f"{'':<{largura}}{'mediana':>14}{'mínimo':>14}")
+    for nome, funcao in selecionados.items():
+        resultado["casos"][nome] = medida = medir(funcao, args.repeticoes)
+        print(f"{nome:<{largura}}{_tempo(medida['mediana_us']):>14}{_tempo(medida['min_us']):>14}")
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"Linha de base gravada em {args.salvar}")
+
+
+def compare(args):
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.novo, encoding="utf-8") as f:
+        novo = json.load(f)
+    for chave in ("seed", "pedidos"):
+        if base["meta"].get(chave) != novo["meta"].get(chave):
+            print(f"Atenção: entradas diferentes ({chave} {base['meta'].get(chave)} x {novo['meta'].get(chave)}).")
+    nomes = [n for n in base["casos"] if n in novo["casos"]]
+    largura = max(map(len, nomes), default=0)
+    print(f"{'mínimo por chamada':<{largura}}{'base':>14}{'novo':>14}{'variação':>10}")
+    regressoes = []
+    for nome in nomes:
+        antes, depois = base["casos"][nome]["min_us"], novo["casos"][nome]["min_us"]
+        variacao = depois / antes - 1
+        marca = ""
+        if variacao * 100 > args.limite:
+            regressoes.append(nome)
+            marca = "  REGRESSÃO"
+        print(f"{nome:<{largura}}{_tempo(antes):>14}{_tempo(depois):>14}{variacao:>+10.1%}{marca}")
+    for nome in sorted(base["casos"].keys() ^ novo["casos"].keys()):
+        print(f"Só em {'base' if nome in base['casos'] else 'novo'}: {nome}")
+    if regressoes:
+        sys.exit(f"ERRO: {len(regressoes)} caso(s) mais de {args.limite:g}% mais lento(s) que a linha de base.")
+    print(f"Nenhum caso mais de {args.limite:g}% mais lento que a linha de base.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    p_run = comandos.add_parser("run", help="Roda a suíte e, com --salvar, grava o resultado em JSON.")
+    p_run.add_argument("--salvar", help="Arquivo JSON da linha de base.")
+    p_run.add_argument("--filtro", help="Roda só os casos cujo nome contém este texto.")
+    p_run.add_argument("--pedidos", type=int, default=50, help="Pedidos nas tabelas sintéticas.")
+    p_run.add_argument("--repeticoes", type=int, default=5)
+    p_run.add_argument("--seed", type=int, default=42)
+    p_run.set_defaults(func=run)
+    p_compare = comandos.add_parser("compare", help="Compara dois resultados e falha se houver regressão.")
+    p_compare.add_argument("base")
+    p_compare.add_argument("novo")
+    p_compare.add_argument("--limite", type=float, default=25,
+                           help="Aumento máximo do tempo mínimo, em %% (abaixo disso é ruído da máquina).")
+    p_compare.set_defaults(func=compare)
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
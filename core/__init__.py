@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Núcleo compartilhado do Assistente Jurídico DataJuri (funções sem dependência do Streamlit)."""
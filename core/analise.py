@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""Análise de uma decisão sem interface: prazos, custas e depósito, relatório, e-mail e tarefas de atualização.
+
+Funções puras sobre um "caso" (os campos do formulário do app, ver CAMPOS_CASO) e os dados do processo
+e dos pedidos trazidos do DataJuri. Não fazem requisições nem gravam arquivos: são usadas pelo lote
+(core.lote) e pelo serviço HTTP (core.servico), que buscam os dados e tratam a saída.
+"""
+
+from datetime import date
+
+import pandas as pd
+
+from .custas import calcular_custas, calcular_deposito_recursal, parse_valor
+from .geracao import build_snapshot, compute_update_tasks, generate_documents, generate_email
+from .prazos import suggest_prazo
+
+# Campos de um caso e seus valores padrão (os mesmos do formulário do app).
+CAMPOS_CASO = {
+    "pasta": None,
+    "data_ciencia": None,
+    "cliente_role": "Reclamado",
+    "tipo_decisao": None,
+    "resultado_sentenca": None,
+    "obs_sentenca": "",
+    "ed_status": None,
+    "justificativa_ed": "",
+    "recurso_selecionado": None,
+    "recurso_outro_especificar": "",
+    "recurso_justificativa": "",
+    "valor_condenacao": 0.0,
+    "deposito_recolhido": 0.0,
+    "percentual_custas": 2.0,
+    "isencao_deposito": "Não se aplica",
+    "outro_motivo_deposito": "",
+    "pagamento_metade_deposito": False,
+    "isencao_custas": "Não se aplica",
+    "outro_motivo_custas": "",
+    "obs_finais": "",
+    "advogado_responsavel": "",
+}
+CAMPOS_NUMERICOS = ("valor_condenacao", "deposito_recolhido", "percentual_custas")
+
+
+def normalize_case(record: dict) -> dict:
+    """Caso completo a partir de um registro (linha do CSV, objeto JSON): valores padrão e tipos convertidos.
+
+    Campos desconhecidos são ignorados. Os valores aceitam "1.234,56" e "1234.56" (core.custas.parse_valor).
+    Levanta ValueError se o registro não for um dicionário ou se um número ou a data da ciência forem inválidos.
+    """
+    if not isinstance(record, dict):
+        raise ValueError(f"O caso deve ser um objeto com os campos do formulário, não {type(record).__name__}: {record!r}.")
+    caso = dict(CAMPOS_CASO)
+    caso.update({k: v for k, v in record.items() if k in CAMPOS_CASO and v not in ("", None)})
+    for campo in CAMPOS_NUMERICOS:
+        try:
+            caso[campo] = parse_valor(caso[campo])
+        except (TypeError, ValueError):
+            raise ValueError(f"O campo '{campo}' deve ser um número: {caso[campo]!r}.") from None
+    if isinstance(caso["pagamento_metade_deposito"], str):
+        caso["pagamento_metade_deposito"] = caso["pagamento_metade_deposito"].strip().lower() in ("1", "sim", "s", "true", "x")
+    if caso["data_ciencia"] and not isinstance(caso["data_ciencia"], date):
+        caso["data_ciencia"] = _parse_data(caso["data_ciencia"])
+    if caso["pasta"] is not None:
+        caso["pasta"] = str(caso["pasta"])
+    return caso
+
+
+def _parse_data(valor) -> date:
+    try:
+        return date.fromisoformat(str(valor))  # AAAA-MM-DD, o formato da API: sem o custo do pandas
+    except ValueError:
+        pass
+    try:
+        return pd.to_datetime(valor, dayfirst="/" in str(valor)).date()
+    except (ValueError, TypeError):
+        raise ValueError(f"Data da ciência inválida: {valor!r}.") from None
+
+
+def _recurso(caso: dict):
+    # O recurso só é considerado quando não cabem embargos de declaração (como no app).
+    return caso["recurso_selecionado"] if caso["ed_status"] == "Não cabe ED" else None
+
+
+def _pedidos_df(pedidos) -> pd.DataFrame:
+    if pedidos is None:
+        return pd.DataFrame()
+    return pedidos if isinstance(pedidos, pd.DataFrame) else pd.DataFrame(list(pedidos))
+
+
+def compute_deadlines(caso: dict) -> list[dict]:
+    """Prazos sugeridos para o caso (ED ou recurso), com as datas fatal e de controle (D-3)."""
+    prazo = suggest_prazo(caso["data_ciencia"], caso["ed_status"], caso["recurso_selecionado"], caso["recurso_outro_especificar"])
+    return [prazo] if prazo else []
+
+
+def compute_custas(caso: dict) -> dict:
+    """Depósito recursal e custas a recolher, com o teto vigente na data da ciência."""
+    recurso = _recurso(caso)
+    return {
+        "deposito_a_recolher": calcular_deposito_recursal(recurso, caso["valor_condenacao"], caso["deposito_recolhido"],
+                                                          caso["isencao_deposito"], caso["pagamento_metade_deposito"],
+                                                          caso["data_ciencia"]),
+        "custas_a_recolher": calcular_custas(caso["valor_condenacao"], caso["percentual_custas"], caso["isencao_custas"]),
+    }
+
+
+def case_snapshot(caso: dict, processo_data: dict, pedidos, pedidos_editados=None, prazos: list = None,
+                  custas: dict = None) -> dict:
+    """Snapshot da geração (core.geracao) para o caso. Sem `pedidos_editados`, os pedidos não foram alterados."""
+    pedidos_df = _pedidos_df(pedidos)
+    campos = {nome: caso[nome] for nome in ("cliente_role", "tipo_decisao", "data_ciencia", "resultado_sentenca",
+                                            "obs_sentenca", "ed_status", "justificativa_ed", "recurso_outro_especificar",
+                                            "recurso_justificativa", "isencao_deposito", "outro_motivo_deposito",
+                                            "isencao_custas", "outro_motivo_custas", "obs_finais")}
+    return build_snapshot(
+        processo_data, pedidos_df, _pedidos_df(pedidos_editados) if pedidos_editados is not None else pedidos_df,
+        compute_deadlines(caso) if prazos is None else prazos,
+        recurso_selecionado=_recurso(caso), **campos, **(custas or compute_custas(caso)),
+    )
+
+
+def render_email(caso: dict, processo_data: dict, pedidos, pedidos_editados=None) -> dict:
+    """E-mail ao cliente: {"assunto", "corpo"}."""
+    assunto, corpo = generate_email(case_snapshot(caso, processo_data, pedidos, pedidos_editados), caso["advogado_responsavel"])
+    return {"assunto": assunto, "corpo": corpo}
+
+
+def diff_updates(original, editado) -> dict:
+    """Tarefas de atualização para o robô (pedidos alterados, pelo id) e os valores anteriores."""
+    tasks, previous = compute_update_tasks(_pedidos_df(original), _pedidos_df(editado))
+    return {"tasks": tasks, "anterior": previous}
+
+
+def analyze_case(caso: dict, processo_data: dict, pedidos, pedidos_editados=None) -> dict:
+    """Análise completa: prazos, custas, relatório interno, e-mail (se houver advogado) e tarefas de atualização."""
+    prazos, custas = compute_deadlines(caso), compute_custas(caso)
+    snapshot = case_snapshot(caso, processo_data, pedidos, pedidos_editados, prazos, custas)
+    documentos = generate_documents(snapshot)
+    email = None
+    if caso["advogado_responsavel"]:
+        assunto, corpo = generate_email(snapshot, caso["advogado_responsavel"])
+        email = {"assunto": assunto, "corpo": corpo}
+    return {
+        "pasta": caso["pasta"],
+        "prazos": prazos,
+        "custas": custas,
+        "relatorio": documentos["final_text"],
+        "email": email,
+        "tasks": documentos["update_tasks"],
+        "anterior": documentos["update_previous"],
+    }
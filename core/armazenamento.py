@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""Armazenamento compartilhado entre processos: token de acesso e cache das consultas ao DataJuri.
+
+Com vários workers (ou réplicas) do Streamlit, cada um lia e gravava o mesmo token.json sem lock e
+mantinha o próprio cache. O resultado eram renovações de token simultâneas e caches frios em cada
+processo. Aqui o token e as respostas das consultas ficam em um armazenamento único:
+
+    sqlite:///caminho.db    (padrão) arquivo SQLite local, em modo WAL; serve a todos os processos da
+                            mesma máquina (ou de máquinas que montam o mesmo volume)
+    redis://host:porta/db   Redis ou compatível, para réplicas em máquinas diferentes; requer o pacote
+                            `redis` (pip install redis). core.redis_local imita o servidor em testes
+
+A renovação usa um lease (get_or_compute): só o processo que obtém o lease chama a API, e os demais
+aguardam o valor novo aparecer no armazenamento. Se esse processo morrer, o lease expira e outro
+assume. O mesmo mecanismo evita que várias sessões busquem ao mesmo tempo a mesma pasta.
+
+Os valores são gravados como JSON. Cada chave pode ter uma validade (ttl, em segundos).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_URL = "sqlite:///datajuri_compartilhado.db"
+TOKEN_VALIDADE = 50 * 60  # segundos
+ENTITY_CACHE_TTL = 120  # segundos; as gravações feitas pelo DataJuriClient invalidam o módulo antes disso
+LEASE_TTL = 60  # segundos; maior que o timeout das requisições à API
+
+
+class ArmazenamentoError(Exception):
+    """Endereço do armazenamento inválido ou backend indisponível."""
+
+
+class SharedStore:
+    """Interface dos backends. Os valores são objetos serializáveis em JSON."""
+
+    def get(self, chave: str):
+        raise NotImplementedError
+
+    def set(self, chave: str, valor, ttl: float = None):
+        raise NotImplementedError
+
+    def delete(self, chave: str):
+        raise NotImplementedError
+
+    def incr(self, chave: str) -> int:
+        """Incrementa um contador (sem validade) e devolve o novo valor."""
+        raise NotImplementedError
+
+    def acquire_lease(self, nome: str, dono: str, ttl: float) -> bool:
+        """Obtém o lease `nome` se ele estiver livre ou expirado. Atômico entre processos."""
+        raise NotImplementedError
+
+    def release_lease(self, nome: str, dono: str):
+        """Libera o lease, se ele ainda for de `dono` (não apaga o de quem o assumiu após a expiração)."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SQLiteStore(SharedStore):
+    """Backend padrão: uma tabela chave/valor/expiração em um arquivo SQLite compartilhado."""
+
+    LIMPEZA_A_CADA = 200  # gravações entre remoções das chaves expiradas
+
+    def __init__(self, caminho: str, timeout: float = 10.0):
+        self.caminho = caminho
+        self.timeout = timeout
+        self._local = threading.local()  # uma conexão por thread (e por processo, após um fork)
+        self._gravacoes = 0
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS armazenamento (chave TEXT PRIMARY KEY, valor TEXT NOT NULL, expira REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS armazenamento_expira ON armazenamento (expira)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            pasta = os.path.dirname(os.path.abspath(self.caminho))
+            os.makedirs(pasta, exist_ok=True)
+            conn = sqlite3.connect(self.caminho, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, chave):
+        row = self._conn().execute("SELECT valor, expira FROM armazenamento WHERE chave = ?", (chave,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return json.loads(row[0])
+
+    def set(self, chave, valor, ttl=None):
+        expira = time.time() + ttl if ttl else None
+        conn = self._conn()
+        conn.execute("INSERT INTO armazenamento (chave, valor, expira) VALUES (?, ?, ?) "
+                     "ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor, expira = excluded.expira",
+                     (chave, json.dumps(valor, ensure_ascii=False, default=str), expira))
+        self._gravacoes += 1
+        if self._gravacoes % self.LIMPEZA_A_CADA == 0:
+            conn.execute("DELETE FROM armazenamento WHERE expira <= ?", (time.time(),))
+
+    def delete(self, chave):
+        self._conn().execute("DELETE FROM armazenamento WHERE chave = ?", (chave,))
+
+    def incr(self, chave):
+        row = self._conn().execute("INSERT INTO armazenamento (chave, valor, expira) VALUES (?, '1', NULL) "
+                                   "ON CONFLICT (chave) DO UPDATE SET valor = CAST(valor AS INTEGER) + 1, expira = NULL "
+                                   "RETURNING valor", (chave,)).fetchone()
+        return int(row[0])
+
+    def acquire_lease(self, nome, dono, ttl):
+        agora = time.time()
+        cursor = self._conn().execute(
+            "INSERT INTO armazenamento (chave, valor, expira) VALUES (?, ?, ?) "
+            "ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor, expira = excluded.expira "
+            "WHERE armazenamento.expira IS NOT NULL AND armazenamento.expira <= ?",
+            (nome, json.dumps(dono), agora + ttl, agora))
+        return cursor.rowcount == 1
+
+    def release_lease(self, nome, dono):
+        self._conn().execute("DELETE FROM armazenamento WHERE chave = ? AND valor = ?", (nome, json.dumps(dono)))
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+
+class RedisStore(SharedStore):
+    """Backend Redis (ou compatível). As chaves recebem um prefixo, para dividir o servidor com outros usos."""
+
+    def __init__(self, url: str, prefixo: str = "datajuri:"):
+        try:
+            import redis
+        except ImportError:
+            raise ArmazenamentoError("O backend Redis requer o pacote 'redis' (pip install redis).") from None
+        self._watch_error = redis.WatchError
+        self._redis = redis.Redis.from_url(url, protocol=2)  # RESP2: aceito por qualquer servidor compatível
+        self.prefixo = prefixo
+
+    def get(self, chave):
+        valor = self._redis.get(self.prefixo + chave)
+        return None if valor is None else json.loads(valor)
+
+    def set(self, chave, valor, ttl=None):
+        self._redis.set(self.prefixo + chave, json.dumps(valor, ensure_ascii=False, default=str),
+                        px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, chave):
+        self._redis.delete(self.prefixo + chave)
+
+    def incr(self, chave):
+        return int(self._redis.incr(self.prefixo + chave))
+
+    def acquire_lease(self, nome, dono, ttl):
+        return bool(self._redis.set(self.prefixo + nome, dono, nx=True, px=int(ttl * 1000)))
+
+    def release_lease(self, nome, dono):
+        # Confere o dono e apaga na mesma transação (WATCH/MULTI): se o lease mudar no meio, nada é apagado.
+        chave = self.prefixo + nome
+        with self._redis.pipeline() as pipe:
+            try:
+                pipe.watch(chave)
+                if pipe.get(chave) == dono.encode("utf-8"):
+                    pipe.multi()
+                    pipe.delete(chave)
+                    pipe.execute()
+            except self._watch_error:
+                pass
+
+    def close(self):
+        self._redis.close()
+
+
+def open_store(url: str = None) -> SharedStore:
+    """Abre o armazenamento indicado pelo endereço (sqlite:///..., redis://... ou o caminho de um arquivo)."""
+    url = url or DEFAULT_URL
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    if "://" in url:
+        raise ArmazenamentoError(f"Endereço de armazenamento não suportado: '{url}'.")
+    return SQLiteStore(url)
+
+
+def get_or_compute(store: SharedStore, chave: str, calcular, ttl: float, invalido=None, lease_ttl: float = LEASE_TTL,
+                   intervalo: float = 0.05):
+    """Valor de `chave` no armazenamento ou, se ausente (ou igual a `invalido`), calculado por um único processo.
+
+    Quem obtém o lease chama `calcular()` e grava o resultado; os demais esperam o valor aparecer (ou o
+    lease ser liberado sem valor, quando então tentam eles mesmos). `calcular` pode devolver None para
+    indicar falha: nada é gravado e None é devolvido.
+    """
+    lease = f"lease:{chave}"
+    dono = uuid.uuid4().hex
+    while True:
+        valor = store.get(chave)
+        if valor is not None and valor != invalido:
+            return valor
+        if store.acquire_lease(lease, dono, lease_ttl):
+            try:
+                valor = store.get(chave)  # outro processo pode ter gravado entre a leitura e o lease
+                if valor is not None and valor != invalido:
+                    return valor
+                valor = calcular()
+                if valor is not None:
+                    store.set(chave, valor, ttl)
+                return valor
+            finally:
+                store.release_lease(lease, dono)
+        time.sleep(intervalo)
+
+
+def _digest(*partes) -> str:
+    return hashlib.sha256(json.dumps(partes, default=str).encode("utf-8")).hexdigest()[:32]
+
+
+def get_shared_token(store: SharedStore, base_url: str, username: str, authenticate, validade: float = TOKEN_VALIDADE,
+                     rejeitado: str = None) -> str | None:
+    """Token de acesso compartilhado por todos os processos que usam a mesma conta do DataJuri.
+
+    `authenticate()` é chamado por um único processo quando não há token válido (ou quando o token
+    guardado é o `rejeitado` pela API) e deve devolver o novo token, ou None em caso de falha.
+    """
+    chave = f"token:{_digest(base_url.rstrip('/'), username)}"
+    info = get_or_compute(store, chave, lambda: _token_info(authenticate()), validade,
+                          invalido=None if rejeitado is None else {"access_token": rejeitado})
+    return info["access_token"] if info else None
+
+
+def _token_info(access_token):
+    return {"access_token": access_token} if access_token else None
+
+
+def entity_cache_key(store: SharedStore, base_url: str, module_name: str, fields, criteria_list) -> str:
+    """Chave da consulta no cache. Inclui a geração do módulo, que invalidate_entities() incrementa."""
+    geracao = store.get(_geracao_key(base_url, module_name)) or 0
+    return f"entidades:{module_name}:{geracao}:{_digest(base_url.rstrip('/'), list(fields), list(criteria_list))}"
+
+
+def invalidate_entities(store: SharedStore, base_url: str, module_name: str):
+    """Descarta as consultas em cache do módulo (após uma gravação), em todos os processos."""
+    store.incr(_geracao_key(base_url, module_name))
+
+
+def _geracao_key(base_url, module_name):
+    return f"geracao:{_digest(base_url.rstrip('/'))}:{module_name}"
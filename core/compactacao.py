@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""Compactação das atualizações pendentes no diário do robô.
+
+Reexecuções e cliques repetidos em "Gerar Relatórios" deixam vários registros quase iguais para a
+mesma pasta. A compactação junta todos os registros ainda não processados de cada pasta em um único
+registro com o conjunto mínimo de tarefas, por pedido (`id`) e campo:
+
+- em alterações sucessivas do mesmo campo, só o valor mais recente é mantido;
+- um campo cujo valor final é igual ao valor original (guardado em "anterior") é descartado;
+- uma exclusão substitui as alterações anteriores do pedido, e alterações posteriores a ela são descartadas;
+- inclusões idênticas registradas em gerações diferentes da mesma pasta viram uma só.
+
+O registro compactado de cada pasta recebe o maior `seq` e o `ts` mais antigo dos registros que substitui
+(a idade de uma atualização pendente conta desde o primeiro registro). Registros que o robô está aplicando
+(reservados com UpdateJournal.claim) ficam fora da compactação. A troca é
+feita de forma atômica por UpdateJournal.rewrite_tail(). Cada tarefa corresponde a uma escrita na
+API, então a diferença entre o número de tarefas antes e depois é o número de escritas economizadas.
+
+Uso:
+    python -m core.compactacao --pasta atualizacoes_robo [--intervalo 300]
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+
+from .journal import UpdateJournal
+
+_AUSENTE = object()
+
+
+def _novo_estado():
+    return {"seqs": [], "ts": None, "alteracoes": {}, "originais": {}, "excluidos": {}, "inclusoes": [], "chaves_inclusao": set()}
+
+
+def compact_records(records: list[dict]) -> tuple[list[dict], dict]:
+    """Compacta os registros por pasta. Retorna (novos registros, estatísticas)."""
+    stats = {"registros_antes": len(records), "tarefas_antes": 0, "alteracoes_substituidas": 0,
+             "campos_sem_efeito": 0, "inclusoes_repetidas": 0}
+    por_pasta = {}
+    for record in records:
+        stats["tarefas_antes"] += len(record["tasks"])
+        if not record["tasks"]:
+            continue
+        estado = por_pasta.setdefault(record["pasta"], _novo_estado())
+        estado["seqs"].append(record["seq"])
+        if record.get("ts") and (estado["ts"] is None or record["ts"] < estado["ts"]):
+            estado["ts"] = record["ts"]
+        anterior = record.get("anterior") or {}
+        chaves_registro = set()
+        for posicao, task in enumerate(record["tasks"]):
+            acao = task.get("acao", "alterar")
+            if acao == "incluir":
+                campos = {k: v for k, v in task.items() if k not in ("acao", "origem")}
+                chave = json.dumps(campos, sort_keys=True, default=str, ensure_ascii=False)
+                if chave in estado["chaves_inclusao"] and chave not in chaves_registro:
+                    stats["inclusoes_repetidas"] += 1
+                    continue
+                estado["chaves_inclusao"].add(chave)
+                chaves_registro.add(chave)
+                estado["inclusoes"].append({"acao": "incluir", **campos, "origem": task.get("origem") or [record["seq"], posicao]})
+                continue
+
+            pedido_id = task["id"]
+            if pedido_id in estado["excluidos"]:
+                stats["alteracoes_substituidas"] += 1
+                continue
+            if acao == "excluir":
+                stats["alteracoes_substituidas"] += len(estado["alteracoes"].pop(pedido_id, {}))
+                estado["excluidos"][pedido_id] = True
+                continue
+
+            alteracoes = estado["alteracoes"].setdefault(pedido_id, {})
+            originais = estado["originais"].setdefault(pedido_id, {})
+            valores_anteriores = anterior.get(str(pedido_id), {})
+            for campo, valor in task.items():
+                if campo in ("id", "acao"):
+                    continue
+                if campo in alteracoes:
+                    stats["alteracoes_substituidas"] += 1
+                originais.setdefault(campo, valores_anteriores.get(campo, _AUSENTE))
+                alteracoes[campo] = valor
+
+    novos = []
+    for pasta, estado in por_pasta.items():
+        tasks, anterior = [], {}
+        for pedido_id, alteracoes in estado["alteracoes"].items():
+            originais = estado["originais"][pedido_id]
+            efetivas = {}
+            for campo, valor in alteracoes.items():
+                if originais.get(campo, _AUSENTE) is not _AUSENTE and originais[campo] == valor:
+                    stats["campos_sem_efeito"] += 1
+                else:
+                    efetivas[campo] = valor
+            if efetivas:
+                tasks.append({"id": pedido_id, **efetivas})
+                conhecidos = {c: originais[c] for c in efetivas if originais.get(c, _AUSENTE) is not _AUSENTE}
+                if conhecidos:
+                    anterior[str(pedido_id)] = conhecidos
+        tasks.extend(estado["inclusoes"])
+        tasks.extend({"id": pedido_id, "acao": "excluir"} for pedido_id in estado["excluidos"])
+        if tasks:
+            novos.append({
+                "seq": max(estado["seqs"]), "ts": estado["ts"] or datetime.now().isoformat(timespec="seconds"), "pasta": pasta,
+                "tasks": tasks, "anterior": anterior, "compactado": sorted(estado["seqs"]),
+            })
+    novos.sort(key=lambda r: r["seq"])
+
+    stats["registros_depois"] = len(novos)
+    stats["tarefas_depois"] = sum(len(r["tasks"]) for r in novos)
+    stats["escritas_economizadas"] = stats["tarefas_antes"] - stats["tarefas_depois"]
+    return novos, stats
+
+
+def compact_pending(journal: UpdateJournal) -> dict:
+    """Compacta os registros que ainda não foram processados por todos os consumidores nem estão reservados."""
+    after_seq = max(min((journal.get_offset(c) for c in journal.consumers()), default=0), journal.claimed_seq())
+    stats = {}
+
+    def transform(records):
+        novos, calculado = compact_records(records)
+        stats.update(calculado)
+        if calculado["escritas_economizadas"] == 0 and calculado["registros_depois"] == len(records):
+            return records  # nada a compactar: o diário não é reescrito
+        return novos
+
+    originais, _ = journal.rewrite_tail(after_seq, transform)
+    if not originais:
+        stats.update(compact_records([])[1])
+    stats["a_partir_do_seq"] = after_seq
+    stats["segmentos_removidos"] = journal.compact()
+    return stats
+
+
+def format_stats(stats: dict) -> str:
+    return (f"Registros pendentes: {stats['registros_antes']} -> {stats['registros_depois']} | "
+            f"tarefas: {stats['tarefas_antes']} -> {stats['tarefas_depois']} | "
+            f"escritas na API economizadas: {stats['escritas_economizadas']} "
+            f"(substituídas: {stats['alteracoes_substituidas']}, sem efeito: {stats['campos_sem_efeito']}, "
+            f"inclusões repetidas: {stats['inclusoes_repetidas']}) | segmentos removidos: {stats['segmentos_removidos']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compacta as atualizações pendentes no diário do robô.")
+    parser.add_argument("--pasta", default="atualizacoes_robo", help="Pasta do diário de atualizações.")
+    parser.add_argument("--intervalo", type=float, default=0, help="Repete a cada N segundos (0 = executa uma vez).")
+    args = parser.parse_args(argv)
+
+    journal = UpdateJournal(args.pasta)
+    try:
+        while True:
+            stats = compact_pending(journal)
+            print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {format_stats(stats)}", flush=True)
+            if args.intervalo <= 0:
+                return 0
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Cálculo do depósito recursal e das custas processuais (um caso por vez ou uma tabela de casos)."""
+
+import logging
+import threading
+from datetime import date
+
+from .tetos import get_tabela_tetos
+
+_atos_avisados = set()
+_avisos_lock = threading.Lock()
+
+
+def _avisar_sem_teto(ato: str, mensagem: str):
+    """Registra no log, uma vez por processo e por ato, que se usou um teto fora da vigência (evita um aviso a cada rerun)."""
+    with _avisos_lock:
+        if ato in _atos_avisados:
+            return
+        _atos_avisados.add(ato)
+    logging.warning(mensagem)
+
+
+def parse_valor(valor) -> float:
+    """Número de um campo de valor: aceita "1.234,56" (formato brasileiro) e "1234.56". Levanta ValueError se inválido."""
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    texto = str(valor).strip()
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".")
+    return float(texto)
+
+
+def parse_valores(valores):
+    """parse_valor() para uma Series do pandas inteira; valores inválidos viram NaN."""
+    import pandas as pd  # importado aqui para não pesar na inicialização dos apps
+    if pd.api.types.is_numeric_dtype(valores):
+        return valores
+    texto = valores.astype(str).str.strip()
+    brasileiro = texto.str.contains(",", regex=False)
+    texto = texto.where(~brasileiro, texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(texto, errors="coerce")
+
+
+def motivo_isencao(isencao, outro_motivo):
+    """Motivo exibido da isenção: o texto livre quando a opção é 'Outro motivo'."""
+    return isencao if isencao != 'Outro motivo' else outro_motivo
+
+
+def deposito_aplicavel(isencao_deposito, recurso_selecionado) -> bool:
+    """Indica se há depósito recursal a calcular (sem isenção total e com recurso a interpor)."""
+    sem_isencao = isencao_deposito == "Não se aplica" or isencao_deposito == "Entidade Beneficente"
+    return sem_isencao and bool(recurso_selecionado) and recurso_selecionado != "Não Interpor Recurso"
+
+
+def calcular_deposito_recursal(recurso_selecionado, valor_condenacao, deposito_recolhido, isencao_deposito,
+                               pagamento_metade_deposito=False, data_referencia: date = None) -> float:
+    """Depósito a recolher: min(teto, condenação) menos o já depositado, pela metade para entidade beneficente/ME-EPP.
+
+    O teto é o vigente em `data_referencia` (a data da ciência da decisão; hoje, se omitida). Sem teto vigente
+    na data, usa o da vigência mais próxima e registra um aviso no log (uma vez por ato).
+    """
+    if not deposito_aplicavel(isencao_deposito, recurso_selecionado):
+        return 0.0
+    tabela, data = get_tabela_tetos(), data_referencia or date.today()
+    if tabela.vigencia(data) is None:
+        ato = tabela.vigencia_referencia(data).ato
+        _avisar_sem_teto(ato, f"No deposit cap in force on {data}; using {ato} (further dates with it are not logged).")
+    teto_recurso = tabela.teto(recurso_selecionado, data)
+    valor_base_deposito = min(teto_recurso, valor_condenacao) if valor_condenacao > 0 else teto_recurso
+    deposito_a_recolher = valor_base_deposito - deposito_recolhido
+    if isencao_deposito == "Entidade Beneficente" or pagamento_metade_deposito:
+        deposito_a_recolher /= 2
+    return max(0, deposito_a_recolher)
+
+
+def calcular_custas(valor_condenacao, percentual_custas, isencao_custas) -> float:
+    """Custas a recolher: percentual sobre a condenação, salvo isenção."""
+    if isencao_custas != "Não se aplica":
+        return 0.0
+    return valor_condenacao * (percentual_custas / 100)
+
+
+# Colunas usadas por calcular_custas_depositos_df e seus valores padrão (os mesmos do formulário).
+COLUNAS_CALCULO = {
+    "recurso_selecionado": None,
+    "data_ciencia": None,
+    "valor_condenacao": 0.0,
+    "deposito_recolhido": 0.0,
+    "percentual_custas": 2.0,
+    "isencao_deposito": "Não se aplica",
+    "pagamento_metade_deposito": False,
+    "isencao_custas": "Não se aplica",
+}
+
+
+def calcular_custas_depositos_df(casos, tabela=None, hoje: date = None):
+    """Versão vetorizada de calcular_deposito_recursal e calcular_custas para uma tabela de casos.
+
+    `casos` é um DataFrame do pandas; colunas ausentes recebem os valores de COLUNAS_CALCULO. Retorna um
+    DataFrame com o mesmo índice e as colunas teto_deposito, deposito_a_recolher e custas_a_recolher.
+    """
+    import numpy as np
+    import pandas as pd  # importados aqui para não pesar na inicialização dos apps
+
+    tabela = tabela or get_tabela_tetos()
+    n = len(casos)
+
+    def coluna(nome):
+        if nome in casos.columns:
+            return casos[nome]
+        return pd.Series([COLUNAS_CALCULO[nome]] * n, index=casos.index, dtype=object)
+
+    recurso = coluna("recurso_selecionado").astype(object).where(lambda r: r.notna(), "").to_numpy(dtype=object)
+    isencao_deposito = coluna("isencao_deposito").astype(object).to_numpy(dtype=object)
+    valor = pd.to_numeric(coluna("valor_condenacao"), errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    recolhido = pd.to_numeric(coluna("deposito_recolhido"), errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    percentual = pd.to_numeric(coluna("percentual_custas"), errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    metade = coluna("pagamento_metade_deposito").fillna(False).astype(bool).to_numpy()
+    datas = pd.to_datetime(coluna("data_ciencia"), errors="coerce").fillna(pd.Timestamp(hoje or date.today()))
+
+    beneficente = isencao_deposito == "Entidade Beneficente"
+    aplicavel = ((isencao_deposito == "Não se aplica") | beneficente) & (recurso != "") & (recurso != "Não Interpor Recurso")
+    teto = tabela.tetos_vetorizados(recurso, datas.to_numpy(dtype="datetime64[D]"))
+    fora = aplicavel & tabela.fora_de_vigencia(datas.to_numpy(dtype="datetime64[D]"))
+    if fora.any():
+        for ato in sorted({tabela.vigencia_referencia(d).ato for d in datas[fora].dt.date.unique()}):
+            _avisar_sem_teto(ato, f"No deposit cap in force for {int(fora.sum())} case(s); using {ato} "
+                                  f"(further cases with it are not logged).")
+    base = np.where(valor > 0, np.minimum(teto, valor), teto)
+    deposito = base - recolhido
+    deposito = np.where(beneficente | metade, deposito / 2, deposito)
+    deposito = np.where(aplicavel, np.maximum(0, deposito), 0.0)
+
+    custas = np.where(coluna("isencao_custas").to_numpy(dtype=object) == "Não se aplica", valor * (percentual / 100), 0.0)
+    return pd.DataFrame({"teto_deposito": teto, "deposito_a_recolher": deposito, "custas_a_recolher": custas}, index=casos.index)
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""Base sintética do DataJuri para testes em escala: processos e pedidos com distribuições realistas.
+
+generate_cases(n, seed) produz um caso por vez, (processo, pedidos): o registro de Processo com os campos
+de PROCESSO_FIELDS (cliente.nome, adverso.nome, faseAtual.vara...) e os de PedidoProcesso, com nomeObjeto,
+situacao e resultado_* sorteados com pesos de acordo com a fase do processo. Cada caso tem o próprio
+random.Random, semeado com (seed, índice): o caso i de uma base de n casos é sempre o mesmo e pode ser
+gerado sozinho (generate_case), sem gerar os anteriores.
+
+write_dataset() grava a base em páginas JSON no formato das respostas de get_entity_data
+({"listSize", "pageSize", "rows"}), uma pasta por módulo, e a tabela de pedidos de cada caso como colada
+da tela do DataJuri (tabelas.jsonl, no formato do parser do Appbeta, core.tabela_colada). A gravação é em
+fluxo: só a página atual fica na memória, e um milhão de casos usa a mesma memória que mil.
+
+    python -m core.dados_sinteticos base/ --casos 100000 --seed 42
+    python -m core.datajuri_local --dados base/
+"""
+
+import argparse
+import bisect
+import glob
+import itertools
+import json
+import os
+import random
+import time
+from functools import lru_cache
+
+from .datajuri import PEDIDOS_FIELDS, PROCESSO_FIELDS
+
+PAGINA_REGISTROS = 1000  # pageSize padrão de get_entity_data
+PASTA_INICIAL = 100000  # pasta do primeiro caso; as seguintes são consecutivas
+MAX_PEDIDOS = 32  # ids dos pedidos do caso i: i * MAX_PEDIDOS + 1, + 2...
+
+# Objetos de pedido e a fração dos processos em que aparecem.
+OBJETOS = [
+    ("Honorários advocatícios", 0.65), ("Justiça gratuita", 0.6), ("Horas extras", 0.55), ("Reflexos", 0.4),
+    ("Danos morais", 0.35), ("FGTS e multa de 40%", 0.35), ("Intervalo intrajornada", 0.3), ("Verbas rescisórias", 0.3),
+    ("Multa do art. 477 da CLT", 0.25), ("Multa do art. 467 da CLT", 0.2), ("Adicional de insalubridade", 0.2),
+    ("Aviso prévio", 0.15), ("Diferenças salariais", 0.15), ("Férias", 0.15), ("Adicional noturno", 0.1),
+    ("Adicional de periculosidade", 0.1), ("Reconhecimento de vínculo", 0.1), ("13º salário", 0.1),
+    ("Equiparação salarial", 0.08), ("Vale-transporte", 0.05),
+]
+# Fase do processo: define até qual instância há resultado.
+FASES = [("1ª instância", 0.35), ("2ª instância", 0.35), ("TST", 0.15), ("Execução", 0.15)]
+RESULTADOS_1 = [("Procedente", 0.35), ("Improcedente", 0.38), ("Parcialmente procedente", 0.22), ("Extinto sem resolução", 0.05)]
+RESULTADOS_2 = [("Mantida", 0.55), ("Reformada", 0.22), ("Parcialmente reformada", 0.15), ("Não houve recurso", 0.08)]
+RESULTADOS_SUP = [("Mantida", 0.7), ("Reformada", 0.12), ("Aguardando julgamento", 0.18)]
+SITUACAO_POR_RESULTADO = {"Procedente": "Procedência", "Improcedente": "Improcedência",
+                          "Parcialmente procedente": "Parcialmente procedente", "Extinto sem resolução": "Extinto sem resolução"}
+
+CIDADES = [("São Paulo", 90), ("Rio de Janeiro", 80), ("Belo Horizonte", 48), ("Porto Alegre", 30), ("Curitiba", 23),
+           ("Salvador", 39), ("Recife", 23), ("Campinas", 12), ("Guarulhos", 14), ("Fortaleza", 18)]
+NOMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela", "João", "Juliana",
+         "Lucas", "Mariana", "Marcos", "Natália", "Paulo", "Rafael", "Renata", "Sérgio", "Tatiane", "Vinícius", "Yara"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+              "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa"]
+RAMOS = ["Comercial", "Indústria", "Transportes", "Serviços", "Construtora", "Logística", "Supermercados", "Têxtil",
+         "Metalúrgica", "Tecnologia", "Hospital", "Agropecuária"]
+EMPRESAS_POR_CASOS = 200  # um cliente para cada ~200 casos; poucos clientes concentram a maioria dos casos
+
+
+def _acumulados(opcoes) -> tuple[list, list]:
+    return [valor for valor, _ in opcoes], list(itertools.accumulate(peso for _, peso in opcoes))
+
+
+_SORTEIOS = {}  # id(opcoes) -> (valores, pesos acumulados)
+
+
+def _sortear(rng: random.Random, opcoes):
+    """Valor de `opcoes` [(valor, peso)] sorteado com os pesos (como rng.choices, sem refazer os acumulados)."""
+    valores, acumulados = _SORTEIOS.get(id(opcoes)) or _SORTEIOS.setdefault(id(opcoes), _acumulados(opcoes))
+    return valores[bisect.bisect(acumulados, rng.random() * acumulados[-1])]
+
+
+def _objetos(rng: random.Random) -> list[str]:
+    """Objetos dos pedidos do caso (sempre o primeiro sorteio do caso)."""
+    objetos = [nome for nome, fracao in OBJETOS if rng.random() < fracao]
+    return objetos or [OBJETOS[0][0]]
+
+
+def _pessoa(rng: random.Random) -> str:
+    return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+
+
+@lru_cache(maxsize=None)
+def _empresa(seed: int, j: int) -> str:
+    rng = random.Random(f"{seed}:empresa:{j}")
+    return f"{rng.choice(RAMOS)} {rng.choice(SOBRENOMES)} {rng.choice(['Ltda', 'S.A.', 'Eireli'])}"
+
+
+def _rng(seed: int, i: int) -> random.Random:
+    return random.Random(f"{seed}:{i}")
+
+
+def generate_case(seed: int, i: int, n: int) -> tuple[dict, list[dict]]:
+    """Caso `i` de uma base de `n` casos: (registro de Processo, registros de PedidoProcesso)."""
+    rng = _rng(seed, i)
+    objetos = _objetos(rng)
+    pasta = str(PASTA_INICIAL + i)
+    empresas = max(1, n // EMPRESAS_POR_CASOS)
+    empresa = _empresa(seed, int(empresas * rng.random() ** 3))  # ~metade dos casos com 10% dos clientes
+    reclamado = rng.random() < 0.9
+    cidade = _sortear(rng, CIDADES)
+    varas = dict(CIDADES)[cidade]
+    fase = _sortear(rng, FASES)
+    processo = {
+        "id": i + 1, "pasta": pasta,
+        "cliente.nome": empresa if reclamado else _pessoa(rng),
+        "adverso.nome": _pessoa(rng) if reclamado else empresa,
+        "posicaoCliente": "Reclamado" if reclamado else "Reclamante",
+        "assunto": "Reclamação trabalhista",
+        "status": "Ativo" if fase != "Execução" or rng.random() < 0.5 else "Arquivado",
+        "faseAtual.vara": f"{rng.randint(1, varas)}ª Vara do Trabalho de {cidade}",
+        "faseAtual.forum": f"Fórum Trabalhista de {cidade}",
+    }
+    acordo = fase == "Execução" and rng.random() < 0.3
+    pedidos = []
+    for j, objeto in enumerate(objetos):
+        res1 = "Aguardando julgamento" if fase == "1ª instância" and rng.random() < 0.6 else _sortear(rng, RESULTADOS_1)
+        res2 = _sortear(rng, RESULTADOS_2) if fase in ("2ª instância", "TST", "Execução") else "Aguardando julgamento"
+        res_sup = _sortear(rng, RESULTADOS_SUP) if fase in ("TST", "Execução") and res2 != "Não houve recurso" else "N/A"
+        if acordo:
+            situacao = "Acordo"
+        elif res1 == "Aguardando julgamento":
+            situacao = "Aguardando julgamento"
+        elif res2 in ("Reformada", "Parcialmente reformada"):
+            situacao = "Parcialmente procedente" if res2 == "Parcialmente reformada" else (
+                "Improcedência" if res1 == "Procedente" else "Procedência")
+        else:
+            situacao = SITUACAO_POR_RESULTADO[res1]
+        pedidos.append({"id": i * MAX_PEDIDOS + j + 1, "processo.pasta": pasta, "nomeObjeto": objeto, "situacao": situacao,
+                        "resultado_1_instanci": res1, "resultado_2_instanci": res2, "resultado_instancia_": res_sup})
+    return processo, pedidos
+
+
+def generate_cases(n: int, seed: int = 42, inicio: int = 0):
+    """Casos `inicio`..n-1 da base, um por vez."""
+    for i in range(inicio, n):
+        yield generate_case(seed, i, n)
+
+
+def count_pedidos(n: int, seed: int = 42) -> int:
+    """Total de pedidos da base, sem gerar os casos (só o sorteio dos objetos)."""
+    return sum(len(_objetos(_rng(seed, i))) for i in range(n))
+
+
+def pasted_table(pedidos: list[dict], objetos_no_cabecalho: bool = True) -> str:
+    """Tabela de pedidos como copiada da tela do DataJuri: colunas separadas por tabulação.
+
+    O parser do Appbeta espera "Objetos" na linha do cabeçalho; o do streamlit_app, em uma linha própria.
+    """
+    colunas = "Situação\tResultado 1ª Instância\tResultado 2ª Instância\tResultado Instância Superior"
+    linhas = ["Pedidos do processo", "Exibindo todos os registros"]
+    linhas += ["Objetos\t" + colunas] if objetos_no_cabecalho else ["Objetos", colunas]
+    for p in pedidos:
+        linhas.append("\t".join([p["nomeObjeto"], p["situacao"], p["resultado_1_instanci"], p["resultado_2_instanci"],
+                                 p["resultado_instancia_"]]))
+        linhas.append("Visualizar\tEditar")
+    return "\n".join(linhas) + "\n"
+
+
+class _Paginas:
+    """Grava os registros de um módulo em páginas de `tamanho` registros, à medida que chegam."""
+
+    def __init__(self, diretorio: str, modulo: str, campos: list[str], total: int, tamanho: int):
+        self.diretorio = os.path.join(diretorio, modulo)
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.campos, self.total, self.tamanho = campos, total, tamanho
+        self.rows, self.paginas, self.registros = [], 0, 0
+
+    def add(self, row: dict):
+        self.rows.append({c: row.get(c) for c in self.campos})
+        if len(self.rows) == self.tamanho:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        self.paginas += 1
+        self.registros += len(self.rows)
+        with open(os.path.join(self.diretorio, f"pagina_{self.paginas:05d}.json"), "w", encoding="utf-8") as f:
+            json.dump({"listSize": self.total, "pageSize": self.tamanho, "rows": self.rows}, f, ensure_ascii=False)
+        self.rows = []
+
+
+def write_dataset(diretorio: str, n: int, seed: int = 42, page_size: int = PAGINA_REGISTROS, tabelas: bool = True) -> dict:
+    """Grava a base de `n` casos em `diretorio`; retorna o resumo (também gravado em base.json)."""
+    os.makedirs(diretorio, exist_ok=True)
+    # Os pedidos levam o vínculo com o processo (processo.pasta), como nos critérios de busca do app.
+    paginas = {"Processo": _Paginas(diretorio, "Processo", ["id", *PROCESSO_FIELDS], n, page_size),
+               "PedidoProcesso": _Paginas(diretorio, "PedidoProcesso", ["processo.pasta", *PEDIDOS_FIELDS],
+                                          count_pedidos(n, seed), page_size)}
+    arquivo_tabelas = open(os.path.join(diretorio, "tabelas.jsonl"), "w", encoding="utf-8") if tabelas else None
+    try:
+        for processo, pedidos in generate_cases(n, seed):
+            paginas["Processo"].add(processo)
+            for pedido in pedidos:
+                paginas["PedidoProcesso"].add(pedido)
+            if arquivo_tabelas:
+                arquivo_tabelas.write(json.dumps({"pasta": processo["pasta"], "texto": pasted_table(pedidos)},
+                                                 ensure_ascii=False) + "\n")
+    finally:
+        if arquivo_tabelas:
+            arquivo_tabelas.close()
+    resumo = {"casos": n, "seed": seed, "pageSize": page_size, "pastas": [str(PASTA_INICIAL), str(PASTA_INICIAL + n - 1)]}
+    for modulo, p in paginas.items():
+        p.flush()
+        resumo[modulo] = {"registros": p.registros, "paginas": p.paginas}
+    with open(os.path.join(diretorio, "base.json"), "w", encoding="utf-8") as f:
+        json.dump(resumo, f, ensure_ascii=False, indent=2)
+    return resumo
+
+
+def iter_pages(diretorio: str, modulo: str):
+    """Respostas (páginas) gravadas de um módulo, em ordem."""
+    for nome in sorted(glob.glob(os.path.join(glob.escape(diretorio), modulo, "pagina_*.json"))):
+        with open(nome, encoding="utf-8") as f:
+            yield json.load(f)
+
+
+def load_dataset(diretorio: str) -> dict:
+    """Base gravada por write_dataset no formato {Modulo: [registros]} (core.datajuri_local)."""
+    modulos = [os.path.basename(os.path.dirname(p)) for p in glob.glob(os.path.join(glob.escape(diretorio), "*", "pagina_00001.json"))]
+    return {modulo: [row for pagina in iter_pages(diretorio, modulo) for row in pagina["rows"]] for modulo in sorted(modulos)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera uma base sintética do DataJuri (páginas JSON e tabelas coladas).")
+    parser.add_argument("diretorio")
+    parser.add_argument("--casos", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--page-size", type=int, default=PAGINA_REGISTROS, help="Registros por página JSON.")
+    parser.add_argument("--sem-tabelas", action="store_true", help="Não grava as tabelas coladas (tabelas.jsonl).")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    resumo = write_dataset(args.diretorio, args.casos, args.seed, args.page_size, not args.sem_tabelas)
+    print(f"{resumo['casos']} processos ({resumo['Processo']['paginas']} páginas) e {resumo['PedidoProcesso']['registros']} "
+          f"pedidos ({resumo['PedidoProcesso']['paginas']} páginas), pastas {resumo['pastas'][0]} a {resumo['pastas'][1]}, "
+          f"em {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""Cliente da API DataJuri sem dependência do Streamlit (usado por scripts e tarefas em segundo plano)."""
+
+import base64
+import logging
+import os
+import threading
+
+import requests
+
+from . import armazenamento
+
+PROCESSO_FIELDS = ["pasta", "cliente.nome", "adverso.nome", "posicaoCliente", "assunto", "status", "faseAtual.vara", "faseAtual.forum"]
+PEDIDOS_FIELDS = ["id", "nomeObjeto", "situacao", "resultado_1_instanci", "resultado_2_instanci", "resultado_instancia_"]
+
+ENV_VARS = {
+    "client_id": "DATAJURI_CLIENT_ID",
+    "client_secret": "DATAJURI_SECRET_ID",
+    "username": "DATAJURI_USERNAME",
+    "password": "DATAJURI_PASSWORD",
+    "base_url": "DATAJURI_BASE_URL",
+}
+STORE_ENV_VAR = "DATAJURI_STORE"  # opcional: armazenamento compartilhado do token e das consultas (core.armazenamento)
+
+
+class DataJuriError(Exception):
+    """Falha de autenticação ou de comunicação com a API DataJuri."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def retryable(self) -> bool:
+        """Falhas de rede, limite de requisições e erros do servidor podem ser repetidos."""
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+class DataJuriClient:
+    def __init__(self, base_url, client_id=None, client_secret=None, username=None, password=None, access_token=None, timeout=30,
+                 store=None):
+        self.base_url = base_url.rstrip('/')
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.username = username
+        self.password = password
+        self.access_token = access_token
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.store = store  # SharedStore: token e consultas compartilhados com os outros processos
+        self._auth_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """Cria o cliente a partir das variáveis DATAJURI_* (carregando um arquivo .env, se houver)."""
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+        try:
+            config = {attr: os.environ[var] for attr, var in ENV_VARS.items()}
+        except KeyError as e:
+            raise DataJuriError(f"A variável de ambiente '{e.args[0]}' não foi definida.") from None
+        if os.environ.get(STORE_ENV_VAR):
+            config["store"] = armazenamento.open_store(os.environ[STORE_ENV_VAR])
+        config.update(kwargs)
+        return cls(**config)
+
+    def authenticate(self) -> str:
+        """Obtém um novo token de acesso (grant 'password') e o guarda no cliente."""
+        logging.info("Requesting new access token.")
+        auth_base64 = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode('utf-8')).decode('utf-8')
+        headers = {'Authorization': f'Basic {auth_base64}', 'Content-Type': 'application/x-www-form-urlencoded'}
+        payload = {'grant_type': 'password', 'username': self.username, 'password': self.password}
+        try:
+            response = self.session.post(f"{self.base_url}/oauth/token", headers=headers, data=payload, timeout=self.timeout)
+            response.raise_for_status()
+            access_token = response.json().get('access_token')
+        except (requests.RequestException, ValueError) as e:
+            logging.error(f"Authentication error: {e}")
+            raise DataJuriError(f"Erro na autenticação: {e}") from e
+        if not access_token:
+            raise DataJuriError("'access_token' não encontrado na resposta da API.")
+        self.access_token = access_token
+        return access_token
+
+    def _obtain_token(self, rejected_token=None):
+        """Token do armazenamento compartilhado (renovado por um único processo) ou, sem ele, um novo token."""
+        if self.store is None or not self.username:
+            return self.authenticate()
+        self.access_token = armazenamento.get_shared_token(self.store, self.base_url, self.username, self.authenticate,
+                                                           rejeitado=rejected_token)
+        return self.access_token
+
+    @property
+    def headers(self) -> dict:
+        if not self.access_token:
+            with self._auth_lock:
+                if not self.access_token:
+                    self._obtain_token()
+        return {'Authorization': f'Bearer {self.access_token}'}
+
+    def _refresh_token(self, rejected_token):
+        """Renova o token recusado pela API (uma única vez, mesmo com várias threads ou processos)."""
+        with self._auth_lock:
+            if self.access_token == rejected_token:
+                self._obtain_token(rejected_token)
+
+    def get_entity_data(self, module_name, fields, criteria_list, page_size=1000) -> dict:
+        if self.store is None:
+            return self._fetch_entity_data(module_name, fields, criteria_list, page_size)
+        chave = armazenamento.entity_cache_key(self.store, self.base_url, module_name, [*fields, page_size], criteria_list)
+        return armazenamento.get_or_compute(self.store, chave, lambda: self._fetch_entity_data(module_name, fields, criteria_list, page_size),
+                                            armazenamento.ENTITY_CACHE_TTL)
+
+    def _fetch_entity_data(self, module_name, fields, criteria_list, page_size) -> dict:
+        params = [('campos', ",".join(fields)), ('pageSize', page_size)]
+        params.extend([('criterio', item) for item in criteria_list])
+        entity_url = f"{self.base_url}/v1/entidades/{module_name}"
+        logging.info(f"REQUEST: GET {entity_url} with PARAMS: {params}")
+        try:
+            response = self.session.get(entity_url, headers=self.headers, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            logging.error(f"API Search Error ({module_name}): {e}")
+            raise DataJuriError(f"Erro na busca ({module_name}): {e}") from e
+
+    def fetch_processo(self, pasta) -> dict | None:
+        data = self.get_entity_data("Processo", PROCESSO_FIELDS, [f"pasta | igual a | {pasta}"])
+        rows = (data or {}).get('rows') or []
+        return rows[0] if rows else None
+
+    def fetch_pedidos(self, pasta) -> list[dict]:
+        data = self.get_entity_data("PedidoProcesso", PEDIDOS_FIELDS, [f"processo.pasta | igual a | {pasta}"])
+        return (data or {}).get('rows') or []
+
+    def _write(self, method, url, payload=None, idempotency_key=None) -> dict:
+        """Requisição de escrita. Renova o token e repete uma vez se a API responder 401."""
+        for attempt in range(2):
+            headers = dict(self.headers)
+            if idempotency_key:
+                headers['Idempotency-Key'] = idempotency_key
+            token = self.access_token
+            logging.info(f"REQUEST: {method} {url} (Idempotency-Key: {idempotency_key})")
+            try:
+                response = self.session.request(method, url, headers=headers, json=payload, timeout=self.timeout)
+                if response.status_code == 401 and attempt == 0 and self.username:
+                    self._refresh_token(token)
+                    continue
+                response.raise_for_status()
+                return response.json() if response.content else {}
+            except requests.HTTPError as e:
+                logging.error(f"API Write Error ({method} {url}): {e}")
+                raise DataJuriError(f"Erro na gravação ({method} {url}): {e}", e.response.status_code) from e
+            except (requests.RequestException, ValueError) as e:
+                logging.error(f"API Write Error ({method} {url}): {e}")
+                raise DataJuriError(f"Erro na gravação ({method} {url}): {e}") from e
+
+    def _invalidate(self, module_name):
+        # Também após uma falha: a gravação pode ter sido aplicada (ex.: timeout depois de enviada).
+        if self.store is not None:
+            armazenamento.invalidate_entities(self.store, self.base_url, module_name)
+
+    def update_entity(self, module_name, entity_id, values: dict, idempotency_key=None) -> dict:
+        try:
+            return self._write("PUT", f"{self.base_url}/v1/entidades/{module_name}/{entity_id}", values, idempotency_key)
+        finally:
+            self._invalidate(module_name)
+
+    def create_entity(self, module_name, values: dict, idempotency_key=None) -> dict:
+        try:
+            return self._write("POST", f"{self.base_url}/v1/entidades/{module_name}", values, idempotency_key)
+        finally:
+            self._invalidate(module_name)
+
+    def delete_entity(self, module_name, entity_id, idempotency_key=None) -> dict:
+        try:
+            return self._write("DELETE", f"{self.base_url}/v1/entidades/{module_name}/{entity_id}", None, idempotency_key)
+        finally:
+            self._invalidate(module_name)
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""Servidor local que imita a API DataJuri, para testes de ponta a ponta do app, do lote e do robô.
+
+Implementa o subconjunto da API usado pelo projeto:
+    POST   /oauth/token                        (aceita quaisquer credenciais)
+    GET    /v1/entidades/<Modulo>?campos=&criterio=campo | igual a | valor&pageSize=
+    PUT    /v1/entidades/<Modulo>/<id>         (altera campos)
+    POST   /v1/entidades/<Modulo>              (inclui)
+    DELETE /v1/entidades/<Modulo>/<id>         (exclui)
+
+As escritas respeitam o cabeçalho Idempotency-Key: repetir uma chave devolve a resposta original sem
+aplicar a alteração de novo. Para testar as novas tentativas do robô, é possível injetar uma taxa de
+falhas (HTTP 503) e uma latência fixa por requisição.
+
+Uso:
+    python -m core.datajuri_local --porta 8765 --dados dados.json
+    python -m core.datajuri_local --dados base/        (base sintética, python -m core.dados_sinteticos base/)
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .dados_sinteticos import load_dataset
+
+
+def dados_demo() -> dict:
+    """Base mínima com um processo e três pedidos."""
+    pedidos = [
+        ("Horas extras", "Procedência"),
+        ("Danos morais", "Improcedência"),
+        ("Férias", "Parcialmente procedente"),
+    ]
+    return {
+        "Processo": [{
+            "id": 1, "pasta": "123", "cliente.nome": "ACME Ltda", "adverso.nome": "Fulano de Tal",
+            "posicaoCliente": "Reclamado", "assunto": "Reclamação trabalhista", "status": "Ativo",
+            "faseAtual.vara": "1ª Vara do Trabalho", "faseAtual.forum": "Fórum Trabalhista",
+        }],
+        "PedidoProcesso": [
+            {"id": i, "processo.pasta": "123", "nomeObjeto": nome, "situacao": situacao,
+             "resultado_1_instanci": "Procedente", "resultado_2_instanci": "Aguardando julgamento",
+             "resultado_instancia_": "N/A"}
+            for i, (nome, situacao) in enumerate(pedidos, start=1)
+        ],
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "DataJuriLocal/1.0"
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def api(self) -> "LocalDataJuri":
+        return self.server.api
+
+    def _send(self, status, body=None):
+        data = json.dumps(body if body is not None else {}, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _route(self, method):
+        body = self._body()
+        self.api.contar(method)
+        if self.api.latencia:
+            time.sleep(self.api.latencia)
+        path = urlparse(self.path).path.rstrip("/")
+        if method == "POST" and path == "/oauth/token":
+            return self._send(200, {"access_token": self.api.token, "token_type": "bearer", "expires_in": 3600})
+        if self.headers.get("Authorization") != f"Bearer {self.api.token}":
+            return self._send(401, {"error": "invalid_token"})
+        if self.api.falhar():
+            return self._send(503, {"error": "Serviço temporariamente indisponível"})
+
+        parts = path.split("/")
+        if len(parts) < 4 or parts[1:3] != ["v1", "entidades"]:
+            return self._send(404, {"error": "Recurso não encontrado"})
+        module, entity_id = parts[3], (parts[4] if len(parts) > 4 else None)
+        if method == "GET":
+            return self._send(200, self.api.buscar(module, parse_qs(urlparse(self.path).query)))
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return self._send(400, {"error": "JSON inválido"})
+        status, response = self.api.gravar(method, module, entity_id, payload, self.headers.get("Idempotency-Key"))
+        return self._send(status, response)
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+
+class LocalDataJuri:
+    """Estado da API local (entidades, chaves de idempotência, contadores) e o servidor HTTP."""
+
+    def __init__(self, dados: dict = None, host="127.0.0.1", port=0, taxa_falhas=0.0, latencia=0.0, seed=None):
+        self.entidades = {
+            module: {row["id"]: dict(row) for row in rows}
+            for module, rows in copy.deepcopy(dados if dados is not None else dados_demo()).items()
+        }
+        self.taxa_falhas = taxa_falhas
+        self.latencia = latencia
+        # Próximo id de cada módulo: sempre crescente (o id de um registro excluído não é reaproveitado).
+        self._proximo_id = {module: max(tabela, default=0) + 1 for module, tabela in self.entidades.items()}
+        self.token = "token-local"
+        self.requisicoes = Counter()
+        self._idempotencia = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.api = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalDataJuri":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="datajuri-local", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Atende as requisições na thread atual (uso pela linha de comando)."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def contar(self, method):
+        with self._lock:
+            self.requisicoes[method] += 1
+
+    def falhar(self) -> bool:
+        with self._lock:
+            falha = self.taxa_falhas > 0 and self._random.random() < self.taxa_falhas
+            if falha:
+                self.requisicoes["503"] += 1
+            return falha
+
+    def buscar(self, module, query) -> dict:
+        campos = [c for c in (query.get("campos") or [""])[0].split(",") if c]
+        page_size = int((query.get("pageSize") or ["1000"])[0])
+        filtros = []
+        for criterio in query.get("criterio", []):
+            campo, _, valor = [p.strip() for p in criterio.split("|")]
+            filtros.append((campo, valor))
+        with self._lock:
+            rows = [
+                {c: row.get(c) for c in campos} if campos else dict(row)
+                for row in self.entidades.get(module, {}).values()
+                if all(str(row.get(campo)) == valor for campo, valor in filtros)
+            ]
+        return {"listSize": len(rows), "pageSize": page_size, "rows": rows[:page_size]}
+
+    def gravar(self, method, module, entity_id, payload, idempotency_key) -> tuple[int, dict]:
+        with self._lock:
+            if idempotency_key and idempotency_key in self._idempotencia:
+                return self._idempotencia[idempotency_key]
+            tabela = self.entidades.setdefault(module, {})
+            if method == "POST" and entity_id is None:
+                novo_id = self._proximo_id.get(module, 1)
+                self._proximo_id[module] = novo_id + 1
+                tabela[novo_id] = {**payload, "id": novo_id}
+                result = (201, {"id": novo_id})
+            else:
+                try:
+                    entity_id = int(entity_id)
+                except (TypeError, ValueError):
+                    return 400, {"error": f"id inválido: {entity_id}"}
+                if entity_id not in tabela:
+                    return 404, {"error": f"{module} {entity_id} não encontrado"}
+                if method == "PUT":
+                    tabela[entity_id].update({k: v for k, v in payload.items() if k != "id"})
+                    result = (200, {"id": entity_id})
+                elif method == "DELETE":
+                    del tabela[entity_id]
+                    result = (200, {"id": entity_id})
+                else:
+                    return 405, {"error": f"Método {method} não suportado"}
+            if idempotency_key:
+                self._idempotencia[idempotency_key] = result
+            return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API DataJuri.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--dados", help="Arquivo JSON {Modulo: [registros]} ou diretório gravado por core.dados_sinteticos "
+                                        "(padrão: base de demonstração).")
+    parser.add_argument("--taxa-falhas", type=float, default=0.0, help="Fração das requisições que respondem 503.")
+    parser.add_argument("--latencia", type=float, default=0.0, help="Atraso em segundos por requisição.")
+    args = parser.parse_args(argv)
+
+    dados = None
+    if args.dados and os.path.isdir(args.dados):
+        dados = load_dataset(args.dados)
+    elif args.dados:
+        with open(args.dados, encoding="utf-8") as f:
+            dados = json.load(f)
+    api = LocalDataJuri(dados, args.host, args.porta, args.taxa_falhas, args.latencia)
+    print(f"API DataJuri local em {api.url} (Ctrl+C para encerrar)")
+    try:
+        api.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
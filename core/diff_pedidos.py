@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Comparação entre a tabela de pedidos original e a editada, gerando as tarefas para o robô.
+
+A comparação é feita pelo `id` do pedido (e não pela posição da linha), coluna a coluna e de forma
+vetorizada. Valores ausentes (None, NaN, NA) são considerados equivalentes entre si. Só as colunas
+presentes nas duas tabelas são comparadas: uma coluna que falta em uma delas não vira alteração para
+None (nem a partir de None). Linhas incluídas no editor (sem id ou com id desconhecido) e linhas
+removidas também são detectadas.
+"""
+
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class PedidosDiff:
+    updates: list = field(default_factory=list)   # [{'id': 1, 'situacao': 'Procedência'}, ...]
+    previous: dict = field(default_factory=dict)  # {1: {'situacao': 'Improcedência'}, ...} valores originais
+    added: list = field(default_factory=list)     # registros completos das linhas incluídas
+    deleted: list = field(default_factory=list)   # ids das linhas removidas
+
+    def __bool__(self):
+        return bool(self.updates or self.added or self.deleted)
+
+    def to_tasks(self) -> list[dict]:
+        """Tarefas no formato do arquivo de atualização. Alterações mantêm o formato {'id', campo: valor}."""
+        tasks = [dict(task) for task in self.updates]
+        tasks.extend({'acao': 'incluir', **row} for row in self.added)
+        tasks.extend({'id': pedido_id, 'acao': 'excluir'} for pedido_id in self.deleted)
+        return tasks
+
+
+def _to_native(value):
+    """Converte escalares numpy/pandas em tipos Python serializáveis em JSON; ausentes viram None."""
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+        if isinstance(value, float) and math.isnan(value):
+            return None
+    return value
+
+
+def _native_id(value):
+    value = _to_native(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _keyed(df: pd.DataFrame, key: str, name: str) -> pd.DataFrame:
+    keyed = df.set_index(key)
+    if keyed.index.has_duplicates:
+        duplicados = keyed.index[keyed.index.duplicated()].unique().tolist()
+        raise ValueError(f"Tabela {name} com '{key}' duplicado: {duplicados[:10]}")
+    return keyed
+
+
+def diff_pedidos(original: pd.DataFrame, edited: pd.DataFrame, key: str = 'id') -> PedidosDiff:
+    """Compara as duas tabelas pelo id e retorna as alterações, inclusões e exclusões."""
+    result = PedidosDiff()
+    original = original if original is not None else pd.DataFrame()
+    edited = edited if edited is not None else pd.DataFrame()
+    if original.empty and edited.empty:
+        return result
+    if key not in edited.columns:
+        if not edited.empty:
+            raise ValueError(f"A tabela editada não possui a coluna '{key}'.")
+        edited = pd.DataFrame(columns=list(original.columns))
+    if key not in original.columns:
+        if not original.empty:
+            raise ValueError(f"A tabela original não possui a coluna '{key}'.")
+        original = pd.DataFrame(columns=list(edited.columns))
+
+    # Linhas novas do editor chegam sem id.
+    sem_id = edited[key].isna().to_numpy(dtype=bool)
+    orig = _keyed(original[original[key].notna()], key, "original")
+    ed = _keyed(edited[~sem_id], key, "editada")
+
+    novos_ids = ~ed.index.isin(orig.index)
+    added_rows = edited[sem_id].to_dict(orient='records') + ed[novos_ids].reset_index().to_dict(orient='records')
+    result.added = [{k: _native_id(v) if k == key else _to_native(v) for k, v in row.items()} for row in added_rows]
+    result.deleted = [_native_id(i) for i in orig.index[~orig.index.isin(ed.index)]]
+
+    common = ed.index[~novos_ids]
+    if len(common) == 0:
+        return result
+    columns = [c for c in ed.columns if c in orig.columns]
+    if not columns:
+        return result
+
+    orig_common = orig.reindex(index=common, columns=columns)
+    ed_common = ed.reindex(index=common, columns=columns)
+
+    # Matriz (linhas x colunas) de células alteradas, calculada coluna a coluna.
+    changed = np.zeros((len(common), len(columns)), dtype=bool)
+    for j, col in enumerate(columns):
+        a, b = orig_common[col], ed_common[col]
+        a_na, b_na = a.isna().to_numpy(dtype=bool), b.isna().to_numpy(dtype=bool)
+        try:
+            differs = (a.to_numpy(dtype=object) != b.to_numpy(dtype=object))
+            differs = np.asarray(differs, dtype=bool)
+        except (TypeError, ValueError):
+            differs = np.array([x != y for x, y in zip(a.tolist(), b.tolist())], dtype=bool)
+        changed[:, j] = np.where(a_na | b_na, a_na != b_na, differs)
+
+    rows = np.flatnonzero(changed.any(axis=1))
+    if len(rows) == 0:
+        return result
+    ids = common.to_numpy(dtype=object)
+    ed_values = ed_common.to_numpy(dtype=object)
+    orig_values = orig_common.to_numpy(dtype=object)
+    for i in rows:
+        cols = np.flatnonzero(changed[i])
+        pedido_id = _native_id(ids[i])
+        task = {'id': pedido_id}
+        task.update((columns[j], _to_native(ed_values[i, j])) for j in cols)
+        result.updates.append(task)
+        result.previous[pedido_id] = {columns[j]: _to_native(orig_values[i, j]) for j in cols}
+    return result
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Composição do e-mail ao cliente (assunto e corpo) a partir dos modelos em `modelos/`."""
+
+import pandas as pd
+
+from .custas import motivo_isencao
+from .modelos import render
+
+MAPA_ASSUNTO = {"Sentença (Vara do Trabalho)": "SENTENÇA", "Decisão de Embargos de Declaração": "SENTENÇA ED", "Acórdão (TRT)": "ACÓRDÃO TRT"}
+
+CATEGORIAS_PADRAO = {
+    'Procedentes': 'Procedência',
+    'Parcialmente Procedentes': 'Parcialmente procedente',
+    'Improcedentes': 'Improcedência'
+}
+
+
+def resumo_pedidos_context(pedidos_df: pd.DataFrame) -> dict:
+    """Agrupa os pedidos por situação nas categorias padrão e nas demais ocorrências."""
+    pedidos_por_situacao = {}
+    if pedidos_df is not None and not pedidos_df.empty:
+        pedidos_por_situacao = pedidos_df.groupby('situacao')['nomeObjeto'].apply(list).to_dict()
+
+    categorias = [{'nome': nome_cat, 'pedidos': pedidos_por_situacao[chave_cat]}
+                  for nome_cat, chave_cat in CATEGORIAS_PADRAO.items() if pedidos_por_situacao.get(chave_cat)]
+    outras = [{'pedido': pedido, 'situacao': situacao}
+              for situacao, pedidos in pedidos_por_situacao.items() if situacao not in CATEGORIAS_PADRAO.values()
+              for pedido in pedidos]
+    return {'categorias': categorias, 'outras_ocorrencias': outras}
+
+
+def build_email_context(processo_data, tipo_decisao, pedidos_df, advogado_responsavel, *,
+                        ed_status=None, justificativa_ed="", recurso_selecionado=None, recurso_outro_especificar="",
+                        recurso_justificativa="", obs_sentenca="", isencao_deposito="Não se aplica", outro_motivo_deposito="",
+                        isencao_custas="Não se aplica", outro_motivo_custas="", deposito_a_recolher=0.0,
+                        custas_a_recolher=0.0, prazos=None) -> dict:
+    """Reúne em um dicionário simples todos os valores usados pelos modelos de e-mail."""
+    motivo_deposito = motivo_isencao(isencao_deposito, outro_motivo_deposito)
+    motivo_custas = motivo_isencao(isencao_custas, outro_motivo_custas)
+    recurso_nome = recurso_selecionado if recurso_selecionado != "Outro" else recurso_outro_especificar
+    return {
+        'tipo_decisao': tipo_decisao,
+        'tipo_decisao_assunto': MAPA_ASSUNTO.get(tipo_decisao, (tipo_decisao or '').upper()),
+        'assunto': {'adverso': processo_data.get('adverso.nome', ''), 'cliente': processo_data.get('cliente.nome', '')},
+        'processo': {
+            'pasta': processo_data.get('pasta', 'N/A'),
+            'cliente': processo_data.get('cliente.nome', 'N/A'),
+            'adverso': processo_data.get('adverso.nome', 'N/A'),
+        },
+        'local_processo': processo_data.get('faseAtual.vara') or processo_data.get('faseAtual.forum') or "Local não informado",
+        'resumo_pedidos': render('email_resumo_pedidos.txt', resumo_pedidos_context(pedidos_df)).strip(),
+        'cabe_ed': ed_status == "Cabe ED",
+        'justificativa_ed': justificativa_ed,
+        'recomenda_recurso': ed_status == "Não cabe ED" and recurso_selecionado != "Não Interpor Recurso",
+        'recurso': recurso_nome,
+        'recurso_justificativa': recurso_justificativa,
+        'obs_sentenca': obs_sentenca,
+        'deposito_isento': motivo_deposito != "Não se aplica",
+        'motivo_deposito': motivo_deposito,
+        'deposito_a_recolher': deposito_a_recolher,
+        'custas_isentas': motivo_custas != "Não se aplica",
+        'motivo_custas': motivo_custas,
+        'custas_a_recolher': custas_a_recolher,
+        # As guias de custas devem ser comprovadas até a data D- do primeiro prazo.
+        'data_d_pagamento': prazos[0]['data_d'] if prazos else None,
+        'advogado_responsavel': advogado_responsavel,
+    }
+
+
+MODELO_PADRAO = 'email_cliente.txt'
+
+
+def compose_client_email(context: dict, modelo: str = MODELO_PADRAO) -> tuple[str, str]:
+    """Retorna (assunto, corpo) do e-mail ao cliente; `modelo` é o corpo usado, da pasta `modelos/`."""
+    return render('email_assunto.txt', context), render(modelo, context)
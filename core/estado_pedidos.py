@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""Estado dos pedidos de uma pasta: base imutável compartilhada entre sessões + alterações da sessão.
+
+A tabela de pedidos trazida do DataJuri é guardada uma única vez por processo (PedidosBase) e
+compartilhada por todas as sessões que abriram a mesma pasta com o mesmo conteúdo; ela é liberada
+quando nenhuma sessão a usa mais. Cada sessão guarda apenas o que mudou (PedidosEdicao): as células
+alteradas por id do pedido e as linhas incluídas ou removidas no editor. As tabelas completas — para
+o relatório e para o diff — são montadas sob demanda por PedidosEdicao.view().
+
+A base não deve ser alterada: o editor a recebe como entrada (e guarda as edições no próprio estado
+do widget) e view() parte de uma cópia rasa, em que o pandas só copia as colunas modificadas.
+"""
+
+import copy
+import hashlib
+import json
+import math
+import threading
+import weakref
+
+import pandas as pd
+
+_registro = weakref.WeakValueDictionary()  # (pasta, digest) -> PedidosBase
+_registro_lock = threading.Lock()
+
+
+class PedidosBase:
+    """Tabela de pedidos de uma pasta como veio do DataJuri. Somente leitura: compartilhada entre sessões."""
+
+    __slots__ = ("pasta", "digest", "df", "_ids", "_posicoes", "__weakref__")
+
+    def __init__(self, pasta: str, df: pd.DataFrame, digest: str):
+        self.pasta = pasta
+        self.digest = digest
+        self.df = df
+        self._ids = df["id"].tolist() if "id" in df.columns else []  # tipos Python (não numpy)
+        self._posicoes = {pedido_id: pos for pos, pedido_id in enumerate(self._ids)}
+
+    @property
+    def ids(self) -> list:
+        return self._ids
+
+    def posicao(self, pedido_id):
+        return self._posicoes[pedido_id]
+
+    def id_na_posicao(self, pos: int):
+        return self._ids[pos]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.df.memory_usage(deep=True).sum())
+
+
+def get_base(pasta: str, rows: list[dict]) -> PedidosBase:
+    """Base dos pedidos da pasta: reaproveita a de outra sessão se o conteúdo vindo da API for o mesmo."""
+    digest = hashlib.sha256(json.dumps(rows, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    with _registro_lock:
+        base = _registro.get((pasta, digest))
+        if base is None:
+            base = PedidosBase(pasta, pd.DataFrame(rows), digest)
+            _registro[(pasta, digest)] = base
+        return base
+
+
+def registro_stats() -> dict:
+    """Bases em memória no processo e seu tamanho total."""
+    with _registro_lock:
+        bases = list(_registro.values())
+    return {"bases": len(bases), "bytes": sum(base.nbytes for base in bases)}
+
+
+def _iguais(a, b) -> bool:
+    ausente_a = a is None or (isinstance(a, float) and math.isnan(a)) or a is pd.NA or a is pd.NaT
+    ausente_b = b is None or (isinstance(b, float) and math.isnan(b)) or b is pd.NA or b is pd.NaT
+    if ausente_a or ausente_b:
+        return ausente_a and ausente_b
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+class PedidosEdicao:
+    """Alterações de uma sessão sobre a base: células alteradas por id, linhas incluídas e ids removidos."""
+
+    def __init__(self, base: PedidosBase):
+        self.base = base
+        self.alterados = {}  # id -> {coluna: valor}
+        self.incluidos = []  # registros das linhas incluídas no editor
+        self.excluidos = []  # ids das linhas removidas no editor
+        self._retomada = None  # alterações anteriores à retomada da pasta, às quais as do editor se somam
+        self._entrada = None  # tabela que o editor recebe depois da retomada (None: a base)
+        self._retomadas = 0
+
+    @property
+    def tem_alteracoes(self) -> bool:
+        return bool(self.alterados or self.incluidos or self.excluidos)
+
+    @property
+    def editor_key(self) -> str:
+        # Uma chave por base: ao buscar outra pasta (ou a mesma com outro conteúdo), o editor começa limpo.
+        # Cada retomada usa uma chave nova, já que a entrada do editor muda.
+        chave = f"data_editor_pedidos_{self.base.digest[:16]}"
+        return f"{chave}_{self._retomadas}" if self._retomadas else chave
+
+    @property
+    def entrada(self) -> pd.DataFrame:
+        """Tabela que o editor recebe: a base ou, depois de uma retomada, a tabela já com as alterações."""
+        return self.base.df if self._entrada is None else self._entrada
+
+    def retomar(self):
+        """Prepara a volta da pasta à tela (casos recentes, ver core/recentes.py).
+
+        O Streamlit descarta o estado do editor quando ele sai da tela e não permite restaurá-lo. Por isso o
+        editor passa a receber a tabela já alterada (view()), e aplicar_editor soma as novas edições às anteriores.
+        """
+        self._retomadas += 1
+        self._retomada = self.congelar() if self.tem_alteracoes else None
+        self._entrada = self.view() if self.tem_alteracoes else None
+
+    def aplicar_editor(self, estado: dict):
+        """Atualiza as alterações a partir do estado do st.data_editor que recebeu `entrada`.
+
+        O estado ({"edited_rows": {posição: {coluna: valor}}, "added_rows": [...], "deleted_rows": [...]})
+        acumula todas as edições feitas no widget, então as alterações são recalculadas por inteiro a partir
+        das anteriores à retomada (nenhuma, se a pasta não foi retomada). Valores editados de volta ao
+        original da base são descartados.
+        """
+        estado = estado or {}
+        df = self.base.df
+        anterior = self._retomada
+        alterados = copy.deepcopy(anterior.alterados) if anterior else {}
+        incluidos = copy.deepcopy(anterior.incluidos) if anterior else []
+        excluidos = list(anterior.excluidos) if anterior else []
+        # Posições na entrada: as linhas da base que não foram removidas, na ordem, e depois as incluídas (ver view()).
+        ids = [i for i in self.base.ids if i not in excluidos] if excluidos else self.base.ids
+        for pos, campos in (estado.get("edited_rows") or {}).items():
+            pos = int(pos)
+            if pos >= len(ids):
+                incluidos[pos - len(ids)].update(campos)
+                continue
+            pedido_id = ids[pos]
+            pos_base = self.base.posicao(pedido_id)
+            mudancas = alterados.setdefault(pedido_id, {})
+            for col, valor in campos.items():
+                if _iguais(df[col].iat[pos_base], valor):
+                    mudancas.pop(col, None)
+                else:
+                    mudancas[col] = valor
+            if not mudancas:
+                del alterados[pedido_id]
+        removidos = sorted((int(pos) for pos in estado.get("deleted_rows") or []), reverse=True)
+        for pos in removidos:
+            if pos >= len(ids):
+                del incluidos[pos - len(ids)]
+            else:
+                excluidos.append(ids[pos])
+        incluidos.extend(dict(row) for row in estado.get("added_rows") or [])
+        self.alterados, self.incluidos, self.excluidos = alterados, incluidos, excluidos
+
+    def congelar(self) -> "PedidosEdicao":
+        """Cópia das alterações neste momento (a base continua compartilhada)."""
+        congelada = PedidosEdicao(self.base)
+        congelada.alterados = copy.deepcopy(self.alterados)
+        congelada.incluidos = copy.deepcopy(self.incluidos)
+        congelada.excluidos = list(self.excluidos)
+        return congelada
+
+    def view(self) -> pd.DataFrame:
+        """Tabela editada completa, montada sob demanda a partir da base e das alterações."""
+        # Cópia rasa: as colunas alteradas são copiadas antes da escrita (sem o copy-on-write do pandas 3,
+        # escrever direto na cópia rasa alteraria a base compartilhada).
+        df, copiadas = self.base.df.copy(deep=False), set()
+        for pedido_id, campos in self.alterados.items():
+            pos = self.base.posicao(pedido_id)
+            for col, valor in campos.items():
+                if col not in copiadas:
+                    df[col] = df[col].copy()
+                    copiadas.add(col)
+                try:
+                    df.iat[pos, df.columns.get_loc(col)] = valor
+                except (TypeError, ValueError):  # valor incompatível com o tipo da coluna (ex.: texto em coluna numérica)
+                    df[col] = df[col].astype(object)
+                    df.iat[pos, df.columns.get_loc(col)] = valor
+        if self.excluidos:
+            df = df[~df["id"].isin(self.excluidos)]
+        if self.incluidos:
+            df = pd.concat([df, pd.DataFrame(self.incluidos)], ignore_index=True)
+        return df
+
+    @property
+    def nbytes(self) -> int:
+        """Memória aproximada das alterações da sessão (sem contar a base compartilhada).
+
+        Depois de uma retomada, inclui a tabela que o editor recebe (que divide com a base as colunas não alteradas).
+        """
+        total = len(json.dumps([self.alterados, self.incluidos, self.excluidos], default=str).encode("utf-8"))
+        if self._entrada is not None:
+            total += int(self._entrada.memory_usage(deep=True).sum())
+        return total
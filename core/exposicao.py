@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Exposição da carteira: depósito recursal e custas a desembolsar nos casos em aberto.
+
+Entrada: arquivo CSV ou JSON com uma linha por caso (ver COLUNAS_ENTRADA; as colunas de cálculo e
+seus valores padrão são os de core.custas.COLUNAS_CALCULO). O cálculo é vetorizado sobre a tabela
+inteira (calcular_custas_depositos_df) e o mês do desembolso é o do prazo fatal do recurso
+(8 dias úteis após a ciência, 15 para o Recurso Extraordinário).
+
+Uso:
+    python -m core.exposicao casos.csv --saida exposicao.csv
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from .custas import COLUNAS_CALCULO, calcular_custas_depositos_df, parse_valores
+from .prazos import add_business_days_array
+
+COLUNAS_ENTRADA = {"pasta": None, "cliente": "Não informado", **COLUNAS_CALCULO}
+ALIASES = {"cliente.nome": "cliente", "recurso": "recurso_selecionado"}
+COLUNAS_NUMERICAS = ("valor_condenacao", "deposito_recolhido", "percentual_custas")
+SEM_DATA = "sem data"
+
+
+def read_cases(path: str) -> pd.DataFrame:
+    """Lê o arquivo de casos e normaliza nomes, tipos e valores padrão das colunas."""
+    if path.lower().endswith(".json"):
+        casos = pd.read_json(path, orient="records", dtype=False)
+    else:
+        casos = pd.read_csv(path, dtype=str, keep_default_na=False)
+    casos = casos.rename(columns={k: v for k, v in ALIASES.items() if k in casos.columns and v not in casos.columns})
+    for coluna, padrao in COLUNAS_ENTRADA.items():
+        if coluna not in casos.columns:
+            casos[coluna] = padrao
+        elif padrao is not None:
+            casos[coluna] = casos[coluna].replace("", np.nan).fillna(padrao)
+    for coluna in COLUNAS_NUMERICAS:
+        casos[coluna] = parse_valores(casos[coluna]).fillna(0.0)  # aceita "1.234,56" e "1234.56"
+    if casos["pagamento_metade_deposito"].dtype != bool:
+        casos["pagamento_metade_deposito"] = casos["pagamento_metade_deposito"].astype(str).str.strip().str.lower().isin(["1", "sim", "s", "true", "x"])
+    datas = casos["data_ciencia"].replace("", np.nan)
+    casos["data_ciencia"] = pd.to_datetime(datas, errors="coerce", dayfirst=bool(datas.astype(str).str.contains("/").any()))
+    return casos
+
+
+def calcular_exposicao(casos: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta aos casos os valores a recolher, o total e o mês do desembolso (prazo fatal do recurso)."""
+    resultado = casos.join(calcular_custas_depositos_df(casos))
+    resultado["total_a_recolher"] = resultado["deposito_a_recolher"] + resultado["custas_a_recolher"]
+
+    datas = pd.to_datetime(resultado["data_ciencia"], errors="coerce")
+    com_data = datas.notna().to_numpy()
+    recurso = resultado["recurso_selecionado"].astype(object).fillna("").astype(str)
+    dias = np.where(recurso.str.contains("Extraordinário", regex=False).to_numpy(), 15, 8)
+    mes = np.full(len(resultado), SEM_DATA, dtype=object)
+    if com_data.any():
+        prazo = add_business_days_array(datas[com_data].to_numpy(dtype="datetime64[D]"), dias[com_data])
+        mes[com_data] = prazo.astype("datetime64[M]").astype(str)
+    resultado["mes_desembolso"] = mes
+    return resultado
+
+
+def aggregate_exposicao(resultado: pd.DataFrame) -> pd.DataFrame:
+    """Totais por cliente e mês do desembolso."""
+    return (resultado.groupby(["cliente", "mes_desembolso"], sort=True)
+            .agg(casos=("total_a_recolher", "size"), deposito=("deposito_a_recolher", "sum"),
+                 custas=("custas_a_recolher", "sum"), total=("total_a_recolher", "sum"))
+            .reset_index())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calcula o depósito recursal e as custas a desembolsar na carteira de casos.")
+    parser.add_argument("entrada", help="Arquivo CSV ou JSON com os casos em aberto.")
+    parser.add_argument("--saida", default="exposicao.csv", help="CSV com os totais por cliente e mês.")
+    parser.add_argument("--detalhe", help="CSV opcional com o cálculo caso a caso.")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    try:
+        casos = read_cases(args.entrada)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Erro: {e}")
+    resultado = calcular_exposicao(casos)
+    agregado = aggregate_exposicao(resultado)
+    total = time.perf_counter() - inicio
+
+    agregado.to_csv(args.saida, index=False, float_format="%.2f")
+    if args.detalhe:
+        resultado.to_csv(args.detalhe, index=False, float_format="%.2f")
+
+    por_mes = resultado.groupby("mes_desembolso")[["deposito_a_recolher", "custas_a_recolher", "total_a_recolher"]].sum()
+    print(por_mes.to_string(float_format=lambda v: f"R$ {v:,.2f}"))
+    print("-" * 60)
+    print(f"Casos: {len(resultado)} | clientes: {resultado['cliente'].nunique()} | "
+          f"total a recolher: R$ {resultado['total_a_recolher'].sum():,.2f}")
+    print(f"Tempo total: {total:.2f} s | totais por cliente e mês gravados em '{args.saida}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""Fila de trabalho do dia: as pastas das publicações, buscadas antes de o analista chegar a elas.
+
+A lista vem de um arquivo (read_worklist) ou de uma consulta ao DataJuri (worklist_from_datajuri). Cada
+item é um caso da análise (core.analise.normalize_case): além da pasta, pode trazer a data da ciência e
+outros campos do formulário, que são preenchidos ao abrir o caso (open_case).
+
+FilaTrabalho mantém em busca, em segundo plano, os `antecipar` casos seguintes ao atual: o processo, os
+pedidos (já na tabela compartilhada, core.estado_pedidos.get_base) e os prazos de ED e de recurso
+sugeridos a partir da data da ciência (prepare_case). "Próximo caso" só aplica o resultado. Como na
+busca antecipada da pasta digitada (core.prefetch), as buscas não acessam o st.session_state, e um
+resultado com mais de PREFETCH_VALIDADE segundos é descartado (o caso é buscado de novo ao abrir).
+
+Cada caso deixado é registrado em um arquivo JSONL por dia (register_case), com o analista, o tempo no
+caso e a espera pela busca; throughput_report resume a produtividade da equipe:
+
+    python -m core.fila produtividade/ --dia 2025-03-10
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import re
+import statistics
+import threading
+import time
+from datetime import date, datetime
+
+import pandas as pd
+
+from .analise import CAMPOS_CASO, normalize_case
+from .logs import copy_log_context
+from .prazos import D_MENOS_PADRAO, suggest_prazo
+from .prefetch import PREFETCH_VALIDADE, fetch_case
+from .recentes import WIDGETS_FORMULARIO
+
+FILA_ANTECIPAR = 3  # casos buscados à frente do atual
+
+
+def _itens(records) -> list[dict]:
+    """Itens da fila: o caso normalizado e os campos informados na lista (os outros ficam com o padrão)."""
+    itens, vistas = [], set()
+    for i, record in enumerate(records, start=1):
+        try:
+            caso = normalize_case(record)
+        except ValueError as e:
+            raise ValueError(f"Linha {i}: {e}") from None
+        if not caso["pasta"]:
+            raise ValueError(f"Linha {i}: o campo 'pasta' é obrigatório.")
+        caso["pasta"] = caso["pasta"].strip()
+        if caso["pasta"] in vistas:  # a mesma pasta em duas publicações do dia: um caso só
+            continue
+        vistas.add(caso["pasta"])
+        informados = tuple(k for k, v in record.items() if k in CAMPOS_CASO and k != "pasta" and v not in ("", None))
+        itens.append({"pasta": caso["pasta"], "caso": caso, "informados": informados})
+    return itens
+
+
+def read_worklist(conteudo, nome: str = "") -> list[dict]:
+    """Lê a lista do dia: JSON (pastas ou objetos), CSV com a coluna 'pasta' (e outras de CAMPOS_CASO) ou uma pasta por linha."""
+    texto = conteudo.decode("utf-8-sig") if isinstance(conteudo, bytes) else conteudo
+    if nome.lower().endswith(".json"):
+        records = [r if isinstance(r, dict) else {"pasta": r} for r in json.loads(texto)]
+    else:
+        linhas = [linha for linha in texto.splitlines() if linha.strip()]
+        cabecalho = [c.strip().lower() for c in re.split(r"[;,\t]", linhas[0])] if linhas else []
+        if "pasta" in cabecalho:
+            df = pd.read_csv(io.StringIO(texto), dtype=str, keep_default_na=False, sep=None, engine="python")
+            df.columns = [c.strip().lower() for c in df.columns]
+            records = df.to_dict(orient="records")
+        else:
+            records = [{"pasta": linha.strip()} for linha in linhas]
+    return _itens(records)
+
+
+def worklist_from_datajuri(client, module_name: str, criteria_list: list[str], campo_pasta: str = "pasta",
+                           campo_data: str = None) -> list[dict]:
+    """Lista do dia a partir de uma consulta ao DataJuri (ex.: as publicações do dia), com a data da ciência opcional."""
+    campos = [campo_pasta] + ([campo_data] if campo_data else [])
+    rows = (client.get_entity_data(module_name, campos, criteria_list) or {}).get("rows") or []
+    return _itens({"pasta": row.get(campo_pasta), "data_ciencia": row.get(campo_data) if campo_data else None}
+                  for row in rows if row.get(campo_pasta))
+
+
+def precompute_deadlines(caso: dict, recursos: dict = None, d_menos: int = D_MENOS_PADRAO) -> dict:
+    """Prazos sugeridos a partir da data da ciência: {"ed": ..., "recurso": ...} (None se não houver sugestão).
+
+    O recurso é o informado na lista ou, sem ele, o sugerido para o tipo de decisão (`recursos`: tipo -> recurso).
+    `d_menos`: dias úteis da data D- antes do prazo fatal, o mesmo usado pelo app na seção de prazos.
+    """
+    recurso = caso["recurso_selecionado"] or (recursos or {}).get(caso["tipo_decisao"])
+    return {
+        "ed": suggest_prazo(caso["data_ciencia"], "Cabe ED", d_menos=d_menos),
+        "recurso": suggest_prazo(caso["data_ciencia"], "Não cabe ED", recurso, caso["recurso_outro_especificar"],
+                                 d_menos=d_menos) if recurso else None,
+    }
+
+
+def prepare_case(base_url: str, access_token: str, item: dict, cancelado: threading.Event = None, store=None,
+                 recursos: dict = None, d_menos: int = D_MENOS_PADRAO) -> dict | None:
+    """Tudo o que abrir o caso precisa: processo, pedidos (na tabela compartilhada) e prazos. None se cancelada."""
+    from .estado_pedidos import get_base
+    inicio = time.perf_counter()
+    dados = fetch_case(base_url, access_token, item["pasta"], cancelado, store)
+    if dados is None:
+        return None
+    if dados["processo"]:
+        dados["base"] = get_base(str(dados["processo"].get("pasta", item["pasta"])), dados["pedidos"])
+    dados["prazos"] = precompute_deadlines(item["caso"], recursos, d_menos)
+    dados["segundos"] = time.perf_counter() - inicio
+    dados["buscado_em"] = time.monotonic()
+    return dados
+
+
+def open_case(estado, item: dict, dados: dict, opcoes: dict = None):
+    """Abre o caso da fila no st.session_state. Deve rodar antes dos widgets serem criados (em um callback).
+
+    O formulário começa limpo e recebe os campos informados na lista; um valor fora das opções do widget
+    (`opcoes`: campo -> opções) é ignorado.
+    """
+    from .estado_pedidos import PedidosEdicao
+    estado["processo_data"] = dados["processo"]
+    estado["pedidos"] = PedidosEdicao(dados["base"]) if dados["processo"] else None
+    estado["pedidos_gerados"] = None
+    estado["prazos"] = []
+    estado["report_generated"] = False
+    if "secoes" in estado:
+        estado["secoes"] = {}
+    for campo, chave in WIDGETS_FORMULARIO.items():
+        valor = item["caso"][campo]
+        if campo in item["informados"] and (not opcoes or campo not in opcoes or valor in opcoes[campo]):
+            estado[chave] = valor
+        elif chave in estado:
+            del estado[chave]
+    estado["numero_processo_input"] = item["pasta"]
+
+
+class FilaTrabalho:
+    """Fila de casos de uma sessão: o caso atual e as buscas em andamento dos seguintes."""
+
+    def __init__(self, itens: list[dict], executor, buscar, antecipar: int = FILA_ANTECIPAR, origem: str = "",
+                 validade: float = PREFETCH_VALIDADE):
+        """`buscar(item, cancelado)` roda no `executor` e retorna o resultado de prepare_case."""
+        self.itens = itens
+        self.origem = origem
+        self.antecipar = antecipar
+        self.validade = validade
+        self.posicao = -1  # nenhum caso aberto ainda
+        self.prazos = None  # prazos pré-calculados do caso atual
+        self.eventos = []  # um por caso deixado (ver register_case)
+        self._executor = executor
+        self._buscar = buscar
+        self._buscas = {}  # posição -> (future, evento de cancelamento)
+        self._aberto = None
+        self._anterior = None  # prazos do caso anterior (ver retreat)
+        self._lock = threading.Lock()
+        self._antecipar()
+
+    def __len__(self) -> int:
+        return len(self.itens)
+
+    @property
+    def atual(self) -> dict | None:
+        return self.itens[self.posicao] if 0 <= self.posicao < len(self.itens) else None
+
+    @property
+    def terminada(self) -> bool:
+        return self.posicao >= len(self.itens) - 1 and self._aberto is None
+
+    def _antecipar(self):
+        """Busca os casos da janela depois do atual e cancela as buscas que saíram dela."""
+        with self._lock:
+            janela = range(self.posicao + 1, min(self.posicao + 1 + self.antecipar, len(self.itens)))
+            for pos in [p for p in self._buscas if p not in janela]:
+                future, cancelado = self._buscas.pop(pos)
+                cancelado.set()
+                future.cancel()
+            for pos in janela:
+                if pos not in self._buscas:
+                    cancelado = threading.Event()
+                    contexto = copy_log_context(pasta=self.itens[pos]["pasta"], etapa="fila de trabalho")
+                    self._buscas[pos] = (self._executor.submit(contexto.run, self._buscar, self.itens[pos], cancelado), cancelado)
+
+    def pending(self) -> bool:
+        """Indica se a busca do próximo caso ainda está em andamento."""
+        with self._lock:
+            busca = self._buscas.get(self.posicao + 1)
+        return busca is not None and not busca[0].done()
+
+    def leave(self, analista: str = "", concluido: bool = True) -> dict | None:
+        """Deixa o caso atual (concluído ou pulado) e retorna o evento de produtividade, ou None se não havia caso."""
+        if self._aberto is None:
+            return None
+        fim = time.time()
+        evento = {
+            "analista": analista, "pasta": self.atual["pasta"], "origem": self.origem, "concluido": concluido,
+            "inicio": datetime.fromtimestamp(self._aberto["inicio"]).isoformat(timespec="seconds"),
+            "fim": datetime.fromtimestamp(fim).isoformat(timespec="seconds"),
+            "segundos": round(fim - self._aberto["inicio"], 3),
+            "espera_ms": round(self._aberto["espera"] * 1000, 1), "antecipado": self._aberto["antecipado"],
+        }
+        self.eventos.append(evento)
+        self._aberto = None
+        return evento
+
+    def advance(self, timeout: float = None) -> tuple[dict | None, dict | None]:
+        """Passa ao próximo caso: (item, resultado da busca). O resultado é None se a busca falhou ou
+        não foi feita (quem chama busca agora); o item é None no fim da fila."""
+        self._anterior = self.prazos
+        self.posicao = min(self.posicao + 1, len(self.itens))
+        item = self.atual
+        if item is None:
+            self.prazos = None
+            return None, None
+        with self._lock:
+            busca = self._buscas.pop(self.posicao, None)
+        inicio = time.perf_counter()
+        antecipado = busca is not None and busca[0].done()
+        dados = None
+        if busca is not None:
+            try:
+                dados = busca[0].result(timeout)
+            except Exception as e:  # inclui cancelamento e timeout
+                logging.warning(f"Worklist prefetch failed ({item['pasta']}): {e!r}")
+        if dados is not None and time.monotonic() - dados.get("buscado_em", time.monotonic()) > self.validade:
+            logging.info(f"Worklist prefetch expired ({item['pasta']})")
+            dados = None
+        self._aberto = {"inicio": time.time(), "espera": time.perf_counter() - inicio, "antecipado": antecipado and dados is not None}
+        self.prazos = dados["prazos"] if dados else None
+        self._antecipar()
+        return item, dados
+
+    def retreat(self):
+        """Desfaz o último advance() quando o caso não pôde ser aberto: o próximo advance() volta a ele."""
+        if self.posicao < 0:
+            return
+        self.posicao -= 1
+        self._aberto = None
+        self.prazos = self._anterior  # o caso anterior continua na tela
+        self._antecipar()
+
+    def opened(self, dados: dict, espera: float):
+        """Registra a busca feita na hora (quando advance() não trouxe o resultado)."""
+        if self._aberto is not None:
+            self._aberto["espera"] += espera
+        self.prazos = dados.get("prazos")
+
+    def cancel(self):
+        """Cancela as buscas em andamento (a fila foi substituída)."""
+        with self._lock:
+            for future, cancelado in self._buscas.values():
+                cancelado.set()
+                future.cancel()
+            self._buscas.clear()
+
+    def stats(self) -> dict:
+        """Produtividade da sessão na fila: casos concluídos e pulados, casos por hora e espera ao abrir."""
+        concluidos = [e for e in self.eventos if e["concluido"]]
+        segundos = sum(e["segundos"] for e in concluidos)
+        return {
+            "total": len(self.itens), "posicao": self.posicao + 1, "concluidos": len(concluidos),
+            "pulados": len(self.eventos) - len(concluidos),
+            "casos_hora": len(concluidos) * 3600 / segundos if segundos else None,
+            "espera_media_ms": statistics.mean(e["espera_ms"] for e in self.eventos) if self.eventos else None,
+            "antecipados": sum(e["antecipado"] for e in self.eventos) / len(self.eventos) if self.eventos else None,
+        }
+
+
+def register_case(pasta_dir: str, evento: dict):
+    """Acrescenta o evento ao arquivo do dia (uma linha JSON, escrita de uma vez: as sessões dividem o arquivo)."""
+    os.makedirs(pasta_dir, exist_ok=True)
+    caminho = os.path.join(pasta_dir, f"{evento['fim'][:10]}.jsonl")
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write(json.dumps(evento, ensure_ascii=False) + "\n")
+
+
+def throughput_report(pasta_dir: str, dia: str = None) -> dict:
+    """Produtividade do dia por analista e da equipe: casos, casos por hora no caso, mediana por caso, espera."""
+    dia = dia or date.today().isoformat()
+    caminho = os.path.join(pasta_dir, f"{dia}.jsonl")
+    eventos = []
+    if os.path.exists(caminho):
+        with open(caminho, encoding="utf-8") as f:
+            eventos = [json.loads(linha) for linha in f if linha.strip()]
+
+    def resumo(lista):
+        concluidos = [e for e in lista if e["concluido"]]
+        segundos = sum(e["segundos"] for e in concluidos)
+        return {
+            "casos": len(concluidos), "pulados": len(lista) - len(concluidos),
+            "casos_hora": len(concluidos) * 3600 / segundos if segundos else 0.0,
+            "mediana_segundos": statistics.median(e["segundos"] for e in concluidos) if concluidos else 0.0,
+            "espera_media_ms": statistics.mean(e["espera_ms"] for e in lista) if lista else 0.0,
+            "antecipados": sum(e["antecipado"] for e in lista) / len(lista) if lista else 0.0,
+        }
+
+    analistas = sorted({e["analista"] for e in eventos})
+    return {"dia": dia, "analistas": {a: resumo([e for e in eventos if e["analista"] == a]) for a in analistas},
+            "equipe": resumo(eventos)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Produtividade da equipe na fila de trabalho do dia.")
+    parser.add_argument("pasta", help="Pasta dos registros (PRODUTIVIDADE_DIR do app).")
+    parser.add_argument("--dia", help="AAAA-MM-DD (padrão: hoje).")
+    args = parser.parse_args(argv)
+
+    relatorio = throughput_report(args.pasta, args.dia)
+    print(f"Fila de trabalho de {relatorio['dia']}")
+    print(f"{'Analista':<24}{'casos':>7}{'pulados':>9}{'casos/h':>9}{'mediana s':>11}{'espera ms':>11}{'prontos':>9}")
+    linhas = [*relatorio["analistas"].items(), ("Equipe", relatorio["equipe"])]
+    for nome, r in linhas:
+        print(f"{(nome or '(sem nome)'):<24}{r['casos']:>7}{r['pulados']:>9}{r['casos_hora']:>9.1f}"
+              f"{r['mediana_segundos']:>11.0f}{r['espera_media_ms']:>11.0f}{r['antecipados']:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Etapa de geração de documentos (arquivo de atualização, relatório interno e e-mail).
+
+A geração é uma função pura de um "snapshot" canônico das entradas (dados do processo, pedidos
+originais e editados, campos do formulário e prazos). O hash desse snapshot é usado como chave de
+cache, de modo que as reexecuções do Streamlit que não alteram nenhuma entrada não refazem o
+trabalho nem registram atualizações duplicadas no diário do robô.
+"""
+
+import hashlib
+import json
+import re
+from collections import OrderedDict
+
+import pandas as pd
+
+from .custas import motivo_isencao
+from .diff_pedidos import diff_pedidos
+from .email_cliente import MODELO_PADRAO, build_email_context, compose_client_email
+from .journal import UpdateJournal
+from .perfil import etapa
+from .relatorios import format_report_from_df, format_prazos, generate_final_text
+
+# Campos do formulário que participam da geração dos documentos.
+CAMPOS_FORMULARIO = (
+    "cliente_role", "tipo_decisao", "data_ciencia", "resultado_sentenca", "obs_sentenca",
+    "ed_status", "justificativa_ed", "recurso_selecionado", "recurso_outro_especificar", "recurso_justificativa",
+    "isencao_deposito", "outro_motivo_deposito", "isencao_custas", "outro_motivo_custas",
+    "deposito_a_recolher", "custas_a_recolher", "obs_finais",
+)
+
+
+def build_snapshot(processo_data: dict, pedidos_df: pd.DataFrame, edited_pedidos_df: pd.DataFrame, prazos: list, **campos) -> dict:
+    """Reúne as entradas da geração. Os DataFrames e listas são copiados para que o snapshot não mude depois."""
+    faltando = set(CAMPOS_FORMULARIO) - set(campos)
+    if faltando:
+        raise ValueError(f"Campos do formulário ausentes no snapshot: {sorted(faltando)}")
+    return {
+        'processo': dict(processo_data or {}),
+        'pedidos_df': pedidos_df.copy() if pedidos_df is not None else pd.DataFrame(),
+        'edited_pedidos_df': edited_pedidos_df.copy() if edited_pedidos_df is not None else pd.DataFrame(),
+        'prazos': [dict(p) for p in prazos or []],
+        'campos': {nome: campos[nome] for nome in CAMPOS_FORMULARIO},
+    }
+
+
+def _canonical(value):
+    if isinstance(value, pd.DataFrame):
+        return {'columns': [str(c) for c in value.columns], 'index': value.index.tolist(), 'data': value.to_numpy(dtype=object).tolist()}
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def snapshot_key(snapshot: dict, *extra) -> str:
+    """Hash estável do snapshot (e de entradas adicionais, como o advogado do e-mail)."""
+    payload = json.dumps([_canonical(snapshot), list(extra)], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def compute_update_tasks(pedidos_df: pd.DataFrame, edited_pedidos_df: pd.DataFrame) -> tuple[list[dict], dict]:
+    """Compara os pedidos originais com os editados (pelo id) e gera as tarefas de atualização para o robô.
+
+    Retorna (tarefas, valores anteriores por id dos campos alterados).
+    """
+    diff = diff_pedidos(pedidos_df, edited_pedidos_df)
+    return diff.to_tasks(), diff.previous
+
+
+def build_report_sections(snapshot: dict) -> list[tuple[str, str]]:
+    """Monta as seções do relatório interno a partir do snapshot."""
+    processo, c = snapshot['processo'], snapshot['campos']
+    data_ciencia = c['data_ciencia']
+    sections_data = []
+    contexto_str = (f"- Processo: {processo.get('pasta', 'N/A')}\n"
+                    f"- Cliente: {processo.get('cliente.nome', 'N/A')} ({c['cliente_role']})\n"
+                    f"- Adverso: {processo.get('adverso.nome', 'N/A')}\n"
+                    f"- Tipo de Decisão Analisada: {c['tipo_decisao']}\n"
+                    f"- Data da Ciência: {data_ciencia.strftime('%d/%m/%Y') if data_ciencia else 'N/A'}")
+    sections_data.append(("Contexto do Processo", contexto_str))
+
+    resultado_str = (f"- Avaliação para o Cliente: {c['resultado_sentenca']}\n"
+                     f"- Observações: {c['obs_sentenca'].strip() or 'Nenhuma'}")
+    sections_data.append(("Resultado Geral da Decisão", resultado_str))
+
+    pedidos_report_text = format_report_from_df(snapshot['edited_pedidos_df'], c['tipo_decisao'])
+    sections_data.append(("Tabela de Pedidos Processada", pedidos_report_text))
+
+    ed_str = (f"- Avaliação: {c['ed_status']}\n"
+              f"- Justificativa: {c['justificativa_ed'].strip() or 'N/A'}")
+    sections_data.append(("Embargos de Declaração (ED)", ed_str))
+
+    if c['ed_status'] == "Não cabe ED":
+        recurso_final = c['recurso_selecionado'] if c['recurso_selecionado'] != "Outro" else c['recurso_outro_especificar'].strip()
+        recurso_str = (f"- Decisão/Recomendação: {recurso_final}\n"
+                       f"- Justificativa: {c['recurso_justificativa'].strip()}")
+        sections_data.append(("Recurso", recurso_str))
+
+        motivo_deposito = motivo_isencao(c['isencao_deposito'], c['outro_motivo_deposito'])
+        motivo_custas = motivo_isencao(c['isencao_custas'], c['outro_motivo_custas'])
+        custas_deposito_str = (f"- Depósito a Recolher: R$ {c['deposito_a_recolher']:,.2f} (Isenção: {motivo_deposito})\n"
+                               f"- Custas a Recolher: R$ {c['custas_a_recolher']:,.2f} (Isenção: {motivo_custas})")
+        sections_data.append(("Custas e Depósito Recursal", custas_deposito_str))
+
+    sections_data.append(("Prazos Adicionados", format_prazos(snapshot['prazos'])))
+    sections_data.append(("Observações Finais Internas", c['obs_finais'].strip() or "Nenhuma"))
+    return sections_data
+
+
+def generate_documents(snapshot: dict) -> dict:
+    """Gera as tarefas de atualização e o relatório interno. Não tem efeitos colaterais."""
+    with etapa("diff dos pedidos"):
+        update_tasks, update_previous = compute_update_tasks(snapshot['pedidos_df'], snapshot['edited_pedidos_df'])
+    with etapa("relatório interno"):
+        final_text = generate_final_text(build_report_sections(snapshot))
+    return {
+        'update_tasks': update_tasks,
+        'update_previous': update_previous,
+        # Chave da atualização: o mesmo conjunto de tarefas nunca é registrado duas vezes.
+        'update_key': snapshot_key({'pasta': snapshot['processo'].get('pasta'), 'tasks': update_tasks}) if update_tasks else None,
+        'final_text': final_text,
+    }
+
+
+def generate_email(snapshot: dict, advogado_responsavel: str, modelo: str = MODELO_PADRAO) -> tuple[str, str]:
+    """Gera (assunto, corpo) do e-mail ao cliente a partir do snapshot, com o corpo do modelo `modelo`."""
+    c = snapshot['campos']
+    email_context = build_email_context(
+        snapshot['processo'], c['tipo_decisao'], snapshot['edited_pedidos_df'], advogado_responsavel,
+        ed_status=c['ed_status'], justificativa_ed=c['justificativa_ed'], recurso_selecionado=c['recurso_selecionado'],
+        recurso_outro_especificar=c['recurso_outro_especificar'], recurso_justificativa=c['recurso_justificativa'],
+        obs_sentenca=c['obs_sentenca'], isencao_deposito=c['isencao_deposito'], outro_motivo_deposito=c['outro_motivo_deposito'],
+        isencao_custas=c['isencao_custas'], outro_motivo_custas=c['outro_motivo_custas'],
+        deposito_a_recolher=c['deposito_a_recolher'], custas_a_recolher=c['custas_a_recolher'], prazos=snapshot['prazos'],
+    )
+    return compose_client_email(email_context, modelo)
+
+
+class GenerationCache:
+    """Cache LRU limitado das saídas da geração, indexado pelo hash do snapshot."""
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get_or_compute(self, key: str, func, *args):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        value = func(*args)
+        self._entries[key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+
+def sanitize_pasta(pasta) -> str:
+    """Remove da pasta os caracteres inválidos em nomes de arquivo."""
+    return re.sub(r'[\\/*?:"<>|]', "", str(pasta or 'unknown'))
+
+
+def save_update(update_folder: str, pasta: str, update_tasks: list[dict], previous: dict = None) -> int:
+    """Registra as tarefas de atualização no diário do robô e retorna o número de sequência do registro."""
+    return UpdateJournal(update_folder).append(str(pasta or 'unknown'), update_tasks, previous)
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""Fila de atualizações para o robô em um diário (journal) só de acréscimo.
+
+Cada geração de documentos com alterações nos pedidos acrescenta UM registro JSON por linha ao
+segmento ativo em `<UPDATE_FOLDER>/journal/`. Os registros têm número de sequência crescente
+(`seq`) e são gravados sob lock exclusivo e com fsync, de modo que nenhuma gravação se perde ou se
+mistura com outra. Cada consumidor (ex.: o robô) guarda em `<UPDATE_FOLDER>/offsets/<nome>.json` o
+último `seq` processado e lê apenas os registros novos. Um consumidor que lê os registros com claim()
+os reserva em `offsets/<nome>.claim` até o commit(): enquanto ele os aplica, rewrite_tail() não os altera.
+
+Os segmentos são rotacionados por tamanho e nomeados pelo primeiro `seq` que contêm; compact()
+remove os segmentos já processados por todos os consumidores registrados. rewrite_tail() substitui
+os registros ainda pendentes por outros (ex.: a compactação de core.compactacao) de forma atômica:
+a nova versão do diário é montada em `journal.new/` e trocada com a atual por rename.
+
+Formato de um registro:
+    {"seq": 42, "ts": "2025-03-10T14:03:11", "pasta": "123", "tasks": [{"id": 7, "situacao": "..."}],
+     "anterior": {"7": {"situacao": "..."}}}
+"""
+
+import bisect
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: apenas o lock entre threads do mesmo processo
+    fcntl = None
+
+SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+_SEGMENT_SUFFIX = ".jsonl"
+_thread_lock = threading.RLock()
+
+
+def _fsync_dir(path):
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_json(path, data):
+    """Grava um JSON de forma atômica (arquivo temporário + fsync + rename)."""
+    tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(path) or ".")
+
+
+class UpdateJournal:
+    def __init__(self, folder: str, max_segment_bytes: int = SEGMENT_MAX_BYTES):
+        self.folder = folder
+        self.journal_dir = os.path.join(folder, "journal")
+        self.offsets_dir = os.path.join(folder, "offsets")
+        self.max_segment_bytes = max_segment_bytes
+        os.makedirs(self.offsets_dir, exist_ok=True)
+        self._lock_path = os.path.join(folder, "journal.lock")
+        # Última posição lida (segmento, inode, byte, seq): permite continuar a leitura em O(novos registros).
+        self._read_position = None
+        with self.lock():
+            os.makedirs(self.journal_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------ lock e segmentos
+
+    @contextmanager
+    def lock(self):
+        """Lock exclusivo do diário, válido entre threads e entre processos."""
+        with _thread_lock:
+            with open(self._lock_path, "a") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    self._recover()
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _recover(self):
+        """Conclui ou descarta uma troca de diretório interrompida por rewrite_tail()."""
+        new_dir, old_dir = self.journal_dir + ".new", self.journal_dir + ".old"
+        if not os.path.isdir(self.journal_dir) and os.path.isdir(new_dir):
+            os.rename(new_dir, self.journal_dir)  # a nova versão já estava completa
+        for leftover in (new_dir, old_dir):
+            if os.path.isdir(leftover):
+                shutil.rmtree(leftover)
+
+    def segments(self) -> list[tuple[int, str]]:
+        """Segmentos existentes como (primeiro seq, caminho), em ordem."""
+        found = []
+        try:
+            names = os.listdir(self.journal_dir)
+        except FileNotFoundError:  # troca de diretório em andamento
+            return []
+        for name in names:
+            if name.endswith(_SEGMENT_SUFFIX) and name[:-len(_SEGMENT_SUFFIX)].isdigit():
+                found.append((int(name[:-len(_SEGMENT_SUFFIX)]), os.path.join(self.journal_dir, name)))
+        return sorted(found)
+
+    def _segment_path(self, start_seq: int) -> str:
+        return os.path.join(self.journal_dir, f"{start_seq:020d}{_SEGMENT_SUFFIX}")
+
+    @staticmethod
+    def _last_record(path):
+        """Lê o último registro completo de um segmento, a partir do fim do arquivo."""
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            block = 4096
+            while True:
+                start = max(0, size - block)
+                f.seek(start)
+                data = f.read(size - start)
+                lines = data.split(b"\n")
+                # O último elemento é um fragmento incompleto (ou vazio, se o arquivo termina em \n).
+                complete = [line for line in lines[:-1] if line.strip()]
+                if complete and (start == 0 or len(lines) > 2):
+                    return json.loads(complete[-1])
+                if start == 0:
+                    return None
+                block *= 4
+
+    @staticmethod
+    def _repair_tail(path):
+        """Descarta um registro parcial no fim do segmento (gravação interrompida)."""
+        with open(path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            data = f.read()
+            f.truncate(data.rfind(b"\n") + 1)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def last_seq(self) -> int:
+        for _, path in reversed(self.segments()):
+            record = self._last_record(path)
+            if record:
+                return record["seq"]
+        return 0
+
+    # ------------------------------------------------------------------ escrita
+
+    def append(self, pasta: str, tasks: list[dict], previous: dict = None) -> int:
+        """Acrescenta um registro de atualização e retorna o seu número de sequência."""
+        with self.lock():
+            segments = self.segments()
+            if segments:
+                self._repair_tail(segments[-1][1])
+            seq = self.last_seq() + 1
+            record = {
+                "seq": seq,
+                "ts": datetime.now().isoformat(timespec="seconds"),
+                "pasta": pasta,
+                "tasks": tasks,
+                "anterior": {str(k): v for k, v in (previous or {}).items()},
+            }
+            line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+            active_size = os.path.getsize(segments[-1][1]) if segments else 0
+            if not segments or (active_size > 0 and active_size + len(line) > self.max_segment_bytes):
+                path, new_segment = self._segment_path(seq), True
+            else:
+                path, new_segment = segments[-1][1], False
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            if new_segment:
+                _fsync_dir(self.journal_dir)
+            return seq
+
+    # ------------------------------------------------------------------ leitura
+
+    def read(self, after_seq: int = 0, limit: int = None):
+        """Itera sobre os registros com seq > after_seq, em ordem."""
+        segments = self.segments()
+        if not segments:
+            return
+        starts = [start for start, _ in segments]
+        position = self._read_position
+        if position and position[3] == after_seq and position[0] in starts:
+            seg_index, byte_pos = starts.index(position[0]), position[2]
+        else:
+            seg_index, byte_pos = max(0, bisect.bisect_right(starts, after_seq + 1) - 1), 0
+
+        count = 0
+        for start, path in segments[seg_index:]:
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:  # segmento removido por compact() ou rewrite_tail()
+                self._read_position = None
+                return
+            with f:
+                inode = os.fstat(f.fileno()).st_ino
+                if byte_pos and position and inode != position[1]:
+                    # O segmento foi reescrito desde a última leitura: recomeça do início dele.
+                    byte_pos = 0
+                f.seek(byte_pos)
+                while True:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):  # fim do arquivo ou registro ainda sendo gravado
+                        break
+                    byte_pos = f.tell()
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if record["seq"] <= after_seq:
+                        continue
+                    after_seq = record["seq"]
+                    self._read_position = (start, inode, byte_pos, after_seq)
+                    yield record
+                    count += 1
+                    if limit is not None and count >= limit:
+                        return
+            byte_pos = 0
+
+    # ------------------------------------------------------------------ consumidores
+
+    def _offset_path(self, consumer: str) -> str:
+        return os.path.join(self.offsets_dir, f"{consumer}.json")
+
+    def consumers(self) -> list[str]:
+        """Consumidores com offset confirmado ou com uma reserva (claim) antes do primeiro commit."""
+        nomes = os.listdir(self.offsets_dir)
+        return sorted({name[:-5] for name in nomes if name.endswith(".json")}
+                      | {name[:-6] for name in nomes if name.endswith(".claim")})
+
+    def get_offset(self, consumer: str) -> int:
+        try:
+            with open(self._offset_path(consumer), encoding="utf-8") as f:
+                return json.load(f)["seq"]
+        except FileNotFoundError:
+            return 0
+
+    def commit(self, consumer: str, seq: int):
+        """Registra que o consumidor processou todos os registros até `seq` (inclusive)."""
+        if seq < self.get_offset(consumer):
+            raise ValueError(f"Offset do consumidor '{consumer}' não pode retroceder ({seq}).")
+        atomic_write_json(self._offset_path(consumer), {"seq": seq, "ts": datetime.now().isoformat(timespec="seconds")})
+        try:
+            with open(self._claim_path(consumer), encoding="utf-8") as f:
+                confirmada = json.load(f)["seq"] <= seq
+            if confirmada:
+                os.remove(self._claim_path(consumer))
+        except FileNotFoundError:
+            pass
+
+    def pending(self, consumer: str, limit: int = None) -> list[dict]:
+        return list(self.read(self.get_offset(consumer), limit))
+
+    def _claim_path(self, consumer: str) -> str:
+        return os.path.join(self.offsets_dir, f"{consumer}.claim")
+
+    def claim(self, consumer: str, limit: int = None) -> list[dict]:
+        """Como pending(), mas reserva os registros lidos até o commit() do consumidor (ver rewrite_tail)."""
+        with self.lock():
+            records = self.pending(consumer, limit)
+            if records:
+                atomic_write_json(self._claim_path(consumer), {"seq": records[-1]["seq"],
+                                                               "ts": datetime.now().isoformat(timespec="seconds")})
+            return records
+
+    def claimed_seq(self) -> int:
+        """Maior seq reservado por um consumidor e ainda não confirmado (0 se nenhum)."""
+        maior = 0
+        for consumer in self.consumers():
+            try:
+                with open(self._claim_path(consumer), encoding="utf-8") as f:
+                    seq = json.load(f)["seq"]
+            except FileNotFoundError:
+                continue
+            if seq > self.get_offset(consumer):
+                maior = max(maior, seq)
+        return maior
+
+    # ------------------------------------------------------------------ manutenção
+
+    def compact(self) -> int:
+        """Remove os segmentos já processados por todos os consumidores. Retorna quantos foram removidos."""
+        consumers = self.consumers()
+        if not consumers:
+            return 0
+        min_offset = min(self.get_offset(c) for c in consumers)
+        removed = 0
+        with self.lock():
+            segments = self.segments()
+            # O segmento ativo (último) nunca é removido.
+            for (start, path), (next_start, _) in zip(segments, segments[1:]):
+                if next_start - 1 <= min_offset:
+                    os.remove(path)
+                    removed += 1
+            if removed:
+                self._read_position = None
+                _fsync_dir(self.journal_dir)
+        return removed
+
+    def rewrite_tail(self, after_seq: int, transform) -> tuple[list[dict], list[dict]]:
+        """Substitui os registros com seq > after_seq por transform(registros), de forma atômica.
+
+        Os novos registros devem ter seq crescente dentro do intervalo original. Se o maior seq
+        original não for mantido, um registro vazio com esse seq é incluído para que a numeração
+        nunca retroceda. Se transform() devolver os mesmos registros, nada é reescrito. Registros
+        reservados por um consumidor (claim) e ainda não confirmados nunca são reescritos: after_seq
+        sobe até claimed_seq().
+        Retorna (registros originais, registros novos).
+        """
+        with self.lock():
+            after_seq = max(after_seq, self.claimed_seq())
+            old = list(self.read(after_seq))
+            if not old:
+                return [], []
+            last = old[-1]["seq"]
+            new = list(transform(old))
+            if new == old:
+                return old, new
+            if not new or new[-1]["seq"] < last:
+                new.append({"seq": last, "ts": datetime.now().isoformat(timespec="seconds"),
+                            "pasta": None, "tasks": [], "anterior": {}})
+            seqs = [r["seq"] for r in new]
+            if seqs != sorted(set(seqs)) or seqs[0] <= after_seq or seqs[-1] != last:
+                raise ValueError("rewrite_tail: os novos registros devem ter seq crescente dentro do intervalo original.")
+
+            segments = self.segments()
+            starts = [start for start, _ in segments]
+            boundary = max(0, bisect.bisect_right(starts, after_seq + 1) - 1)
+            new_dir, old_dir = self.journal_dir + ".new", self.journal_dir + ".old"
+            os.makedirs(new_dir)
+            for _, path in segments[:boundary]:
+                target = os.path.join(new_dir, os.path.basename(path))
+                try:
+                    os.link(path, target)
+                except OSError:
+                    shutil.copy2(path, target)
+
+            _, boundary_path = segments[boundary]
+            with open(boundary_path, "rb") as f:
+                kept = [line for line in f if line.endswith(b"\n") and line.strip() and json.loads(line)["seq"] <= after_seq]
+            with open(os.path.join(new_dir, os.path.basename(boundary_path)), "wb") as f:
+                f.writelines(kept)
+                f.writelines((json.dumps(r, ensure_ascii=False, default=str) + "\n").encode("utf-8") for r in new)
+                f.flush()
+                os.fsync(f.fileno())
+            _fsync_dir(new_dir)
+
+            os.rename(self.journal_dir, old_dir)
+            os.rename(new_dir, self.journal_dir)
+            _fsync_dir(self.folder)
+            shutil.rmtree(old_dir)
+            self._read_position = None
+            return old, new
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""Log estruturado em JSON, gravado em segundo plano, com rotação por tamanho e por dia e compressão.
+
+configure_logging() põe no logger raiz um QueueHandler: quem chama logging.info(...) só monta o registro e o
+coloca em uma fila, sem formatar nem tocar no disco. Uma thread (QueueListener) formata cada registro como
+uma linha JSON e a grava no arquivo:
+
+    {"ts": "2025-03-10T14:02:11.532-03:00", "nivel": "INFO", "sessao": "3f9c2a1b", "pasta": "123",
+     "etapa": "busca antecipada", "msg": "...", "logger": "root", "pid": 4242, "thread": "prefetch_0"}
+
+Os campos sessao, pasta e etapa vêm do contexto do log (set_log_context / log_context), guardado em um
+contextvars.ContextVar: vale para a thread da sessão do Streamlit e para cada tarefa do asyncio
+(core.servico). As buscas em segundo plano levam o contexto de quem as pediu (copy_log_context).
+
+O arquivo é compartilhado pelos workers (processos) do app: cada linha é gravada com um único write em
+modo append, e a rotação é feita sob uma trava de arquivo (fcntl, quando disponível). Ao passar de
+LOG_MAX_BYTES ou ao virar o dia, o arquivo vira um segmento `assistente.log.AAAA-MM-DD[.N]`; os segmentos
+anteriores ao último são comprimidos (.gz) e só os LOG_SEGMENTOS mais novos são mantidos. O último fica
+sem comprimir até a rotação seguinte, para que um worker que ainda não viu a rotação termine de gravar nele.
+
+Consulta (arquivo atual e segmentos, inclusive os .gz):
+
+    python -m core.logs assistente.log --pasta 123 --nivel WARNING
+"""
+
+import argparse
+import atexit
+import contextlib
+import contextvars
+import glob
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import date, datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos (um único worker)
+    fcntl = None
+
+LOG_MAX_BYTES = 20 * 1024 * 1024  # Tamanho máximo do arquivo atual antes da rotação
+LOG_SEGMENTOS = 30  # Segmentos (comprimidos) mantidos além do arquivo atual
+
+_contexto = contextvars.ContextVar("contexto_log", default={})
+_listener = None
+_lock = threading.Lock()
+
+_CAMPOS_CONTEXTO = ("sessao", "pasta", "etapa")  # Sempre nesta ordem no início da linha
+# Atributos de todo LogRecord: o que sobrar em um registro veio de extra={...} e vai para o JSON.
+_ATRIBUTOS_REGISTRO = set(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {"message", "asctime", "contexto"}
+
+
+def set_log_context(**campos):
+    """Define campos do contexto do log (sessao, pasta, etapa...) até a próxima mudança. None remove o campo."""
+    atual = dict(_contexto.get())
+    for chave, valor in campos.items():
+        if valor is None:
+            atual.pop(chave, None)
+        else:
+            atual[chave] = valor
+    _contexto.set(atual)
+
+
+@contextlib.contextmanager
+def log_context(**campos):
+    """Campos do contexto do log válidos só dentro do bloco."""
+    token = _contexto.set({**_contexto.get(), **{k: v for k, v in campos.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _contexto.reset(token)
+
+
+def copy_log_context(**campos) -> contextvars.Context:
+    """Cópia do contexto atual com `campos`, para rodar uma tarefa em outra thread: executor.submit(ctx.run, f)."""
+    contexto = contextvars.copy_context()
+    contexto.run(set_log_context, **campos)
+    return contexto
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Só o necessário na thread de quem registra: a mensagem final e o contexto do log."""
+
+    def prepare(self, record):
+        record.msg, record.args = record.getMessage(), None
+        record.contexto = _contexto.get()
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro, com o contexto do log e os campos passados em extra={...}."""
+
+    def format(self, record) -> str:
+        entrada = {"ts": datetime.fromtimestamp(record.created).astimezone().isoformat(timespec="milliseconds"),
+                   "nivel": record.levelname}
+        contexto = getattr(record, "contexto", None) or {}
+        entrada.update((chave, contexto[chave]) for chave in _CAMPOS_CONTEXTO if chave in contexto)
+        entrada.update(contexto)
+        entrada["msg"] = record.getMessage()
+        for chave, valor in record.__dict__.items():
+            if chave not in _ATRIBUTOS_REGISTRO:
+                entrada[chave] = valor
+        entrada.update(logger=record.name, pid=record.process, thread=record.threadName)
+        if record.exc_info:
+            entrada["exc"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entrada["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entrada, ensure_ascii=False, default=str)
+
+
+class JsonLinesFileHandler(logging.Handler):
+    """Arquivo de log compartilhado entre processos, com rotação por tamanho e por dia e segmentos .gz.
+
+    Roda só na thread do QueueListener.
+    """
+
+    INTERVALO_VERIFICACAO = 1.0  # segundos entre as verificações de rotação feita por outro processo
+
+    def __init__(self, arquivo: str, max_bytes: int = LOG_MAX_BYTES, segmentos: int = LOG_SEGMENTOS):
+        super().__init__()
+        self.arquivo = os.path.abspath(arquivo)
+        self.max_bytes = max_bytes
+        self.segmentos = segmentos
+        self._fd = None
+        self._inode = None
+        self._dia = None  # dia dos registros no arquivo atual
+        self._verificado = 0.0
+
+    def _abrir(self):
+        if self._fd is not None:
+            os.close(self._fd)
+        os.makedirs(os.path.dirname(self.arquivo), exist_ok=True)
+        self._fd = os.open(self.arquivo, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        st = os.fstat(self._fd)
+        self._inode = (st.st_dev, st.st_ino)
+        self._dia = date.fromtimestamp(st.st_mtime) if st.st_size else date.today()
+        self._verificado = time.monotonic()
+
+    def _inode_do_caminho(self):
+        try:
+            st = os.stat(self.arquivo)
+        except FileNotFoundError:
+            return None
+        return (st.st_dev, st.st_ino)
+
+    @contextlib.contextmanager
+    def _trava(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.arquivo + ".lock", "a") as trava:
+            fcntl.flock(trava, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(trava, fcntl.LOCK_UN)
+
+    def emit(self, record):
+        try:
+            dados = (self.format(record) + "\n").encode("utf-8")
+            agora = time.monotonic()
+            if self._fd is None:
+                self._abrir()
+            elif agora - self._verificado > self.INTERVALO_VERIFICACAO:
+                self._verificado = agora
+                if self._inode_do_caminho() != self._inode:  # outro processo rotacionou o arquivo
+                    self._abrir()
+            dia = date.fromtimestamp(record.created)
+            tamanho = os.fstat(self._fd).st_size
+            if tamanho and (dia != self._dia or tamanho + len(dados) > self.max_bytes):
+                self._rotacionar()
+                self._dia = dia
+            os.write(self._fd, dados)
+        except Exception:
+            self.handleError(record)
+
+    def _segmento_livre(self) -> str:
+        base = f"{self.arquivo}.{self._dia.isoformat()}"
+        nome, n = base, 0
+        while os.path.exists(nome) or os.path.exists(nome + ".gz"):
+            n += 1
+            nome = f"{base}.{n}"
+        return nome
+
+    def _rotacionar(self):
+        with self._trava():
+            if self._inode_do_caminho() == self._inode:  # senão outro processo já rotacionou: só reabre
+                os.rename(self.arquivo, self._segmento_livre())
+            self._abrir()
+            for nome in log_segments(self.arquivo)[:-1]:
+                if not nome.endswith(".gz"):
+                    _comprimir(nome)
+            segmentos = log_segments(self.arquivo)
+            for nome in segmentos[:max(0, len(segmentos) - self.segmentos)]:
+                os.remove(nome)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        super().close()
+
+
+def log_segments(arquivo: str) -> list[str]:
+    """Segmentos rotacionados do log (comprimidos ou não), do mais antigo ao mais novo."""
+    nomes = [n for n in glob.glob(glob.escape(arquivo) + ".*") if not n.endswith((".lock", ".tmp"))]
+    return sorted(nomes, key=os.path.getmtime)
+
+
+def _comprimir(nome: str):
+    with open(nome, "rb") as origem, gzip.open(nome + ".gz.tmp", "wb") as destino:
+        shutil.copyfileobj(origem, destino)
+    shutil.copystat(nome, nome + ".gz.tmp")  # mantém a ordem dos segmentos pela data de modificação
+    os.replace(nome + ".gz.tmp", nome + ".gz")
+    os.remove(nome)
+
+
+def configure_logging(arquivo: str, nivel: int = logging.INFO, max_bytes: int = LOG_MAX_BYTES,
+                      segmentos: int = LOG_SEGMENTOS) -> JsonLinesFileHandler:
+    """Liga o log em JSON no logger raiz, uma vez por processo (as reexecuções do script só reaproveitam)."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            fila = queue.SimpleQueue()
+            handler = JsonLinesFileHandler(arquivo, max_bytes, segmentos)
+            handler.setFormatter(JsonFormatter())
+            raiz = logging.getLogger()
+            raiz.addHandler(_QueueHandler(fila))
+            raiz.setLevel(nivel)
+            _listener = logging.handlers.QueueListener(fila, handler, respect_handler_level=True)
+            _listener.start()
+            atexit.register(shutdown_logging)
+        return _listener.handlers[0]
+
+
+def shutdown_logging():
+    """Grava os registros ainda na fila e desliga o log em JSON."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in list(logging.getLogger().handlers):
+            if isinstance(handler, _QueueHandler):
+                logging.getLogger().removeHandler(handler)
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def read_log(arquivo: str):
+    """Registros do log (segmentos .gz, segmentos e arquivo atual), do mais antigo ao mais novo."""
+    for nome in log_segments(arquivo) + ([arquivo] if os.path.exists(arquivo) else []):
+        with (gzip.open(nome, "rt", encoding="utf-8") if nome.endswith(".gz") else open(nome, encoding="utf-8")) as f:
+            for linha in f:
+                try:
+                    yield json.loads(linha)
+                except ValueError:  # linha do formato antigo (texto) ou gravação interrompida
+                    continue
+
+
+def _nivel(nome) -> int:
+    valor = logging.getLevelName(str(nome).upper())
+    return valor if isinstance(valor, int) else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consulta o log em JSON dos apps (arquivo atual e segmentos .gz).")
+    parser.add_argument("arquivo", nargs="?", default="assistente.log")
+    parser.add_argument("--pasta")
+    parser.add_argument("--sessao")
+    parser.add_argument("--etapa")
+    parser.add_argument("--nivel", help="Nível mínimo (DEBUG, INFO, WARNING, ERROR).")
+    parser.add_argument("--desde", help="AAAA-MM-DD[THH:MM]: registros a partir deste momento.")
+    parser.add_argument("--contem", help="Texto contido na mensagem.")
+    args = parser.parse_args(argv)
+
+    minimo = _nivel(args.nivel) if args.nivel else 0
+    for entrada in read_log(args.arquivo):
+        if ((args.pasta and str(entrada.get("pasta")) != args.pasta) or (args.sessao and entrada.get("sessao") != args.sessao)
+                or (args.etapa and entrada.get("etapa") != args.etapa)
+                or _nivel(entrada.get("nivel")) < minimo
+                or (args.desde and entrada.get("ts", "")[:len(args.desde)] < args.desde)
+                or (args.contem and args.contem not in entrada.get("msg", ""))):
+            continue
+        sys.stdout.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""Geração em lote de relatórios internos e e-mails ao cliente, sem interface Streamlit.
+
+Entrada: arquivo CSV ou JSON (lista de objetos) com uma linha por decisão analisada e as mesmas
+informações do formulário do app (ver CAMPOS_ENTRADA). Para cada linha, os dados do processo e dos
+pedidos são buscados na API DataJuri e os documentos são gerados em paralelo por um pool de processos.
+Os arquivos de saída levam o número da pasta; se a mesma pasta (ou outra com o mesmo nome de arquivo)
+aparece de novo no lote, os arquivos seguintes recebem um sufixo (_2, _3...) em vez de sobrescrever.
+
+Uso:
+    python -m core.lote decisoes.csv --saida relatorios/ --processos 4
+
+As credenciais são lidas das variáveis DATAJURI_* (ou de um arquivo .env).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from .analise import CAMPOS_CASO, analyze_case, normalize_case
+from .datajuri import DataJuriClient, DataJuriError
+from .geracao import sanitize_pasta
+
+# Campos aceitos no arquivo de entrada: os de um caso da análise (core.analise.CAMPOS_CASO).
+CAMPOS_ENTRADA = CAMPOS_CASO
+
+_client = None
+
+
+def read_input(path: str) -> list[dict]:
+    """Lê o arquivo de entrada (CSV ou JSON) e normaliza cada linha com os valores padrão."""
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f)
+    else:
+        records = pd.read_csv(path, dtype=str, keep_default_na=False).to_dict(orient="records")
+
+    casos = []
+    for i, record in enumerate(records, start=1):
+        try:
+            caso = normalize_case(record)
+        except ValueError as e:
+            raise ValueError(f"Linha {i}: {e}") from None
+        if not caso["pasta"]:
+            raise ValueError(f"Linha {i}: o campo 'pasta' é obrigatório.")
+        casos.append(caso)
+    return casos
+
+
+def _init_worker(base_url: str, access_token: str):
+    """Cada processo do pool usa o mesmo token, obtido uma única vez pelo processo principal."""
+    global _client
+    _client = DataJuriClient(base_url, access_token=access_token)
+
+
+def output_names(casos: list[dict]) -> list[str]:
+    """Nome base dos arquivos de cada caso: a pasta, com sufixo _2, _3... quando o nome se repete no lote."""
+    nomes, usados = [], set()
+    for caso in casos:
+        base = nome = sanitize_pasta(caso["pasta"])
+        n = 1
+        while nome.lower() in usados:  # sem distinguir maiúsculas (sistemas de arquivos do Windows e macOS)
+            n += 1
+            nome = f"{base}_{n}"
+        usados.add(nome.lower())
+        nomes.append(nome)
+    return nomes
+
+
+def process_case(caso: dict, output_dir: str, nome: str = None) -> dict:
+    """Busca os dados de um processo, gera o relatório e o e-mail e grava os arquivos de saída (`nome`: ver output_names)."""
+    inicio = time.perf_counter()
+    pasta = caso["pasta"]
+    try:
+        processo_data = _client.fetch_processo(pasta)
+        if not processo_data:
+            raise DataJuriError("Nenhum processo encontrado com este número.")
+        analise = analyze_case(caso, processo_data, _client.fetch_pedidos(pasta))
+
+        base_name = os.path.join(output_dir, nome or sanitize_pasta(pasta))
+        arquivos = [f"{base_name}_relatorio.txt"]
+        with open(arquivos[0], "w", encoding="utf-8") as f:
+            f.write(analise["relatorio"])
+        if analise["email"]:
+            arquivos.append(f"{base_name}_email.txt")
+            with open(arquivos[1], "w", encoding="utf-8") as f:
+                f.write(f"Assunto: {analise['email']['assunto']}\n\n{analise['email']['corpo']}")
+        return {"pasta": pasta, "ok": True, "arquivos": arquivos, "segundos": time.perf_counter() - inicio}
+    except Exception as e:
+        return {"pasta": pasta, "ok": False, "erro": str(e), "segundos": time.perf_counter() - inicio}
+
+
+def run_batch(casos: list[dict], output_dir: str, client: DataJuriClient, processos: int = None) -> list[dict]:
+    os.makedirs(output_dir, exist_ok=True)
+    access_token = client.access_token or client.authenticate()
+    resultados = []
+    with ProcessPoolExecutor(max_workers=processos, initializer=_init_worker, initargs=(client.base_url, access_token)) as executor:
+        futures = [executor.submit(process_case, caso, output_dir, nome) for caso, nome in zip(casos, output_names(casos))]
+        for future in as_completed(futures):
+            resultado = future.result()
+            resultados.append(resultado)
+            status = "OK " if resultado["ok"] else f"ERRO: {resultado['erro']}"
+            print(f"[{len(resultados)}/{len(casos)}] Pasta {resultado['pasta']}: {status}", flush=True)
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera relatórios internos e e-mails ao cliente para um lote de decisões.")
+    parser.add_argument("entrada", help="Arquivo CSV ou JSON com as decisões analisadas.")
+    parser.add_argument("--saida", default="relatorios_lote", help="Pasta onde os arquivos serão gravados.")
+    parser.add_argument("--processos", type=int, default=None, help="Número de processos em paralelo (padrão: nº de CPUs).")
+    args = parser.parse_args(argv)
+
+    try:
+        casos = read_input(args.entrada)
+        client = DataJuriClient.from_env()
+    except (OSError, ValueError, DataJuriError) as e:
+        sys.exit(f"Erro: {e}")
+
+    inicio = time.perf_counter()
+    resultados = run_batch(casos, args.saida, client, args.processos)
+    total = time.perf_counter() - inicio
+
+    ok = sum(r["ok"] for r in resultados)
+    print("-" * 60)
+    print(f"Casos processados: {len(resultados)} | sucesso: {ok} | erro: {len(resultados) - ok}")
+    print(f"Tempo total: {total:.2f} s | vazão: {len(resultados) / total if total else 0:.1f} casos/s")
+    if resultados:
+        print(f"Tempo médio por caso (no processo): {sum(r['segundos'] for r in resultados) / len(resultados) * 1000:.0f} ms")
+    return 0 if ok == len(resultados) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""Mini motor de modelos de texto (relatório interno, e-mail ao cliente, etc.).
+
+Os modelos ficam em arquivos .txt na pasta `modelos/` (ou na pasta indicada pela variável de
+ambiente ASSISTENTE_MODELOS_DIR), para que o escritório possa ajustar a redação sem alterar código.
+Cada modelo é compilado uma única vez por processo para uma função geradora Python e mantido em
+cache; se o arquivo for alterado, ele é recompilado automaticamente no próximo uso.
+
+Sintaxe suportada:
+    {{ nome }}                      valor do contexto (acesso a campos com ponto: {{ p.descricao }})
+    {{ nome|filtro }}               filtros: lower, upper, strip, default("x"), data("x"), moeda
+    {% if [not] nome %} ... {% elif [not] nome %} ... {% else %} ... {% endif %}
+    {% for item in nome %} ... {% endfor %}   (com loop.index, loop.first e loop.last)
+    {# comentário #}
+
+Uma linha que contém apenas uma tag de bloco ou comentário é removida por inteiro. O hífen
+({%- ... -%}) remove todos os espaços e quebras de linha antes/depois da tag.
+"""
+
+import ast
+import os
+import re
+import threading
+from datetime import date
+
+MODELOS_DIR = os.environ.get(
+    "ASSISTENTE_MODELOS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "modelos"),
+)
+
+_TOKEN_RE = re.compile(r"(\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\})", re.S)
+_EXPR_RE = re.compile(r"^(not\s+)?([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)((?:\s*\|\s*[A-Za-z_]\w*(?:\(.*?\))?)*)$", re.S)
+_FILTER_RE = re.compile(r"\|\s*([A-Za-z_]\w*)(?:\((.*?)\))?", re.S)
+
+
+class TemplateError(Exception):
+    """Erro de sintaxe ou de renderização de um modelo."""
+
+
+def _filter_data(value, default=""):
+    return value.strftime('%d/%m/%Y') if isinstance(value, date) else default
+
+
+def _filter_default(value, default=""):
+    return value if value else default
+
+
+FILTERS = {
+    "lower": lambda v: str(v).lower(),
+    "upper": lambda v: str(v).upper(),
+    "strip": lambda v: str(v).strip(),
+    "default": _filter_default,
+    "data": _filter_data,
+    "moeda": lambda v: f"{v:,.2f}",
+}
+
+
+class _Loop:
+    __slots__ = ("index", "first", "last")
+
+    def __init__(self, i, length):
+        self.index = i + 1
+        self.first = i == 0
+        self.last = i == length - 1
+
+
+def _attr(obj, name):
+    if isinstance(obj, dict):
+        return obj[name]
+    return getattr(obj, name)
+
+
+class _Context:
+    """Acesso às variáveis de nível superior com mensagem de erro clara."""
+
+    def __init__(self, data, template_name):
+        self.data = data
+        self.template_name = template_name
+
+    def __getitem__(self, name):
+        try:
+            return self.data[name]
+        except KeyError:
+            raise TemplateError(f"Modelo '{self.template_name}': variável '{name}' não definida no contexto.") from None
+
+
+def _tokenize(source):
+    """Divide o modelo em tokens (tipo, conteúdo) e aplica as regras de espaços em branco."""
+    parts = _TOKEN_RE.split(source)
+    tokens = []
+    for i, part in enumerate(parts):
+        if i % 2 == 0:
+            tokens.append(["text", part, False, False])
+        else:
+            kind = {"{{": "var", "{%": "block", "{#": "comment"}[part[:2]]
+            inner = part[2:-2]
+            strip_before = inner.startswith("-")
+            strip_after = inner.endswith("-")
+            inner = inner[1 if strip_before else 0:len(inner) - (1 if strip_after else 0)].strip()
+            tokens.append([kind, inner, strip_before, strip_after])
+
+    # Tags de bloco/comentário sozinhas na linha: a linha inteira é removida.
+    standalone = set()
+    last = len(tokens) - 1
+    for i in range(1, last, 2):
+        if tokens[i][0] == "var":
+            continue
+        prev, nxt = tokens[i - 1][1], tokens[i + 1][1]
+        at_line_start = bool(re.search(r"\n[ \t]*$", prev)) or (i == 1 and re.fullmatch(r"[ \t]*", prev))
+        at_line_end = bool(re.match(r"[ \t]*\r?\n", nxt)) or (i + 1 == last and re.fullmatch(r"[ \t]*", nxt))
+        if at_line_start and at_line_end:
+            standalone.add(i)
+    for i in sorted(standalone):
+        tokens[i - 1][1] = re.sub(r"[ \t]*$", "", tokens[i - 1][1])
+        tokens[i + 1][1] = re.sub(r"^[ \t]*(\r?\n)?", "", tokens[i + 1][1])
+
+    for i in range(1, last, 2):
+        if tokens[i][2]:
+            tokens[i - 1][1] = tokens[i - 1][1].rstrip()
+        if tokens[i][3]:
+            tokens[i + 1][1] = tokens[i + 1][1].lstrip()
+    return [(kind, content) for kind, content, _, _ in tokens]
+
+
+class _Compiler:
+    def __init__(self, name):
+        self.name = name
+        self.lines = ["def _render(_ctx):"]
+        self.indent = 1
+        self.stack = []  # ('if'|'for', loop_var, depth, body_vazio)
+        self.body_empty = [False]
+
+    def error(self, msg):
+        raise TemplateError(f"Modelo '{self.name}': {msg}")
+
+    def emit(self, line):
+        self.lines.append("    " * self.indent + line)
+        self.body_empty[-1] = False
+
+    def open_block(self, line):
+        self.emit(line)
+        self.indent += 1
+        self.body_empty.append(True)
+
+    def close_body(self):
+        if self.body_empty.pop():
+            self.lines.append("    " * self.indent + "pass")
+        self.indent -= 1
+
+    def loop_vars(self):
+        return {entry[1]: entry[2] for entry in self.stack if entry[0] == "for"}
+
+    def expr(self, text):
+        match = _EXPR_RE.match(text.strip())
+        if not match:
+            self.error(f"expressão inválida: '{text}'")
+        negate, path, filters = match.groups()
+        names = path.split(".")
+        loop_vars = self.loop_vars()
+        if names[0] == "loop":
+            depths = [entry[2] for entry in self.stack if entry[0] == "for"]
+            if not depths:
+                self.error("'loop' usado fora de um bloco for.")
+            code = f"_loop{depths[-1]}"
+        elif names[0] in loop_vars:
+            code = f"_v{loop_vars[names[0]]}"
+        else:
+            code = f"_ctx[{names[0]!r}]"
+        for attr in names[1:]:
+            code = f"_attr({code}, {attr!r})"
+        for fname, fargs in _FILTER_RE.findall(filters or ""):
+            if fname not in FILTERS:
+                self.error(f"filtro desconhecido: '{fname}'")
+            args = ""
+            if fargs.strip():
+                try:
+                    value = ast.literal_eval(fargs.strip())
+                except (ValueError, SyntaxError):
+                    self.error(f"argumento inválido para o filtro '{fname}': {fargs}")
+                args = f", {value!r}"
+            code = f"_filters[{fname!r}]({code}{args})"
+        return f"(not {code})" if negate else code
+
+    def compile(self, source):
+        for kind, content in _tokenize(source):
+            if kind == "text":
+                if content:
+                    self.emit(f"yield {content!r}")
+            elif kind == "var":
+                self.emit(f"yield str({self.expr(content)})")
+            elif kind == "block":
+                self.block(content)
+        if self.stack:
+            self.error(f"bloco '{self.stack[-1][0]}' não foi fechado.")
+        self.emit("return")
+        return "\n".join(self.lines)
+
+    def block(self, content):
+        keyword, _, rest = content.partition(" ")
+        rest = rest.strip()
+        if keyword == "if":
+            self.stack.append(("if", None, None))
+            self.open_block(f"if {self.expr(rest)}:")
+        elif keyword in ("elif", "else"):
+            if not self.stack or self.stack[-1][0] != "if":
+                self.error(f"'{keyword}' sem 'if' correspondente.")
+            self.close_body()
+            self.open_block(f"elif {self.expr(rest)}:" if keyword == "elif" else "else:")
+        elif keyword == "endif":
+            if not self.stack or self.stack.pop()[0] != "if":
+                self.error("'endif' sem 'if' correspondente.")
+            self.close_body()
+        elif keyword == "for":
+            match = re.match(r"^([A-Za-z_]\w*)\s+in\s+(.+)$", rest)
+            if not match:
+                self.error(f"laço inválido: '{content}'")
+            depth = len(self.stack)
+            seq = self.expr(match.group(2))
+            self.emit(f"_seq{depth} = list({seq})")
+            self.stack.append(("for", match.group(1), depth))
+            self.open_block(f"for _i{depth}, _v{depth} in enumerate(_seq{depth}):")
+            self.emit(f"_loop{depth} = _Loop(_i{depth}, len(_seq{depth}))")
+        elif keyword == "endfor":
+            if not self.stack or self.stack.pop()[0] != "for":
+                self.error("'endfor' sem 'for' correspondente.")
+            self.close_body()
+        else:
+            self.error(f"tag desconhecida: '{keyword}'")
+
+
+class Template:
+    """Modelo compilado. Use render() para obter o texto ou stream() para gerá-lo em partes."""
+
+    def __init__(self, source: str, name: str = "<string>"):
+        self.name = name
+        code = _Compiler(name).compile(source)
+        namespace = {"_attr": _attr, "_filters": FILTERS, "_Loop": _Loop}
+        exec(compile(code, f"<modelo {name}>", "exec"), namespace)
+        self._render = namespace["_render"]
+
+    def stream(self, context: dict):
+        """Gera o texto em partes, sem montar a string inteira em memória."""
+        try:
+            yield from self._render(_Context(context, self.name))
+        except (KeyError, AttributeError, TypeError, ValueError) as e:
+            raise TemplateError(f"Modelo '{self.name}': falha ao renderizar ({e!r}).") from e
+
+    def render(self, context: dict) -> str:
+        return "".join(self.stream(context))
+
+    def stream_to(self, fp, context: dict):
+        """Escreve o texto renderizado diretamente em um arquivo aberto."""
+        for chunk in self.stream(context):
+            fp.write(chunk)
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_template(name: str) -> Template:
+    """Carrega e compila o modelo `name` da pasta de modelos, reaproveitando a versão em cache."""
+    path = os.path.join(MODELOS_DIR, name)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        raise TemplateError(f"Modelo '{name}' não encontrado em '{MODELOS_DIR}'.") from None
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    with open(path, encoding="utf-8") as f:
+        template = Template(f.read(), name)
+    with _cache_lock:
+        _cache[path] = (mtime, template)
+    return template
+
+
+def render(name: str, context: dict) -> str:
+    return get_template(name).render(context)
+
+
+def render_many(name: str, contexts):
+    """Renderiza um modelo para vários contextos, um de cada vez (geração em lote)."""
+    template = get_template(name)
+    for context in contexts:
+        yield template.render(context)
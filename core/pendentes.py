@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""Índice em memória das atualizações pendentes do robô, mantido por um observador da pasta.
+
+O PendingIndex acompanha o diário de atualizações (core.journal) de forma incremental: a cada
+aviso do observador, lê apenas os registros novos e descarta os que o robô já processou (offset do
+consumidor). As consultas — o que está pendente para a pasta X, para o pedido Y, o que está
+esperando há mais de N minutos — respondem a partir do índice, sem ler arquivos.
+
+O FolderWatcher usa inotify (Linux, via ctypes) para ser avisado de gravações no diário e nos
+offsets; em outros sistemas, ou se o inotify não estiver disponível, verifica a pasta
+periodicamente.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import sys
+import threading
+import time
+from datetime import datetime
+
+from .journal import UpdateJournal
+from .robo import CONSUMIDOR
+
+# Eventos do inotify (linux/inotify.h).
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+
+def _load_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FolderWatcher(threading.Thread):
+    """Chama `callback()` sempre que algo muda nas pastas observadas (inotify ou verificação periódica)."""
+
+    def __init__(self, paths: list[str], callback, intervalo: float = 2.0, debounce: float = 0.05, usar_inotify: bool = True):
+        super().__init__(name="pendentes-watcher", daemon=True)
+        self.paths = paths
+        self.callback = callback
+        self.intervalo = intervalo
+        self.debounce = debounce
+        self._stop_event = threading.Event()
+        self._libc = _load_inotify() if usar_inotify else None
+        self._fd = -1
+        if self._libc:
+            self._fd = self._libc.inotify_init1(IN_CLOEXEC)
+            if self._fd < 0:
+                logging.warning(f"inotify indisponível (errno {ctypes.get_errno()}); usando verificação periódica.")
+                self._libc = None
+        self.modo = "inotify" if self._libc else "polling"
+
+    def _add_watches(self):
+        # Chamado também depois de cada evento: se o diretório foi trocado (rewrite_tail), ganha um novo watch.
+        for path in self.paths:
+            if os.path.isdir(path):
+                self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+
+    def _notify(self):
+        try:
+            self.callback()
+        except Exception:
+            logging.exception("Erro ao atualizar o índice de pendências.")
+
+    def run(self):
+        if not self._libc:
+            while not self._stop_event.wait(self.intervalo):
+                self._notify()
+            return
+        try:
+            self._add_watches()
+            while not self._stop_event.is_set():
+                ready, _, _ = select.select([self._fd], [], [], 1.0)
+                if not ready:
+                    continue
+                # Junta uma rajada de eventos (ex.: gravação + fsync + rename) em uma única atualização.
+                os.read(self._fd, 65536)
+                time.sleep(self.debounce)
+                while select.select([self._fd], [], [], 0)[0]:
+                    os.read(self._fd, 65536)
+                self._add_watches()
+                self._notify()
+        finally:
+            os.close(self._fd)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def _parse_ts(ts):
+    try:
+        return datetime.fromisoformat(ts)
+    except (TypeError, ValueError):
+        return datetime.now()
+
+
+class PendingIndex:
+    """Registros do diário ainda não processados pelo consumidor, indexados por pasta e por pedido."""
+
+    def __init__(self, folder: str, consumer: str = CONSUMIDOR):
+        self.journal = UpdateJournal(folder)
+        self.consumer = consumer
+        self._lock = threading.RLock()
+        self._watcher = None
+        self._reset()
+        self.refresh()
+
+    def _reset(self):
+        self._records = {}    # seq -> registro (em ordem de seq: o primeiro é o mais antigo)
+        self._by_pasta = {}   # pasta -> {seq: registro}
+        self._by_pedido = {}  # (pasta, id) -> {seq: tarefa}
+        self._last_seq = 0
+        self._offset = 0
+        self._journal_inode = None
+        self.atualizado_em = None
+
+    def _journal_dir_inode(self):
+        try:
+            return os.stat(self.journal.journal_dir).st_ino
+        except FileNotFoundError:
+            return None
+
+    def _add(self, record):
+        record = dict(record, ts=_parse_ts(record.get("ts")))
+        seq, pasta = record["seq"], record["pasta"]
+        self._records[seq] = record
+        if not record["tasks"]:
+            return
+        self._by_pasta.setdefault(pasta, {})[seq] = record
+        for task in record["tasks"]:
+            if task.get("id") is not None:
+                self._by_pedido.setdefault((pasta, task["id"]), {})[seq] = task
+
+    def _remove_until(self, offset):
+        while self._records:
+            seq = next(iter(self._records))
+            if seq > offset:
+                break
+            record = self._records.pop(seq)
+            pasta = record["pasta"]
+            por_pasta = self._by_pasta.get(pasta)
+            if por_pasta is not None:
+                por_pasta.pop(seq, None)
+                if not por_pasta:
+                    del self._by_pasta[pasta]
+            for task in record["tasks"]:
+                key = (pasta, task.get("id"))
+                por_pedido = self._by_pedido.get(key)
+                if por_pedido is not None:
+                    por_pedido.pop(seq, None)
+                    if not por_pedido:
+                        del self._by_pedido[key]
+
+    def refresh(self):
+        """Incorpora os registros novos e descarta os já processados. Custo proporcional às mudanças."""
+        with self._lock:
+            inode = self._journal_dir_inode()
+            if inode != self._journal_inode:  # diário reescrito pela compactação: reconstrói o índice
+                self._reset()
+                self._journal_inode = inode
+            offset = self.journal.get_offset(self.consumer)
+            for record in self.journal.read(max(self._last_seq, offset)):
+                self._add(record)
+                self._last_seq = record["seq"]
+            if offset > self._offset:
+                self._remove_until(offset)
+                self._offset = offset
+            self._last_seq = max(self._last_seq, offset)
+            self.atualizado_em = datetime.now()
+
+    # ------------------------------------------------------------------ observador
+
+    def start_watching(self, intervalo: float = 2.0, usar_inotify: bool = True) -> FolderWatcher:
+        with self._lock:
+            if self._watcher is None or not self._watcher.is_alive():
+                paths = [self.journal.folder, self.journal.journal_dir, self.journal.offsets_dir]
+                self._watcher = FolderWatcher(paths, self.refresh, intervalo, usar_inotify=usar_inotify)
+                self._watcher.start()
+            return self._watcher
+
+    def stop_watching(self):
+        if self._watcher:
+            self._watcher.stop()
+            self._watcher.join(timeout=5)
+
+    # ------------------------------------------------------------------ consultas
+
+    def for_pasta(self, pasta) -> list[dict]:
+        """Registros pendentes da pasta, do mais antigo para o mais recente."""
+        with self._lock:
+            return list(self._by_pasta.get(str(pasta), {}).values())
+
+    def for_pedido(self, pasta, pedido_id) -> dict:
+        """Estado pendente de um pedido: valor final de cada campo (o mais recente prevalece)."""
+        with self._lock:
+            tasks = list(self._by_pedido.get((str(pasta), pedido_id), {}).items())
+        campos, acao = {}, None
+        for _, task in tasks:
+            if task.get("acao") == "excluir":
+                acao, campos = "excluir", {}
+            elif acao != "excluir":
+                acao = "alterar"
+                campos.update({k: v for k, v in task.items() if k not in ("id", "acao")})
+        return {"acao": acao, "campos": campos, "registros": [seq for seq, _ in tasks]}
+
+    def summary(self, agora: datetime = None) -> list[dict]:
+        """Uma linha por pasta com pendências, da espera mais longa para a mais curta."""
+        agora = agora or datetime.now()
+        with self._lock:
+            linhas = []
+            for pasta, records in self._by_pasta.items():
+                primeiro = next(iter(records.values()))
+                linhas.append({
+                    "pasta": pasta,
+                    "registros": len(records),
+                    "tarefas": sum(len(r["tasks"]) for r in records.values()),
+                    "mais_antigo": primeiro["ts"],
+                    "idade_min": (agora - primeiro["ts"]).total_seconds() / 60,
+                })
+        return sorted(linhas, key=lambda linha: linha["mais_antigo"])
+
+    def older_than(self, minutos: float, agora: datetime = None) -> list[dict]:
+        return [linha for linha in self.summary(agora) if linha["idade_min"] >= minutos]
+
+    def stats(self) -> dict:
+        with self._lock:
+            primeiro = next((r for r in self._records.values() if r["tasks"]), None)
+            return {
+                "registros": sum(len(r) for r in self._by_pasta.values()),
+                "pastas": len(self._by_pasta),
+                "pedidos": len(self._by_pedido),
+                "tarefas": sum(len(r["tasks"]) for r in self._records.values()),
+                "mais_antigo": primeiro["ts"] if primeiro else None,
+                "ultimo_seq": self._last_seq,
+                "offset": self._offset,
+                "atualizado_em": self.atualizado_em,
+                "modo": self._watcher.modo if self._watcher else None,
+            }
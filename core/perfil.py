@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""Perfil de desempenho por execução da página: tempo de cada etapa nomeada e, opcionalmente, o cProfile.
+
+O painel de desempenho dos apps (?perfil=1, com PERFIL_PAINEL habilitado) guarda um PerfilSessao na
+sessão. Cada execução da página (ou só de um fragmento) é aberta com start() e fechada com finish();
+no meio, as etapas são medidas com PerfilSessao.etapa(nome) (blocos aninhados) ou PerfilSessao.marco(nome)
+(trechos em sequência de um script sem funções, como o Appgama). Cada etapa registra o início em relação
+à execução, a duração e o tempo de CPU da thread.
+
+O código compartilhado marca as próprias etapas com a função etapa(nome) deste módulo (por exemplo, o
+diff dos pedidos em core.geracao): ela mede apenas quando há uma execução perfilada nesta thread e, fora
+disso, não faz nada.
+
+Com `cprofile` ligado, cada execução roda sob um cProfile.Profile e as últimas `execucoes_cprofile` ficam
+guardadas como pstats.Stats; dump() junta as estatísticas em um arquivo .prof (python -m pstats, snakeviz).
+"""
+
+import contextlib
+import cProfile
+import io
+import pstats
+import threading
+import time
+from collections import deque
+
+PERFIL_HISTORICO = 200  # Execuções guardadas por sessão para os percentis
+PERFIL_CPROFILE_EXECUCOES = 20  # Execuções com cProfile guardadas para dump()
+
+_local = threading.local()  # Perfil da execução aberta nesta thread (etapa())
+
+
+def etapa(nome: str):
+    """Etapa nomeada da execução perfilada nesta thread; sem execução perfilada, não mede nada."""
+    perfil = getattr(_local, "perfil", None)
+    return perfil.etapa(nome) if perfil is not None else contextlib.nullcontext()
+
+
+def _percentil(valores: list, q: float) -> float:
+    """Percentil pelo posto mais próximo (valores já ordenados)."""
+    return valores[min(len(valores) - 1, int(len(valores) * q))]
+
+
+class PerfilSessao:
+    """Etapas de cada execução da sessão, com os percentis das últimas execuções e o cProfile opcional."""
+
+    def __init__(self, historico: int = PERFIL_HISTORICO, execucoes_cprofile: int = PERFIL_CPROFILE_EXECUCOES):
+        self.execucoes = deque(maxlen=historico)
+        self.perfis = deque(maxlen=execucoes_cprofile)  # pstats.Stats das últimas execuções com cProfile
+        self.cprofile = False
+        self._atual = None
+        self._pilha = []  # etapas abertas (etapa())
+        self._marco = None  # trecho aberto (marco())
+        self._pendentes = []  # etapas medidas antes da execução começar (callbacks dos widgets)
+        self._profiler = None
+
+    @property
+    def em_execucao(self) -> bool:
+        return self._atual is not None
+
+    def start(self, escopo: str, inicio: float | None = None, inicio_cpu: float | None = None):
+        """Abre a execução. `inicio`/`inicio_cpu`: time.perf_counter()/time.thread_time() do começo do script.
+
+        Uma execução anterior ainda aberta foi interrompida (st.rerun, st.stop ou erro) e é fechada como tal.
+        """
+        if self._atual is not None:
+            self.finish(interrompida=True)
+        self._atual = {
+            "escopo": escopo, "quando": time.time(), "t0": time.perf_counter() if inicio is None else inicio,
+            "c0": time.thread_time() if inicio_cpu is None else inicio_cpu, "etapas": self._pendentes,
+        }
+        self._pendentes = []
+        _local.perfil = self
+        if self.cprofile:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # outro profiler ativo (Python 3.12+: sys.monitoring é do processo todo)
+                return
+            self._profiler = profiler
+
+    def finish(self, interrompida: bool = False) -> dict | None:
+        """Fecha a execução aberta e a guarda no histórico."""
+        atual, self._atual = self._atual, None
+        if atual is None:
+            return None
+        if self._profiler is not None:
+            self._profiler.disable()
+            self.perfis.append(pstats.Stats(self._profiler))
+            self._profiler = None
+        fim, fim_cpu = time.perf_counter(), time.thread_time()
+        if self._marco is not None:
+            self._fechar(self._marco, fim, fim_cpu)
+            self._marco = None
+        while self._pilha:  # etapas interrompidas por exceção fora do bloco
+            self._fechar(self._pilha.pop(), fim, fim_cpu)
+        if getattr(_local, "perfil", None) is self:
+            _local.perfil = None
+        t0 = atual["t0"]
+        execucao = {
+            "escopo": atual["escopo"], "quando": atual["quando"], "interrompida": interrompida,
+            "total_ms": (fim - t0) * 1000, "cpu_ms": (fim_cpu - atual["c0"]) * 1000,
+            "etapas": [{"etapa": e["etapa"], "nivel": e["nivel"], "inicio_ms": (e["t"] - t0) * 1000,
+                        "ms": e["ms"], "cpu_ms": e["cpu_ms"]} for e in atual["etapas"]],
+        }
+        self.execucoes.append(execucao)
+        return execucao
+
+    def _abrir(self, nome: str, nivel: int) -> dict:
+        registro = {"etapa": nome, "nivel": nivel, "t": time.perf_counter(), "c": time.thread_time()}
+        (self._atual["etapas"] if self._atual is not None else self._pendentes).append(registro)
+        return registro
+
+    @staticmethod
+    def _fechar(registro: dict, fim: float | None = None, fim_cpu: float | None = None):
+        registro["ms"] = ((fim or time.perf_counter()) - registro["t"]) * 1000
+        registro["cpu_ms"] = ((fim_cpu or time.thread_time()) - registro.pop("c")) * 1000
+
+    @contextlib.contextmanager
+    def etapa(self, nome: str):
+        """Mede o bloco como uma etapa, aninhada nas etapas abertas.
+
+        Fora de uma execução (nos callbacks, que rodam antes do script), a etapa entra na próxima execução,
+        com início negativo.
+        """
+        registro = self._abrir(nome, len(self._pilha) + (self._marco is not None))
+        self._pilha.append(registro)
+        try:
+            yield
+        finally:
+            if self._pilha and self._pilha[-1] is registro:
+                self._pilha.pop()
+                self._fechar(registro)
+
+    def marco(self, nome: str):
+        """Fecha o trecho anterior e abre o trecho `nome`, que vai até o próximo marco ou o fim da execução."""
+        if self._atual is None:
+            return
+        if self._marco is not None:
+            self._fechar(self._marco)
+        self._marco = self._abrir(nome, 0)
+
+    def percentiles(self) -> list[dict]:
+        """p50, p95 e máximo (ms) e CPU média de cada etapa e do total de cada escopo, nas execuções guardadas."""
+        amostras = {}
+        for execucao in self.execucoes:
+            amostras.setdefault(f"[{execucao['escopo']}]", []).append((execucao["total_ms"], execucao["cpu_ms"]))
+            for e in execucao["etapas"]:
+                amostras.setdefault(e["etapa"], []).append((e["ms"], e["cpu_ms"]))
+        linhas = []
+        for nome, valores in amostras.items():
+            tempos = sorted(v[0] for v in valores)
+            linhas.append({"etapa": nome, "execuções": len(valores), "p50 ms": _percentil(tempos, 0.5),
+                           "p95 ms": _percentil(tempos, 0.95), "máx ms": tempos[-1],
+                           "CPU média ms": sum(v[1] for v in valores) / len(valores)})
+        return linhas
+
+    def merged_stats(self) -> pstats.Stats | None:
+        """Estatísticas do cProfile das execuções guardadas, somadas."""
+        if not self.perfis:
+            return None
+        stats = pstats.Stats()
+        stats.add(*self.perfis)
+        return stats
+
+    def dump(self, caminho: str) -> int:
+        """Grava as estatísticas do cProfile das últimas execuções em `caminho` (formato pstats). Retorna quantas."""
+        stats = self.merged_stats()
+        if stats is None:
+            return 0
+        stats.dump_stats(caminho)
+        return len(self.perfis)
+
+    def top_functions(self, limite: int = 25, ordem: str = "cumulative") -> str:
+        """Texto do pstats com as `limite` funções de maior custo nas execuções guardadas."""
+        stats = self.merged_stats()
+        if stats is None:
+            return ""
+        saida = io.StringIO()
+        stats.stream = saida
+        stats.sort_stats(ordem).print_stats(limite)
+        return saida.getvalue()
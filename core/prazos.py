@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Cálculo de dias úteis e sugestão de prazos (ED / recurso).
+
+As bibliotecas holidays e numpy são importadas no primeiro uso; preload_holidays carrega o calendário
+em segundo plano durante a inicialização do app.
+"""
+
+import threading
+from datetime import date, timedelta
+from functools import lru_cache
+
+# Prazo D- interno (em dias úteis) em relação à data fatal.
+D_MENOS_PADRAO = -3
+
+
+@lru_cache(maxsize=None)
+def get_holidays(year):
+    """Feriados nacionais do ano como conjunto imutável de datas (seguro para compartilhar entre sessões)."""
+    import holidays
+    return frozenset(holidays.country_holidays('BR', years=year))
+
+
+_preload_lock = threading.Lock()
+_preload_thread = None
+
+
+def preload_holidays(anos=None) -> threading.Thread:
+    """Carrega em segundo plano, uma vez por processo, os feriados do ano atual e do seguinte."""
+    global _preload_thread
+    with _preload_lock:
+        if _preload_thread is None:
+            anos = anos or (date.today().year, date.today().year + 1)
+            _preload_thread = threading.Thread(target=lambda: [get_holidays(ano) for ano in anos], name="preload-feriados", daemon=True)
+            _preload_thread.start()
+        return _preload_thread
+
+
+def add_business_days(from_date, num_days):
+    """Adiciona ou subtrai dias úteis de uma data, considerando feriados nacionais."""
+    if not isinstance(from_date, date): return None
+    current_date, days_added = from_date, 0
+    increment = 1 if num_days >= 0 else -1
+    while days_added < abs(num_days):
+        current_date += timedelta(days=increment)
+        if current_date.weekday() < 5 and current_date not in get_holidays(current_date.year):
+            days_added += 1
+    return current_date
+
+
+def add_business_days_array(datas, num_days):
+    """add_business_days para um array de datas (datetime64[D]) e um número (ou array, com o mesmo sinal) de dias úteis."""
+    import numpy as np
+    datas = np.asarray(datas, dtype="datetime64[D]")
+    if datas.size == 0:
+        return datas
+    anos = datas.astype("datetime64[Y]").astype(int) + 1970
+    feriados = sorted(set().union(*(get_holidays(int(ano)) for ano in range(anos.min(), anos.max() + 2))))
+    # Data inicial em fim de semana/feriado: conta a partir do dia útil adjacente, como add_business_days.
+    roll = "backward" if np.all(np.asarray(num_days) >= 0) else "forward"
+    return np.busday_offset(datas, num_days, roll=roll, holidays=np.array(feriados, dtype="datetime64[D]"))
+
+
+def suggest_prazo(data_ciencia, ed_status, recurso_selecionado=None, recurso_outro_especificar="", d_menos=D_MENOS_PADRAO):
+    """Sugere o prazo de ED ou de recurso a partir da data da ciência. Retorna None se não houver sugestão."""
+    if not data_ciencia:
+        return None
+    if ed_status == "Cabe ED":
+        prazo_fatal = add_business_days(data_ciencia, 5)
+        if prazo_fatal:
+            return {"descricao": "Prazo para Oposição de Embargos de Declaração", "data_fatal": prazo_fatal, "data_d": add_business_days(prazo_fatal, d_menos), "obs": ""}
+    elif ed_status == "Não cabe ED" and recurso_selecionado:
+        prazo_dias = 15 if "Extraordinário" in recurso_selecionado else 8
+        prazo_fatal = add_business_days(data_ciencia, prazo_dias)
+        if prazo_fatal:
+            if recurso_selecionado == "Não Interpor Recurso":
+                descricao = "Verificar interposição de recurso pela parte contrária"
+                data_d = prazo_fatal
+            else:
+                recurso_final = recurso_selecionado if recurso_selecionado != "Outro" else recurso_outro_especificar
+                descricao = f"Prazo para Interposição de {recurso_final}"
+                data_d = add_business_days(prazo_fatal, d_menos)
+            return {"descricao": descricao, "data_fatal": prazo_fatal, "data_d": data_d, "obs": ""}
+    return None
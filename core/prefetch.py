@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Busca antecipada (prefetch) dos dados de uma pasta em segundo plano, enquanto o analista ainda digita.
+
+Prefetcher guarda, por sessão, só a busca da última pasta informada. Uma nova pasta cancela a anterior:
+se ela ainda não começou, não é executada; se já está em andamento, não faz a requisição seguinte e
+seu resultado é descartado. A busca roda em uma thread sem acesso ao st.session_state: quem aplica o
+resultado é a execução do script que o pede com take(), e só para a pasta que está na tela. Assim, uma
+busca atrasada de uma pasta anterior nunca sobrescreve o estado mais novo.
+"""
+
+import logging
+import threading
+import time
+
+from .logs import copy_log_context
+
+PREFETCH_VALIDADE = 120  # segundos; um resultado mais antigo é descartado e a busca é refeita
+
+
+class Prefetcher:
+    """Busca em segundo plano da última chave pedida (uma por sessão), em um executor compartilhado."""
+
+    def __init__(self, executor, validade: float = PREFETCH_VALIDADE):
+        self._executor = executor
+        self.validade = validade
+        self._lock = threading.Lock()
+        self._atual = None  # (chave, future, evento de cancelamento)
+
+    def start(self, chave, fetch):
+        """Começa a buscar `chave` com fetch(cancelado: threading.Event). Cancela a busca de outra chave."""
+        with self._lock:
+            if self._atual is not None and self._atual[0] == chave and not self._expirada(self._atual[1]):
+                return self._atual[1]
+            self._cancelar()
+            cancelado = threading.Event()
+            future = self._executor.submit(copy_log_context(pasta=chave, etapa="busca antecipada").run, fetch, cancelado)
+            future.add_done_callback(_marcar_fim)
+            self._atual = (chave, future, cancelado)
+            return future
+
+    def cancel(self):
+        with self._lock:
+            self._cancelar()
+
+    def _cancelar(self):
+        if self._atual is not None:
+            chave, future, cancelado = self._atual
+            cancelado.set()
+            future.cancel()
+            self._atual = None
+            logging.debug(f"Prefetch cancelado: {chave}")
+
+    def _expirada(self, future) -> bool:
+        fim = getattr(future, "fim", None)
+        return fim is not None and time.monotonic() - fim > self.validade
+
+    def pending(self, chave) -> bool:
+        """Indica se há uma busca de `chave` ainda em andamento."""
+        with self._lock:
+            return self._atual is not None and self._atual[0] == chave and not self._atual[1].done()
+
+    def take(self, chave, timeout: float = None):
+        """Resultado da busca de `chave`, aguardando se ela ainda estiver em andamento.
+
+        Retorna None se não houver busca dessa chave (ou se ela falhou, foi cancelada ou expirou): nesse
+        caso, quem chama faz a busca normalmente. O resultado é consumido; um novo take() busca de novo.
+        """
+        with self._lock:
+            atual = self._atual
+            if atual is None or atual[0] != chave:
+                return None
+            self._atual = None
+        try:
+            resultado = atual[1].result(timeout)
+        except Exception as e:  # inclui cancelamento e timeout
+            logging.warning(f"Prefetch failed ({chave}): {e!r}")
+            return None
+        if self._expirada(atual[1]):
+            return None
+        return resultado
+
+
+def _marcar_fim(future):
+    future.fim = time.monotonic()
+
+
+def fetch_case(base_url: str, access_token: str, pasta: str, cancelado: threading.Event = None, store=None) -> dict | None:
+    """Busca o processo e os pedidos da pasta (sem Streamlit). Retorna None se for cancelada no meio."""
+    from .datajuri import DataJuriClient
+    client = DataJuriClient(base_url, access_token=access_token, store=store)
+    processo = client.fetch_processo(pasta)
+    if cancelado is not None and cancelado.is_set():
+        return None
+    pedidos = client.fetch_pedidos(pasta) if processo else []
+    return {"processo": processo, "pedidos": pedidos}
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""Casos recentes da sessão: o estado completo das últimas pastas abertas, para retomá-las sem consultar a API.
+
+Ao sair de uma pasta (buscando outra ou retomando uma recente), o app guarda o que é do caso: os dados do
+processo, os pedidos com as alterações da sessão, os prazos, o estado da geração e os valores do
+formulário (WIDGETS_FORMULARIO). Retomar a pasta devolve tudo isso ao st.session_state, sem requisições.
+
+CasosRecentes é um LRU limitado pelo número de casos e pela memória estimada. A tabela de pedidos da
+pasta (core.estado_pedidos.PedidosBase) é compartilhada entre sessões, mas é o caso guardado que a
+mantém em memória, então ela entra na conta de cada caso e uma única vez no total.
+"""
+
+import json
+import time
+from collections import OrderedDict
+
+RECENTES_MAX_CASOS = 8
+RECENTES_MAX_BYTES = 16 * 1024 * 1024
+
+# Widgets do formulário de análise: campo do caso (core.analise.CAMPOS_CASO) -> chave do widget (a mesma nos dois apps).
+WIDGETS_FORMULARIO = {
+    "data_ciencia": "data_ciencia", "cliente_role": "cliente_role", "tipo_decisao": "tipo_decisao",
+    "resultado_sentenca": "resultado_sentenca", "obs_sentenca": "obs_sentenca", "ed_status": "ed_status",
+    "justificativa_ed": "justificativa_ed", "recurso_selecionado": "recurso_sel",
+    "recurso_outro_especificar": "recurso_outro_txt", "recurso_justificativa": "recurso_justificativa",
+    "valor_condenacao": "valor_condenacao", "deposito_recolhido": "deposito_recolhido",
+    "percentual_custas": "percentual_custas", "isencao_deposito": "isencao_deposito",
+    "outro_motivo_deposito": "outro_motivo_deposito_input", "pagamento_metade_deposito": "pagamento_metade_deposito",
+    "isencao_custas": "isencao_custas", "outro_motivo_custas": "outro_motivo_custas_input",
+    "obs_finais": "obs_finais", "advogado_responsavel": "advogado_responsavel",
+}
+# Demais chaves do st.session_state que pertencem ao caso aberto.
+ESTADO_CASO = ("processo_data", "pedidos", "pedidos_gerados", "prazos", "report_generated", "secoes")
+
+
+def capture_case(estado) -> dict:
+    """Estado do caso aberto (`estado`: o st.session_state), para guardar em CasosRecentes."""
+    # Listas e dicionários são copiados: o app continua a alterá-los no lugar (prazos, seções) no próximo caso.
+    return {
+        "estado": {chave: _copia(estado[chave]) for chave in ESTADO_CASO if chave in estado},
+        "formulario": {chave: estado[chave] for chave in WIDGETS_FORMULARIO.values() if chave in estado},
+    }
+
+
+def _copia(valor):
+    if isinstance(valor, dict):
+        return dict(valor)
+    if isinstance(valor, list):
+        return list(valor)
+    return valor
+
+
+def restore_case(estado, caso: dict):
+    """Devolve o caso ao st.session_state. Deve rodar antes dos widgets serem criados (em um callback).
+
+    Os campos do formulário que não tinham valor voltam ao padrão do widget.
+    """
+    estado.update(caso["estado"])
+    for chave in WIDGETS_FORMULARIO.values():
+        if chave in caso["formulario"]:
+            estado[chave] = caso["formulario"][chave]
+        elif chave in estado:
+            del estado[chave]
+    if caso["estado"].get("pedidos") is not None:
+        caso["estado"]["pedidos"].retomar()
+
+
+def _bases(caso: dict) -> dict:
+    """Tamanho das tabelas de pedidos compartilhadas que o caso mantém em memória, pelo id da tabela."""
+    pedidos = (caso["estado"].get("pedidos"), caso["estado"].get("pedidos_gerados"))
+    return {id(p.base): p.base.nbytes for p in pedidos if p is not None}
+
+
+def _proprios(caso: dict) -> int:
+    estado = caso["estado"]
+    total = len(json.dumps([estado.get("processo_data"), estado.get("prazos"), estado.get("secoes"), caso["formulario"]],
+                           default=str).encode("utf-8"))
+    for chave in ("pedidos", "pedidos_gerados"):
+        if estado.get(chave) is not None:
+            total += estado[chave].nbytes
+    return total
+
+
+def case_nbytes(caso: dict) -> int:
+    """Memória estimada do caso: estado serializado, alterações dos pedidos e as tabelas que ele mantém."""
+    return _proprios(caso) + sum(_bases(caso).values())
+
+
+class CasosRecentes:
+    """LRU dos casos guardados da sessão, limitado por número de casos e por memória estimada."""
+
+    def __init__(self, max_casos: int = RECENTES_MAX_CASOS, max_bytes: int = RECENTES_MAX_BYTES):
+        self.max_casos = max_casos
+        self.max_bytes = max_bytes
+        self.descartados = 0
+        self._casos = OrderedDict()  # pasta -> (caso, bytes próprios, {id da tabela: bytes}, quando)
+
+    def put(self, pasta: str, caso: dict):
+        """Guarda o caso como o mais recente e descarta os mais antigos acima dos limites."""
+        self._casos.pop(pasta, None)
+        self._casos[pasta] = (caso, _proprios(caso), _bases(caso), time.time())
+        while self._casos and (len(self._casos) > self.max_casos or self.nbytes > self.max_bytes):
+            self._casos.popitem(last=False)
+            self.descartados += 1
+
+    def pop(self, pasta: str) -> dict | None:
+        """Retira o caso para retomá-lo (o caso aberto não fica na lista)."""
+        item = self._casos.pop(pasta, None)
+        return item[0] if item else None
+
+    def __contains__(self, pasta) -> bool:
+        return pasta in self._casos
+
+    def __len__(self) -> int:
+        return len(self._casos)
+
+    def entries(self) -> list[dict]:
+        """Casos guardados, do mais recente ao mais antigo: pasta, dados do processo, tamanho e resumo."""
+        resultado = []
+        for pasta, (caso, proprios, bases, quando) in reversed(self._casos.items()):
+            estado = caso["estado"]
+            pedidos = estado.get("pedidos")
+            resultado.append({
+                "pasta": pasta,
+                "processo": estado.get("processo_data") or {},
+                "bytes": proprios + sum(bases.values()),
+                "quando": quando,
+                "prazos": len(estado.get("prazos") or []),
+                "alterado": bool(pedidos is not None and pedidos.tem_alteracoes),
+            })
+        return resultado
+
+    @property
+    def nbytes(self) -> int:
+        """Memória estimada dos casos guardados, com cada tabela compartilhada contada uma vez."""
+        todas = {}
+        total = 0
+        for _, proprios, bases, _ in self._casos.values():
+            todas.update(bases)
+            total += proprios
+        return total + sum(todas.values())
+
+    def stats(self) -> dict:
+        return {"casos": len(self._casos), "bytes": self.nbytes, "descartados": self.descartados}
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""Servidor local que imita o Redis, para testar o backend Redis de core.armazenamento sem um servidor real.
+
+Fala o protocolo RESP2 e implementa só os comandos usados pelo projeto (e pelo cliente `redis` ao
+conectar): PING, ECHO, HELLO 2, CLIENT, SELECT, GET, SET (EX/PX/NX/XX), DEL, EXISTS, INCR, INCRBY,
+PTTL, FLUSHDB e as transações WATCH/MULTI/EXEC/DISCARD/UNWATCH. Tudo fica em memória, em um único banco.
+
+Uso:
+    python -m core.redis_local --porta 6380
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+from collections import Counter
+
+
+class _Erro(Exception):
+    pass
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.vigiadas = {}  # chave -> versão no WATCH
+        self.fila = None  # comandos enfileirados após MULTI
+
+    @property
+    def servidor(self) -> "LocalRedis":
+        return self.server.redis
+
+    def _ler_comando(self):
+        linha = self.rfile.readline()
+        if not linha:
+            return None
+        if not linha.startswith(b"*"):  # comando inline (ex.: redis-cli PING via telnet)
+            return linha.strip().split()
+        args = []
+        for _ in range(int(linha[1:])):
+            tamanho = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(tamanho + 2)[:-2])
+        return args
+
+    def _escrever(self, valor):
+        self.wfile.write(_codificar(valor))
+
+    def handle(self):
+        while True:
+            args = self._ler_comando()
+            if args is None:
+                return
+            if not args:
+                continue
+            nome = args[0].upper().decode()
+            try:
+                self._escrever(self._executar(nome, args[1:]))
+            except _Erro as e:
+                self._escrever(e)
+            self.wfile.flush()
+
+    def _executar(self, nome, args):
+        redis = self.servidor
+        redis.contar(nome)
+        if nome == "MULTI":
+            self.fila = []
+            return "OK"
+        if nome == "DISCARD":
+            self.fila, self.vigiadas = None, {}
+            return "OK"
+        if nome == "EXEC":
+            fila, vigiadas = self.fila, self.vigiadas
+            self.fila, self.vigiadas = None, {}
+            if fila is None:
+                raise _Erro("ERR EXEC without MULTI")
+            with redis.lock:
+                if any(redis.versao(chave) != versao for chave, versao in vigiadas.items()):
+                    return None
+                return [redis.executar(n, a) for n, a in fila]
+        if self.fila is not None:
+            self.fila.append((nome, args))
+            return "QUEUED"
+        if nome == "WATCH":
+            with redis.lock:
+                self.vigiadas.update({chave: redis.versao(chave) for chave in args})
+            return "OK"
+        if nome == "UNWATCH":
+            self.vigiadas = {}
+            return "OK"
+        with redis.lock:
+            return redis.executar(nome, args)
+
+
+def _codificar(valor) -> bytes:
+    if valor is None:
+        return b"$-1\r\n"
+    if isinstance(valor, _Erro):
+        return f"-{valor}\r\n".encode()
+    if isinstance(valor, str):
+        return f"+{valor}\r\n".encode()
+    if isinstance(valor, int):
+        return f":{valor}\r\n".encode()
+    if isinstance(valor, bytes):
+        return b"$%d\r\n%s\r\n" % (len(valor), valor)
+    return b"*%d\r\n" % len(valor) + b"".join(_codificar(v) for v in valor)
+
+
+class _Servidor(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalRedis:
+    """Dados em memória (valor, expiração e versão por chave) e o servidor TCP."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.dados = {}  # chave -> (valor, expira em time.time() ou None)
+        self.versoes = Counter()  # alterada a cada escrita ou expiração (usada pelo WATCH)
+        self.comandos = Counter()
+        self.lock = threading.RLock()
+        self._server = _Servidor((host, port), _Handler)
+        self._server.redis = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "LocalRedis":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="redis-local", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def contar(self, nome):
+        with self.lock:
+            self.comandos[nome] += 1
+
+    def _vivo(self, chave):
+        item = self.dados.get(chave)
+        if item is not None and item[1] is not None and item[1] <= time.time():
+            del self.dados[chave]
+            self.versoes[chave] += 1
+            return None
+        return item
+
+    def versao(self, chave) -> int:
+        self._vivo(chave)
+        return self.versoes[chave]
+
+    def _gravar(self, chave, valor, expira=None):
+        self.dados[chave] = (valor, expira)
+        self.versoes[chave] += 1
+
+    def executar(self, nome, args):
+        """Executa um comando com o lock já obtido."""
+        if nome == "PING":
+            return args[0] if args else "PONG"
+        if nome == "ECHO":
+            return args[0]
+        if nome in ("CLIENT", "SELECT"):
+            return "OK"
+        if nome == "HELLO":
+            if args and args[0] != b"2":
+                raise _Erro("NOPROTO unsupported protocol version")
+            return [b"server", b"redis", b"version", b"7.0.0", b"proto", 2, b"mode", b"standalone", b"role", b"master"]
+        if nome == "FLUSHDB":
+            for chave in list(self.dados):
+                self.versoes[chave] += 1
+            self.dados.clear()
+            return "OK"
+        if nome == "GET":
+            item = self._vivo(args[0])
+            return None if item is None else item[0]
+        if nome == "SET":
+            return self._set(args)
+        if nome == "DEL":
+            removidas = 0
+            for chave in args:
+                if self._vivo(chave) is not None:
+                    del self.dados[chave]
+                    self.versoes[chave] += 1
+                    removidas += 1
+            return removidas
+        if nome == "EXISTS":
+            return sum(self._vivo(chave) is not None for chave in args)
+        if nome in ("INCR", "INCRBY"):
+            item = self._vivo(args[0])
+            try:
+                valor = (int(item[0]) if item else 0) + (int(args[1]) if nome == "INCRBY" else 1)
+            except (IndexError, ValueError):
+                raise _Erro("ERR value is not an integer or out of range") from None
+            self._gravar(args[0], str(valor).encode(), item[1] if item else None)
+            return valor
+        if nome == "PTTL":
+            item = self._vivo(args[0])
+            if item is None:
+                return -2
+            return -1 if item[1] is None else int((item[1] - time.time()) * 1000)
+        raise _Erro(f"ERR unknown command '{nome}'")
+
+    def _set(self, args):
+        chave, valor, opcoes = args[0], args[1], [a.upper() for a in args[2:]]
+        expira = None
+        for i, opcao in enumerate(opcoes):
+            if opcao in (b"EX", b"PX"):
+                try:
+                    quantidade = int(args[2 + i + 1])
+                except (IndexError, ValueError):
+                    raise _Erro("ERR syntax error") from None
+                expira = time.time() + (quantidade if opcao == b"EX" else quantidade / 1000)
+        existe = self._vivo(chave) is not None
+        if (b"NX" in opcoes and existe) or (b"XX" in opcoes and not existe):
+            return None
+        self._gravar(chave, valor, expira)
+        return "OK"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que imita o Redis (testes de core.armazenamento).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=6380)
+    args = parser.parse_args(argv)
+    redis = LocalRedis(args.host, args.porta)
+    print(f"Redis local em {redis.url}")
+    redis.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
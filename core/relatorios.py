@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Formatação dos relatórios internos a partir dos dados do processo."""
+
+import numpy as np
+import pandas as pd
+
+from .modelos import render
+
+# Valores de resultado que não devem aparecer no relatório (comparados em minúsculas, sem espaços).
+RESULTADOS_IRRELEVANTES = ["aguardando julgamento", "n/a", "", "não houve recurso"]
+
+
+def _column(df: pd.DataFrame, column: str, default) -> pd.Series:
+    """Retorna a coluna do DataFrame ou, se ela não existir, uma coluna preenchida com o valor padrão."""
+    if column not in df.columns:
+        return pd.Series([default] * len(df), index=df.index, dtype=object)
+    return df[column]
+
+
+def _normalized(series: pd.Series) -> pd.Series:
+    """Aplica lower/strip de forma vetorizada; valores que não são texto viram NaN."""
+    try:
+        return series.str.lower().str.strip()
+    except AttributeError:  # Coluna sem nenhum texto (ex.: só None/NaN ou números)
+        return pd.Series(np.nan, index=series.index, dtype=object)
+
+
+def _relevant_mask(series: pd.Series) -> np.ndarray:
+    """Máscara dos resultados que são texto e não constam em RESULTADOS_IRRELEVANTES."""
+    normalized = _normalized(series)
+    return (normalized.notna() & ~normalized.isin(RESULTADOS_IRRELEVANTES)).to_numpy(dtype=bool)
+
+
+def _optional_lines(mask: np.ndarray, prefix: str, series: pd.Series) -> np.ndarray:
+    """Monta a linha opcional (precedida de quebra) apenas onde a máscara é verdadeira."""
+    lines = np.full(len(series), "", dtype=object)
+    if mask.any():
+        lines[mask] = [f"\n{prefix}{v}" for v in series.to_numpy(dtype=object)[mask]]
+    return lines
+
+
+def format_report_from_df(df: pd.DataFrame, tipo_decisao: str):
+    """Formata a seção de pedidos do relatório a partir de um DataFrame, incluindo resultados."""
+    if df.empty: return "Nenhum pedido encontrado."
+    df_sorted = df.sort_values(by='nomeObjeto').reset_index(drop=True) if 'nomeObjeto' in df.columns else df.reset_index(drop=True)
+
+    # As regras de exibição dependem só do tipo de decisão: calculadas uma vez, não por linha.
+    tipo_decisao_lower = tipo_decisao.lower() if tipo_decisao else ""
+    show_res2 = "acórdão" in tipo_decisao_lower or "monocrática" in tipo_decisao_lower or "denegatório" in tipo_decisao_lower
+    show_resSup = "tst" in tipo_decisao_lower or "denegatório" in tipo_decisao_lower
+
+    nomes = _column(df_sorted, 'nomeObjeto', 'N/A').to_numpy(dtype=object)
+    blocks = np.array([f"{i}) {nome}" for i, nome in enumerate(nomes, start=1)], dtype=object)
+
+    try:
+        situacao = _column(df_sorted, 'situacao', '').str.strip()
+    except AttributeError:
+        situacao = pd.Series(np.nan, index=df_sorted.index, dtype=object)
+    situacao_mask = (situacao.fillna('').str.len() > 0).to_numpy(dtype=bool)
+    blocks += _optional_lines(situacao_mask, " - Situação: ", situacao)
+
+    res1 = _column(df_sorted, 'resultado_1_instanci', 'N/A')
+    blocks += _optional_lines(_relevant_mask(res1), " - Resultado 1ª Instância: ", res1)
+    if show_res2:
+        res2 = _column(df_sorted, 'resultado_2_instanci', 'N/A')
+        blocks += _optional_lines(_relevant_mask(res2), " - Resultado 2ª Instância: ", res2)
+    if show_resSup:
+        resSup = _column(df_sorted, 'resultado_instancia_', 'N/A')
+        blocks += _optional_lines(_relevant_mask(resSup), " - Resultado Instância Superior: ", resSup)
+
+    # Cada pedido termina com uma linha em branco, como na montagem linha a linha.
+    return "\n".join(blocks + "\n")
+
+
+def format_prazos(prazos_list):
+    """Formata a lista de prazos a partir do modelo 'prazos.txt'."""
+    prazos = [{
+        'descricao': p.get('descricao', 'N/A'),
+        'data_d': p.get('data_d'),
+        'data_fatal': p.get('data_fatal'),
+        'obs': p.get('obs', '').strip(),
+    } for p in prazos_list or []]
+    return render('prazos.txt', {'prazos': prazos})
+
+
+def generate_final_text(sections):
+    """Monta o relatório interno (modelo 'relatorio_interno.txt'), numerando só as seções com conteúdo."""
+    secoes = [{'titulo': title, 'conteudo': str(content).strip()} for title, content in sections if content and str(content).strip()]
+    return render('relatorio_interno.txt', {'secoes': secoes})
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""Robô que aplica no DataJuri as atualizações de pedidos registradas pelo app.
+
+O robô lê do diário de atualizações (core.journal) os registros ainda não processados, em lotes.
+Dentro de um lote, várias edições do mesmo pedido são combinadas em uma única operação (o valor
+mais recente de cada campo prevalece; uma exclusão substitui as alterações anteriores). As
+operações são enviadas à API com concorrência limitada e com uma chave de idempotência, de modo
+que reprocessar um lote após uma queda não aplica nada em dobro. Falhas temporárias (rede, 429,
+5xx) são repetidas com espera exponencial; as demais (inclusive erros inesperados), ou as que esgotam as
+tentativas, vão para `<UPDATE_FOLDER>/dead_letter.jsonl`, uma vez por operação (pela chave de
+idempotência: o lote reprocessado após uma queda não repete as entradas). O offset do consumidor só avança depois que todo o lote foi
+aplicado ou registrado como falha; até lá, os registros do lote ficam reservados (UpdateJournal.claim)
+e a compactação (core.compactacao) não os altera.
+
+Uso:
+    python -m core.robo --pasta atualizacoes_robo --concorrencia 4 --lote 200 [--continuo --intervalo 5]
+
+As credenciais são lidas das variáveis DATAJURI_* (ou de um arquivo .env).
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from .datajuri import DataJuriClient, DataJuriError
+from .journal import UpdateJournal
+
+CONSUMIDOR = "robo"
+MODULO_PEDIDOS = "PedidoProcesso"
+CAMPO_PASTA = "processo.pasta"  # vínculo do pedido incluído com o processo
+DEAD_LETTER_FILE = "dead_letter.jsonl"
+
+
+@dataclass
+class Operacao:
+    acao: str                 # 'alterar', 'incluir' ou 'excluir'
+    pasta: str
+    pedido_id: object = None  # None nas inclusões
+    campos: dict = field(default_factory=dict)
+    seqs: list = field(default_factory=list)  # registros do diário que originaram a operação
+    origem: tuple = ()        # (seq, posição) da tarefa de inclusão
+
+    @property
+    def idempotency_key(self) -> str:
+        # Inclusões: chave pela posição no diário (nunca muda ao reprocessar). Alterações e
+        # exclusões: chave pelo conteúdo, pois reaplicá-las com os mesmos valores é inofensivo.
+        if self.acao == "incluir":
+            base = ["incluir", self.pasta, *self.origem]
+        else:
+            base = [self.acao, self.pedido_id, self.campos, self.seqs]
+        digest = hashlib.sha256(json.dumps(base, sort_keys=True, default=str, ensure_ascii=False).encode("utf-8"))
+        return f"robo-{digest.hexdigest()[:32]}"
+
+
+def coalesce(records: list[dict]) -> list[Operacao]:
+    """Combina as tarefas de vários registros do diário em no máximo uma operação por pedido."""
+    operacoes = {}
+    for record in records:
+        pasta, seq = record["pasta"], record["seq"]
+        for posicao, task in enumerate(record["tasks"]):
+            acao = task.get("acao", "alterar")
+            campos = {k: v for k, v in task.items() if k not in ("id", "acao", "origem")}
+            if acao == "incluir":
+                # Inclusões reescritas pela compactação guardam a posição do registro original.
+                origem = tuple(task.get("origem") or (seq, posicao))
+                operacoes[("incluir", *origem)] = Operacao("incluir", pasta, None, campos, [seq], origem)
+                continue
+
+            chave = ("pedido", task["id"])
+            atual = operacoes.get(chave)
+            if acao == "excluir":
+                operacoes[chave] = Operacao("excluir", pasta, task["id"], {}, (atual.seqs if atual else []) + [seq])
+            elif atual is None:
+                operacoes[chave] = Operacao("alterar", pasta, task["id"], campos, [seq])
+            elif atual.acao == "excluir":
+                logging.warning(f"Robô: alteração do pedido {task['id']} (registro {seq}) ignorada; o pedido foi excluído antes.")
+            else:
+                atual.campos.update(campos)
+                atual.seqs.append(seq)
+                atual.pasta = pasta
+    return list(operacoes.values())
+
+
+class RoboAtualizacoes:
+    def __init__(self, journal: UpdateJournal, client: DataJuriClient, concorrencia: int = 4, max_tentativas: int = 5,
+                 espera_inicial: float = 0.5, espera_maxima: float = 30.0, dead_letter_path: str = None, sleep=time.sleep):
+        self.journal = journal
+        self.client = client
+        self.concorrencia = concorrencia
+        self.max_tentativas = max_tentativas
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self.dead_letter_path = dead_letter_path or os.path.join(journal.folder, DEAD_LETTER_FILE)
+        self._sleep = sleep
+        self._chaves_falhas = set()  # chaves de idempotência já na fila de falhas (lidas até _falhas_lidas bytes)
+        self._falhas_lidas = 0
+
+    def _aplicar(self, op: Operacao):
+        key = op.idempotency_key
+        if op.acao == "alterar":
+            self.client.update_entity(MODULO_PEDIDOS, op.pedido_id, op.campos, idempotency_key=key)
+        elif op.acao == "incluir":
+            self.client.create_entity(MODULO_PEDIDOS, {CAMPO_PASTA: op.pasta, **op.campos}, idempotency_key=key)
+        elif op.acao == "excluir":
+            try:
+                self.client.delete_entity(MODULO_PEDIDOS, op.pedido_id, idempotency_key=key)
+            except DataJuriError as e:
+                if e.status_code != 404:  # já excluído: o objetivo foi atingido
+                    raise
+        else:
+            raise DataJuriError(f"Ação desconhecida: '{op.acao}'", 400)
+
+    def _ler_chaves_falhas(self):
+        """Atualiza _chaves_falhas com as linhas gravadas na fila de falhas desde a última leitura (chamar com o lock)."""
+        try:
+            with open(self.dead_letter_path, "rb") as f:
+                f.seek(self._falhas_lidas)
+                for linha in f:
+                    if not linha.endswith(b"\n"):
+                        break  # linha incompleta (gravação interrompida): lida de novo na próxima vez
+                    self._falhas_lidas += len(linha)
+                    try:
+                        self._chaves_falhas.add(json.loads(linha)["idempotency_key"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except FileNotFoundError:
+            self._falhas_lidas = 0
+
+    def _dead_letter(self, op: Operacao, erro: Exception, tentativas: int):
+        key = op.idempotency_key
+        record = {
+            "ts": datetime.now().isoformat(timespec="seconds"), "seqs": op.seqs, "pasta": op.pasta, "acao": op.acao,
+            "id": op.pedido_id, "campos": op.campos, "idempotency_key": key,
+            "erro": str(erro) if isinstance(erro, DataJuriError) else f"{type(erro).__name__}: {erro}",
+            "status_code": getattr(erro, "status_code", None), "tentativas": tentativas,
+        }
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self.journal.lock():
+            self._ler_chaves_falhas()
+            if key in self._chaves_falhas:
+                return  # já registrada (lote reprocessado após uma queda)
+            self._chaves_falhas.add(key)
+            if os.path.exists(self.dead_letter_path):
+                UpdateJournal._repair_tail(self.dead_letter_path)  # descarta uma linha incompleta (gravação interrompida)
+            fd = os.open(self.dead_letter_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._falhas_lidas += len(line)
+
+    def executar_operacao(self, op: Operacao) -> dict:
+        """Aplica uma operação, repetindo as falhas temporárias. Nunca levanta exceção: erros inesperados vão para a fila de falhas."""
+        for tentativa in range(1, self.max_tentativas + 1):
+            try:
+                self._aplicar(op)
+                return {"ok": True, "acao": op.acao, "id": op.pedido_id, "tentativas": tentativa}
+            except DataJuriError as e:
+                if not e.retryable or tentativa == self.max_tentativas:
+                    logging.error(f"Robô: {op.acao} do pedido {op.pedido_id} (pasta {op.pasta}) falhou após {tentativa} tentativa(s): {e}")
+                    self._dead_letter(op, e, tentativa)
+                    return {"ok": False, "acao": op.acao, "id": op.pedido_id, "tentativas": tentativa, "erro": str(e)}
+            except Exception as e:  # resposta inesperada, erro de programação: não derruba o lote
+                logging.exception(f"Robô: erro inesperado em {op.acao} do pedido {op.pedido_id} (pasta {op.pasta}).")
+                self._dead_letter(op, e, tentativa)
+                return {"ok": False, "acao": op.acao, "id": op.pedido_id, "tentativas": tentativa, "erro": repr(e)}
+            espera = min(self.espera_maxima, self.espera_inicial * 2 ** (tentativa - 1))
+            self._sleep(espera * random.uniform(0.5, 1.0))
+
+    def processar_lote(self, limite: int = 200) -> dict | None:
+        """Processa até `limite` registros pendentes do diário. Retorna o resumo ou None se não havia nada."""
+        records = self.journal.claim(CONSUMIDOR, limite)
+        if not records:
+            return None
+        operacoes = coalesce(records)
+        with ThreadPoolExecutor(max_workers=self.concorrencia) as executor:
+            resultados = list(executor.map(self.executar_operacao, operacoes))
+        self.journal.commit(CONSUMIDOR, records[-1]["seq"])
+        return {
+            "ate_seq": records[-1]["seq"],
+            "registros": len(records),
+            "tarefas": sum(len(r["tasks"]) for r in records),
+            "operacoes": len(operacoes),
+            "aplicadas": sum(r["ok"] for r in resultados),
+            "falhas": sum(not r["ok"] for r in resultados),
+            "tentativas": sum(r["tentativas"] for r in resultados),
+        }
+
+    def executar(self, limite: int = 200, continuo: bool = False, intervalo: float = 5.0, on_lote=None):
+        """Processa todos os registros pendentes; no modo contínuo, aguarda novos registros indefinidamente."""
+        while True:
+            resumo = self.processar_lote(limite)
+            if resumo:
+                if on_lote:
+                    on_lote(resumo)
+                continue
+            self.journal.compact()
+            if not continuo:
+                return
+            self._sleep(intervalo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aplica no DataJuri as atualizações de pedidos registradas pelo app.")
+    parser.add_argument("--pasta", default="atualizacoes_robo", help="Pasta do diário de atualizações.")
+    parser.add_argument("--concorrencia", type=int, default=4, help="Máximo de requisições simultâneas à API.")
+    parser.add_argument("--lote", type=int, default=200, help="Registros do diário por lote.")
+    parser.add_argument("--tentativas", type=int, default=5, help="Tentativas por operação antes de ir para a fila de falhas.")
+    parser.add_argument("--continuo", action="store_true", help="Continua aguardando novos registros.")
+    parser.add_argument("--intervalo", type=float, default=5.0, help="Segundos entre verificações no modo contínuo.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    try:
+        client = DataJuriClient.from_env()
+    except DataJuriError as e:
+        sys.exit(f"Erro: {e}")
+    robo = RoboAtualizacoes(UpdateJournal(args.pasta), client, args.concorrencia, args.tentativas)
+
+    def imprimir(resumo):
+        print(f"Registros até {resumo['ate_seq']}: {resumo['tarefas']} tarefa(s) -> {resumo['operacoes']} operação(ões) | "
+              f"aplicadas: {resumo['aplicadas']} | falhas: {resumo['falhas']} | requisições: {resumo['tentativas']}", flush=True)
+
+    try:
+        robo.executar(args.lote, args.continuo, args.intervalo, on_lote=imprimir)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
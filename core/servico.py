@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""Serviço HTTP/JSON da análise de decisões (core.analise), sem Streamlit.
+
+Servidor asyncio (só biblioteca padrão, HTTP/1.1 com keep-alive). As buscas no DataJuri rodam em
+threads e os cálculos em um pool (threads por padrão, ou processos com --processos) para não bloquear
+o laço de eventos. Rotas (corpo e resposta em JSON; datas no formato AAAA-MM-DD):
+
+    POST /v1/analyze            caso (campos de core.analise.CAMPOS_CASO) + opcionais "processo", "pedidos"
+                                e "pedidos_editados"; sem "processo", os dados são buscados no DataJuri pela pasta.
+                                Resposta: prazos, custas, relatório, e-mail e tarefas de atualização
+    POST /v1/compute-deadlines  caso -> {"prazos": [...]}
+    POST /v1/compute-custas     caso -> {"deposito_a_recolher", "custas_a_recolher"};
+                                ou {"casos": [...]} -> {"resultados": [...]}
+    POST /v1/render-email       caso + "processo" + "pedidos" (+ "pedidos_editados") -> {"assunto", "corpo"}
+    POST /v1/diff-updates       {"original": [...], "editado": [...]} -> {"tasks", "anterior"}
+    GET  /v1/health             estado e contadores de requisições
+
+Erros: 400 (entrada inválida), 404 (rota ou processo inexistente), 413 (corpo grande demais),
+502 (falha do DataJuri), 503 (DataJuri não configurado) e 500, sempre com {"erro": "..."}.
+
+Uso:
+    python -m core.servico --porta 8080 [--processos 4] [--log servico.log]
+
+As credenciais do DataJuri são lidas das variáveis DATAJURI_* (ou de um arquivo .env), como no lote.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime
+from http import HTTPStatus
+
+from . import analise
+from .datajuri import DataJuriClient, DataJuriError
+from .logs import configure_logging, log_context
+
+MAX_CORPO = 10 * 1024 * 1024  # bytes
+MAX_CABECALHOS = 100
+
+
+class ErroHTTP(Exception):
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _json_default(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    if hasattr(valor, "item"):  # escalares do numpy/pandas
+        return valor.item()
+    return str(valor)
+
+
+def _dumps(corpo) -> bytes:
+    return json.dumps(corpo, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+# Tarefas executadas no pool de cálculo (funções de módulo, para funcionar também com processos).
+
+def _analyze(corpo, processo, pedidos):
+    return analise.analyze_case(analise.normalize_case(corpo), processo, pedidos, corpo.get("pedidos_editados"))
+
+
+def _compute_deadlines(corpo):
+    return {"prazos": analise.compute_deadlines(analise.normalize_case(corpo))}
+
+
+def _compute_custas(corpo):
+    if "casos" not in corpo:
+        return analise.compute_custas(analise.normalize_case(corpo))
+    if not isinstance(corpo["casos"], list):
+        raise ValueError("'casos' deve ser uma lista.")
+    # Caso a caso: com a entrada em JSON, montar o DataFrame de calcular_custas_depositos_df custa mais
+    # que o próprio cálculo (o vetorizado compensa a partir de tabelas já carregadas, como em core.exposicao).
+    return {"resultados": [analise.compute_custas(analise.normalize_case(caso)) for caso in corpo["casos"]]}
+
+
+def _render_email(corpo):
+    caso = analise.normalize_case(corpo)
+    if not caso["advogado_responsavel"]:
+        raise ValueError("O campo 'advogado_responsavel' é obrigatório para o e-mail.")
+    return analise.render_email(caso, corpo.get("processo") or {}, corpo.get("pedidos"), corpo.get("pedidos_editados"))
+
+
+def _diff_updates(corpo):
+    if not isinstance(corpo.get("original"), list) or not isinstance(corpo.get("editado"), list):
+        raise ValueError("Informe as listas 'original' e 'editado' de pedidos.")
+    return analise.diff_updates(corpo["original"], corpo["editado"])
+
+
+class ServicoAnalise:
+    """Servidor HTTP da análise. start()/stop() o executam em uma thread (testes e benchmarks)."""
+
+    def __init__(self, host="127.0.0.1", port=8080, client: DataJuriClient = None, processos: int = 0,
+                 threads: int = 8, max_corpo: int = MAX_CORPO):
+        self.host, self.port = host, port
+        self.max_corpo = max_corpo
+        self.requisicoes = Counter()
+        self._client = client
+        self._client_lock = threading.Lock()
+        self._calculo = ProcessPoolExecutor(processos) if processos else ThreadPoolExecutor(threads, thread_name_prefix="calculo")
+        self._busca = ThreadPoolExecutor(threads, thread_name_prefix="datajuri")
+        self._rotas = {
+            ("POST", "/v1/analyze"): self.analyze,
+            ("POST", "/v1/compute-deadlines"): lambda corpo: self._calcular(_compute_deadlines, corpo),
+            ("POST", "/v1/compute-custas"): lambda corpo: self._calcular(_compute_custas, corpo),
+            ("POST", "/v1/render-email"): lambda corpo: self._calcular(_render_email, corpo),
+            ("POST", "/v1/diff-updates"): lambda corpo: self._calcular(_diff_updates, corpo),
+            ("GET", "/v1/health"): self.health,
+        }
+        self._loop = None
+        self._server = None
+        self._conexoes = {}  # tarefa -> writer das conexões abertas (fechadas no stop)
+        self._thread = None
+        self._iniciado = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # --- Rotas ---
+
+    async def _calcular(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._calculo, func, *args)
+
+    async def _buscar(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._busca, func, *args)
+
+    def client(self) -> DataJuriClient:
+        with self._client_lock:
+            if self._client is None:
+                try:
+                    self._client = DataJuriClient.from_env()
+                except DataJuriError as e:
+                    raise ErroHTTP(503, f"DataJuri não configurado ({e}); envie 'processo' e 'pedidos' na requisição.") from None
+            return self._client
+
+    async def analyze(self, corpo):
+        processo, pedidos = corpo.get("processo"), corpo.get("pedidos")
+        if processo is None:
+            pasta = corpo.get("pasta")
+            if pasta in (None, ""):
+                raise ValueError("Informe a 'pasta' (ou os dados em 'processo' e 'pedidos').")
+            client = self.client()
+            processo, pedidos_api = await asyncio.gather(self._buscar(client.fetch_processo, str(pasta)),
+                                                         self._buscar(client.fetch_pedidos, str(pasta)))
+            if not processo:
+                raise ErroHTTP(404, f"Nenhum processo encontrado com a pasta {pasta}.")
+            pedidos = pedidos if pedidos is not None else pedidos_api
+        return await self._calcular(_analyze, corpo, processo, pedidos or [])
+
+    async def health(self, corpo):
+        return {"status": "ok", "requisicoes": dict(self.requisicoes)}
+
+    # --- HTTP ---
+
+    async def _ler_requisicao(self, reader):
+        linha = await reader.readline()
+        if not linha:
+            return None
+        try:
+            metodo, alvo, versao = linha.decode("latin-1").split()
+        except ValueError:
+            raise ErroHTTP(400, "Linha de requisição inválida.") from None
+        cabecalhos = {}
+        for _ in range(MAX_CABECALHOS):
+            linha = await reader.readline()
+            if linha in (b"\r\n", b"\n", b""):
+                break
+            nome, _, valor = linha.decode("latin-1").partition(":")
+            cabecalhos[nome.strip().lower()] = valor.strip()
+        else:
+            raise ErroHTTP(400, "Cabeçalhos demais.")
+        if "chunked" in cabecalhos.get("transfer-encoding", "").lower():
+            raise ErroHTTP(411, "Envie o corpo com Content-Length.")
+        tamanho = cabecalhos.get("content-length", "0").strip() or "0"
+        if not (tamanho.isascii() and tamanho.isdigit()):  # só dígitos: sem sinal, espaços ou "1_000"
+            raise ErroHTTP(400, "Content-Length inválido.")
+        tamanho = int(tamanho)
+        if tamanho > self.max_corpo:
+            raise ErroHTTP(413, f"Corpo da requisição maior que {self.max_corpo} bytes.")
+        corpo = await reader.readexactly(tamanho) if tamanho else b""
+        manter = cabecalhos.get("connection", "").lower() != "close" and versao == "HTTP/1.1"
+        return metodo.upper(), alvo.split("?", 1)[0].rstrip("/"), corpo, manter
+
+    async def _responder(self, metodo, caminho, dados):
+        handler = self._rotas.get((metodo, caminho))
+        if handler is None:
+            if any(rota == caminho for _, rota in self._rotas):
+                raise ErroHTTP(405, f"Método {metodo} não permitido em {caminho}.")
+            raise ErroHTTP(404, f"Rota não encontrada: {caminho}")
+        try:
+            corpo = json.loads(dados) if dados else {}
+        except ValueError:
+            raise ErroHTTP(400, "JSON inválido.") from None
+        if not isinstance(corpo, dict):
+            raise ErroHTTP(400, "O corpo deve ser um objeto JSON.")
+        try:
+            return 200, await handler(corpo)
+        except (ValueError, KeyError, TypeError) as e:
+            raise ErroHTTP(400, str(e)) from None
+        except DataJuriError as e:
+            raise ErroHTTP(502, str(e)) from None
+
+    async def _conexao(self, reader, writer):
+        self._conexoes[asyncio.current_task()] = writer
+        try:
+            while True:
+                inicio = time.perf_counter()
+                manter, caminho = False, "?"
+                try:
+                    requisicao = await self._ler_requisicao(reader)
+                    if requisicao is None:
+                        break
+                    metodo, caminho, dados, manter = requisicao
+                    with log_context(etapa=caminho):
+                        status, resposta = await self._responder(metodo, caminho, dados)
+                except ErroHTTP as e:
+                    status, resposta = e.status, {"erro": str(e)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    logging.exception(f"Service error ({caminho}): {e}")
+                    status, resposta = 500, {"erro": f"Erro interno: {e}"}
+                self.requisicoes[f"{caminho} {status}"] += 1
+                corpo = _dumps(resposta)
+                writer.write((f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                              f"Content-Type: application/json; charset=utf-8\r\nContent-Length: {len(corpo)}\r\n"
+                              f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n").encode("latin-1") + corpo)
+                await writer.drain()
+                logging.debug(f"{caminho} {status} {(time.perf_counter() - inicio) * 1000:.1f} ms")
+                if not manter:
+                    break
+        finally:
+            self._conexoes.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def serve(self):
+        self._server = await asyncio.start_server(self._conexao, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._loop = asyncio.get_running_loop()
+        self._iniciado.set()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start(self) -> "ServicoAnalise":
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._executar()), name="servico-analise", daemon=True)
+        self._thread.start()
+        self._iniciado.wait(30)
+        return self
+
+    async def _executar(self):
+        self._parar = asyncio.Event()
+        tarefa = asyncio.create_task(self.serve())
+        await self._parar.wait()
+        # Fecha as conexões keep-alive: cada uma termina ao ler o fim do fluxo, sem ser cancelada.
+        self._server.close()
+        for writer in list(self._conexoes.values()):
+            writer.close()
+        await asyncio.gather(*self._conexoes, return_exceptions=True)
+        tarefa.cancel()
+        await asyncio.gather(tarefa, return_exceptions=True)
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._parar.set)
+        if self._thread is not None:
+            self._thread.join(10)
+        self._calculo.shutdown(cancel_futures=True)
+        self._busca.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON da análise de decisões.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--processos", type=int, default=0, help="Cálculos em um pool de processos (padrão: threads).")
+    parser.add_argument("--threads", type=int, default=8, help="Threads para as buscas no DataJuri (e cálculos, sem --processos).")
+    parser.add_argument("--log", help="Arquivo do log em JSON, com rotação (ver core/logs.py). Padrão: texto no terminal.")
+    args = parser.parse_args(argv)
+    if args.log:
+        configure_logging(args.log)
+    else:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    servico = ServicoAnalise(args.host, args.porta, processos=args.processos, threads=args.threads)
+    print(f"Serviço de análise em http://{args.host}:{args.porta}", flush=True)
+    try:
+        asyncio.run(servico.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""Parsers da tabela de pedidos copiada da tela do DataJuri e colada no app (texto com colunas).
+
+parse_datajuri_table / format_table_report: parser do Appbeta, que localiza o cabeçalho pelas colunas
+(Objetos, Situação, Resultado 1ª/2ª instância e instância superior) e separa as colunas por tabulação
+ou por dois ou mais espaços. parse_and_format_report_v2: parser do streamlit_app, que faz o parse e o
+relatório de uma vez e imprime o passo a passo no terminal.
+"""
+
+import logging
+import re
+
+import pandas as pd
+
+
+def _find_header_and_map_columns(lines: list[str]) -> tuple[dict, int, list]:
+    """Localiza a linha do cabeçalho e mapeia dinamicamente os índices das colunas."""
+    HEADER_KEYWORDS = ['objetos', 'situação', 'resultado 1ª instância', 'resultado 2ª instância', 'resultado instância superior']
+    header_map = {}
+    header_row_index = -1
+
+    for i, line in enumerate(lines):
+        line_lower = line.lower()
+        if sum(kw in line_lower for kw in HEADER_KEYWORDS) >= 3:
+            header_row_index = i
+            parts = re.split(r'\t|\s{2,}', line)
+            header_parts = [p.strip().lower() for p in parts if p.strip()]
+
+            for kw in HEADER_KEYWORDS:
+                try:
+                    found_col = next(col for col in header_parts if kw in col)
+                    header_map[kw] = header_parts.index(found_col)
+                except StopIteration:
+                    return None, -1, [f"Coluna essencial '{kw}' não encontrada no cabeçalho: '{line}'"]
+            return header_map, header_row_index, []
+
+    return None, -1, ["Não foi possível localizar uma linha de cabeçalho válida. Verifique se colunas como 'Objetos', 'Situação' e 'Resultado...' estão presentes."]
+
+
+def _parse_data_rows(lines: list[str], header_map: dict, start_index: int) -> tuple[list[dict], list[str]]:
+    """Processa as linhas de dados com base no mapa de colunas dinâmico."""
+    parsed_data = []
+    warnings = []
+
+    num_expected_parts = len(header_map)
+    for i in range(start_index, len(lines)):
+        line = lines[i].strip()
+        if not line or line.lower().startswith(("visualizar", "editar", "ação", "gerenciar")):
+            continue
+
+        parts = re.split(r'\t|\s{2,}', line)
+        parts = [p.strip() for p in parts if p.strip()]
+
+        if len(parts) < num_expected_parts:
+            warnings.append(f"Linha {i+1} parece incompleta (tem {len(parts)} partes, esperado ~{num_expected_parts}): '{line[:70]}...'")
+            continue
+
+        row_data = {}
+        try:
+            for key, col_index in header_map.items():
+                # Renomeia chaves para serem mais amigáveis ao Python/Pandas
+                clean_key = key.replace(' ', '_').replace('ª', 'a').capitalize()
+                row_data[clean_key] = parts[col_index] if col_index < len(parts) else 'N/A'
+            parsed_data.append(row_data)
+        except IndexError:
+            warnings.append(f"Falha ao acessar coluna na linha {i+1}. Verifique o alinhamento: '{line[:70]}...'")
+
+    return parsed_data, warnings
+
+
+def format_table_report(data: list[dict], tipo_decisao: str, warnings: list[str], avisar=logging.warning) -> str:
+    """Formata os dados processados em um texto de relatório legível. `avisar`: st.warning nos apps."""
+    report_lines = []
+    if warnings:
+        report_lines.append("[AVISOS DURANTE PROCESSAMENTO]:")
+        report_lines.extend([f"- {w}" for w in warnings])
+        report_lines.append("-" * 20)
+
+    # Ordena uma cópia: a lista original pode estar em cache e não deve ser alterada.
+    try:
+        data = sorted(data, key=lambda x: x.get('Objetos', ''))
+    except TypeError:
+        avisar("Não foi possível ordenar os pedidos (dados mistos).")
+
+    for index, item in enumerate(data, start=1):
+        report_lines.append(f"{index}) {item.get('Objetos', 'N/A')}")
+
+        if situacao := item.get('Situação', 'N/A').strip():
+             report_lines.append(f" - Situação: {situacao}")
+
+        res1 = item.get('Resultado_1a_instância', 'N/A')
+        res2 = item.get('Resultado_2a_instância', 'N/A')
+        resSup = item.get('Resultado_instância_superior', 'N/A')
+
+        tipo_decisao_lower = tipo_decisao.lower() if tipo_decisao else ""
+        show_res2 = "acórdão" in tipo_decisao_lower or "monocrática" in tipo_decisao_lower or "denegatório" in tipo_decisao_lower
+        show_resSup = "tst" in tipo_decisao_lower or "denegatório" in tipo_decisao_lower
+
+        def is_relevant(res_value):
+            return res_value and res_value.lower().strip() not in ["aguardando julgamento", "n/a", "", "não houve recurso"]
+
+        if is_relevant(res1): report_lines.append(f" - Resultado 1ª Instância: {res1}")
+        if show_res2 and is_relevant(res2): report_lines.append(f" - Resultado 2ª Instância: {res2}")
+        if show_resSup and is_relevant(resSup): report_lines.append(f" - Resultado Instância Superior: {resSup}")
+
+        report_lines.append("")
+
+    return "\n".join(report_lines)
+
+
+def parse_datajuri_table(text: str) -> tuple[pd.DataFrame, list[dict], list[str], str]:
+    """Processa o texto colado, sem depender do tipo de decisão. Retorna (df, dados, avisos, erro)."""
+    lines = [l.strip() for l in text.strip().splitlines() if l.strip()]
+    if not lines:
+        return None, None, [], "Erro: O texto da tabela está vazio."
+
+    header_map, header_row_index, errors = _find_header_and_map_columns(lines)
+    if errors:
+        return None, None, [], "\n".join(errors)
+
+    data_rows, warnings = _parse_data_rows(lines, header_map, header_row_index + 1)
+    if not data_rows:
+        return None, None, warnings, "Erro: Nenhum dado de pedido válido foi extraído. Verifique o conteúdo após o cabeçalho."
+
+    return pd.DataFrame(data_rows), data_rows, warnings, None
+
+
+def parse_and_format_report_v2(texto: str, tipo_decisao_analisada: str, avisar=logging.warning) -> tuple:
+    """
+    Processa texto do DataJuri e formata relatório filtrando instâncias (parser do streamlit_app).
+    As mensagens de diagnóstico vão para logging.debug; `avisar` recebe os avisos ao usuário (st.warning no app).
+    Retorna: tuple: (dados_estruturados, texto_formatado_ou_erro)
+    """
+    logging.debug("Iniciando parse_and_format_report_v2")
+    lines = [l.strip() for l in texto.strip().splitlines() if l.strip()]
+    if not lines:
+        logging.debug("Erro: Texto vazio.")
+        return None, "Erro: Texto da tabela de pedidos está vazio."
+
+    header_keywords = ['situação', 'resultado 1ª instância', 'resultado 2ª instância', 'resultado instância superior']
+    header_row_index = -1; header_map = {}; header_line_parts = []
+
+    # 1. Encontrar linha de cabeçalho
+    logging.debug("Procurando linha de cabeçalho por keywords...")
+    for i, line in enumerate(lines):
+        line_lower = line.lower(); keywords_found = [kw for kw in header_keywords if kw in line_lower]
+        common_data_starts = ['adicional', 'horas', 'multa', 'diferenças', 'danos', 'justiça', 'honorários']
+        is_likely_header = len(keywords_found) >= 2 and not any(line_lower.startswith(start) for start in common_data_starts)
+        if is_likely_header:
+            logging.debug(f"Header provável encontrado na linha {i}: '{line}'")
+            header_row_index = i; parts = line.split('\t')
+            if len(parts) <= 1: parts = re.split(r'\s{2,}', line)
+            header_line_parts = [p.strip() for p in parts]; break
+    if header_row_index == -1:
+        try: # Fallback Objetos
+            objetos_index = -1
+            for i, line in enumerate(lines):
+                if line.strip().lower() == 'objetos': objetos_index = i; break
+            if objetos_index != -1 and objetos_index + 1 < len(lines):
+                 header_row_index = objetos_index + 1; line = lines[header_row_index]
+                 logging.debug(f"Usando linha após 'Objetos' (linha {header_row_index}): '{line}'")
+                 parts = line.split('\t');
+                 if len(parts) <= 1: parts = re.split(r'\s{2,}', line)
+                 header_line_parts = [p.strip() for p in parts]; avisar("Cabeçalho não encontrado por keywords, usando linha após 'Objetos'.")
+            else: return None, "Erro: Não foi possível localizar a linha de cabeçalho. Verifique o texto colado."
+        except Exception as e_fb: return None, f"Erro: Falha ao tentar localizar cabeçalho após 'Objetos': {e_fb}"
+
+    logging.debug(f"Cabeçalho detectado para mapeamento: {header_line_parts}")
+
+    # 2. Mapear índices das colunas (Situação e Resultados apenas)
+    header_map = {}
+    try:
+        header_map['situação'] = header_line_parts.index(next(h for h in header_line_parts if 'situação' in h.lower()))
+        header_map['resultado 1ª instância'] = header_line_parts.index(next(h for h in header_line_parts if 'resultado 1ª instância' in h.lower()))
+        header_map['resultado 2ª instância'] = header_line_parts.index(next(h for h in header_line_parts if 'resultado 2ª instância' in h.lower()))
+        header_map['resultado instância superior'] = header_line_parts.index(next(h for h in header_line_parts if 'resultado instância superior' in h.lower()))
+        logging.debug(f"Mapeamento de cabeçalho (Situação/Resultados): {header_map}")
+    except (ValueError, StopIteration) as e_map:
+        error_detail = f"Cabeçalho Detectado: '{' | '.join(header_line_parts)}'. Erro específico: {e_map}"
+        logging.debug(f"Falha no mapeamento do cabeçalho. {error_detail}")
+        return None, f"Erro: Não foi possível encontrar/mapear as colunas essenciais (Situação, Resultados...) no cabeçalho.\n{error_detail}\nVerifique o texto colado."
+
+    # 3. Processar linhas de dados
+    data_rows_start_index = header_row_index + 1; pedidos_data = []; processing_warnings = []
+    logging.debug(f"Iniciando processamento de dados da linha {data_rows_start_index}")
+    for i in range(data_rows_start_index, len(lines)):
+        line = lines[i]; line_lower_strip = line.strip().lower()
+        if not line or line_lower_strip.startswith(("visualizar", "editar", "ação", "gerenciar")): continue
+        parts = line.split('\t'); split_method = "TAB"
+        if len(parts) <= 1 and len(line.split()) > 1: parts = re.split(r'\s{2,}', line); split_method = "REGEX"
+        if len(parts) <= 1 and len(line.split()) > 1: parts = line.split(); split_method = "ESPAÇO SIMPLES"
+        parts = [p.strip() for p in parts if p.strip()] # Remove partes vazias após split
+
+        logging.debug("Linha %d Parts (%s): %s", i + 1, split_method, parts)  # formatada só com DEBUG ligado
+
+        if not parts or not parts[0]: continue # Pula se não sobrou nada ou o primeiro elemento é vazio
+
+        # Lógica de extração revisada
+        try:
+            pedido_dict = {'Objetos': parts[0]} # Assume Objeto é sempre o primeiro
+
+            # Calcula os índices esperados em 'parts' assumindo Objeto=parts[0]
+            # Os índices do header_map (0, 1, 2, 3) correspondem a Situação, Res1, Res2, ResSup *no header_line_parts*
+            # Se o header_line_parts começa com Situação (índice 0), então em 'parts' a situação deve estar no índice 1
+            offset = 1 # Assume Objeto é parts[0]
+
+            idx_situacao = header_map['situação'] + offset
+            idx_res1 = header_map['resultado 1ª instância'] + offset
+            idx_res2 = header_map['resultado 2ª instância'] + offset
+            idx_resSup = header_map['resultado instância superior'] + offset
+
+            # Pega os dados usando os índices calculados, com verificação de limites
+            pedido_dict['Situação'] = parts[idx_situacao] if idx_situacao < len(parts) else 'N/A'
+            pedido_dict['Res1'] = parts[idx_res1] if idx_res1 < len(parts) else 'N/A'
+            pedido_dict['Res2'] = parts[idx_res2] if idx_res2 < len(parts) else 'N/A'
+            pedido_dict['ResSup'] = parts[idx_resSup] if idx_resSup < len(parts) else 'N/A'
+
+            pedidos_data.append(pedido_dict)
+
+        except IndexError:
+             # Se mesmo com a verificação de offset der erro, a estrutura da linha é inesperada
+             processing_warnings.append(f"Falha ao processar linha {i+1} (Índice após offset): '{line[:70]}...' | Parts: {len(parts)}")
+        except Exception as e:
+             processing_warnings.append(f"Falha inesperada linha {i+1} '{line[:70]}...': {e}")
+
+
+    logging.debug(f"Processamento de dados concluído. {len(pedidos_data)} pedidos extraídos.")
+    if not pedidos_data:
+        error_msg = "Erro: Nenhum dado de pedido válido encontrado."
+        if processing_warnings: error_msg += "\nPossíveis problemas:\n" + "\n".join([f"- {w}" for w in processing_warnings])
+        error_msg += "\nVerifique o texto colado."; return None, error_msg
+
+    # 4. Ordenar e Formatar para o Relatório Final (com filtro de instância)
+    try: pedidos_data.sort(key=lambda x: x.get('Objetos', ''))
+    except Exception as e: avisar(f"Não foi possível ordenar os pedidos: {e}")
+    pedidos_formatados_report = []
+    if processing_warnings: pedidos_formatados_report.append("[AVISOS DURANTE PROCESSAMENTO]:"); pedidos_formatados_report.extend([f"- {w}" for w in processing_warnings]); pedidos_formatados_report.append("-" * 20)
+    for index, item in enumerate(pedidos_data, start=1):
+        pedidos_formatados_report.append(f"{index}) {item.get('Objetos', 'N/A')}")
+        situacao = item.get('Situação', 'N/A').strip()
+        if situacao: pedidos_formatados_report.append(f" - Situação: {situacao}")
+        res1 = item.get('Res1', '').strip(); res2 = item.get('Res2', '').strip(); resSup = item.get('ResSup', '').strip()
+        show_res1 = True; show_res2 = False; show_resSup = False
+        if tipo_decisao_analisada:
+            tipo_lower = tipo_decisao_analisada.lower()
+            if tipo_lower.startswith("acórdão (trt)"): show_res2 = True
+            elif tipo_lower.startswith("acórdão (tst"): show_res2 = True; show_resSup = True
+            elif tipo_lower.startswith(("decisão monocrática", "despacho denegatório")): show_res2 = True; show_resSup = True
+        def is_relevant(res_value): return res_value and res_value.lower() not in ["aguardando julgamento", "n/a", ""]
+        if show_res1 and is_relevant(res1): pedidos_formatados_report.append(f" - Resultado 1ª Instância: {res1}")
+        if show_res2 and is_relevant(res2): pedidos_formatados_report.append(f" - Resultado 2ª Instância: {res2}")
+        if show_resSup and is_relevant(resSup): pedidos_formatados_report.append(f" - Resultado Instância Superior: {resSup}")
+        pedidos_formatados_report.append("")
+    logging.debug("Formatação do relatório final concluída (com filtro de instância).")
+    return pedidos_data, "\n".join(pedidos_formatados_report)
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Tabela versionada dos limites (tetos) do depósito recursal.
+
+Os valores ficam em `dados/tetos_deposito_recursal.json` (ou no arquivo indicado pela variável de
+ambiente ASSISTENTE_TETOS_FILE), uma vigência por ato do TST:
+
+    {"vigencias": [{"ato": "Ato SEGJUD.GP nº 366/2024", "inicio": "2024-08-01", "fim": "2025-07-31",
+                    "recurso_ordinario": 13133.46, "recurso_revista": 26266.92}]}
+
+A consulta é feita pela data da ciência da decisão (busca binária pelo início da vigência), de modo
+que casos antigos usam o teto em vigor na época. Uma data fora de todas as vigências (antes da primeira,
+depois do `fim` da última ou entre dois atos) não tem teto vigente: vigencia() retorna None e quem chama
+avisa; teto() usa a vigência mais próxima (vigencia_referencia). O arquivo é carregado uma única vez por processo e
+recarregado automaticamente quando é alterado, sem necessidade de nova implantação.
+"""
+
+import bisect
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import date
+
+TETOS_FILE = os.environ.get(
+    "ASSISTENTE_TETOS_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dados", "tetos_deposito_recursal.json"),
+)
+
+RECURSO_PADRAO = "Outro"
+
+
+class TetosError(Exception):
+    """Arquivo de tetos ausente ou inválido."""
+
+
+def tetos_por_recurso(teto_recurso_ordinario: float, teto_recurso_revista: float) -> dict[str, float]:
+    """Teto de cada recurso a partir dos valores do RO e do RR (agravos de instrumento pela metade)."""
+    return {
+        "Recurso Ordinário (RO)": teto_recurso_ordinario,
+        "Recurso de Revista (RR)": teto_recurso_revista,
+        "Recurso de Embargos (E-RR/E-ED)": teto_recurso_revista,
+        "Agravo de Instrumento em Recurso Ordinário (AIRO)": teto_recurso_ordinario / 2,
+        "Agravo de Instrumento em Recurso de Revista (AIRR)": teto_recurso_revista / 2,
+        RECURSO_PADRAO: teto_recurso_revista,  # Usa o teto máximo como padrão
+    }
+
+
+@dataclass(frozen=True)
+class VigenciaTeto:
+    ato: str
+    inicio: date
+    fim: date | None
+    recurso_ordinario: float
+    recurso_revista: float
+    valores: dict = field(compare=False, repr=False, default_factory=dict)
+
+    def teto(self, recurso: str) -> float:
+        return self.valores.get(recurso, max(self.valores.values()))
+
+
+class TabelaTetos:
+    def __init__(self, vigencias: list[VigenciaTeto]):
+        if not vigencias:
+            raise TetosError("Nenhuma vigência de teto cadastrada.")
+        self.vigencias = sorted(vigencias, key=lambda v: v.inicio)
+        self._inicios = [v.inicio for v in self.vigencias]
+        self._matriz = None
+        for anterior, seguinte in zip(self.vigencias, self.vigencias[1:]):
+            if anterior.inicio == seguinte.inicio or (anterior.fim and anterior.fim >= seguinte.inicio):
+                raise TetosError(f"Vigências sobrepostas: '{anterior.ato}' e '{seguinte.ato}'.")
+
+    @property
+    def atual(self) -> VigenciaTeto:
+        return self.vigencias[-1]
+
+    def vigencia(self, data: date) -> VigenciaTeto | None:
+        """Vigência em vigor na data ([inicio, fim]); None se a data estiver fora de todas."""
+        vigencia = self.vigencia_referencia(data)
+        if data < vigencia.inicio or (vigencia.fim and data > vigencia.fim):
+            return None
+        return vigencia
+
+    def vigencia_referencia(self, data: date) -> VigenciaTeto:
+        """Vigência usada por teto(): a última iniciada até a data ou, antes de todas, a mais antiga."""
+        i = bisect.bisect_right(self._inicios, data) - 1
+        return self.vigencias[max(i, 0)]
+
+    def teto(self, recurso: str, data: date = None) -> float:
+        """Teto do recurso na data (hoje, se omitida). Fora das vigências, usa a mais próxima (ver vigencia())."""
+        return self.vigencia_referencia(data or date.today()).teto(recurso)
+
+    def tetos_vetorizados(self, recursos, datas):
+        """teto() para muitos casos de uma vez: `datas` em datetime64[D] (sem valores ausentes). Retorna um array numpy."""
+        import numpy as np
+        import pandas as pd  # importados aqui para não pesar na inicialização dos apps
+        if self._matriz is None:
+            nomes = pd.Index(sorted({nome for v in self.vigencias for nome in v.valores}))
+            # Uma linha por vigência; a última coluna é o teto padrão (o maior) para recursos sem teto próprio.
+            valores = [[v.teto(nome) for nome in nomes] + [max(v.valores.values())] for v in self.vigencias]
+            self._matriz = (nomes, np.array(valores, dtype=float), np.array(self._inicios, dtype="datetime64[D]"))
+        nomes, matriz, inicios = self._matriz
+        colunas = nomes.get_indexer(pd.Index(recursos, dtype=object))  # -1 (desconhecido) = última coluna
+        linhas = np.clip(np.searchsorted(inicios, np.asarray(datas, dtype="datetime64[D]"), side="right") - 1, 0, None)
+        return matriz[linhas, colunas]
+
+    def fora_de_vigencia(self, datas):
+        """vigencia() is None para muitas datas de uma vez (`datas` em datetime64[D]). Retorna um array numpy de bool."""
+        import numpy as np
+        datas = np.asarray(datas, dtype="datetime64[D]")
+        inicios = np.array(self._inicios, dtype="datetime64[D]")
+        fins = np.array([v.fim or date.max for v in self.vigencias], dtype="datetime64[D]")
+        i = np.searchsorted(inicios, datas, side="right") - 1
+        return (i < 0) | (datas > fins[np.clip(i, 0, None)])
+
+    def expirada(self, hoje: date = None) -> bool:
+        """Indica se a vigência mais recente já terminou (novo ato do TST ainda não cadastrado)."""
+        fim = self.atual.fim
+        return bool(fim) and (hoje or date.today()) > fim
+
+
+def _parse_vigencia(item: dict) -> VigenciaTeto:
+    try:
+        ro, rr = float(item["recurso_ordinario"]), float(item["recurso_revista"])
+        valores = tetos_por_recurso(ro, rr)
+        valores.update({k: float(v) for k, v in (item.get("valores") or {}).items()})
+        return VigenciaTeto(
+            ato=item.get("ato", ""),
+            inicio=date.fromisoformat(item["inicio"]),
+            fim=date.fromisoformat(item["fim"]) if item.get("fim") else None,
+            recurso_ordinario=ro,
+            recurso_revista=rr,
+            valores=valores,
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise TetosError(f"Vigência de teto inválida ({item!r}): {e}") from None
+
+
+def load_tetos(path: str = TETOS_FILE) -> TabelaTetos:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        raise TetosError(f"Arquivo de tetos não encontrado: '{path}'.") from None
+    except ValueError as e:
+        raise TetosError(f"Arquivo de tetos inválido ('{path}'): {e}") from None
+    return TabelaTetos([_parse_vigencia(item) for item in data.get("vigencias", [])])
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_tabela_tetos(path: str = TETOS_FILE) -> TabelaTetos:
+    """Tabela de tetos carregada uma vez por processo e recarregada quando o arquivo muda."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        raise TetosError(f"Arquivo de tetos não encontrado: '{path}'.") from None
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    tabela = load_tetos(path)
+    with _cache_lock:
+        _cache[path] = (mtime, tabela)
+    return tabela
@@ -4,7 +4,8 @@
 import streamlit as st
 from datetime import date, timedelta, datetime
 import holidays # pip install holidays
-import re # Importa regex para parsing flexível
+
+from core.tabela_colada import parse_and_format_report_v2
 
 # ========= INÍCIO: Funções Auxiliares =========
 
@@ -20,136 +21,6 @@ def add_business_days(from_date, num_days):
         days_added += 1
     return current_date
 
-# --- Função de Parse da Tabela (VERSÃO ROBUSTA com DEBUG linha e Extração Revisada) ---
-def parse_and_format_report_v2(texto: str, tipo_decisao_analisada: str) -> tuple:
-    """
-    Processa texto do DataJuri e formata relatório filtrando instâncias.
-    Retorna: tuple: (dados_estruturados, texto_formatado_ou_erro)
-    """
-    print("-" * 10 + "[DEBUG] Iniciando parse_and_format_report_v2" + "-" * 10)
-    lines = [l.strip() for l in texto.strip().splitlines() if l.strip()]
-    if not lines:
-        print("[DEBUG] Erro: Texto vazio.")
-        return None, "Erro: Texto da tabela de pedidos está vazio."
-
-    header_keywords = ['situação', 'resultado 1ª instância', 'resultado 2ª instância', 'resultado instância superior']
-    header_row_index = -1; header_map = {}; header_line_parts = []
-
-    # 1. Encontrar linha de cabeçalho
-    print("[DEBUG] Procurando linha de cabeçalho por keywords...")
-    for i, line in enumerate(lines):
-        line_lower = line.lower(); keywords_found = [kw for kw in header_keywords if kw in line_lower]
-        common_data_starts = ['adicional', 'horas', 'multa', 'diferenças', 'danos', 'justiça', 'honorários']
-        is_likely_header = len(keywords_found) >= 2 and not any(line_lower.startswith(start) for start in common_data_starts)
-        if is_likely_header:
-            print(f"[DEBUG] Header provável encontrado na linha {i}: '{line}'")
-            header_row_index = i; parts = line.split('\t')
-            if len(parts) <= 1: parts = re.split(r'\s{2,}', line)
-            header_line_parts = [p.strip() for p in parts]; break
-    if header_row_index == -1:
-        try: # Fallback Objetos
-            objetos_index = -1
-            for i, line in enumerate(lines):
-                if line.strip().lower() == 'objetos': objetos_index = i; break
-            if objetos_index != -1 and objetos_index + 1 < len(lines):
-                 header_row_index = objetos_index + 1; line = lines[header_row_index]
-                 print(f"[DEBUG] Usando linha após 'Objetos' (linha {header_row_index}): '{line}'")
-                 parts = line.split('\t');
-                 if len(parts) <= 1: parts = re.split(r'\s{2,}', line)
-                 header_line_parts = [p.strip() for p in parts]; st.warning("Cabeçalho não encontrado por keywords, usando linha após 'Objetos'.")
-            else: return None, "Erro: Não foi possível localizar a linha de cabeçalho. Verifique o texto colado."
-        except Exception as e_fb: return None, f"Erro: Falha ao tentar localizar cabeçalho após 'Objetos': {e_fb}"
-
-    print(f"[DEBUG] Cabeçalho detectado para mapeamento: {header_line_parts}")
-
-    # 2. Mapear índices das colunas (Situação e Resultados apenas)
-    header_map = {}
-    try:
-        header_map['situação'] = header_line_parts.index(next(h for h in header_line_parts if 'situação' in h.lower()))
-        header_map['resultado 1ª instância'] = header_line_parts.index(next(h for h in header_line_parts if 'resultado 1ª instância' in h.lower()))
-        header_map['resultado 2ª instância'] = header_line_parts.index(next(h for h in header_line_parts if 'resultado 2ª instância' in h.lower()))
-        header_map['resultado instância superior'] = header_line_parts.index(next(h for h in header_line_parts if 'resultado instância superior' in h.lower()))
-        print(f"[DEBUG] Mapeamento de cabeçalho (Situação/Resultados): {header_map}")
-    except (ValueError, StopIteration) as e_map:
-        error_detail = f"Cabeçalho Detectado: '{' | '.join(header_line_parts)}'. Erro específico: {e_map}"
-        print(f"[DEBUG] Falha no mapeamento do cabeçalho. {error_detail}")
-        return None, f"Erro: Não foi possível encontrar/mapear as colunas essenciais (Situação, Resultados...) no cabeçalho.\n{error_detail}\nVerifique o texto colado."
-
-    # 3. Processar linhas de dados
-    data_rows_start_index = header_row_index + 1; pedidos_data = []; processing_warnings = []
-    print(f"[DEBUG] Iniciando processamento de dados da linha {data_rows_start_index}")
-    for i in range(data_rows_start_index, len(lines)):
-        line = lines[i]; line_lower_strip = line.strip().lower()
-        if not line or line_lower_strip.startswith(("visualizar", "editar", "ação", "gerenciar")): continue
-        parts = line.split('\t'); split_method = "TAB"
-        if len(parts) <= 1 and len(line.split()) > 1: parts = re.split(r'\s{2,}', line); split_method = "REGEX"
-        if len(parts) <= 1 and len(line.split()) > 1: parts = line.split(); split_method = "ESPAÇO SIMPLES"
-        parts = [p.strip() for p in parts if p.strip()] # Remove partes vazias após split
-
-        # <<< DEBUG DESCOMENTADO >>>
-        print(f"[DEBUG]   Linha {i+1} Parts ({split_method}): {parts}") # DEBUG - VEJA ISSO NO TERMINAL
-
-        if not parts or not parts[0]: continue # Pula se não sobrou nada ou o primeiro elemento é vazio
-
-        # Lógica de extração revisada
-        try:
-            pedido_dict = {'Objetos': parts[0]} # Assume Objeto é sempre o primeiro
-
-            # Calcula os índices esperados em 'parts' assumindo Objeto=parts[0]
-            # Os índices do header_map (0, 1, 2, 3) correspondem a Situação, Res1, Res2, ResSup *no header_line_parts*
-            # Se o header_line_parts começa com Situação (índice 0), então em 'parts' a situação deve estar no índice 1
-            offset = 1 # Assume Objeto é parts[0]
-
-            idx_situacao = header_map['situação'] + offset
-            idx_res1 = header_map['resultado 1ª instância'] + offset
-            idx_res2 = header_map['resultado 2ª instância'] + offset
-            idx_resSup = header_map['resultado instância superior'] + offset
-
-            # Pega os dados usando os índices calculados, com verificação de limites
-            pedido_dict['Situação'] = parts[idx_situacao] if idx_situacao < len(parts) else 'N/A'
-            pedido_dict['Res1'] = parts[idx_res1] if idx_res1 < len(parts) else 'N/A'
-            pedido_dict['Res2'] = parts[idx_res2] if idx_res2 < len(parts) else 'N/A'
-            pedido_dict['ResSup'] = parts[idx_resSup] if idx_resSup < len(parts) else 'N/A'
-
-            pedidos_data.append(pedido_dict)
-
-        except IndexError:
-             # Se mesmo com a verificação de offset der erro, a estrutura da linha é inesperada
-             processing_warnings.append(f"Falha ao processar linha {i+1} (Índice após offset): '{line[:70]}...' | Parts: {len(parts)}")
-        except Exception as e:
-             processing_warnings.append(f"Falha inesperada linha {i+1} '{line[:70]}...': {e}")
-
-
-    print(f"[DEBUG] Processamento de dados concluído. {len(pedidos_data)} pedidos extraídos.")
-    if not pedidos_data:
-        error_msg = "Erro: Nenhum dado de pedido válido encontrado."
-        if processing_warnings: error_msg += "\nPossíveis problemas:\n" + "\n".join([f"- {w}" for w in processing_warnings])
-        error_msg += "\nVerifique o texto colado."; return None, error_msg
-
-    # 4. Ordenar e Formatar para o Relatório Final (com filtro de instância)
-    try: pedidos_data.sort(key=lambda x: x.get('Objetos', ''))
-    except Exception as e: st.warning(f"Não foi possível ordenar os pedidos: {e}")
-    pedidos_formatados_report = []
-    if processing_warnings: pedidos_formatados_report.append("[AVISOS DURANTE PROCESSAMENTO]:"); pedidos_formatados_report.extend([f"- {w}" for w in processing_warnings]); pedidos_formatados_report.append("-" * 20)
-    for index, item in enumerate(pedidos_data, start=1):
-        pedidos_formatados_report.append(f"{index}) {item.get('Objetos', 'N/A')}")
-        situacao = item.get('Situação', 'N/A').strip()
-        if situacao: pedidos_formatados_report.append(f" - Situação: {situacao}")
-        res1 = item.get('Res1', '').strip(); res2 = item.get('Res2', '').strip(); resSup = item.get('ResSup', '').strip()
-        show_res1 = True; show_res2 = False; show_resSup = False
-        if tipo_decisao_analisada:
-            tipo_lower = tipo_decisao_analisada.lower()
-            if tipo_lower.startswith("acórdão (trt)"): show_res2 = True
-            elif tipo_lower.startswith("acórdão (tst"): show_res2 = True; show_resSup = True
-            elif tipo_lower.startswith(("decisão monocrática", "despacho denegatório")): show_res2 = True; show_resSup = True
-        def is_relevant(res_value): return res_value and res_value.lower() not in ["aguardando julgamento", "n/a", ""]
-        if show_res1 and is_relevant(res1): pedidos_formatados_report.append(f" - Resultado 1ª Instância: {res1}")
-        if show_res2 and is_relevant(res2): pedidos_formatados_report.append(f" - Resultado 2ª Instância: {res2}")
-        if show_resSup and is_relevant(resSup): pedidos_formatados_report.append(f" - Resultado Instância Superior: {resSup}")
-        pedidos_formatados_report.append("")
-    print("[DEBUG] Formatação do relatório final concluída (com filtro de instância).")
-    return pedidos_data, "\n".join(pedidos_formatados_report)
-
 # --- Funções format_prazos, make_hyperlink, generate_final_text (mantidas) ---
 def format_prazos(prazos_list):
     if not prazos_list: return "Nenhum prazo informado."
@@ -326,7 +197,7 @@ if st.button("Verificar Tabela Colada"):
          with preview_placeholder.container(): st.error("Selecione 'Tipo de Decisão Analisada' antes de verificar.")
     elif texto_tabela.strip():
         with st.spinner("Processando tabela..."):
-            parsed_data, result_text = parse_and_format_report_v2(texto_tabela, tipo_decisao) # Passa tipo_decisao
+            parsed_data, result_text = parse_and_format_report_v2(texto_tabela, tipo_decisao, avisar=st.warning) # Passa tipo_decisao
             if parsed_data:
                 st.session_state.parsed_pedidos_data = parsed_data; st.session_state.parsed_pedidos_error = None
                 with preview_placeholder.container():
@@ -461,7 +332,7 @@ if st.button("✔️ Gerar Texto Final da Análise", type="primary"):
         st.stop()
     else:
         # Chama parse novamente para pegar o texto formatado/filtrado correto
-        parsed_data_final, result_text_final = parse_and_format_report_v2(texto_tabela, tipo_decisao)
+        parsed_data_final, result_text_final = parse_and_format_report_v2(texto_tabela, tipo_decisao, avisar=st.warning)
         if not parsed_data_final:
              st.error(f"Erro final ao processar tabela para o relatório: {result_text_final}")
              st.stop()
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""Testes do core: python -m pytest -q (na raiz do repositório)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
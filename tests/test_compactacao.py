@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Compactação das atualizações pendentes (core/compactacao.py) e a troca atômica do diário que ela usa."""
+
+import pytest
+
+from core.compactacao import compact_pending, compact_records
+from core.journal import UpdateJournal
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return UpdateJournal(str(tmp_path))
+
+
+def registro(seq, tasks, pasta="123", anterior=None, ts=None):
+    return {"seq": seq, "ts": ts or f"2025-03-10T10:00:{seq:02d}", "pasta": pasta, "tasks": tasks, "anterior": anterior or {}}
+
+
+def test_compact_records_por_pasta():
+    registros = [
+        registro(1, [{"id": 7, "situacao": "a"}, {"id": 8, "situacao": "x"}], anterior={"8": {"situacao": "orig"}}),
+        registro(2, [{"id": 9, "situacao": "z"}], pasta="456"),
+        registro(3, [{"id": 7, "situacao": "b"}, {"id": 8, "situacao": "orig"}, {"acao": "incluir", "nomeObjeto": "FGTS"}]),
+        registro(4, [{"id": 7, "acao": "excluir"}, {"acao": "incluir", "nomeObjeto": "FGTS"}]),
+    ]
+    novos, stats = compact_records(registros)
+    assert [(r["seq"], r["pasta"]) for r in novos] == [(2, "456"), (4, "123")]
+    pasta_123 = novos[1]
+    assert pasta_123["tasks"] == [{"acao": "incluir", "nomeObjeto": "FGTS", "origem": [3, 2]}, {"id": 7, "acao": "excluir"}]
+    assert pasta_123["ts"] == "2025-03-10T10:00:01"  # a idade conta desde o primeiro registro
+    assert pasta_123["compactado"] == [1, 3, 4]
+    assert stats["campos_sem_efeito"] == 1  # o pedido 8 voltou ao valor original
+    assert stats["inclusoes_repetidas"] == 1
+    assert stats["escritas_economizadas"] == stats["tarefas_antes"] - stats["tarefas_depois"] == 8 - 3
+
+
+def test_compact_pending_reescreve_so_o_que_nao_foi_processado(journal):
+    journal.append("123", [{"id": 7, "situacao": "a"}])
+    journal.commit("robo", 1)
+    for situacao in "bcd":
+        journal.append("123", [{"id": 7, "situacao": situacao}])
+    stats = compact_pending(journal)
+    assert (stats["a_partir_do_seq"], stats["registros_antes"], stats["registros_depois"]) == (1, 3, 1)
+    registros = list(journal.read())
+    assert [(r["seq"], r["tasks"]) for r in registros] == [(1, [{"id": 7, "situacao": "a"}]), (4, [{"id": 7, "situacao": "d"}])]
+    assert journal.append("123", [{"id": 7, "situacao": "e"}]) == 5  # a numeração nunca retrocede
+
+
+def test_compact_pending_nao_altera_registros_reservados(journal):
+    for situacao in "abc":
+        journal.append("123", [{"id": 7, "situacao": situacao}])
+    # O robô reservou os dois primeiros registros e ainda não confirmou (nem havia confirmado nada antes).
+    reservados = journal.claim("robo", limit=2)
+    journal.append("123", [{"id": 7, "situacao": "d"}])
+    stats = compact_pending(journal)
+    assert stats["a_partir_do_seq"] == 2
+    registros = list(journal.read())
+    assert registros[:2] == reservados
+    assert [(r["seq"], r["tasks"]) for r in registros[2:]] == [(4, [{"id": 7, "situacao": "d"}])]
+
+    journal.commit("robo", 2)
+    assert [r["seq"] for r in journal.pending("robo")] == [4]
+
+
+def test_compact_pending_sem_ganho_nao_reescreve(journal):
+    journal.append("123", [{"id": 7, "situacao": "a"}])
+    journal.append("456", [{"id": 8, "situacao": "b"}])
+    (_, caminho), = journal.segments()
+    with open(caminho, "rb") as f:
+        antes = f.read()
+    stats = compact_pending(journal)
+    assert stats["escritas_economizadas"] == 0
+    with open(caminho, "rb") as f:
+        assert f.read() == antes
+
+
+def test_rewrite_tail_rejeita_seq_fora_do_intervalo(journal):
+    for situacao in "ab":
+        journal.append("123", [{"id": 7, "situacao": situacao}])
+    with pytest.raises(ValueError):
+        journal.rewrite_tail(0, lambda registros: [dict(registros[0], seq=9)])
+    assert [r["seq"] for r in journal.read()] == [1, 2]  # o diário não foi alterado
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Diário de atualizações (core/journal.py): sequência, reserva e commit dos consumidores, recuperação após quedas."""
+
+import json
+import os
+
+import pytest
+
+from core.journal import UpdateJournal
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return UpdateJournal(str(tmp_path / "atualizacoes"))
+
+
+def tarefas(n):
+    return [{"id": n, "situacao": f"s{n}"}]
+
+
+def test_append_e_read_em_ordem(journal):
+    seqs = [journal.append("123", tarefas(i), {i: {"situacao": "antes"}}) for i in range(1, 4)]
+    assert seqs == [1, 2, 3]
+    registros = list(journal.read())
+    assert [r["seq"] for r in registros] == [1, 2, 3]
+    assert registros[0]["anterior"] == {"1": {"situacao": "antes"}}
+    assert [r["seq"] for r in journal.read(after_seq=1, limit=1)] == [2]
+    # Outra instância (outro processo) continua a numeração.
+    assert UpdateJournal(journal.folder).append("123", tarefas(4)) == 4
+
+
+def test_claim_commit(journal):
+    for i in range(1, 4):
+        journal.append("123", tarefas(i))
+    lote = journal.claim("robo", limit=2)
+    assert [r["seq"] for r in lote] == [1, 2]
+    # Sem commit (ex.: o robô caiu), o mesmo lote é entregue de novo.
+    assert [r["seq"] for r in journal.claim("robo", limit=2)] == [1, 2]
+
+    journal.commit("robo", 2)
+    assert journal.get_offset("robo") == 2
+    assert journal.claimed_seq() == 0
+    assert not os.path.exists(os.path.join(journal.offsets_dir, "robo.claim"))
+    assert [r["seq"] for r in journal.pending("robo")] == [3]
+    with pytest.raises(ValueError):
+        journal.commit("robo", 1)
+
+
+def test_commit_parcial_mantem_a_reserva(journal):
+    for i in range(1, 4):
+        journal.append("123", tarefas(i))
+    journal.claim("robo")
+    journal.commit("robo", 1)
+    assert journal.claimed_seq() == 3
+    journal.commit("robo", 3)
+    assert journal.claimed_seq() == 0
+
+
+def test_registro_parcial_no_fim_e_descartado(journal):
+    journal.append("123", tarefas(1))
+    (_, caminho), = journal.segments()
+    with open(caminho, "ab") as f:
+        f.write(b'{"seq": 2, "pasta": "123", "tas')  # gravação interrompida
+    assert [r["seq"] for r in UpdateJournal(journal.folder).read()] == [1]
+    assert journal.append("123", tarefas(2)) == 2
+    with open(caminho, "rb") as f:
+        linhas = f.read().splitlines()
+    assert [json.loads(linha)["seq"] for linha in linhas] == [1, 2]
+
+
+def test_leitura_incremental_ve_registros_novos(journal):
+    journal.append("123", tarefas(1))
+    assert [r["seq"] for r in journal.read()] == [1]
+    journal.append("123", tarefas(2))
+    assert [r["seq"] for r in journal.read(after_seq=1)] == [2]
+
+
+def test_rotacao_e_compact(tmp_path):
+    journal = UpdateJournal(str(tmp_path), max_segment_bytes=200)
+    for i in range(1, 7):
+        journal.append("123", tarefas(i))
+    segmentos = len(journal.segments())
+    assert segmentos > 2
+    assert [r["seq"] for r in journal.read()] == list(range(1, 7))
+
+    assert journal.compact() == 0  # nenhum consumidor registrado
+    journal.commit("robo", 6)
+    assert journal.compact() == segmentos - 1
+    assert len(journal.segments()) == 1  # o segmento ativo nunca é removido
+    assert journal.last_seq() == 6
+    assert journal.append("123", tarefas(7)) == 7
+
+
+def test_recuperacao_com_a_nova_versao_completa(journal):
+    journal.append("123", tarefas(1))
+    # Queda entre os dois renames de rewrite_tail(): só journal.new/ (completo) e journal.old/ existem.
+    os.rename(journal.journal_dir, journal.journal_dir + ".new")
+    os.makedirs(journal.journal_dir + ".old")
+    assert journal.append("123", tarefas(2)) == 2
+    assert [r["seq"] for r in journal.read()] == [1, 2]
+    assert not os.path.exists(journal.journal_dir + ".new")
+    assert not os.path.exists(journal.journal_dir + ".old")
+
+
+def test_recuperacao_descarta_nova_versao_incompleta(journal):
+    journal.append("123", tarefas(1))
+    # Queda antes dos renames: journal.new/ pela metade ao lado do diário atual, que continua valendo.
+    os.makedirs(journal.journal_dir + ".new")
+    with open(os.path.join(journal.journal_dir + ".new", "lixo.jsonl"), "w") as f:
+        f.write('{"seq": 99}\n')
+    assert journal.append("123", tarefas(2)) == 2
+    assert [r["seq"] for r in journal.read()] == [1, 2]
+    assert not os.path.exists(journal.journal_dir + ".new")
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Motor de modelos (core/modelos.py): sintaxe, filtros, laços e os erros de compilação e renderização."""
+
+import os
+from datetime import date
+
+import pytest
+
+from core import modelos
+from core.modelos import Template, TemplateError
+
+
+def render(source, **context):
+    return Template(source, "teste.txt").render(context)
+
+
+def test_variaveis_campos_e_filtros():
+    contexto = {"p": {"descricao": " Recurso "}, "valor": 25266.92, "data": date(2025, 3, 10), "vazio": ""}
+    assert render("{{ p.descricao|strip|upper }}", **contexto) == "RECURSO"
+    assert render("R$ {{ valor|moeda }}", **contexto) == "R$ 25,266.92"
+    assert render("{{ data|data }} {{ vazio|data('N/A') }}", **contexto) == "10/03/2025 N/A"
+    assert render('{{ vazio|default("decisão")|upper }}', **contexto) == "DECISÃO"
+
+
+def test_if_elif_else_e_not():
+    source = "{% if a %}A{% elif not b %}sem B{% else %}B{% endif %}"
+    assert render(source, a=True, b=True) == "A"
+    assert render(source, a=False, b=False) == "sem B"
+    assert render(source, a=False, b=True) == "B"
+
+
+def test_for_com_loop_e_laco_aninhado():
+    source = ("{% for c in categorias %}{{ loop.index }}.{{ c.nome }}:"
+              "{% for p in c.pedidos %}{{ p }}{% if not loop.last %},{% endif %}{% endfor %}"
+              "{% if not loop.last %};{% endif %}{% endfor %}")
+    categorias = [{"nome": "Procedentes", "pedidos": ["Férias", "FGTS"]}, {"nome": "Improcedentes", "pedidos": []}]
+    assert render(source, categorias=categorias) == "1.Procedentes:Férias,FGTS;2.Improcedentes:"
+    assert render(source, categorias=[]) == ""
+
+
+def test_linhas_so_com_tags_sao_removidas():
+    source = "{# comentário #}\n{% for p in itens %}\n- {{ p }}\n{% endfor %}\nfim\n"
+    assert render(source, itens=["a", "b"]) == "- a\n- b\nfim\n"
+    assert render("a  {%- if x -%}  b  {%- endif -%}  c", x=True) == "abc"
+
+
+def test_texto_literal_nao_e_executado():
+    source = "aspas ' \" \\ e {chaves} e \"\"\" triplas\n"
+    assert render(source) == source
+
+
+@pytest.mark.parametrize("source, mensagem", [
+    ("{% if a %}sem fim", "não foi fechado"),
+    ("{% for x in itens %}", "não foi fechado"),
+    ("{% endif %}", "sem 'if'"),
+    ("{% if a %}{% endfor %}", "sem 'for'"),
+    ("{% else %}", "sem 'if'"),
+    ("{% while a %}{% endwhile %}", "tag desconhecida"),
+    ("{% for x de itens %}{% endfor %}", "laço inválido"),
+    ("{{ a|inexistente }}", "filtro desconhecido"),
+    ("{{ a|default(x) }}", "argumento inválido"),
+    ("{{ loop.index }}", "fora de um bloco for"),
+    ("{{ __import__('os').getcwd() }}", "expressão inválida"),
+    ("{{ a + b }}", "expressão inválida"),
+    ("{% if a or b %}x{% endif %}", "expressão inválida"),
+])
+def test_erros_de_sintaxe(source, mensagem):
+    with pytest.raises(TemplateError, match=mensagem):
+        Template(source, "teste.txt")
+
+
+def test_erros_de_renderizacao():
+    with pytest.raises(TemplateError, match="variável 'ausente' não definida"):
+        render("{{ ausente }}")
+    with pytest.raises(TemplateError, match="falha ao renderizar"):
+        render("{{ p.campo }}", p={})
+    with pytest.raises(TemplateError, match="falha ao renderizar"):
+        render("{{ valor|moeda }}", valor="abc")
+
+
+def test_cache_recompila_quando_o_arquivo_muda(tmp_path, monkeypatch):
+    monkeypatch.setattr(modelos, "MODELOS_DIR", str(tmp_path))
+    caminho = tmp_path / "m.txt"
+    caminho.write_text("v1 {{ x }}", encoding="utf-8")
+    primeiro = modelos.get_template("m.txt")
+    assert modelos.get_template("m.txt") is primeiro
+    assert modelos.render("m.txt", {"x": 1}) == "v1 1"
+
+    caminho.write_text("v2 {{ x }}", encoding="utf-8")
+    stat = caminho.stat()
+    os.utime(caminho, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert modelos.render("m.txt", {"x": 1}) == "v2 1"
+    with pytest.raises(TemplateError, match="não encontrado"):
+        modelos.get_template("nao_existe.txt")
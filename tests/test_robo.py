@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Robô de atualizações (core/robo.py): repetições, fila de falhas e reprocessamento após uma queda."""
+
+import json
+import os
+
+import pytest
+
+from core.datajuri import DataJuriError
+from core.journal import UpdateJournal
+from core.robo import CONSUMIDOR, RoboAtualizacoes, coalesce
+
+
+class ClienteFalso:
+    """Cliente do DataJuri que registra as chamadas e levanta, por id do pedido, os erros programados."""
+
+    def __init__(self, erros=None):
+        self.erros = {k: list(v) for k, v in (erros or {}).items()}
+        self.chamadas = []
+
+    def _chamar(self, acao, pedido_id, campos, idempotency_key):
+        self.chamadas.append((acao, pedido_id, campos, idempotency_key))
+        if self.erros.get(pedido_id):
+            raise self.erros[pedido_id].pop(0)
+
+    def update_entity(self, modulo, pedido_id, campos, idempotency_key=None):
+        self._chamar("alterar", pedido_id, campos, idempotency_key)
+
+    def create_entity(self, modulo, campos, idempotency_key=None):
+        self._chamar("incluir", None, campos, idempotency_key)
+
+    def delete_entity(self, modulo, pedido_id, idempotency_key=None):
+        self._chamar("excluir", pedido_id, {}, idempotency_key)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return UpdateJournal(str(tmp_path))
+
+
+def robo(journal, cliente, **kwargs):
+    return RoboAtualizacoes(journal, cliente, concorrencia=2, max_tentativas=3, sleep=lambda s: None, **kwargs)
+
+
+def falhas(journal):
+    caminho = os.path.join(journal.folder, "dead_letter.jsonl")
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f]
+
+
+def test_coalesce_combina_por_pedido():
+    registros = [
+        {"seq": 1, "pasta": "123", "tasks": [{"id": 7, "situacao": "a"}, {"acao": "incluir", "nomeObjeto": "FGTS"}]},
+        {"seq": 2, "pasta": "123", "tasks": [{"id": 7, "situacao": "b", "obs": "x"}, {"id": 8, "situacao": "c"}]},
+        {"seq": 3, "pasta": "123", "tasks": [{"id": 8, "acao": "excluir"}, {"id": 8, "situacao": "d"}]},
+    ]
+    operacoes = {(op.acao, op.pedido_id): op for op in coalesce(registros)}
+    assert operacoes[("alterar", 7)].campos == {"situacao": "b", "obs": "x"}
+    assert operacoes[("alterar", 7)].seqs == [1, 2]
+    assert operacoes[("excluir", 8)].seqs == [2, 3]
+    assert operacoes[("incluir", None)].origem == (1, 1)
+    assert len(operacoes) == 3
+
+
+def test_falha_temporaria_e_repetida(journal):
+    journal.append("123", [{"id": 7, "situacao": "a"}])
+    cliente = ClienteFalso({7: [DataJuriError("indisponível", 503), DataJuriError("limite", 429)]})
+    resumo = robo(journal, cliente).processar_lote()
+    assert (resumo["aplicadas"], resumo["falhas"], resumo["tentativas"]) == (1, 0, 3)
+    assert len({chave for *_, chave in cliente.chamadas}) == 1  # a mesma chave de idempotência em todas as tentativas
+    assert falhas(journal) == []
+    assert journal.get_offset(CONSUMIDOR) == 1
+
+
+def test_falhas_definitivas_vao_para_a_fila_de_falhas(journal):
+    journal.append("123", [{"id": 7, "situacao": "a"}, {"id": 8, "situacao": "b"}, {"id": 9, "situacao": "c"}])
+    cliente = ClienteFalso({
+        7: [DataJuriError("inválido", 400)],                     # não repetível
+        8: [DataJuriError("indisponível", 503)] * 3,             # esgota as tentativas
+        9: [KeyError("campo")],                                  # erro inesperado
+    })
+    resumo = robo(journal, cliente).processar_lote()
+    assert (resumo["aplicadas"], resumo["falhas"]) == (0, 3)
+    por_id = {f["id"]: f for f in falhas(journal)}
+    assert (por_id[7]["tentativas"], por_id[7]["status_code"]) == (1, 400)
+    assert (por_id[8]["tentativas"], por_id[8]["status_code"]) == (3, 503)
+    assert por_id[9]["erro"] == "KeyError: 'campo'"
+    assert journal.get_offset(CONSUMIDOR) == 1  # o lote é confirmado mesmo com falhas
+
+
+def test_exclusao_de_pedido_inexistente_conta_como_aplicada(journal):
+    journal.append("123", [{"id": 7, "acao": "excluir"}])
+    resumo = robo(journal, ClienteFalso({7: [DataJuriError("não encontrado", 404)]})).processar_lote()
+    assert (resumo["aplicadas"], resumo["falhas"]) == (1, 0)
+
+
+def test_queda_antes_do_commit_reprocessa_sem_repetir_falhas(journal, monkeypatch):
+    journal.append("123", [{"id": 7, "situacao": "a"}, {"id": 8, "situacao": "b"}])
+
+    def queda(consumer, seq):
+        raise SystemExit("queda do robô")
+
+    monkeypatch.setattr(journal, "commit", queda)
+    cliente = ClienteFalso({7: [DataJuriError("inválido", 400)] * 2})
+    with pytest.raises(SystemExit):
+        robo(journal, cliente).processar_lote()
+    assert journal.get_offset(CONSUMIDOR) == 0
+    monkeypatch.undo()
+
+    # Novo processo do robô: o lote reservado é entregue de novo, com as mesmas chaves de idempotência.
+    resumo = robo(UpdateJournal(journal.folder), cliente).processar_lote()
+    assert resumo["registros"] == 1
+    chaves = [(pedido_id, chave) for _, pedido_id, _, chave in cliente.chamadas]
+    assert sorted(chaves[:2]) == sorted(chaves[2:])
+    assert [f["id"] for f in falhas(journal)] == [7]
+    assert journal.get_offset(CONSUMIDOR) == 1
+    assert robo(journal, cliente).processar_lote() is None
+
+
+def test_fila_de_falhas_com_linha_incompleta(journal):
+    with open(os.path.join(journal.folder, "dead_letter.jsonl"), "w", encoding="utf-8") as f:
+        f.write('{"idempotency_key": "robo-x", "id": 1')  # gravação interrompida
+    journal.append("123", [{"id": 7, "situacao": "a"}])
+    robo(journal, ClienteFalso({7: [DataJuriError("inválido", 400)]})).processar_lote()
+    assert [f["id"] for f in falhas(journal)] == [7]